@@ -1,8 +1,23 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
-import py_eureka_client.eureka_client as eureka_client
+import requests
 
-from constants.urls import APP_NAME, EURKEKA_SERVER, HOST, PORT
+from order_microservice.config.eureka.discovery import (
+    DiscoveryClient,
+    NoInstanceAvailable,
+    deregister,
+    register_with_retry,
+)
+from order_microservice.constants.urls import (
+    API_GATEWAY,
+    APP_NAME,
+    DISCOVERY_REFRESH_SECONDS,
+    DISCOVERY_STRATEGY,
+    EURKEKA_SERVER,
+    PORT,
+    SERVICE_CALL_TIMEOUT_SECONDS,
+)
 
 
 
@@ -13,6 +28,47 @@ import fastapi
 
 logger = logging.getLogger(__name__)
 
+# Shared registry cache; started and stopped by the application lifespan
+discovery_client = DiscoveryClient(
+    EURKEKA_SERVER,
+    refresh_interval_seconds=DISCOVERY_REFRESH_SECONDS,
+    strategy=DISCOVERY_STRATEGY,
+)
+
+
+def call_service(app_name: str, method: str, path: str, **kwargs) -> requests.Response:
+    """
+    Call another service directly on an instance from the registry cache.
+
+    Falls back to the API gateway while the registry has no instance of the service (Eureka
+    down or not fetched yet) or when the chosen instance refuses the connection. Calls time out
+    after SERVICE_CALL_TIMEOUT_SECONDS unless the caller passes its own ``timeout``.
+    """
+    kwargs.setdefault("timeout", SERVICE_CALL_TIMEOUT_SECONDS)
+    try:
+        with discovery_client.lease(app_name) as instance:
+            return requests.request(method, f"{instance.base_url}{path}", **kwargs)
+    except (NoInstanceAvailable, requests.ConnectionError) as e:
+        logger.warning(f"Calling {app_name} through the API gateway: {e}")
+        return requests.request(method, f"{API_GATEWAY}{path}", **kwargs)
+
+
+def start_discovery() -> asyncio.Task:
+    """Register with Eureka in the background and start refreshing the registry cache"""
+    discovery_client.start()
+    return asyncio.create_task(register_with_retry(
+        eureka_server=EURKEKA_SERVER,
+        app_name=APP_NAME,
+        instance_port=PORT,
+    ))
+
+
+async def stop_discovery(registration: asyncio.Task) -> None:
+    if not registration.done():
+        registration.cancel()
+    await discovery_client.stop()
+    await deregister()
+
 # def read_banner():
 #     with open('banner.txt', 'r') as f:
 #         return f.read()
@@ -30,12 +86,7 @@ async def lifespan(app: fastapi.FastAPI):
     fastapi_version = get_fastapi_version()
     python_version = get_python_version()
     port = PORT  # Default port, you can change this or make it configurable
-    await eureka_client.init_async(
-            eureka_server=EURKEKA_SERVER,
-            app_name=APP_NAME,
-            instance_port=port,
-            instance_host=HOST
-    )
+    registration = start_discovery()
     info = f"""
     Framework: FastAPI {fastapi_version}
     Python: {python_version}
@@ -49,5 +100,4 @@ async def lifespan(app: fastapi.FastAPI):
     yield
 
     # Shutdown logic
-    # Your existing shutdown logic here (if any)
-    # ...
\ No newline at end of file
+    await stop_discovery(registration)
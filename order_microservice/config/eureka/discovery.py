@@ -0,0 +1,35 @@
+"""
+Eureka registration and client-side service discovery, shared with product-service.
+
+The module lives once, in product-service's ``config/eureka/discovery.py``, and is loaded
+here from that file: product-service is built from its own Docker context and cannot import
+from this package, while the order service runs from the repository root, where both are.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+_SOURCE = Path(__file__).resolve().parents[3] / "product-service" / "config" / "eureka" / "discovery.py"
+_MODULE_NAME = "afrifurn_discovery"
+
+
+def _load_shared_module():
+    module = sys.modules.get(_MODULE_NAME)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(_MODULE_NAME, _SOURCE)
+        module = importlib.util.module_from_spec(spec)
+        # Registered before it runs, as dataclasses look their module up in sys.modules
+        sys.modules[_MODULE_NAME] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+_shared = _load_shared_module()
+
+DiscoveryClient = _shared.DiscoveryClient
+NoInstanceAvailable = _shared.NoInstanceAvailable
+ServiceInstance = _shared.ServiceInstance
+deregister = _shared.deregister
+register_with_retry = _shared.register_with_retry
+
+__all__ = ["DiscoveryClient", "NoInstanceAvailable", "ServiceInstance", "deregister", "register_with_retry"]
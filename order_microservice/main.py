@@ -4,10 +4,10 @@ import sys
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from py_eureka_client import eureka_client
 
 
-from order_microservice.constants.urls import HOST, PORT, EURKEKA_SERVER, APP_NAME
+from order_microservice.config.eureka import start_discovery, stop_discovery
+from order_microservice.constants.urls import HOST, PORT
 from order_microservice.config.db import DATABASE_URL, create_db_and_tables
 from order_microservice.routers.order_router import router as order_router
 from order_microservice.services.kafka.kafka_consumer import start_kafka_consumers
@@ -20,13 +20,11 @@ async def app_lifespan(app: FastAPI):
         # await start_kafka_consumers()
         # Eureka initialization
         await asyncio.to_thread(start_kafka_consumers)
-        await eureka_client.init_async(
-            eureka_server=EURKEKA_SERVER, 
-            app_name=APP_NAME, 
-            instance_port=PORT
-        )
+        # Eureka registration retries in the background instead of delaying start-up
+        registration = start_discovery()
  
         yield
+        await stop_discovery(registration)
     except Exception as e:
         print(f"Startup error: {e}")
         raise e
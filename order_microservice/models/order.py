@@ -17,8 +17,11 @@ class OrderInDB(OrderCreate):
     created_at: datetime
     user_id: int
 class CartItem(BaseModel):
-    product: dict
+    # Snapshot of the product taken by product-service when the item was added
+    product_id: str
     variant_id: str
+    name: str
+    image: Optional[str] = None
     quantity: int 
     unit_price: float
     total_price: float
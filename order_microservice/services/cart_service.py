@@ -1,7 +1,7 @@
 from typing import Protocol
 
-import requests
-
+from order_microservice.config.eureka import call_service
+from order_microservice.constants.urls import PRODUCT_SERVICE
 from order_microservice.models.order import Cart
 
 
@@ -10,15 +10,23 @@ class CartService(Protocol):
         pass
     def fetch_cart_by_cart_id(self,cart_id:str)->Cart|None:
         pass
+    def checkout_cart(self,cart_id:str)->Cart|None:
+        pass
 
 class CartServiceImpl(CartService):
     
     # Update the fetch_cart_by_cart_id method
     def fetch_cart_by_cart_id(self, cart_id: str) -> Cart:
-        response =  requests.get(f"http://localhost:8000/api/v1/cart/{cart_id}")
+        response = call_service(PRODUCT_SERVICE, "GET", f"/product-service/api/v1/cart/{cart_id}")
         data = response.json()
         print("Data:", data)
         # Assuming the response contains 'items' in the JSON
         return Cart(items=data.get('items', []),user_id=data.get('user_id'),total_amount=data.get('total_amount'))
 
-
+    def checkout_cart(self, cart_id: str) -> Cart|None:
+        """Cart to order from, as the product service has written it to its database"""
+        response = call_service(PRODUCT_SERVICE, "POST", f"/product-service/api/v1/cart/{cart_id}/checkout")
+        if not response.ok:
+            return None
+        data = response.json()
+        return Cart(items=data.get('items', []),user_id=data.get('user_id'),total_amount=data.get('total_amount'))
@@ -42,6 +42,16 @@ class InvoiceService:
         session.refresh(invoice)
         print("Updated invoice:", invoice)
         return invoice
+    def product_descriptions(self, cart: Cart) -> dict:
+        """Descriptions of the cart's products by ID, fetched in one call; empty if product-service fails"""
+        product_ids = list(dict.fromkeys(item.product_id for item in cart.items))
+        try:
+            products = self.product_service.query_products(product_ids)
+            return {str(product.get("_id") or product.get("id")): product.get("description") for product in products}
+        except Exception as e:
+            print("Could not fetch product descriptions:", e)
+            return {}
+
     def generate_pdf(self,invoice: Invoice,cart:Cart)->None:
         """
         Generate a PDF invoice using ReportLab
@@ -70,8 +80,9 @@ class InvoiceService:
         items_data = [
             ['QTY', 'DESCRIPTION', 'UNIT PRICE', 'TOTAL SALES']
         ]
+        descriptions = self.product_descriptions(cart)
         items_data.extend([
-            [str(item.quantity), item.product['description'], 
+            [str(item.quantity), descriptions.get(item.product_id) or item.name, 
              f'US$ {item.unit_price:.2f}', 
              f'US$ {item.quantity * item.unit_price:.2f}'] 
             for item in cart.items
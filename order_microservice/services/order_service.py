@@ -43,7 +43,7 @@ class OrderService:
         if order.user_id is None:
             return None
 
-        cart=self.cart_service.fetch_cart_by_cart_id(cart_id=order.cart_id)
+        cart=self.cart_service.checkout_cart(cart_id=order.cart_id)
         
         if not isinstance(cart, Cart): return None
         db_order = Order(customer_address=order.customer_address, customer_name=order.customer_name, customer_phone=order.customer_phone, user_id=order.user_id)
@@ -1,17 +1,40 @@
-from typing import Protocol
+from typing import List, Protocol
 
-import requests
+from order_microservice.config.eureka import call_service
+from order_microservice.constants.urls import PRODUCT_SERVICE
+
+# product-service answers /products/by-ids for at most this many IDs
+MAX_PRODUCTS_PER_REQUEST = 100
 
 
 class ProductService(Protocol):
     async def query_product(self, product_id: str) -> dict:
         ...
 
+    def query_products(self, product_ids: List[str]) -> List[dict]:
+        ...
+
+    def query_variant(self, product_id: str, variant_id: str) -> dict:
+        ...
+
 class ProductServiceImpl(ProductService ):
+    # Direct to a product-service instance from the registry cache, skipping the gateway hop
     def query_product(self, product_id: str) -> dict:
-        response = requests.get(f"http://product-service/api/products/{product_id}")
+        response = call_service(PRODUCT_SERVICE, "GET", "/product-service/api/v1/products/filter-one", params={"id": product_id})
         return response.json()
 
-    def query_variant(self, variant_id: str) -> dict:
-        response = requests.get(f"http://product-service/api/variants/{variant_id}")
-        return response.json()
\ No newline at end of file
+    def query_products(self, product_ids: List[str]) -> List[dict]:
+        # One request per 100 products of an order; product-service reads them from its cache in bulk.
+        # Raises requests.HTTPError on an error response, such as a 503 from load shedding
+        products = []
+        for start in range(0, len(product_ids), MAX_PRODUCTS_PER_REQUEST):
+            batch = product_ids[start:start + MAX_PRODUCTS_PER_REQUEST]
+            response = call_service(PRODUCT_SERVICE, "GET", "/product-service/api/v1/products/by-ids", params={"ids": ",".join(batch)})
+            response.raise_for_status()
+            products.extend(response.json())
+        return products
+
+    def query_variant(self, product_id: str, variant_id: str) -> dict:
+        # product-service declares this route without a slash after the /product/variant prefix
+        response = call_service(PRODUCT_SERVICE, "GET", f"/product-service/api/v1/product/variant{product_id}/variants/{variant_id}")
+        return response.json()
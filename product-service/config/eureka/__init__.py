@@ -1,12 +1,20 @@
+import asyncio
 import os
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
-import py_eureka_client.eureka_client as eureka_client
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 import os
-from decorators.redis_provider import RedisCacheProvider
+from config.eureka.discovery import DiscoveryClient, deregister, register_with_retry
+from database import DatabaseStatus, close_client, connect_with_retry
+from decorators import close_connection_pools
 from config.settings import get_settings
+from core.metrics import EventLoopLagMonitor
+
+if TYPE_CHECKING:
+    from services.cache_warmer import CacheWarmer
+    from services.repository.redis_cart_repository import CartWriteBehind
+
 your_rest_server_port = 8000
 DEFAULT_HOST = "0.0.0.0"
 DEFAULT_PORT = 8000
@@ -74,9 +82,41 @@ def log_eureka_status(status: str, url: str, reason: str = ""):
         print(f"  Reason: {reason}")
     print("}\n")
 
+def create_cache_warmer(app: fastapi.FastAPI) -> "CacheWarmer":
+    """Build the startup cache warmer from settings"""
+    from routers import API_PREFIX
+    from services.cache_warmer import CacheWarmer
+
+    return CacheWarmer(
+        app,
+        base_path=API_PREFIX,
+        static_paths=settings.cache_warm_paths,
+        include_categories=settings.cache_warm_categories,
+        log_file=settings.cache_warm_log_file,
+        log_prefixes=settings.cache_warm_log_prefixes,
+        top_log_queries=settings.cache_warm_top_queries,
+        concurrency=settings.cache_warm_concurrency,
+        timeout_seconds=settings.cache_warm_timeout_seconds,
+    )
+
+async def migrate_cart_items() -> None:
+    """Rewrite carts stored before item snapshots; a failure is logged and retried on the next boot"""
+    from services.repository.cart_repository import CartRepository
+
+    try:
+        await asyncio.to_thread(CartRepository().migrate_legacy_items)
+    except Exception as e:
+        logging.error(f"Cart item migration failed: {e}")
+
+def create_cart_write_behind() -> "CartWriteBehind":
+    """Build the task that writes Redis carts to Mongo, for CART_STORE=redis"""
+    from dependencies.cart import get_cart_repository
+    from services.repository.redis_cart_repository import CartWriteBehind
+
+    return CartWriteBehind(get_cart_repository(), interval_seconds=settings.cart_flush_interval_seconds)
+
 @asynccontextmanager
 async def lifespan(app: fastapi.FastAPI):
-    redis_app=RedisCacheProvider()
 
     host = settings.host_ip # type: ignore
     banner = read_banner()
@@ -84,31 +124,56 @@ async def lifespan(app: fastapi.FastAPI):
     python_version = get_python_version()
     port = 8000
     eureka_url = settings.eureka_client_service_url # type: ignore
-    await redis_app.set(key="categories",value=None)
-    await redis_app.set(key="level1_categories",value=None)
-    await redis_app.set(key="level2_categories",value=None)
-    await redis_app.set(key="level1-categories-by-category",value=None)
-    await redis_app.set(key="level2-categories-by-level1",value=None) 
-    await redis_app.set(key="materials",value=None)
-    await redis_app.set(key="material",value=None)
-    await redis_app.set(key="colors",value=None)
-    await redis_app.set(key="currencies",value=None)
-    await redis_app.set(key="products",value=None)
-    await redis_app.set(key="level-one-products",value=None)
-    await redis_app.set(key="level-two-products",value=None)
-    await redis_app.set(key="filtered-product",value=None)
-    await redis_app.set(key="category-product",value=None)
-    try:
-        await eureka_client.init_async(
-            eureka_server=eureka_url, # type: ignore
+    # Connect to Mongo, then warm hot catalog keys, in the background; /health/ready stays
+    # false until both finish so the worker can boot while Mongo is still unreachable
+    database_status = DatabaseStatus()
+    app.state.database = database_status
+    cache_warmer = create_cache_warmer(app) if settings.cache_warm_enabled else None
+    app.state.cache_warmer = cache_warmer
+
+    async def start_up() -> None:
+        await connect_with_retry(database_status)
+        await migrate_cart_items()
+        if cache_warmer is not None:
+            await cache_warmer.run()
+
+    startup_task = asyncio.create_task(start_up())
+
+    cart_write_behind = create_cart_write_behind() if settings.cart_store == "redis" else None
+    if cart_write_behind is not None:
+        cart_write_behind.start()
+
+    loop_lag_monitor = EventLoopLagMonitor(interval_seconds=settings.event_loop_lag_interval_seconds)
+    loop_lag_monitor.start()
+
+    # Registration retries in the background; a slow Eureka server no longer delays serving
+    def registration_failed(attempt: int, error: Exception) -> None:
+        if attempt == 1:
+            log_eureka_status("DOWN", eureka_url, reason=str(error))
+
+    async def register() -> None:
+        await register_with_retry(
+            eureka_url, # type: ignore
             app_name="product-service",
             instance_port=int(settings.server_port), # type: ignore
-            instance_host=host
+            instance_host=host,
+            initial_delay_seconds=settings.eureka_register_initial_delay_seconds,
+            max_delay_seconds=settings.eureka_register_max_delay_seconds,
+            on_error=registration_failed,
         )
         log_eureka_status("UP", eureka_url)
-    except Exception as e:
-        reason = str(e)
-        log_eureka_status("DOWN", eureka_url, reason=reason)
+
+    registration_task = asyncio.create_task(register())
+
+    discovery = None
+    if settings.discovery_enabled:
+        discovery = DiscoveryClient(
+            eureka_url, # type: ignore
+            refresh_interval_seconds=settings.discovery_refresh_seconds,
+            strategy=settings.discovery_strategy,
+        )
+        discovery.start()
+    app.state.discovery = discovery
 
     info = f"""
     {banner}
@@ -117,4 +182,17 @@ async def lifespan(app: fastapi.FastAPI):
     Running on: http://{host}:{port}
     """
     logging.info(info)
-    yield
\ No newline at end of file
+    yield
+
+    for task in (startup_task, registration_task):
+        if not task.done():
+            task.cancel()
+    await loop_lag_monitor.stop()
+    if cart_write_behind is not None:
+        # Writes the carts still dirty, so it runs before the Redis pools are closed
+        await cart_write_behind.stop()
+    if discovery is not None:
+        await discovery.stop()
+    await deregister()
+    await close_connection_pools()
+    close_client()
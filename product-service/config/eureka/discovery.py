@@ -0,0 +1,405 @@
+"""
+Eureka registration and client-side service discovery.
+
+Registration runs as a background task that retries with backoff, so a slow or unreachable
+Eureka server never delays start-up. ``DiscoveryClient`` keeps the Eureka registry in memory,
+refreshes it on an interval and load-balances calls across the UP instances of a service, so
+service-to-service calls go straight to an instance instead of through the API gateway.
+
+The order service loads this file too (see its ``config/eureka/discovery.py``), so the module
+must only import the standard library, httpx and py_eureka_client.
+
+httpx is imported when the client is first used: discovery is off by default and the import
+costs about as much as the rest of the eureka package, on every worker boot.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class NoInstanceAvailable(LookupError):
+    """The cached registry has no UP instance of an application"""
+
+    def __init__(self, app_name: str):
+        self.app_name = app_name
+        super().__init__(f"No instance of {app_name} is available")
+
+
+@dataclass(frozen=True)
+class ServiceInstance:
+    """One registered instance of an application"""
+    app_name: str
+    instance_id: str
+    host: str
+    port: int
+    secure: bool = False
+
+    @property
+    def base_url(self) -> str:
+        return f"{'https' if self.secure else 'http'}://{self.host}:{self.port}"
+
+    @classmethod
+    def from_eureka(cls, app_name: str, data: Dict[str, Any], prefer_ip: bool = False) -> "ServiceInstance":
+        """
+        Build an instance from its entry in Eureka's JSON registry.
+
+        Args:
+            app_name: Application the instance belongs to
+            data: The ``instance`` object
+            prefer_ip: Address the instance by ``ipAddr`` instead of ``hostName``
+
+        Returns:
+            The instance
+        """
+        secure_port = data.get("securePort") or {}
+        secure = str(secure_port.get("@enabled", "false")).lower() == "true"
+        port = (secure_port if secure else data.get("port")) or {}
+        primary, fallback = ("ipAddr", "hostName") if prefer_ip else ("hostName", "ipAddr")
+        host = data.get(primary) or data.get(fallback) or ""
+        port_number = int(port.get("$", 443 if secure else 80))
+        return cls(
+            app_name=app_name.upper(),
+            instance_id=data.get("instanceId") or f"{host}:{port_number}",
+            host=host,
+            port=port_number,
+            secure=secure,
+        )
+
+
+def _as_list(value: Any) -> List[Any]:
+    # Eureka serialises a single-element array as a bare object
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def parse_registry(payload: Dict[str, Any], prefer_ip: bool = False) -> Dict[str, List[ServiceInstance]]:
+    """
+    Extract the UP instances of every application from a ``GET /eureka/apps`` response.
+
+    Args:
+        payload: Decoded JSON body
+        prefer_ip: Address instances by IP instead of host name
+
+    Returns:
+        Instances keyed by upper-case application name; applications without UP instances are left out
+    """
+    registry: Dict[str, List[ServiceInstance]] = {}
+    for application in _as_list((payload.get("applications") or {}).get("application")):
+        name = str(application.get("name", "")).upper()
+        instances = [
+            ServiceInstance.from_eureka(name, instance, prefer_ip)
+            for instance in _as_list(application.get("instance"))
+            if instance.get("status") == "UP"
+        ]
+        if instances:
+            registry[name] = instances
+    return registry
+
+
+def registry_urls(eureka_server: str) -> List[str]:
+    """``/apps`` URLs for a comma-separated list of Eureka servers, adding ``/eureka`` when missing"""
+    urls = []
+    for server in eureka_server.split(","):
+        server = server.strip().rstrip("/")
+        if not server:
+            continue
+        if not server.endswith("/eureka"):
+            server += "/eureka"
+        urls.append(f"{server}/apps")
+    return urls
+
+
+class LoadBalancer(ABC):
+    """Chooses an instance for each call; ``release`` is called once the call has finished"""
+
+    @abstractmethod
+    def choose(self, instances: List[ServiceInstance]) -> ServiceInstance:
+        pass
+
+    def release(self, instance: ServiceInstance) -> None:
+        pass
+
+
+class RoundRobinBalancer(LoadBalancer):
+    """Cycles through the instances of each application in turn"""
+
+    def __init__(self):
+        self._counters: Dict[str, Iterator[int]] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, instances: List[ServiceInstance]) -> ServiceInstance:
+        with self._lock:
+            counter = self._counters.setdefault(instances[0].app_name, itertools.count())
+            return instances[next(counter) % len(instances)]
+
+
+class LeastOutstandingBalancer(LoadBalancer):
+    """
+    Chooses the instance with the fewest requests in flight from this process.
+
+    Ties are broken round robin, so an idle service still spreads its calls.
+    """
+
+    def __init__(self):
+        self._outstanding: Dict[str, int] = {}
+        self._tiebreak = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self, instances: List[ServiceInstance]) -> ServiceInstance:
+        with self._lock:
+            offset = next(self._tiebreak) % len(instances)
+            rotated = instances[offset:] + instances[:offset]
+            instance = min(rotated, key=lambda candidate: self._outstanding.get(candidate.instance_id, 0))
+            self._outstanding[instance.instance_id] = self._outstanding.get(instance.instance_id, 0) + 1
+            return instance
+
+    def release(self, instance: ServiceInstance) -> None:
+        with self._lock:
+            remaining = self._outstanding.get(instance.instance_id, 0) - 1
+            if remaining > 0:
+                self._outstanding[instance.instance_id] = remaining
+            else:
+                self._outstanding.pop(instance.instance_id, None)
+
+    def outstanding(self, instance: ServiceInstance) -> int:
+        return self._outstanding.get(instance.instance_id, 0)
+
+
+BALANCERS: Dict[str, Callable[[], LoadBalancer]] = {
+    "round_robin": RoundRobinBalancer,
+    "least_outstanding": LeastOutstandingBalancer,
+}
+
+
+class DiscoveryClient:
+    """
+    In-memory copy of the Eureka registry with client-side load balancing.
+
+    ``start`` launches a task that fetches the full registry every ``refresh_interval_seconds``.
+    When a refresh fails the previous registry is kept, so calls keep flowing while Eureka is
+    down. Lookups never touch the network and are safe to use from threads.
+    """
+
+    def __init__(
+        self,
+        eureka_server: str,
+        refresh_interval_seconds: float = 30.0,
+        strategy: str = "round_robin",
+        prefer_ip: bool = False,
+        timeout_seconds: float = 5.0,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            eureka_server: Eureka server URL, or several separated by commas
+            refresh_interval_seconds: Delay between registry fetches
+            strategy: ``round_robin`` or ``least_outstanding``
+            prefer_ip: Address instances by IP instead of host name
+            timeout_seconds: Timeout of registry fetches and of requests sent through ``request``
+            transport: httpx transport, for tests
+
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        if strategy not in BALANCERS:
+            raise ValueError(f"Unknown load balancing strategy: {strategy}")
+        self.urls = registry_urls(eureka_server)
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.balancer = BALANCERS[strategy]()
+        self.prefer_ip = prefer_ip
+        self.timeout_seconds = timeout_seconds
+        self.transport = transport
+        self.registry: Dict[str, List[ServiceInstance]] = {}
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _client(self) -> "httpx.AsyncClient":
+        import httpx
+
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=self.timeout_seconds, transport=self.transport)
+        return self._http
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the registry from the first Eureka server that answers.
+
+        Returns:
+            True if the registry was replaced, False if every server failed
+        """
+        import httpx
+
+        for url in self.urls:
+            try:
+                response = await self._client().get(url, headers={"Accept": "application/json"})
+                response.raise_for_status()
+                self.registry = parse_registry(response.json(), self.prefer_ip)
+            except (httpx.HTTPError, ValueError) as e:
+                self.last_error = f"{url}: {e}"
+                continue
+            self.refreshed_at = time.time()
+            self.last_error = None
+            return True
+
+        logger.warning(f"Eureka registry refresh failed, keeping {len(self.registry)} cached applications: {self.last_error}")
+        return False
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    def start(self) -> None:
+        """Start refreshing the registry in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def instances(self, app_name: str) -> List[ServiceInstance]:
+        return self.registry.get(app_name.upper(), [])
+
+    @contextmanager
+    def lease(self, app_name: str) -> Iterator[ServiceInstance]:
+        """
+        Choose an instance for one call; the balancer counts it as in flight until the block exits.
+
+        Args:
+            app_name: Application to call, e.g. ``product-service``
+
+        Raises:
+            NoInstanceAvailable: If the registry has no UP instance of the application
+        """
+        instances = self.instances(app_name)
+        if not instances:
+            raise NoInstanceAvailable(app_name)
+        instance = self.balancer.choose(instances)
+        try:
+            yield instance
+        finally:
+            self.balancer.release(instance)
+
+    async def request(self, app_name: str, method: str, path: str, **kwargs: Any) -> "httpx.Response":
+        """
+        Send a request to an instance of an application.
+
+        A connection failure is retried once on another instance when there is one.
+
+        Args:
+            app_name: Application to call
+            method: HTTP method
+            path: Path on the instance, starting with ``/``
+            **kwargs: Passed to ``httpx.AsyncClient.request``
+
+        Returns:
+            The response
+
+        Raises:
+            NoInstanceAvailable: If the registry has no UP instance of the application
+            httpx.TransportError: If the request could not be sent
+        """
+        import httpx
+
+        attempts = 2 if len(self.instances(app_name)) > 1 else 1
+        for attempt in range(1, attempts + 1):
+            with self.lease(app_name) as instance:
+                try:
+                    return await self._client().request(method, f"{instance.base_url}{path}", **kwargs)
+                except httpx.TransportError as e:
+                    if attempt == attempts:
+                        raise
+                    logger.warning(f"{app_name} instance {instance.instance_id} failed, retrying on another: {e}")
+        raise NoInstanceAvailable(app_name)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "applications": {name: len(instances) for name, instances in self.registry.items()},
+            "refreshed_at": self.refreshed_at,
+            "last_error": self.last_error,
+        }
+
+
+async def register_with_retry(
+    eureka_server: str,
+    app_name: str,
+    instance_port: int,
+    instance_host: str = "",
+    initial_delay_seconds: float = 1.0,
+    max_delay_seconds: float = 60.0,
+    on_error: Optional[Callable[[int, Exception], None]] = None,
+) -> None:
+    """
+    Register this instance with Eureka, retrying with exponential backoff until it succeeds.
+
+    Meant to run as a background task; cancel it to give up. The instance does not fetch the
+    registry through py_eureka_client, DiscoveryClient does that.
+
+    Args:
+        eureka_server: Eureka server URL(s)
+        app_name: Name to register under
+        instance_port: Port the instance serves on
+        instance_host: Host name to register, detected when empty
+        initial_delay_seconds: Delay before the first retry
+        max_delay_seconds: Upper bound of the retry delay
+        on_error: Called with the attempt number and the error after each failed attempt
+    """
+    import py_eureka_client.eureka_client as eureka_client
+
+    delay = initial_delay_seconds
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            await eureka_client.init_async(
+                eureka_server=eureka_server,
+                app_name=app_name,
+                instance_port=instance_port,
+                instance_host=instance_host,
+                should_discover=False,
+            )
+        except Exception as e:
+            if on_error is not None:
+                on_error(attempt, e)
+            logger.warning(f"Eureka registration failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay_seconds)
+            continue
+        logger.info(f"Registered {app_name} with Eureka after {attempt} attempt(s)")
+        return
+
+
+async def deregister() -> None:
+    """Remove this instance from Eureka if it was registered"""
+    import py_eureka_client.eureka_client as eureka_client
+
+    if eureka_client.get_client() is not None:
+        try:
+            await eureka_client.stop_async()
+        except Exception as e:
+            logger.warning(f"Eureka deregistration failed: {e}")
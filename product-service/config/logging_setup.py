@@ -0,0 +1,87 @@
+"""
+Logging for the product service: JSON lines written by a background thread.
+
+Every record goes through a ``QueueHandler`` into an in-memory queue; a ``QueueListener``
+thread formats it and writes it to the log file, so the event loop never waits on disk I/O.
+"""
+import atexit
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+import orjson
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line.
+
+    Fields passed as ``extra={"fields": {...}}`` are merged into the object, which is how the
+    request logging middleware records method, path, status and duration.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+def _stop_listener() -> None:
+    """Flush and stop the running listener, if any, and close its file"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+# Registered once: ``stop`` raises on a listener that is already stopped
+atexit.register(_stop_listener)
+
+
+def configure_logging(log_file: str = "app.log", level: int = logging.INFO) -> QueueListener:
+    """
+    Replace the root handlers with a queue feeding a JSON-lines file.
+
+    Calling it again stops the previous listener first. The listener is flushed and stopped
+    at interpreter exit.
+
+    Args:
+        log_file: File the listener appends to
+        level: Root logger level
+
+    Returns:
+        The running listener
+    """
+    global _listener
+    _stop_listener()
+
+    file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
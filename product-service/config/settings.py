@@ -10,10 +10,93 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379"
     redis_key_prefix: str = "afrifurn"
     redis_ttl_seconds: int = 300  # 5 minutes default TTL
+    redis_max_key_length: int = 200  # longer keys are stored under a digest
+    redis_max_connections: int = 50  # shared by every cache provider in the process
+    redis_socket_timeout_ms: int = 40
+    redis_connect_timeout_ms: int = 40
+    redis_admin_timeout_ms: int = 5000  # key sampling for /cache/stats, on its own connection
+    redis_circuit_failure_threshold: int = 5  # consecutive failures before the cache is bypassed
+    redis_circuit_cooldown_seconds: float = 30.0
+    
+    # HTTP caching of catalog responses
+    catalog_cache_max_age: int = 30
+    catalog_stale_while_revalidate: int = 60
+    catalog_version_refresh_seconds: float = 1.0  # how long an instance trusts its copy of a catalog version
+    
+    # Response compression
+    compression_minimum_size: int = 1024  # bytes; smaller bodies are sent as is
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    compression_zstd_level: int = 3
+    compression_store_max_bytes: int = 32 * 1024 * 1024  # compressed catalog bodies kept per instance
+    
+    # Cache warming on startup; paths are relative to the API prefix
+    cache_warm_enabled: bool = True
+    cache_warm_paths: list = [
+        "/categories/", "/categories/level-1/", "/categories/level-2/",
+        "/colors/", "/materials/", "/currencies/",
+        "/products/filter",
+        "/products/filter?sort_by=_id&sort_order=-1",  # newest
+        "/products/filter?sort_by=views&sort_order=-1",  # most viewed
+    ]
+    cache_warm_categories: bool = True  # first page of every level-1 and level-2 category
+    cache_warm_log_file: str = "app.log"
+    cache_warm_log_prefixes: list = ["/products/filter"]
+    cache_warm_top_queries: int = 20
+    cache_warm_concurrency: int = 4
+    cache_warm_timeout_seconds: float = 30.0
+    
+    # Logging; records are written as JSON lines by a background thread
+    log_file: str = "app.log"
+    request_log_sample_rate: float = 0.1  # share of fast, successful requests that are logged
+    request_log_slow_seconds: float = 1.0  # slower requests are always logged
+    
+    # Metrics
+    event_loop_lag_interval_seconds: float = 0.5  # how often event loop lag is sampled
+    
+    # Profiling; requests with X-Profile and an admin API key are always profiled
+    profiling_sample_every: int = 0  # also profile every N-th request; 0 disables sampling
+    profiling_dir: str = "profiles"
+    profiling_max_profiles: int = 50  # older profiles are deleted
+    
+    # Admission control; a concurrency limit adapted to latency, excess requests queue briefly then get 503
+    admission_enabled: bool = True
+    admission_initial_limit: int = 50
+    admission_min_limit: int = 4
+    admission_max_limit: int = 500
+    admission_latency_target_ms: int = 500  # responses starting later than this shrink the limit
+    admission_max_queue: int = 200
+    admission_queue_timeout_ms: int = 1000  # high priority may wait twice this, low priority half
+    admission_retry_after_seconds: int = 2
+    admission_priorities: dict = {  # text in the path -> high, normal, low or exempt; first match wins
+        "/health": "exempt", "/metrics": "exempt",
+        "/bulk-import": "low", "/products/export": "low", "/debug": "low",
+        "/products/filter-one": "high", "/cart": "high",
+    }
+    
+    # Rate limiting; token buckets per client in Redis, kept per instance while Redis is unreachable
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "redis"  # or "memory" for per-instance buckets only
+    rate_limit_overrides: dict = {}  # scope -> limit such as "300/minute", replacing the route's default
+    rate_limit_trust_forwarded: bool = False  # count clients by the first X-Forwarded-For address
+    rate_limit_local_max_keys: int = 100_000  # in-process buckets kept per instance
+    
+    # Cart storage; "redis" keeps active carts in Redis hashes and writes them to Mongo in the background
+    cart_store: str = "mongo"  # or "redis"
+    cart_redis_url: str = ""  # defaults to redis_url; the server must use maxmemory-policy noeviction
+    cart_redis_key_prefix: str = "afrifurn-cart"  # apart from the cache prefix, so clearing the cache keeps carts
+    cart_redis_timeout_ms: int = 500  # command and connect timeout of the cart store's own pool
+    cart_idle_seconds: int = 3 * 24 * 3600  # idle carts are written to Mongo and dropped from Redis
+    cart_flush_interval_seconds: float = 2.0  # how far Mongo may lag behind Redis
+    cart_flush_batch_size: int = 500
     
     # Database Configuration
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "afrifurn"
+    mongo_server_selection_timeout_ms: int = 2000  # how long a command waits for an unreachable server
+    mongo_connect_timeout_ms: int = 2000
+    mongo_slow_query_ms: int = 100  # slower commands are logged and their shape explained once
+    mongo_query_shapes_max: int = 500  # distinct query shapes timed per instance
     
     # Application Configuration
     app_name: str = "AfriFurn Product Service"
@@ -28,6 +111,12 @@ class Settings(BaseSettings):
     eureka_server_url: str = "http://localhost:8761/eureka/"
     service_name: str = "product-service"
     service_port: int = 8000
+    eureka_register_initial_delay_seconds: float = 1.0
+    eureka_register_max_delay_seconds: float = 60.0
+    # Client-side discovery for calls to other services; product-service makes none by default
+    discovery_enabled: bool = False
+    discovery_refresh_seconds: float = 30.0
+    discovery_strategy: str = "round_robin"  # or "least_outstanding"
 
     model_config = SettingsConfigDict(env_file=".env.production", extra='allow')
 
@@ -92,4 +92,12 @@ class ExternalServiceError(AfriFurnException):
             "service_name": service_name,
             "operation": operation,
             "details": details
-        }) 
\ No newline at end of file
+        })
+
+
+class RateLimitExceeded(AfriFurnException):
+    """Raised when a client has used up its request budget for a route."""
+    
+    def __init__(self, scope: str, limit: int, retry_after_seconds: float):
+        self.retry_after_seconds = retry_after_seconds
+        super().__init__("Rate limit exceeded", "RATE_LIMIT_EXCEEDED", {"scope": scope, "limit": limit})
@@ -0,0 +1,199 @@
+"""
+Hydration of stored documents into Pydantic models.
+
+Documents are validated when they are written (request bodies and DTOs), so reads can skip
+re-validating them. Repositories pick one of three strategies:
+
+- ``validate``: ``Model(**doc)`` per document; full validation, the historical behaviour.
+- ``adapter``: one ``TypeAdapter(List[Model])`` call per batch; still validates, but the whole
+  cursor goes through pydantic-core in one pass.
+- ``construct``: no validation; nested models are built with ``model_construct`` following a
+  per-class plan that is computed once and cached.
+"""
+import copy
+import typing
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from bson import ObjectId
+from pydantic import BaseModel, BeforeValidator, TypeAdapter
+
+T = TypeVar('T', bound=BaseModel)
+
+# Field converter of a construct plan: turns the stored value into the value the model holds
+Converter = Optional[Callable[[Any], Any]]
+
+
+class HydrationMode(str, Enum):
+    """How a repository turns stored documents into models"""
+    VALIDATE = "validate"
+    ADAPTER = "adapter"
+    CONSTRUCT = "construct"
+
+
+def _model_in(annotation: Any) -> Optional[Type[BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _converter_for(annotation: Any, metadata: List[Any]) -> Converter:
+    """Converter for one field, or None when the stored value can be used as is"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        members = [member for member in typing.get_args(annotation) if member is not type(None)]
+        if len(members) != 1:
+            return None
+        annotation = members[0]
+        origin = typing.get_origin(annotation)
+    if origin is typing.Annotated:
+        metadata = [*metadata, *annotation.__metadata__]
+        annotation = typing.get_args(annotation)[0]
+        origin = typing.get_origin(annotation)
+
+    # PyObjectId: the validator would have turned the stored ObjectId into a str
+    if any(isinstance(item, BeforeValidator) and item.func is str for item in metadata):
+        return _object_id_to_str
+
+    model_class = _model_in(annotation)
+    if model_class is not None:
+        return lambda value: construct_model(model_class, value) if isinstance(value, dict) else value
+
+    if origin is list:
+        args = typing.get_args(annotation)
+        item_class = _model_in(args[0]) if args else None
+        if item_class is not None:
+            return lambda value: [
+                construct_model(item_class, item) if isinstance(item, dict) else item for item in value
+            ] if isinstance(value, list) else value
+    return None
+
+
+def _object_id_to_str(value: Any) -> Any:
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+_IMMUTABLE_DEFAULTS = (type(None), bool, int, float, str, bytes, tuple, frozenset, Enum)
+
+
+def _default_factory_for(field: Any) -> Optional[Callable[[], Any]]:
+    """Zero-argument callable producing a field's default, or None for required fields"""
+    if field.default_factory is not None:
+        return field.default_factory
+    if field.is_required():
+        return None
+    default = field.default
+    if isinstance(default, _IMMUTABLE_DEFAULTS):
+        return lambda: default
+    return lambda: copy.deepcopy(default)
+
+
+@lru_cache(maxsize=None)
+def construct_plan(model_class: Type[BaseModel]) -> Tuple[Tuple[str, Optional[str], Converter, Any], ...]:
+    """
+    Compute, once per model class, how each field is read from a document.
+
+    Args:
+        model_class: Model to build a plan for
+
+    Returns:
+        ``(field name, alias, converter, default factory)`` for every field of the model
+    """
+    return tuple(
+        (name, field.alias, _converter_for(field.annotation, field.metadata), _default_factory_for(field))
+        for name, field in model_class.model_fields.items()
+    )
+
+
+def construct_model(model_class: Type[T], document: Dict[str, Any]) -> T:
+    """
+    Build a model from a trusted document without validating it.
+
+    Nested models and lists of models are constructed recursively, ObjectIds are turned into
+    strings where the model declares ``PyObjectId``, and missing fields get their defaults.
+    Keys that are not fields are dropped. This does what ``model_construct`` does, minus its
+    per-call field introspection and default deep-copies, which made it slower than validating.
+
+    Args:
+        model_class: Model to build
+        document: Stored document, keyed by alias (``_id``) or field name
+
+    Returns:
+        The constructed model
+    """
+    if model_class.__private_attributes__:
+        return model_class.model_construct(**document)
+
+    values: Dict[str, Any] = {}
+    fields_set = set()
+    for name, alias, converter, default in construct_plan(model_class):
+        if alias is not None and alias in document:
+            value = document[alias]
+        elif name in document:
+            value = document[name]
+        elif default is not None:
+            values[name] = default()
+            continue
+        else:
+            continue
+        values[name] = converter(value) if converter is not None and value is not None else value
+        fields_set.add(name)
+
+    model = model_class.__new__(model_class)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", None)
+    return model
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model_class: Type[BaseModel]) -> TypeAdapter:
+    """Compiled validator for ``List[model_class]``, built once per class"""
+    return TypeAdapter(List[model_class])
+
+
+class Hydrator(Generic[T]):
+    """Turns documents into models of one class according to a HydrationMode"""
+
+    def __init__(self, model_class: Type[T], mode: HydrationMode = HydrationMode.VALIDATE):
+        """
+        Initialize the hydrator.
+
+        Args:
+            model_class: Model documents are turned into
+            mode: Hydration strategy
+        """
+        self.model_class = model_class
+        self.mode = HydrationMode(mode)
+
+    def one(self, document: Dict[str, Any]) -> T:
+        """
+        Hydrate a single document.
+
+        Args:
+            document: Stored document
+
+        Returns:
+            The model
+        """
+        if self.mode is HydrationMode.CONSTRUCT:
+            return construct_model(self.model_class, document)
+        return self.model_class(**document)
+
+    def many(self, documents: Iterable[Dict[str, Any]]) -> List[T]:
+        """
+        Hydrate a batch of documents, e.g. a cursor.
+
+        Args:
+            documents: Stored documents
+
+        Returns:
+            The models, in the order of ``documents``
+        """
+        if self.mode is HydrationMode.CONSTRUCT:
+            return [construct_model(self.model_class, document) for document in documents]
+        if self.mode is HydrationMode.ADAPTER:
+            return list_adapter(self.model_class).validate_python(list(documents))
+        return [self.model_class(**document) for document in documents]
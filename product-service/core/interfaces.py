@@ -96,6 +96,16 @@ class ICacheService(ABC):
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
         pass
+    
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one round trip; missing keys are omitted."""
+        pass
+    
+    @abstractmethod
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: int = 300) -> None:
+        """Set several values in one round trip."""
+        pass
 
 
 class IValidator(ABC):
@@ -0,0 +1,110 @@
+"""
+On-disk store for request profiles.
+
+Profiles are cProfile ``.prof`` files, one per profiled request, with a small JSON file of
+request metadata next to each. Open them with ``python -m pstats`` or render a flame graph
+with snakeviz. Only the newest ``max_profiles`` are kept.
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Profile ids become file names, so only a conservative alphabet is accepted
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ProfileStore:
+    """Rotating directory of profiles keyed by request id"""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """
+        Location of a stored profile.
+
+        Args:
+            profile_id: Request id the profile was saved under
+
+        Returns:
+            Path of the ``.prof`` file, or None if the id is malformed or unknown
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.prof"
+        return path if path.exists() else None
+
+    def save(self, profile_id: str, profiler: cProfile.Profile, metadata: Dict[str, Any]) -> Path:
+        """
+        Write a profile and its metadata, then drop the oldest profiles over the limit.
+
+        Args:
+            profile_id: Request id to save the profile under
+            profiler: Profiler that has been disabled
+            metadata: Request details shown in the profile listing
+
+        Returns:
+            Path of the ``.prof`` file
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{profile_id}.prof"
+            profiler.dump_stats(str(path))
+            (self.directory / f"{profile_id}.json").write_text(json.dumps({"id": profile_id, **metadata}))
+            self._rotate()
+        return path
+
+    def _rotate(self) -> None:
+        profiles = sorted(self.directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+        for old in profiles[:-self.max_profiles] if self.max_profiles > 0 else profiles:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of the stored profiles, newest first"""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append(json.loads(path.read_text()))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable profile metadata {path.name}: {e}")
+        return sorted(entries, key=lambda entry: entry.get("timestamp", 0), reverse=True)
+
+    def report(self, profile_id: str, sort_by: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """
+        Render a stored profile as a pstats table.
+
+        Args:
+            profile_id: Request id the profile was saved under
+            sort_by: pstats sort key, e.g. cumulative or tottime
+            limit: Number of functions to print
+
+        Returns:
+            The report, or None if there is no such profile
+        """
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(str(path), stream=stream).strip_dirs().sort_stats(sort_by).print_stats(limit)
+        return stream.getvalue()
+
+
+@lru_cache()
+def get_profile_store() -> ProfileStore:
+    """The process-wide profile store configured in settings"""
+    settings = get_settings()
+    return ProfileStore(settings.profiling_dir, settings.profiling_max_profiles)
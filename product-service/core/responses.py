@@ -0,0 +1,101 @@
+"""
+Fast JSON responses for the AfriFurn product service.
+"""
+import functools
+from decimal import Decimal
+from typing import Any, Callable
+
+import orjson
+import pydantic_core
+from bson import ObjectId
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _make_default(by_alias: bool) -> Callable[[Any], Any]:
+    """Build the orjson hook for types it does not serialise natively"""
+    def default(value: Any) -> Any:
+        if isinstance(value, BaseModel):
+            return value.model_dump(by_alias=by_alias)
+        if isinstance(value, ObjectId):
+            return str(value)
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+    return default
+
+
+_default_by_alias = _make_default(by_alias=True)
+_default_by_name = _make_default(by_alias=False)
+
+
+def _pydantic_fallback(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any, by_alias: bool = True) -> bytes:
+    """
+    Serialise content to JSON bytes.
+
+    Pydantic models, and lists of them, go through pydantic-core's serializer, which produces
+    the same JSON as FastAPI's response_model path without building intermediate dicts.
+    Everything else goes through orjson, which handles datetime, date, UUID and dataclasses
+    natively; ObjectId, Decimal, sets and nested models are converted by the default hook.
+
+    Args:
+        content: Value to serialise
+        by_alias: Dump pydantic models by field alias (``_id``) rather than name (``id``)
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if isinstance(content, BaseModel) or (isinstance(content, list) and content and isinstance(content[0], BaseModel)):
+        return pydantic_core.to_json(content, by_alias=by_alias, inf_nan_mode="null", fallback=_pydantic_fallback)
+    return orjson.dumps(content, default=_default_by_alias if by_alias else _default_by_name, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; the application-wide default response class."""
+
+    def __init__(self, content: Any, status_code: int = 200, headers=None, media_type=None, background=None,
+                 by_alias: bool = True):
+        self.by_alias = by_alias
+        super().__init__(content, status_code=status_code, headers=headers, media_type=media_type,
+                         background=background)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, by_alias=self.by_alias)
+
+
+def trusted_response(by_alias: bool = True, status_code: int = 200):
+    """
+    Decorator for routes whose data is already valid: skip FastAPI's output validation.
+
+    The endpoint's return value is rendered straight to a FastJSONResponse, so FastAPI neither
+    re-validates it against ``response_model`` nor walks it with ``jsonable_encoder``. The
+    route's ``response_model`` is still used for the OpenAPI schema. Only use it where the
+    returned objects are built from the same model as ``response_model``; no field filtering
+    is applied.
+
+    Args:
+        by_alias: Match the route's ``response_model_by_alias`` setting
+        status_code: Status code of the response
+
+    Returns:
+        Decorated endpoint
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result, status_code=status_code, by_alias=by_alias)
+        return wrapper
+    return decorator
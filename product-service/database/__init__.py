@@ -1,80 +1,232 @@
+"""
+Lazy MongoDB access.
+
+Importing this module does no I/O: ``db`` resolves the client on first use, and pymongo's
+client only opens connections when the first command runs. Index creation and the initial
+connectivity check run from the application lifespan (see ``connect_with_retry``), so a worker
+boots while Mongo is unreachable and reports not-ready until it connects.
+"""
+import asyncio
 import logging
-import os
-from pymongo import MongoClient
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import MongoClient, monitoring
+from pymongo.database import Database
+
 from config.settings import get_settings
+from core.metrics import FAST_BUCKETS, metrics
+from database.query_monitor import SlowQueryMonitor
+
+logger = logging.getLogger(__name__)
+
+# Unique indexes created once the database is reachable
+INDEXES: Dict[str, List[str]] = {
+    "products": ["name", "short_name"],
+    "colors": ["name", "color_code"],
+    "categories": ["name", "short_name"],
+    "level1_categories": ["name", "short_name"],
+    "level2_categories": ["name", "short_name"],
+    "materials": ["name"],
+}
+
+# Other indexes per collection: (keys, options)
+QUERY_INDEXES: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    # Lookups of a user's active cart; also allows only one active cart per user
+    "cart": [([("user_id", 1), ("is_archived", 1)], {
+        "name": "user_id_active_cart", "unique": True, "partialFilterExpression": {"is_archived": False},
+    })],
+}
+
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Times every MongoDB command per collection and command name.
+
+    The driver reports the duration on completion but the collection only when the command
+    starts, so the pair is kept by request id in between.
+    """
+
+    def __init__(self):
+        self.duration = metrics.histogram(
+            "mongodb_command_duration_seconds", "MongoDB command round trips",
+            labels=("collection", "command"), buckets=FAST_BUCKETS,
+        )
+        self.failures = metrics.counter(
+            "mongodb_command_failures_total", "MongoDB commands that failed", labels=("collection", "command"),
+        )
+        self._pending: Dict[Any, Tuple[str, str]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else event.database_name
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
 
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is not None:
+            self.duration.labels(*labels).observe(event.duration_micros / 1e6)
 
-def setup_indexes_for_collection(db_dict:dict):
-    collection=db_dict["collection"]
-    indices=db_dict["indices"]  # Changed from "index" to "indices"
-    try:
-        for index in indices:
-            db[collection].create_index(index, unique=True)
-            print(f"Created index: {index} for collection: {collection}")
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is not None:
+            self.duration.labels(*labels).observe(event.duration_micros / 1e6)
+            self.failures.labels(*labels).inc()
 
-    except Exception as e:
-        print("Exception:   ",e)
 
+command_metrics = CommandMetrics()
 
-# Connect to MongoDB using settings from get_settings function
-try:
+
+def run_explain(database_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    return get_client()[database_name].command(command)
+
+
+slow_query_monitor = SlowQueryMonitor(explain_runner=run_explain)
+
+
+def mongo_uri() -> str:
     settings = get_settings()
-    mongo_host=settings.mongo_host # type: ignore
-    mongo_password=settings.mongodb_password # type: ignore
-    mongo_port=settings.mongo_port # type: ignore
-    mongo_user=settings.mongo_user # type: ignore
-    mongo_db_name=settings.mongo_db_name # type: ignore
-    
-
-
-
-    # Print connection details (consider removing in production)
-    print(f"=================== MONGO_PASSWORD: {mongo_password} =====================")
-    print(f"=================== MONGO_HOST: {mongo_host} =====================")
-    print(f"=================== MONGO_PORT: {mongo_port} =====================")
-    print(f"=================== MONGO_DB_NAME: {mongo_db_name} =====================")
-    print(f"=================== MONGO_USER: {mongo_user} =====================")
-
-    # Construct MongoDB URI
-    MONGO_URI = f"mongodb://{mongo_user}:{mongo_password}@{mongo_host}:{mongo_port}/{mongo_db_name}"
-    logging.info(f"=================== MONGO_URI: {MONGO_URI} =====================")
-
-    client = MongoClient(MONGO_URI)
-    db = client.get_database(mongo_db_name)
-
-    if db is not None:
-        setup_indexes_for_collection(
-            {"collection":"products",
-             "indices":["name","short_name"]
-             })
-        setup_indexes_for_collection(
-            {"collection":"colors",
-             "indices":["name","color_code"]
-             })
-        setup_indexes_for_collection(
-            {"collection":"categories",
-             "indices":["name","short_name"]
-             })
-        setup_indexes_for_collection(
-            {"collection":"level1_categories",
-             "indices":["name","short_name"]
-             })
-        setup_indexes_for_collection(
-            {"collection":"level2_categories",
-             "indices":["name","short_name"]
-             })
-        setup_indexes_for_collection(
-            {"collection":"materials",
-             "indices":["name",]
-             })
-    # Test the connection
-    client.server_info()
-    logging.info("\033[92m====================== Successfully connected to MongoDB ======================\033[0m")
-except ValueError as ve:
-    logging.error(f"\033[91m====================== Configuration Error: {str(ve)} ======================\033[0m")
-    raise
-except Exception as e:
-    logging.error(f"\033[91m====================== Error connecting to MongoDB ======================\033[0m")
-    logging.error(f"\033[91m====================== {str(e)} ======================\033[0m")
-    raise
+    return (
+        f"mongodb://{settings.mongo_user}:{settings.mongodb_password}"  # type: ignore
+        f"@{settings.mongo_host}:{settings.mongo_port}/{settings.mongo_db_name}"  # type: ignore
+    )
+
+
+def get_client() -> MongoClient:
+    """
+    Return the process-wide MongoClient, creating it on first use.
+
+    Creating the client does not block on the server; the timeouts bound how long a command
+    waits when Mongo is unreachable.
+
+    Returns:
+        The shared client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                settings = get_settings()
+                slow_query_monitor.threshold_ms = settings.mongo_slow_query_ms
+                slow_query_monitor.max_shapes = settings.mongo_query_shapes_max
+                _client = MongoClient(
+                    mongo_uri(),
+                    serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+                    connectTimeoutMS=settings.mongo_connect_timeout_ms,
+                    event_listeners=[command_metrics, slow_query_monitor],
+                )
+                logger.info(f"MongoDB client created for {settings.mongo_host}:{settings.mongo_port}")  # type: ignore
+    return _client
+
+
+def get_database() -> Database:
+    return get_client().get_database(get_settings().mongo_db_name)  # type: ignore
+
+
+class LazyDatabase:
+    """Stands in for the pymongo Database until it is first used"""
+
+    def __getitem__(self, name: str) -> Any:
+        return get_database()[name]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_database(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyDatabase(connected={_client is not None})"
+
+
+db = LazyDatabase()
+
+
+def ping() -> None:
+    """Round trip to the server; raises if it is unreachable"""
+    get_client().admin.command("ping")
+
+
+def ensure_indexes() -> None:
+    """Create the indexes in INDEXES and QUERY_INDEXES; existing ones are left as they are"""
+    database = get_database()
+    for collection, fields in INDEXES.items():
+        for field in fields:
+            try:
+                database[collection].create_index(field, unique=True)
+            except Exception as e:
+                logger.error(f"Failed to create index {field} on {collection}: {e}")
+    for collection, indexes in QUERY_INDEXES.items():
+        for keys, options in indexes:
+            try:
+                database[collection].create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"Failed to create index {options.get('name', keys)} on {collection}: {e}")
+
+
+def close_client() -> None:
+    global _client
+    slow_query_monitor.shutdown()
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+class DatabaseStatus:
+    """Connection state reported by the readiness probe"""
+
+    def __init__(self):
+        self.connected = False
+        self.indexes_ready = False
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.connected_at: Optional[float] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "indexes_ready": self.indexes_ready,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+        }
+
+
+async def connect_with_retry(
+    status: DatabaseStatus,
+    initial_delay_seconds: float = 0.5,
+    max_delay_seconds: float = 10.0,
+) -> None:
+    """
+    Ping MongoDB until it answers, then create indexes.
+
+    The blocking driver calls run in a worker thread. Retries back off exponentially up to
+    ``max_delay_seconds`` and continue until the task is cancelled.
+
+    Args:
+        status: Updated as the connection progresses
+        initial_delay_seconds: Delay before the first retry
+        max_delay_seconds: Upper bound of the retry delay
+    """
+    delay = initial_delay_seconds
+    while True:
+        status.attempts += 1
+        try:
+            await asyncio.to_thread(ping)
+            break
+        except Exception as e:
+            status.last_error = str(e)
+            logger.warning(f"MongoDB not reachable (attempt {status.attempts}), retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay_seconds)
+
+    status.connected = True
+    status.connected_at = time.time()
+    status.last_error = None
+    logger.info("Connected to MongoDB")
 
+    await asyncio.to_thread(ensure_indexes)
+    status.indexes_ready = True
@@ -0,0 +1,364 @@
+"""
+Per query shape timing for MongoDB, with a slow-query log and automatic explain capture.
+
+A query shape is the command with every value replaced by ``"?"``: the filter keys, operators,
+pipeline stages and sort order stay, so ``/products/filter`` requests that differ only in the
+price range or category land on the same shape. Durations are aggregated per shape. The first
+time a shape runs slower than the threshold, the command is explained once with
+``executionStats`` on a background thread and the plan is logged and kept with the shape.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = "?"
+# Shapes beyond the limit are aggregated here so a burst of ad-hoc queries cannot grow the table
+OVERFLOW_SHAPE = "<other>"
+
+# Commands that carry a query; anything else (inserts, getMore, index builds...) is not tracked
+QUERY_COMMANDS = ("find", "aggregate", "count", "distinct", "update", "delete", "findAndModify")
+# Commands that can be explained without side effects
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+# Keys whose values describe the shape rather than the request, e.g. a sort direction
+PRESERVED_KEYS = frozenset({"$sort", "sort"})
+# Driver-added fields that explain rejects or that belong to the original session
+SESSION_FIELDS = frozenset({"lsid", "$clusterTime", "$db", "$readPreference", "txnNumber", "$readConcern"})
+WRITE_STAGES = frozenset({"$out", "$merge"})
+
+ExplainRunner = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+
+def normalise(value: Any) -> Any:
+    """
+    Replace the values of a filter, pipeline or update with placeholders.
+
+    Args:
+        value: Part of a command document
+
+    Returns:
+        The same structure with keys kept and values replaced by ``"?"``; lists of documents
+        (``$or`` branches, pipeline stages) are normalised element by element
+    """
+    if isinstance(value, dict):
+        return {
+            key: item if key in PRESERVED_KEYS else normalise(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+        return [normalise(item) for item in value]
+    return PLACEHOLDER
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    """
+    Describe the query of a command as a normalised JSON string.
+
+    Args:
+        command_name: Name of the command, e.g. ``find``
+        command: The command document as sent to the server
+
+    Returns:
+        The shape, or None for commands that carry no query
+    """
+    if command_name == "find":
+        parts: Dict[str, Any] = {"filter": normalise(command.get("filter", {}))}
+        if command.get("sort"):
+            parts["sort"] = command["sort"]
+        if command.get("projection"):
+            parts["projection"] = sorted(command["projection"])
+    elif command_name == "aggregate":
+        parts = {"pipeline": normalise(list(command.get("pipeline", [])))}
+    elif command_name == "count":
+        parts = {"query": normalise(command.get("query", {}))}
+    elif command_name == "distinct":
+        parts = {"key": command.get("key"), "query": normalise(command.get("query", {}))}
+    elif command_name == "update":
+        statements = command.get("updates") or [{}]
+        parts = {"q": normalise(statements[0].get("q", {})), "u": normalise(statements[0].get("u", {}))}
+    elif command_name == "delete":
+        statements = command.get("deletes") or [{}]
+        parts = {"q": normalise(statements[0].get("q", {}))}
+    elif command_name == "findAndModify":
+        parts = {"query": normalise(command.get("query", {})), "update": normalise(command.get("update", {}))}
+        if command.get("sort"):
+            parts["sort"] = command["sort"]
+    else:
+        return None
+    return json.dumps(parts, default=str, separators=(",", ":"))
+
+
+def _find_key(document: Any, key: str) -> Any:
+    """Depth-first search for the first value stored under ``key``"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = []
+    while isinstance(plan, dict):
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        inputs = plan.get("inputStages")
+        plan = plan.get("inputStage") or (inputs[0] if inputs else None)
+    return stages
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pull the numbers that matter out of an ``executionStats`` explain.
+
+    Works for find and aggregate explains; for a pipeline the stats of its first cursor stage
+    are used, which is where documents are read.
+
+    Args:
+        explain: The explain command's reply
+
+    Returns:
+        docsExamined, keysExamined, nReturned, executionTimeMillis and the winning plan as
+        ``"LIMIT > FETCH > IXSCAN(price_1)"``
+    """
+    stats = _find_key(explain, "executionStats") or {}
+    winning_plan = _find_key(explain, "winningPlan") or {}
+    # Servers using the slot-based engine nest the classic plan one level down
+    winning_plan = winning_plan.get("queryPlan", winning_plan)
+    stages = _plan_stages(winning_plan)
+    return {
+        "docsExamined": stats.get("totalDocsExamined"),
+        "keysExamined": stats.get("totalKeysExamined"),
+        "nReturned": stats.get("nReturned"),
+        "executionTimeMillis": stats.get("executionTimeMillis"),
+        "plan": " > ".join(stages),
+        "collectionScan": "COLLSCAN" in stages,
+    }
+
+
+class QueryShapeStats:
+    """Timings of one query shape"""
+
+    __slots__ = (
+        "collection", "command", "shape", "count", "failures", "slow_count",
+        "total_seconds", "max_seconds", "last_seen", "explain",
+    )
+
+    def __init__(self, collection: str, command: str, shape: str):
+        self.collection = collection
+        self.command = command
+        self.shape = shape
+        self.count = 0
+        self.failures = 0
+        self.slow_count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seen = 0.0
+        # None until the shape is first slow, then "pending" and finally the explain summary
+        self.explain: Optional[Any] = None
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "collection": self.collection,
+            "command": self.command,
+            "shape": self.shape,
+            "count": self.count,
+            "failures": self.failures,
+            "slow_count": self.slow_count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_ms": round(self.mean_seconds * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "last_seen": self.last_seen,
+            "explain": self.explain,
+        }
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """
+    Aggregates MongoDB command durations per collection, command and query shape.
+
+    Listener callbacks run on the thread that issued the command, so they only normalise the
+    command and update counters; explains are handed to a single background thread and run
+    at most once per shape.
+    """
+
+    SORT_KEYS: Dict[str, Callable[[QueryShapeStats], float]] = {
+        "total": lambda stats: stats.total_seconds,
+        "max": lambda stats: stats.max_seconds,
+        "mean": lambda stats: stats.mean_seconds,
+        "count": lambda stats: stats.count,
+        "slow": lambda stats: stats.slow_count,
+    }
+
+    def __init__(
+        self,
+        threshold_ms: float = 100,
+        max_shapes: int = 500,
+        explain_runner: Optional[ExplainRunner] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self.explain_runner = explain_runner
+        self._executor = executor
+        self._shapes: Dict[Tuple[str, str, str], QueryShapeStats] = {}
+        self._pending: Dict[Any, Tuple[Tuple[str, str, str], str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in QUERY_COMMANDS:
+            return
+        try:
+            shape = query_shape(event.command_name, event.command)
+        except Exception as e:
+            logger.debug(f"Could not normalise {event.command_name} command: {e}")
+            return
+        if shape is None:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.database_name
+        self._pending[(event.connection_id, event.request_id)] = (
+            (collection, event.command_name, shape), event.database_name, event.command,
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is not None:
+            self.record(*pending, duration_seconds=event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is not None:
+            self.record(*pending, duration_seconds=event.duration_micros / 1e6, failed=True)
+
+    def _stats_for(self, key: Tuple[str, str, str]) -> QueryShapeStats:
+        stats = self._shapes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._shapes.get(key)
+                if stats is None:
+                    if len(self._shapes) >= self.max_shapes:
+                        key = (key[0], key[1], OVERFLOW_SHAPE)
+                        stats = self._shapes.get(key)
+                    if stats is None:
+                        stats = self._shapes[key] = QueryShapeStats(*key)
+        return stats
+
+    def record(
+        self,
+        key: Tuple[str, str, str],
+        database_name: str,
+        command: Any,
+        duration_seconds: float,
+        failed: bool = False,
+    ) -> None:
+        """
+        Add one execution to its shape and explain the shape if this is its first slow run.
+
+        Args:
+            key: (collection, command name, shape)
+            database_name: Database the command ran against
+            command: The original command document, kept only if it needs explaining
+            duration_seconds: Round trip reported by the driver
+            failed: Whether the command failed
+        """
+        stats = self._stats_for(key)
+        stats.count += 1
+        stats.total_seconds += duration_seconds
+        stats.last_seen = time.time()
+        if duration_seconds > stats.max_seconds:
+            stats.max_seconds = duration_seconds
+        if failed:
+            stats.failures += 1
+            return
+        if duration_seconds * 1000 < self.threshold_ms:
+            return
+
+        stats.slow_count += 1
+        if stats.explain is None and stats.shape != OVERFLOW_SHAPE:
+            with self._lock:
+                if stats.explain is not None:
+                    return
+                stats.explain = "pending"
+            logger.warning(
+                f"Slow query on {stats.collection}.{stats.command} ({duration_seconds * 1000:.1f}ms): {stats.shape}"
+            )
+            if self.explain_runner is not None and self._explainable(stats.command, command):
+                self._submit(stats, database_name, command)
+            else:
+                stats.explain = {"plan": None, "reason": "not explainable"}
+
+    @staticmethod
+    def _explainable(command_name: str, command: Any) -> bool:
+        if command_name not in EXPLAINABLE_COMMANDS:
+            return False
+        if command_name == "aggregate":
+            return not any(WRITE_STAGES.intersection(stage) for stage in command.get("pipeline", []))
+        return True
+
+    def _submit(self, stats: QueryShapeStats, database_name: str, command: Any) -> None:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mongo-explain")
+        explain_command = {key: value for key, value in command.items() if key not in SESSION_FIELDS}
+        self._executor.submit(self._explain, stats, database_name, explain_command)
+
+    def _explain(self, stats: QueryShapeStats, database_name: str, command: Dict[str, Any]) -> None:
+        try:
+            reply = self.explain_runner(database_name, {"explain": command, "verbosity": "executionStats"})  # type: ignore
+            stats.explain = summarize_explain(reply)
+            logger.warning(
+                f"Explain for slow {stats.collection}.{stats.command}: "
+                f"docsExamined={stats.explain['docsExamined']} keysExamined={stats.explain['keysExamined']} "
+                f"nReturned={stats.explain['nReturned']} plan={stats.explain['plan']} shape={stats.shape}"
+            )
+        except Exception as e:
+            stats.explain = {"plan": None, "error": str(e)}
+            logger.error(f"Explain failed for {stats.collection}.{stats.command}: {e}")
+
+    def top(self, limit: int = 10, sort_by: str = "total", slow_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        The most expensive shapes.
+
+        Args:
+            limit: Number of shapes to return
+            sort_by: One of total, max, mean, count or slow
+            slow_only: Only shapes that ran over the threshold at least once
+
+        Returns:
+            Shape summaries, most expensive first
+        """
+        sort_key = self.SORT_KEYS[sort_by]
+        shapes = [stats for stats in list(self._shapes.values()) if stats.slow_count or not slow_only]
+        shapes.sort(key=sort_key, reverse=True)
+        return [stats.summary() for stats in shapes[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,13 +1,16 @@
-from .redis_provider import RedisCacheProvider
+from functools import lru_cache
+
+from .redis_provider import RedisCacheProvider, close_connection_pools
 from .interface import ICacheProvider
 from config.settings import get_settings
 
+@lru_cache()
 def create_redis_cache_provider() -> ICacheProvider:
-    """Factory function to create a Redis cache provider with settings"""
+    """Return the process-wide Redis cache provider, created from settings on first use"""
     settings = get_settings()
     return RedisCacheProvider(
         redis_url=settings.redis_url,
         key_prefix=settings.redis_key_prefix
     )
 
-__all__ = ['RedisCacheProvider', 'ICacheProvider', 'create_redis_cache_provider']
+__all__ = ['RedisCacheProvider', 'ICacheProvider', 'create_redis_cache_provider', 'close_connection_pools']
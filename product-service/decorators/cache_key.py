@@ -0,0 +1,130 @@
+import hashlib
+import inspect
+import json
+import string
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+
+_NO_DEFAULT = object()
+
+
+def _resolve_default(parameter: inspect.Parameter) -> Any:
+    """Return the effective default of a parameter, unwrapping FastAPI Query/Path/Body markers."""
+    default = parameter.default
+    if default is inspect.Parameter.empty:
+        return _NO_DEFAULT
+    if isinstance(default, FieldInfo):
+        default = default.default
+    if default is PydanticUndefined or default is Ellipsis:
+        return _NO_DEFAULT
+    return default
+
+
+def resolve_defaults(func: Callable[..., Any]) -> Dict[str, Any]:
+    """Map each parameter of ``func`` that has a default to its effective default value."""
+    defaults = {}
+    for name, parameter in inspect.signature(func).parameters.items():
+        default = _resolve_default(parameter)
+        if default is not _NO_DEFAULT:
+            defaults[name] = default
+    return defaults
+
+
+class CacheKeyTemplate:
+    """
+    A cache key template compiled once, when the decorator is applied.
+
+    Placeholders are checked against the decorated function's signature up front, and every
+    value is canonicalised before it is formatted so that equivalent queries share one key:
+
+    - values equal to the parameter default (and ``None``) are elided
+    - JSON array strings and lists are de-duplicated and sorted
+    - strings are stripped, and lower-cased for parameters listed in ``case_insensitive``
+    - integral floats are written without a trailing ``.0``
+
+    Keys longer than ``max_length`` are replaced by a digest that keeps the template's
+    static prefix, so they can still be matched by pattern.
+    """
+
+    def __init__(
+        self,
+        template: str,
+        func: Callable[..., Any],
+        case_insensitive: Iterable[str] = (),
+        max_length: int = 200,
+    ):
+        self.template = template
+        self.max_length = max_length
+        self.case_insensitive = frozenset(case_insensitive)
+        self._signature = inspect.signature(func)
+        self._defaults = resolve_defaults(func)
+        self._parts: List[Tuple[str, Optional[str]]] = []
+
+        for literal, field_name, _, _ in string.Formatter().parse(template):
+            if field_name is not None and field_name not in self._signature.parameters:
+                raise ValueError(
+                    f"Cache key placeholder '{{{field_name}}}' is not a parameter of {func.__qualname__}"
+                )
+            self._parts.append((literal, field_name or None))
+
+        unknown = self.case_insensitive - set(self._signature.parameters)
+        if unknown:
+            raise ValueError(f"Unknown case-insensitive parameters for {func.__qualname__}: {sorted(unknown)}")
+
+        self.prefix = template.split("{", 1)[0].rstrip(":") or template
+        self.is_static = all(field_name is None for _, field_name in self._parts)
+
+    def build(self, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """Build the final key for one call."""
+        if self.is_static:
+            return self.template
+
+        arguments = kwargs or {}
+        if args:
+            arguments = self._signature.bind_partial(*args, **arguments).arguments
+
+        key = "".join(
+            literal + (self._render(field_name, arguments) if field_name else "")
+            for literal, field_name in self._parts
+        )
+        if len(key) > self.max_length:
+            digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+            return f"{self.prefix}:h:{digest}"
+        return key
+
+    def _render(self, name: str, arguments: Dict[str, Any]) -> str:
+        default = self._defaults.get(name, _NO_DEFAULT)
+        value = arguments.get(name, default)
+        if value is None or value is _NO_DEFAULT:
+            return ""
+        if default is not _NO_DEFAULT and value == default:
+            return ""
+        return canonicalize(value, lower_case=name in self.case_insensitive)
+
+
+def canonicalize(value: Any, lower_case: bool = False) -> str:
+    """Render a single parameter value in its canonical string form."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return _canonical_array(value, lower_case)
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            try:
+                parsed = json.loads(text)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, list):
+                return _canonical_array(parsed, lower_case)
+        return text.lower() if lower_case else text
+    return str(value)
+
+
+def _canonical_array(values: Iterable[Any], lower_case: bool) -> str:
+    items = sorted({canonicalize(item, lower_case) for item in values if item is not None} - {""})
+    return json.dumps(items, separators=(",", ":")) if items else ""
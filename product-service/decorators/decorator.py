@@ -1,19 +1,27 @@
 import functools
-import inspect
-from typing import Callable, Type, Any
+import json
+import time
+from typing import Callable, Iterable, Type, Any
 from pydantic import BaseModel
 import logging
 
-from .redis_provider import RedisCacheProvider  # adjust path
-redis_app = RedisCacheProvider()
+from fastapi.responses import Response
+
+from config.settings import get_settings
+from core.responses import dumps
+from .cache_key import CacheKeyTemplate
+from .metrics import cache_metrics
+from . import create_redis_cache_provider
+redis_app = create_redis_cache_provider()
 
 logger = logging.getLogger("redis_cache")
-logger.setLevel(logging.INFO)
 
 def cache_response(
     key: str,
     response_model: Type[BaseModel],
-    ttl_seconds: int = 3600
+    ttl_seconds: int = 3600,
+    case_insensitive: Iterable[str] = (),
+    raw_hits: bool = False
 ):
     """
     Cache decorator with dynamic key support and logging.
@@ -22,59 +30,89 @@ def cache_response(
         key (str): Cache key, can include template placeholders like 'categories:{category_id}'
         response_model (Type[BaseModel]): Pydantic model for response validation
         ttl_seconds (int): Cache expiry time in seconds
+        case_insensitive (Iterable[str]): Parameters whose values are matched case-insensitively
+            by the query, so their case can be folded in the key
+        raw_hits (bool): Return cache hits as the stored JSON bytes, skipping decoding and
+            validation; only for routes wrapped in ``trusted_response``
     """
     def decorator(func: Callable[..., Any]):
+        # Compile the key template once; placeholders are validated against the signature here
+        key_template = CacheKeyTemplate(
+            key,
+            func,
+            case_insensitive=case_insensitive,
+            max_length=get_settings().redis_max_key_length
+        )
+
+        stats = cache_metrics.template(key)
+
+        def serialize(item):
+            if hasattr(item, "model_dump"):
+                d = item.model_dump(by_alias=True)
+            elif isinstance(item, dict):
+                d = item
+            else:
+                raise TypeError("Unsupported return type for caching")
+            
+            if "_id" in d and d["_id"] is not None:
+                d["_id"] = str(d["_id"])
+            return d
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
+            # Only cache work is guarded; exceptions from the handler, such as a 404, propagate
             try:
-                # Map args and kwargs to parameter names
-                sig = inspect.signature(func)
-                bound_args = sig.bind(*args, **kwargs)
-                bound_args.apply_defaults()
-                arg_map = bound_args.arguments
-                safe_args = {k: str(v) if v is not None else "" for k, v in arg_map.items()}
-
-                # Format key with any matching parameters (e.g. category_id → categories:{category_id})
-                final_key = key.format(**safe_args)
+                final_key = key_template.build(args, kwargs)
 
 
                 # Try get from cache
-                cached = await redis_app.get(final_key)
+                cached = await redis_app.get_raw(final_key)
+                if cached and raw_hits:
+                    stats.hits += 1
+                    stats.bytes_read += len(cached)
+                    logger.debug(f"[CACHE HIT] Key: {final_key}")
+                    return Response(content=cached, media_type="application/json")
                 if cached:
-                    logger.info(f"[CACHE HIT] Key: {final_key}")
-                    if isinstance(cached, list):
-                        return [response_model.model_validate(item) for item in cached]
-                    else:
-                        return response_model.model_validate(cached)
-
-                logger.info(f"[CACHE MISS] Key: {final_key}")
-                result = await func(*args, **kwargs)
-
-                def serialize(item):
-                    if hasattr(item, "model_dump"):
-                        d = item.model_dump(by_alias=True)
-                    elif isinstance(item, dict):
-                        d = item
-                    else:
-                        raise TypeError("Unsupported return type for caching")
-                    
-                    if "_id" in d and d["_id"] is not None:
-                        d["_id"] = str(d["_id"])
-                    return d
+                    started = time.perf_counter()
+                    data = json.loads(cached)
+                    if data:
+                        if isinstance(data, list):
+                            response = [response_model.model_validate(item) for item in data]
+                        else:
+                            response = response_model.model_validate(data)
+                        stats.serialization_seconds += time.perf_counter() - started
+                        stats.hits += 1
+                        stats.bytes_read += len(cached)
+                        logger.debug(f"[CACHE HIT] Key: {final_key}")
+                        return response
+            except Exception as e:
+                stats.errors += 1
+                logger.warning(f"[CACHE ERROR] Key: {key} - {e}")
+                return await func(*args, **kwargs)
 
+            stats.misses += 1
+            logger.debug(f"[CACHE MISS] Key: {final_key}")
+            started = time.perf_counter()
+            result = await func(*args, **kwargs)
+            stats.compute_seconds += time.perf_counter() - started
 
+            try:
+                started = time.perf_counter()
                 if isinstance(result, list):
                     data_to_cache = [serialize(item) for item in result]
                 else:
                     data_to_cache = serialize(result)
+                payload = dumps(data_to_cache).decode("utf-8")
+                stats.serialization_seconds += time.perf_counter() - started
 
-                await redis_app.set(final_key, data_to_cache, ttl_seconds)
-                logger.info(f"[CACHE SET] Key: {final_key}")
-                return result
-
+                await redis_app.set_raw(final_key, payload, ttl_seconds)
+                stats.sets += 1
+                stats.bytes_written += len(payload)
+                logger.debug(f"[CACHE SET] Key: {final_key}")
             except Exception as e:
+                stats.errors += 1
                 logger.warning(f"[CACHE ERROR] Key: {key} - {e}")
-                return await func(*args, **kwargs)
+            return result
 
         return wrapper
     return decorator
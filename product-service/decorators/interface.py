@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 
 class ICacheProvider(ABC):
@@ -23,4 +23,16 @@ class ICacheProvider(ABC):
     
     @abstractmethod
     async def exists(self, key: str) -> bool:
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        pass
+    
+    @abstractmethod
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: int = 300) -> None:
+        pass
+    
+    @abstractmethod
+    async def delete_pattern(self, pattern: str) -> int:
+        pass
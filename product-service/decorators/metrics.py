@@ -0,0 +1,113 @@
+import time
+from typing import Any, Dict, List
+
+from core.metrics import escape_label, metrics
+
+
+class CacheTemplateStats:
+    """Counters for one ``cache_response`` key template, aggregated over every key it produces"""
+
+    __slots__ = (
+        "hits", "misses", "errors", "sets",
+        "bytes_read", "bytes_written",
+        "serialization_seconds", "compute_seconds",
+    )
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.sets = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.serialization_seconds = 0.0
+        self.compute_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "sets": self.sets,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "serialization_seconds": round(self.serialization_seconds, 6),
+            "compute_seconds": round(self.compute_seconds, 6),
+            "avg_compute_ms": round(self.compute_seconds * 1000 / self.misses, 3) if self.misses else None,
+        }
+
+
+class CacheMetrics:
+    """
+    In-process registry of cache counters, keyed by key template rather than final key.
+
+    Counters are plain attributes bumped from the event loop thread, so recording costs a
+    dict lookup and an addition; nothing is logged per request.
+    """
+
+    # (metric name, stats attribute, Prometheus type, help text)
+    PROMETHEUS_METRICS = (
+        ("cache_hits_total", "hits", "counter", "Cache lookups answered from Redis"),
+        ("cache_misses_total", "misses", "counter", "Cache lookups that fell through to the handler"),
+        ("cache_errors_total", "errors", "counter", "Cache operations that raised"),
+        ("cache_sets_total", "sets", "counter", "Responses written to the cache"),
+        ("cache_read_bytes_total", "bytes_read", "counter", "Bytes of cached payload read"),
+        ("cache_written_bytes_total", "bytes_written", "counter", "Bytes of payload written to the cache"),
+        ("cache_serialization_seconds_total", "serialization_seconds", "counter",
+         "Time spent encoding and decoding cached payloads"),
+        ("cache_compute_seconds_total", "compute_seconds", "counter", "Time spent in handlers on cache misses"),
+    )
+
+    def __init__(self):
+        self._templates: Dict[str, CacheTemplateStats] = {}
+        self.started_at = time.time()
+
+    def template(self, template: str) -> CacheTemplateStats:
+        """Return the stats object for ``template``; callers keep the reference to skip the lookup"""
+        stats = self._templates.get(template)
+        if stats is None:
+            stats = self._templates[template] = CacheTemplateStats()
+        return stats
+
+    def reset(self) -> None:
+        for template in list(self._templates):
+            self._templates[template] = CacheTemplateStats()
+        self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        templates = {template: stats.to_dict() for template, stats in sorted(self._templates.items())}
+        return {
+            "since": self.started_at,
+            "templates": templates,
+            "totals": {
+                field: sum(stats[field] for stats in templates.values())
+                for field in ("hits", "misses", "errors", "sets", "bytes_read", "bytes_written")
+            },
+        }
+
+    def render_prometheus(self, extra_gauges: Dict[str, float] = None, extra_counters: Dict[str, float] = None) -> str:
+        """Render every counter, then ``extra_gauges`` and ``extra_counters``, in the Prometheus text format (0.0.4)"""
+        lines: List[str] = []
+        templates = sorted(self._templates.items())
+        for name, attribute, metric_type, help_text in self.PROMETHEUS_METRICS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for template, stats in templates:
+                lines.append(f'{name}{{template="{escape_label(template)}"}} {getattr(stats, attribute)}')
+        lines.append("# HELP cache_hit_ratio Share of cache lookups answered from Redis since the last reset")
+        lines.append("# TYPE cache_hit_ratio gauge")
+        for template, stats in templates:
+            lookups = stats.hits + stats.misses
+            if lookups:
+                lines.append(f'cache_hit_ratio{{template="{escape_label(template)}"}} {round(stats.hits / lookups, 4)}')
+        for metric_type, values in (("gauge", extra_gauges), ("counter", extra_counters)):
+            for name, value in (values or {}).items():
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+cache_metrics = CacheMetrics()
+metrics.add_collector(cache_metrics.render_prometheus)
@@ -1,79 +1,318 @@
-
 import json, logging as logger
+import time
 
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import redis.asyncio as redis
+from .circuit_breaker import CircuitBreaker
 from .interface import ICacheProvider
 from config.settings import get_settings
+from core.metrics import FAST_BUCKETS, metrics
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
 
 # Configure logging
 logger.basicConfig(level=logger.INFO)
 
+# One connection pool and one circuit breaker per store and Redis URL, shared by every user of
+# that store in the process. The cache and the rate limiter are the "cache" store; the cart
+# store has its own, so a slow cache cannot open the breaker that carts depend on.
+_connection_pools: Dict[Tuple[str, str, bool], "redis.ConnectionPool"] = {}
+_circuit_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+redis_command_duration = metrics.histogram(
+    "redis_command_duration_seconds", "Redis command round trips", labels=("operation",), buckets=FAST_BUCKETS,
+)
+redis_command_failures = metrics.counter(
+    "redis_command_failures_total", "Redis commands that raised", labels=("operation",),
+)
+
+
+def get_connection_pool(
+    redis_url: str,
+    decode_responses: bool = True,
+    store: str = "cache",
+    socket_timeout_ms: Optional[int] = None,
+    connect_timeout_ms: Optional[int] = None,
+) -> "redis.ConnectionPool":
+    """
+    Return the process-wide connection pool of ``store`` for ``redis_url``, creating it on first use.
+
+    Args:
+        redis_url: Redis server
+        decode_responses: Whether replies are decoded to str
+        store: Name of the store the pool serves; stores never share a pool
+        socket_timeout_ms: Command timeout, by default ``redis_socket_timeout_ms``; only used
+            when the pool is created
+        connect_timeout_ms: Connect timeout, by default ``redis_connect_timeout_ms``
+    """
+    import redis.asyncio as redis  # deferred: creating a provider at import time must stay cheap
+
+    pool_key = (store, redis_url, decode_responses)
+    pool = _connection_pools.get(pool_key)
+    if pool is None:
+        settings = get_settings()
+        pool = redis.ConnectionPool.from_url(
+            redis_url,
+            decode_responses=decode_responses,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=(socket_timeout_ms or settings.redis_socket_timeout_ms) / 1000,
+            socket_connect_timeout=(connect_timeout_ms or settings.redis_connect_timeout_ms) / 1000,
+        )
+        _connection_pools[pool_key] = pool
+    return pool
+
+
+def get_circuit_breaker(redis_url: str, store: str = "cache") -> CircuitBreaker:
+    """Return the process-wide circuit breaker of ``store`` for ``redis_url``"""
+    breaker = _circuit_breakers.get((store, redis_url))
+    if breaker is None:
+        settings = get_settings()
+        breaker = CircuitBreaker(
+            failure_threshold=settings.redis_circuit_failure_threshold,
+            cooldown_seconds=settings.redis_circuit_cooldown_seconds,
+        )
+        _circuit_breakers[(store, redis_url)] = breaker
+    return breaker
+
+
+async def close_connection_pools() -> None:
+    """Disconnect every shared pool; called once on application shutdown"""
+    pools = list(_connection_pools.values())
+    _connection_pools.clear()
+    for pool in pools:
+        try:
+            await pool.disconnect()
+        except Exception as e:
+            logger.error(f"Error closing Redis connection pool: {e}")
+
 
 class RedisCacheProvider(ICacheProvider):
     """Redis implementation of cache provider"""
-    
+
     def __init__(self, redis_url: Optional[str] = None, key_prefix: Optional[str] = None):
         settings = get_settings()
         self.redis_url = redis_url or settings.redis_url
         self.key_prefix = key_prefix or settings.redis_key_prefix
-        self._redis: Optional[redis.Redis] = None
-    
-    async def _get_redis(self) -> redis.Redis:
-        """Lazy initialization of Redis connection"""
+        self.circuit_breaker = get_circuit_breaker(self.redis_url)
+        self._redis: Optional["redis.Redis"] = None
+
+    async def _get_redis(self) -> "redis.Redis":
+        """Lazy initialization of a client on the shared connection pool"""
         if self._redis is None:
-            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+            import redis.asyncio as redis
+
+            self._redis = redis.Redis(connection_pool=get_connection_pool(self.redis_url))
         return self._redis
-    
+
+    async def _execute(self, description: str, command: Callable[["redis.Redis"], Awaitable[Any]], fallback: Any = None) -> Any:
+        """
+        Run one Redis command behind the circuit breaker.
+
+        While the breaker is open the command is skipped and ``fallback`` is returned at once,
+        so callers go straight to the database instead of waiting on a timeout.
+        """
+        if not self.circuit_breaker.allow_request():
+            return fallback
+        # The description starts with the operation ("get for key ..."), which labels the timing
+        operation = description.split(" ", 1)[0]
+        start = time.perf_counter()
+        try:
+            result = await command(await self._get_redis())
+        except Exception as e:
+            redis_command_duration.labels(operation).observe(time.perf_counter() - start)
+            redis_command_failures.labels(operation).inc()
+            self.circuit_breaker.record_failure()
+            logger.error(f"Cache {description} error: {e}")
+            return fallback
+        except BaseException:
+            # Cancelled (client gone, wait_for timed out): no verdict on Redis either way
+            self.circuit_breaker.release_probe()
+            raise
+        redis_command_duration.labels(operation).observe(time.perf_counter() - start)
+        self.circuit_breaker.record_success()
+        return result
+
     def _make_key(self, key: str) -> str:
         """Create prefixed cache key"""
         return f"{self.key_prefix}:{key}"
-    
+
     async def get(self, key: str) -> Optional[Any]:
+        data = await self._execute(f"get for key {key}", lambda client: client.get(self._make_key(key)))
         try:
-            redis_client = await self._get_redis()
-            data = await redis_client.get(self._make_key(key))
             return json.loads(data) if data else None
-        except Exception as e:
+        except ValueError as e:
             logger.error(f"Cache get error for key {key}: {e}")
             return None
-    
+
+    async def get_raw(self, key: str) -> Optional[str]:
+        """Return the stored JSON text without decoding it, so callers can measure and time decoding"""
+        return await self._execute(f"get for key {key}", lambda client: client.get(self._make_key(key)))
+
+    async def set_raw(self, key: str, payload: str, ttl_seconds: Optional[int] = None) -> None:
+        """Store already-encoded JSON text"""
+        ttl = ttl_seconds or get_settings().redis_ttl_seconds
+        await self._execute(f"set for key {key}", lambda client: client.setex(self._make_key(key), ttl, payload))
+
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        settings = get_settings()
+        ttl = ttl_seconds or settings.redis_ttl_seconds
         try:
-            settings = get_settings()
-            ttl = ttl_seconds or settings.redis_ttl_seconds
-            redis_client = await self._get_redis()
             serialized_value = json.dumps(value, default=str)
-            await redis_client.setex(self._make_key(key), ttl, serialized_value)
-        except Exception as e:
+        except (TypeError, ValueError) as e:
             logger.error(f"Cache set error for key {key}: {e}")
-    
+            return
+        await self._execute(
+            f"set for key {key}",
+            lambda client: client.setex(self._make_key(key), ttl, serialized_value)
+        )
+
     async def delete(self, key: str) -> None:
-        try:
-            redis_client = await self._get_redis()
-            await redis_client.delete(self._make_key(key))
-        except Exception as e:
-            logger.error(f"Cache delete error for key {key}: {e}")
-    
+        await self._execute(f"delete for key {key}", lambda client: client.delete(self._make_key(key)))
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete every key matching a glob pattern, walking the keyspace with SCAN rather than KEYS"""
+        async def unlink_matching(client: "redis.Redis") -> int:
+            deleted = 0
+            batch: List[str] = []
+            async for cache_key in client.scan_iter(match=self._make_key(pattern), count=500):
+                batch.append(cache_key)
+                if len(batch) >= 500:
+                    deleted += await client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await client.unlink(*batch)
+            return deleted
+
+        return await self._execute(f"delete_pattern for {pattern}", unlink_matching, 0)
+
     async def clear(self) -> None:
-        try:
-            redis_client = await self._get_redis()
-            keys = await redis_client.keys(f"{self.key_prefix}:*")
+        async def clear_prefix(client: "redis.Redis") -> None:
+            keys = await client.keys(f"{self.key_prefix}:*")
             if keys:
-                await redis_client.delete(*keys)
-        except Exception as e:
-            logger.error(f"Cache clear error: {e}")
-    
+                await client.delete(*keys)
+
+        await self._execute("clear", clear_prefix)
+
     async def exists(self, key: str) -> bool:
+        result = await self._execute(f"exists for key {key}", lambda client: client.exists(self._make_key(key)), False)
+        return bool(result)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Fetch several keys with a single MGET; keys that miss are left out of the result"""
+        if not keys:
+            return {}
+        values = await self._execute(
+            f"get_many for {len(keys)} keys",
+            lambda client: client.mget([self._make_key(key) for key in keys]),
+            []
+        )
         try:
-            redis_client = await self._get_redis()
-            return bool(await redis_client.exists(self._make_key(key)))
+            return {key: json.loads(value) for key, value in zip(keys, values) if value}
+        except ValueError as e:
+            logger.error(f"Cache get_many error for {len(keys)} keys: {e}")
+            return {}
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        """Store several keys with pipelined SETEX commands in one round trip"""
+        if not items:
+            return
+        settings = get_settings()
+        ttl = ttl_seconds or settings.redis_ttl_seconds
+
+        async def pipelined_setex(client: "redis.Redis") -> None:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(self._make_key(key), ttl, json.dumps(value, default=str))
+                await pipe.execute()
+
+        await self._execute(f"set_many for {len(items)} keys", pipelined_setex)
+
+    def _admin_client(self) -> "redis.Redis":
+        """A connection of its own, with a long timeout, for slow diagnostic commands"""
+        import redis.asyncio as redis
+
+        timeout = get_settings().redis_admin_timeout_ms / 1000
+        return redis.Redis.from_url(
+            self.redis_url, decode_responses=True, socket_timeout=timeout, socket_connect_timeout=timeout,
+        )
+
+    async def sample_keys(self, limit: int = 10, scan_count: int = 1000) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Sample up to ``scan_count`` keys under this provider's prefix and report the largest and hottest.
+
+        Memory usage and access statistics are fetched in one pipeline on a separate client
+        with a long timeout, outside the circuit breaker, so a slow sample cannot time out
+        request-path commands or open the breaker. "Hottest" means highest OBJECT FREQ under
+        an LFU maxmemory-policy and most recently accessed (lowest OBJECT IDLETIME) otherwise;
+        Redis answers only the one that matches the policy.
+        """
+        empty = {"largest": [], "hottest": [], "sampled": 0}
+        client = self._admin_client()
+        try:
+            keys: List[str] = []
+            async for cache_key in client.scan_iter(match=f"{self.key_prefix}:*", count=500):
+                keys.append(cache_key)
+                if len(keys) >= scan_count:
+                    break
+            if not keys:
+                return empty
+            async with client.pipeline(transaction=False) as pipe:
+                for cache_key in keys:
+                    pipe.memory_usage(cache_key)
+                    pipe.object("idletime", cache_key)
+                    pipe.object("freq", cache_key)
+                    pipe.ttl(cache_key)
+                results = await pipe.execute(raise_on_error=False)
         except Exception as e:
-            logger.error(f"Cache exists error for key {key}: {e}")
-            return False
-    
+            logger.error(f"Cache sample_keys error: {e}")
+            return empty
+        finally:
+            await client.aclose()
+
+        prefix_length = len(self.key_prefix) + 1
+        entries = []
+        for index, cache_key in enumerate(keys):
+            size, idle, freq, ttl = results[index * 4:index * 4 + 4]
+            if isinstance(size, Exception) or size is None:
+                continue
+            entries.append({
+                "key": cache_key[prefix_length:],
+                "bytes": size,
+                "idle_seconds": idle if isinstance(idle, int) else None,
+                "access_frequency": freq if isinstance(freq, int) else None,
+                "ttl_seconds": ttl if isinstance(ttl, int) else None,
+            })
+        by_frequency = [entry for entry in entries if entry["access_frequency"] is not None]
+        if by_frequency:
+            hottest = sorted(by_frequency, key=lambda entry: entry["access_frequency"], reverse=True)
+        else:
+            hottest = sorted((entry for entry in entries if entry["idle_seconds"] is not None),
+                             key=lambda entry: entry["idle_seconds"])
+        return {
+            "sampled": len(keys),
+            "largest": sorted(entries, key=lambda entry: entry["bytes"], reverse=True)[:limit],
+            "hottest": hottest[:limit],
+        }
+
+    async def ping(self) -> bool:
+        """Round trip to Redis; goes through the breaker so an open circuit reports False"""
+        return bool(await self._execute("ping", lambda client: client.ping(), False))
+
+    def stats(self) -> Dict[str, Any]:
+        """Circuit breaker state and connection pool usage for this provider's Redis"""
+        pool = _connection_pools.get((self.redis_url, True))
+        pool_stats = {"max_connections": get_settings().redis_max_connections, "in_use": 0, "idle": 0}
+        if pool is not None:
+            pool_stats.update(
+                max_connections=pool.max_connections,
+                in_use=len(getattr(pool, "_in_use_connections", ())),
+                idle=len(getattr(pool, "_available_connections", ())),
+            )
+        return {"circuit_breaker": self.circuit_breaker.snapshot(), "connection_pool": pool_stats}
+
     async def close(self) -> None:
-        """Close Redis connection"""
+        """Release this provider's client; the shared pool stays open for other providers"""
         if self._redis:
-            await self._redis.close()
\ No newline at end of file
+            await self._redis.aclose()
+            self._redis = None
@@ -1,6 +1,26 @@
-from fastapi import Depends
-from database import db
-from services.cart import CartService
-from services.generic import CartRepository, CartItemRepository
+from functools import lru_cache
+from typing import Union
+
+from config.settings import get_settings
+from services.cart_service import CartService
+from services.repository.cart_repository import CartRepository
+from services.repository.redis_cart_repository import RedisCartRepository
+
+
+@lru_cache()
+def get_cart_repository() -> Union[CartRepository, RedisCartRepository]:
+    """Return the cart store chosen by CART_STORE, created from settings on first use"""
+    settings = get_settings()
+    if settings.cart_store == "redis":
+        return RedisCartRepository(
+            redis_url=settings.cart_redis_url or settings.redis_url,
+            key_prefix=settings.cart_redis_key_prefix,
+            idle_seconds=settings.cart_idle_seconds,
+            batch_size=settings.cart_flush_batch_size,
+            socket_timeout_ms=settings.cart_redis_timeout_ms,
+        )
+    return CartRepository()
+
+
 async def get_cart_service() -> CartService:
-    return CartService(cart_repository=CartRepository(), cart_item_repository=CartItemRepository()) 
\ No newline at end of file
+    return CartService(get_cart_repository())
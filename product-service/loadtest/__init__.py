@@ -0,0 +1,28 @@
+"""
+Load-testing harness for the product service.
+
+Boots the service against throwaway ``mongod`` and ``redis-server`` processes (or targets a
+running stack), seeds the catalog from ``afrifurn-mongodb/seed`` and replays a weighted request
+mix at a fixed arrival rate or concurrency. The report is JSON so runs can be compared.
+
+Run from the product-service directory::
+
+    python -m loadtest --duration 60 --rate 200 --concurrency 64 --output run.json
+    python -m loadtest --target http://localhost:8000 --mix app.log --concurrency 16
+    python -m loadtest --catalog-size 100k --rate 100
+
+``python -m loadtest.catalog`` generates catalogs of any size on its own.
+"""
+from .catalog import CatalogGenerator, build_generator, load_catalog, write_catalog
+from .mix import RequestMix, RequestSpec, default_mix, load_mix
+from .runner import LoadRunner, percentile
+from .seed import DEFAULT_SEED_DIR, load_seed, seed_database
+from .stack import LocalStack, StackError
+
+__all__ = [
+    'CatalogGenerator', 'build_generator', 'load_catalog', 'write_catalog',
+    'RequestMix', 'RequestSpec', 'default_mix', 'load_mix',
+    'LoadRunner', 'percentile',
+    'DEFAULT_SEED_DIR', 'load_seed', 'seed_database',
+    'LocalStack', 'StackError',
+]
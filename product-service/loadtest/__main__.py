@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional
+
+from .catalog import build_generator, parse_size
+from .mix import default_mix, load_mix
+from .runner import LoadRunner
+from .seed import DEFAULT_SEED_DIR, load_seed
+from .stack import LocalStack, StackError
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Replay a request mix against the product service")
+    parser.add_argument("--target", help="Base URL of a running service; without it a local stack is started")
+    parser.add_argument("--mix", type=Path, help="JSON lines file of mix entries or request log records (default: built from the seed)")
+    parser.add_argument("--seed-dir", type=Path, default=DEFAULT_SEED_DIR, help="mongoexport dumps to seed the local stack with")
+    parser.add_argument(
+        "--catalog-size", type=parse_size, default=0,
+        help="Load a generated catalog of this many products (e.g. 100k); with --target, name products of a "
+             "catalog loaded by python -m loadtest.catalog with the default random seed",
+    )
+    parser.add_argument("--rate", type=float, default=0, help="Open-loop arrivals per second; 0 for closed loop")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop workers, or the open-loop in-flight cap")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of load before measuring")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the local service")
+    parser.add_argument("--no-redis", action="store_true", help="Run the local stack without Redis")
+    parser.add_argument("--random-seed", type=int, help="Seed for request selection and arrivals")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s", stream=sys.stderr)
+
+    catalog = build_generator(args.catalog_size, args.seed_dir) if args.catalog_size else None
+    if args.mix:
+        mix = load_mix(args.mix)
+    else:
+        mix = default_mix(catalog.as_seed() if catalog else load_seed(args.seed_dir))
+    stack = None if args.target else LocalStack(
+        seed_dir=args.seed_dir, with_redis=not args.no_redis, workers=args.workers, catalog=catalog,
+    )
+    try:
+        with stack or nullcontext():
+            runner = LoadRunner(
+                base_url=args.target or stack.base_url,  # type: ignore[union-attr]
+                mix=mix,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                duration_seconds=args.duration,
+                warmup_seconds=args.warmup,
+                timeout_seconds=args.timeout,
+                seed=args.random_seed,
+            )
+            report = asyncio.run(runner.run())
+    except StackError as e:
+        logging.error(str(e))
+        return 2
+
+    report["config"]["stack"] = "external" if args.target else {"workers": args.workers, "redis": not args.no_redis}
+    report["config"]["catalog_size"] = args.catalog_size or None
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+        logging.info(f"Report written to {args.output}")
+    else:
+        print(text)
+    return 1 if report["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Compare two benchmark or load-test runs and flag regressions.
+
+Reads pytest-benchmark JSON (``--benchmark-json`` or ``--benchmark-autosave`` files) and the
+reports written by ``python -m loadtest``. A directory stands for its newest JSON file, so the
+``.benchmarks`` store of pytest-benchmark can be used as the baseline directly::
+
+    python -m loadtest.compare .benchmarks current.json --threshold 10
+    python -m loadtest.compare baseline-report.json report.json --threshold 5
+
+Exits with status 1 when any metric got worse by more than the threshold.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Metric name -> (value, whether higher is better)
+Metrics = Dict[str, Tuple[float, bool]]
+
+
+def resolve(path: Path) -> Path:
+    """A JSON file, or the most recently modified JSON file under a directory"""
+    if path.is_dir():
+        candidates = sorted(path.rglob("*.json"), key=lambda candidate: candidate.stat().st_mtime)
+        if not candidates:
+            raise FileNotFoundError(f"No JSON results under {path}")
+        return candidates[-1]
+    return path
+
+
+def extract_metrics(document: Dict[str, Any], stat: str = "median") -> Metrics:
+    """
+    Comparable metrics of one run.
+
+    Args:
+        document: pytest-benchmark JSON or a load-test report
+        stat: pytest-benchmark statistic to compare (min, mean, median...)
+
+    Returns:
+        Values by metric name, with whether higher is better
+
+    Raises:
+        ValueError: If the document is neither format
+    """
+    metrics: Metrics = {}
+    if isinstance(document.get("benchmarks"), list):
+        for benchmark in document["benchmarks"]:
+            metrics[benchmark["fullname"]] = (float(benchmark["stats"][stat]), False)
+        return metrics
+    if isinstance(document.get("routes"), dict):
+        metrics["throughput_rps"] = (float(document["throughput_rps"]), True)
+        metrics["error_rate"] = (float(document["error_rate"]), False)
+        sections = [("overall", document.get("latency_ms", {}))]
+        sections += [(route, stats.get("latency_ms", {})) for route, stats in document["routes"].items()]
+        for name, latency in sections:
+            for percentile in ("p50", "p95", "p99"):
+                if latency.get(percentile) is not None:
+                    metrics[f"{name} {percentile}_ms"] = (float(latency[percentile]), False)
+        return metrics
+    raise ValueError("Not a pytest-benchmark result or a load-test report")
+
+
+def compare(baseline: Metrics, current: Metrics, threshold: float) -> Dict[str, Any]:
+    """
+    Relative change of every metric present in both runs.
+
+    Args:
+        baseline: Metrics of the reference run
+        current: Metrics of the run under test
+        threshold: Allowed relative change in the bad direction, e.g. 0.1 for 10%
+
+    Returns:
+        Rows sorted worst first, the names of regressions, and metrics only one run has
+    """
+    scored = []
+    for name in baseline.keys() & current.keys():
+        before, higher_is_better = baseline[name]
+        after = current[name][0]
+        if before == 0:
+            change = 0.0 if after == 0 else float("inf")
+        else:
+            change = (after - before) / before
+        worse_by = -change if higher_is_better else change
+        scored.append((worse_by, name, {
+            "metric": name,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            "regression": worse_by > threshold,
+            "improvement": worse_by < -threshold,
+        }))
+    rows = [row for _, _, row in sorted(scored, key=lambda entry: (-entry[0], entry[1]))]
+    return {
+        "threshold": threshold,
+        "rows": rows,
+        "regressions": [row["metric"] for row in rows if row["regression"]],
+        "only_in_baseline": sorted(baseline.keys() - current.keys()),
+        "only_in_current": sorted(current.keys() - baseline.keys()),
+    }
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    width = max([len("metric")] + [len(row["metric"]) for row in result["rows"]])
+    lines = [f"{'metric':<{width}} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in result["rows"]:
+        flag = "  REGRESSION" if row["regression"] else "  improved" if row["improvement"] else ""
+        lines.append(
+            f"{row['metric']:<{width}} {row['baseline']:>12.6g} {row['current']:>12.6g} {row['change']:>+8.1%}{flag}"
+        )
+    for label in ("only_in_baseline", "only_in_current"):
+        if result[label]:
+            lines.append(f"{label.replace('_', ' ')}: {', '.join(result[label])}")
+    lines.append(
+        f"{len(result['regressions'])} regression(s) beyond {result['threshold']:.0%}"
+        if result["regressions"] else f"No regressions beyond {result['threshold']:.0%}"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.compare", description="Flag regressions between two runs")
+    parser.add_argument("baseline", type=Path, help="Baseline JSON file, or a directory of results")
+    parser.add_argument("current", type=Path, help="JSON file of the run to check, or a directory of results")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent (default 10)")
+    parser.add_argument("--stat", default="median", help="pytest-benchmark statistic to compare (default median)")
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    baseline_path, current_path = resolve(args.baseline), resolve(args.current)
+    baseline = extract_metrics(json.loads(baseline_path.read_text()), args.stat)
+    current = extract_metrics(json.loads(current_path.read_text()), args.stat)
+    result = compare(baseline, current, args.threshold / 100)
+    result["baseline_file"], result["current_file"] = str(baseline_path), str(current_path)
+
+    print(json.dumps(result, indent=2) if args.json else format_table(result))
+    return 1 if result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
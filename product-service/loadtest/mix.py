@@ -0,0 +1,180 @@
+"""
+Weighted request mixes to replay.
+
+A mix comes either from the seed data (``default_mix``), shaped like storefront traffic, or
+from a JSON lines file (``load_mix``). Each line of the file is either an explicit entry::
+
+    {"method": "GET", "path": "/product-service/api/v1/products/filter?page=2", "weight": 3, "name": "filter"}
+
+or a request log record written by RequestLoggingMiddleware, so a production log can be
+replayed as is. Log records count one each and only GETs are replayed from them.
+"""
+import json
+import random
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from services.cache_warmer import parse_request_line
+
+API_PREFIX = "/product-service/api/v1"
+
+
+@dataclass(frozen=True)
+class RequestSpec:
+    """One request of a mix; ``name`` groups requests in the report and defaults to the path without query"""
+    method: str
+    path: str
+    weight: float = 1.0
+    name: Optional[str] = None
+    body: Optional[Dict[str, Any]] = None
+
+    @property
+    def route(self) -> str:
+        return self.name or f"{self.method} {self.path.split('?', 1)[0]}"
+
+
+class RequestMix:
+    """Picks requests at random in proportion to their weights"""
+
+    def __init__(self, specs: Iterable[RequestSpec]):
+        self.specs = [spec for spec in specs if spec.weight > 0]
+        if not self.specs:
+            raise ValueError("A request mix needs at least one request with a positive weight")
+        self._cumulative = list(accumulate(spec.weight for spec in self.specs))
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def choose(self, rng: random.Random) -> RequestSpec:
+        index = bisect_right(self._cumulative, rng.random() * self._cumulative[-1])
+        return self.specs[min(index, len(self.specs) - 1)]
+
+    def routes(self) -> Dict[str, float]:
+        """Share of the mix per report route"""
+        total = self._cumulative[-1]
+        shares: Dict[str, float] = {}
+        for spec in self.specs:
+            shares[spec.route] = shares.get(spec.route, 0.0) + spec.weight / total
+        return shares
+
+
+def _with_query(path: str, **params: Any) -> str:
+    query = urlencode({key: value for key, value in params.items() if value is not None})
+    return f"{path}?{query}" if query else path
+
+
+def default_mix(seed: Dict[str, List[Dict[str, Any]]], base_path: str = API_PREFIX) -> RequestMix:
+    """
+    A storefront-like mix over the seeded catalog.
+
+    Listing pages dominate, followed by product pages and category navigation; menus
+    (categories, colors, materials, currencies) are requested on most page loads but are cheap.
+
+    Args:
+        seed: Documents per collection, as returned by ``load_seed``
+        base_path: API prefix of the product service
+
+    Returns:
+        The mix
+    """
+    products = seed.get("products", [])
+    level1 = seed.get("level1_categories", [])
+    level2 = seed.get("level2_categories", [])
+    specs: List[RequestSpec] = []
+
+    def add(path: str, weight: float, name: str) -> None:
+        specs.append(RequestSpec("GET", f"{base_path}{path}", weight, f"GET {base_path}{name}"))
+
+    # Listing pages: newest, most viewed, by price, and the summary cards the grid renders
+    for sort_by, sort_order in (("_id", -1), ("views", -1), ("price", 1), ("price", -1)):
+        for page in (1, 2):
+            add(_with_query("/products/filter", sort_by=sort_by, sort_order=sort_order, page=page), 4 / page, "/products/filter")
+        add(_with_query("/products/filter", sort_by=sort_by, sort_order=sort_order, view="summary"), 3, "/products/filter")
+    for start_price, end_price in ((0, 200), (200, 500), (500, 5000)):
+        add(_with_query("/products/filter", start_price=start_price, end_price=end_price), 2, "/products/filter")
+
+    for product in products:
+        if product.get("short_name"):
+            add(_with_query("/products/filter-one", short_name=product["short_name"]), 2, "/products/filter-one")
+
+    for category in level2:
+        if category.get("short_name"):
+            add(
+                _with_query("/products/by-level-two-category/filter", short_name=category["short_name"]),
+                3, "/products/by-level-two-category/filter",
+            )
+    for category in level1:
+        if category.get("name"):
+            add(_with_query("/products/by-level-one-category", name=category["name"]), 2, "/products/by-level-one-category")
+        if category.get("short_name"):
+            add(f"/categories/level-2/short-name/{category['short_name']}", 1, "/categories/level-2/short-name/{category_name}")
+
+    for path in ("/categories/", "/categories/level-1/", "/categories/level-2/", "/colors/", "/materials/", "/currencies/"):
+        add(path, 3, path)
+
+    return RequestMix(specs)
+
+
+def _parse_line(line: str) -> Optional[Tuple[RequestSpec, bool]]:
+    """The request on a mix line, and whether it was an explicit entry rather than a log record"""
+    line = line.strip()
+    if not line:
+        return None
+    entry: Any = None
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+    if isinstance(entry, dict) and "weight" in entry and "path" in entry:
+        spec = RequestSpec(
+            method=str(entry.get("method", "GET")).upper(),
+            path=entry["path"],
+            weight=float(entry["weight"]),
+            name=entry.get("name"),
+            body=entry.get("body"),
+        )
+        return spec, True
+    request = parse_request_line(line)
+    if request is None:
+        return None
+    path = f"{request['path']}?{request['query']}" if request.get("query") else request["path"]
+    return RequestSpec(request["method"].upper(), path), False
+
+
+def load_mix(path: Path) -> RequestMix:
+    """
+    Build a mix from a JSON lines file of explicit entries and/or request log records.
+
+    Identical requests are merged and their weights added.
+
+    Args:
+        path: The file to read
+
+    Returns:
+        The mix
+
+    Raises:
+        ValueError: If the file holds no replayable requests
+    """
+    weights: Dict[Tuple[str, str, Optional[str], Optional[str]], float] = {}
+    bodies: Dict[Tuple[str, str, Optional[str], Optional[str]], Optional[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8", errors="replace") as lines:
+        for line in lines:
+            parsed = _parse_line(line)
+            if parsed is None:
+                continue
+            spec, explicit = parsed
+            if not explicit and spec.method != "GET":
+                continue
+            key = (spec.method, spec.path, spec.name, json.dumps(spec.body, sort_keys=True) if spec.body else None)
+            weights[key] = weights.get(key, 0.0) + spec.weight
+            bodies[key] = spec.body
+    return RequestMix(
+        RequestSpec(method, request_path, weight, name, bodies[(method, request_path, name, body_key)])
+        for (method, request_path, name, body_key), weight in weights.items()
+    )
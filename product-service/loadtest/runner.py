@@ -0,0 +1,216 @@
+"""
+Open- and closed-loop load generation with per-route latency percentiles.
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .mix import RequestMix, RequestSpec
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        sorted_values: Samples in ascending order
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        The sample at that rank, or None without samples
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(latencies)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "p50": ms(percentile(ordered, 0.50)),
+        "p95": ms(percentile(ordered, 0.95)),
+        "p99": ms(percentile(ordered, 0.99)),
+        "mean": ms(sum(ordered) / len(ordered)) if ordered else None,
+        "max": ms(ordered[-1]) if ordered else None,
+    }
+
+
+class RouteStats:
+    """Outcomes of the requests of one report route"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency: float, status: Optional[int], failed: bool) -> None:
+        self.latencies.append(latency)
+        key = str(status) if status is not None else "exception"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if failed:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        requests = len(self.latencies)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 6) if requests else 0.0,
+            "status": dict(sorted(self.statuses.items())),
+            "latency_ms": _latency_summary(self.latencies),
+        }
+
+
+class LoadRunner:
+    """
+    Replays a request mix against a base URL.
+
+    With ``rate`` set, arrivals are open-loop: requests start on a Poisson schedule whatever the
+    service's response times, latency is measured from the scheduled arrival so a stalled
+    client does not hide queueing, and arrivals that find ``concurrency`` requests already in
+    flight are counted as dropped. Without a rate, ``concurrency`` workers each send their next
+    request as soon as the previous one completes (closed loop).
+
+    Requests that raise or answer 5xx count as errors; other statuses are reported per route.
+    Requests that start during the warm-up are sent but not recorded.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        mix: RequestMix,
+        concurrency: int = 16,
+        rate: Optional[float] = None,
+        duration_seconds: float = 30.0,
+        warmup_seconds: float = 0.0,
+        timeout_seconds: float = 10.0,
+        headers: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.concurrency = max(1, concurrency)
+        self.rate = rate if rate and rate > 0 else None
+        self.duration_seconds = duration_seconds
+        self.warmup_seconds = warmup_seconds
+        self.timeout_seconds = timeout_seconds
+        self.headers = headers or {}
+        self.rng = random.Random(seed)
+        self.transport = transport
+
+        self.routes: Dict[str, RouteStats] = {}
+        self.dropped = 0
+        self._recording_from = 0.0
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Generate load for the warm-up plus the configured duration.
+
+        Returns:
+            The report, see ``report``
+        """
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=self.timeout_seconds, limits=limits,
+            headers=self.headers, transport=self.transport,
+        ) as client:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            self._recording_from = started + self.warmup_seconds
+            deadline = self._recording_from + self.duration_seconds
+            if self.rate is None:
+                await asyncio.gather(*(self._worker(client, deadline) for _ in range(self.concurrency)))
+            else:
+                await self._open_loop(client, started, deadline)
+            elapsed = loop.time() - max(started, self._recording_from)
+        return self.report(min(elapsed, self.duration_seconds) if self.duration_seconds else elapsed)
+
+    async def _worker(self, client: httpx.AsyncClient, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline:
+            await self._send(client, self.mix.choose(self.rng), loop.time())
+
+    async def _open_loop(self, client: httpx.AsyncClient, started: float, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        in_flight: set = set()
+        arrival = started
+        while True:
+            arrival += self.rng.expovariate(self.rate)  # type: ignore[arg-type]
+            if arrival >= deadline:
+                break
+            delay = arrival - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.concurrency:
+                if arrival >= self._recording_from:
+                    self.dropped += 1
+                continue
+            task = asyncio.create_task(self._send(client, self.mix.choose(self.rng), arrival))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def _send(self, client: httpx.AsyncClient, spec: RequestSpec, scheduled: float) -> None:
+        loop = asyncio.get_running_loop()
+        status: Optional[int] = None
+        failed = False
+        try:
+            response = await client.request(spec.method, spec.path, json=spec.body)
+            status = response.status_code
+            failed = status >= 500
+        except httpx.HTTPError as e:
+            failed = True
+            logger.debug(f"{spec.method} {spec.path} failed: {e!r}")
+        if scheduled >= self._recording_from:
+            stats = self.routes.get(spec.route)
+            if stats is None:
+                stats = self.routes[spec.route] = RouteStats()
+            stats.record(loop.time() - scheduled, status, failed)
+
+    def report(self, elapsed_seconds: float) -> Dict[str, Any]:
+        """
+        Summarise the recorded requests.
+
+        Args:
+            elapsed_seconds: Length of the measured window
+
+        Returns:
+            Configuration, totals, throughput, overall latency percentiles and the same per route
+        """
+        latencies = [latency for stats in self.routes.values() for latency in stats.latencies]
+        requests = len(latencies)
+        errors = sum(stats.errors for stats in self.routes.values())
+        return {
+            "config": {
+                "base_url": self.base_url,
+                "mode": "open" if self.rate else "closed",
+                "rate": self.rate,
+                "concurrency": self.concurrency,
+                "duration_seconds": self.duration_seconds,
+                "warmup_seconds": self.warmup_seconds,
+                "mix_size": len(self.mix),
+            },
+            "started_at": time.time() - elapsed_seconds,
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "requests": requests,
+            "errors": errors,
+            "error_rate": round(errors / requests, 6) if requests else 0.0,
+            "dropped": self.dropped,
+            "throughput_rps": round(requests / elapsed_seconds, 3) if elapsed_seconds > 0 else 0.0,
+            "latency_ms": _latency_summary(latencies),
+            "routes": {route: self.routes[route].summary() for route in sorted(self.routes)},
+        }
@@ -0,0 +1,57 @@
+"""
+Catalog seed data from the ``mongoexport`` dumps in ``afrifurn-mongodb/seed``.
+"""
+import logging
+from pathlib import Path
+from typing import Any, Dict, List
+
+from bson import json_util
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_DIR = Path(__file__).resolve().parents[2] / "afrifurn-mongodb" / "seed"
+
+
+def load_seed(seed_dir: Path = DEFAULT_SEED_DIR) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Read every ``<database>.<collection>.json`` dump in a directory.
+
+    Args:
+        seed_dir: Directory holding the dumps
+
+    Returns:
+        Documents per collection name, with extended JSON (``$oid``, ``$date``) decoded
+
+    Raises:
+        FileNotFoundError: If the directory holds no dumps
+    """
+    seed: Dict[str, List[Dict[str, Any]]] = {}
+    for path in sorted(Path(seed_dir).glob("*.json")):
+        collection = path.stem.split(".", 1)[-1]
+        documents = json_util.loads(path.read_text())
+        seed[collection] = documents if isinstance(documents, list) else [documents]
+    if not seed:
+        raise FileNotFoundError(f"No seed dumps in {seed_dir}")
+    return seed
+
+
+def seed_database(database: Database, seed: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Replace the contents of each seeded collection.
+
+    Args:
+        database: Target database
+        seed: Documents per collection, as returned by ``load_seed``
+
+    Returns:
+        Number of documents inserted per collection
+    """
+    counts = {}
+    for collection, documents in seed.items():
+        database[collection].delete_many({})
+        if documents:
+            database[collection].insert_many([dict(document) for document in documents])
+        counts[collection] = len(documents)
+        logger.info(f"Seeded {collection} with {len(documents)} documents")
+    return counts
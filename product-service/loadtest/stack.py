@@ -0,0 +1,208 @@
+"""
+Throwaway local stack: ``mongod``, ``redis-server`` and the product service under uvicorn.
+"""
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from pymongo import MongoClient
+
+from .catalog import CatalogGenerator, load_catalog
+from .mix import API_PREFIX
+from .seed import DEFAULT_SEED_DIR, load_seed, seed_database
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+MONGO_USER = "loadtest"
+MONGO_PASSWORD = "loadtest"
+MONGO_DB_NAME = "afrifurn"
+
+
+class StackError(RuntimeError):
+    """A stack process is missing or did not become ready"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(check: Callable[[], bool], timeout_seconds: float, what: str) -> None:
+    """
+    Poll ``check`` until it returns true.
+
+    Args:
+        check: Readiness check; exceptions count as not ready
+        timeout_seconds: How long to wait
+        what: Name used in the error
+
+    Raises:
+        StackError: If the check did not pass in time
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise StackError(f"{what} not ready after {timeout_seconds:.0f}s")
+
+
+class LocalStack:
+    """
+    Starts the processes, seeds Mongo and waits for the service's readiness probe.
+
+    Each process gets a free port and a scratch directory that is removed on ``stop``. Redis is
+    optional: without it the service serves uncached, which is itself worth measuring. With a
+    ``catalog`` the seeded products are replaced by a generated catalog.
+    Registration with Eureka points at a closed port and retries in the background.
+    """
+
+    def __init__(
+        self,
+        seed_dir: Path = DEFAULT_SEED_DIR,
+        with_redis: bool = True,
+        workers: int = 1,
+        mongod: str = "mongod",
+        redis_server: str = "redis-server",
+        service_env: Optional[Dict[str, str]] = None,
+        ready_timeout_seconds: float = 60.0,
+        catalog: Optional[CatalogGenerator] = None,
+    ):
+        self.seed_dir = Path(seed_dir)
+        self.with_redis = with_redis
+        self.workers = workers
+        self.mongod = mongod
+        self.redis_server = redis_server
+        self.service_env = service_env or {}
+        self.ready_timeout_seconds = ready_timeout_seconds
+        self.catalog = catalog
+
+        self.workdir: Optional[Path] = None
+        self.mongo_port = 0
+        self.redis_port = 0
+        self.service_port = 0
+        self._processes: List[subprocess.Popen] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.service_port}"
+
+    def __enter__(self) -> "LocalStack":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _binary(self, name: str) -> str:
+        path = shutil.which(name)
+        if path is None:
+            raise StackError(f"{name} not found on PATH; install it or run against a running stack with --target")
+        return path
+
+    def _spawn(self, name: str, command: List[str], **kwargs) -> subprocess.Popen:
+        with open(self.workdir / f"{name}.log", "wb") as log:  # type: ignore[operator]
+            process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+        self._processes.append(process)
+        return process
+
+    def start(self) -> None:
+        mongod = self._binary(self.mongod)
+        redis_server = self._binary(self.redis_server) if self.with_redis else None
+        self.workdir = Path(tempfile.mkdtemp(prefix="afrifurn-loadtest-"))
+        try:
+            self._start_mongo(mongod)
+            if redis_server:
+                self._start_redis(redis_server)
+            self._start_service()
+        except BaseException:
+            self.stop()
+            raise
+
+    def _start_mongo(self, mongod: str) -> None:
+        self.mongo_port = free_port()
+        dbpath = self.workdir / "mongo"  # type: ignore[operator]
+        dbpath.mkdir()
+        self._spawn("mongod", [mongod, "--dbpath", str(dbpath), "--port", str(self.mongo_port), "--bind_ip", "127.0.0.1"])
+
+        client: MongoClient = MongoClient("127.0.0.1", self.mongo_port, serverSelectionTimeoutMS=500)
+        try:
+            wait_until(lambda: client.admin.command("ping")["ok"] == 1, 30, "mongod")
+            # The service always authenticates against its own database
+            database = client[MONGO_DB_NAME]
+            database.command("createUser", MONGO_USER, pwd=MONGO_PASSWORD, roles=["readWrite", "dbAdmin"])
+            counts = seed_database(database, load_seed(self.seed_dir))
+            logger.info(f"mongod on port {self.mongo_port} seeded: {counts}")
+            if self.catalog is not None:
+                loaded = load_catalog(f"mongodb://127.0.0.1:{self.mongo_port}", MONGO_DB_NAME, self.catalog)
+                logger.info(f"Generated catalog loaded: {loaded}")
+        finally:
+            client.close()
+
+    def _start_redis(self, redis_server: str) -> None:
+        self.redis_port = free_port()
+        self._spawn("redis", [
+            redis_server, "--port", str(self.redis_port), "--bind", "127.0.0.1",
+            "--save", "", "--appendonly", "no", "--dir", str(self.workdir),
+        ])
+
+        def accepting() -> bool:
+            with socket.create_connection(("127.0.0.1", self.redis_port), timeout=0.5):
+                return True
+
+        wait_until(accepting, 15, "redis-server")
+
+    def _start_service(self) -> None:
+        self.service_port = free_port()
+        env = {
+            **os.environ,
+            "MONGO_HOST": "127.0.0.1",
+            "MONGO_PORT": str(self.mongo_port),
+            "MONGO_USER": MONGO_USER,
+            "MONGODB_PASSWORD": MONGO_PASSWORD,
+            "MONGO_DB_NAME": MONGO_DB_NAME,
+            # Nothing listens here: without Redis the cache circuit opens and requests go to Mongo
+            "REDIS_URL": f"redis://127.0.0.1:{self.redis_port or free_port()}",
+            "REDIS_PASSWORD": "",
+            "EUREKA_SERVER_URL": f"http://127.0.0.1:{free_port()}/eureka/",
+            "LOG_FILE": str(self.workdir / "app.log"),  # type: ignore[operator]
+            "PROFILING_DIR": str(self.workdir / "profiles"),  # type: ignore[operator]
+            # Every simulated shopper comes from one address and would share one bucket
+            "RATE_LIMIT_ENABLED": "false",
+            **self.service_env,
+        }
+        self._spawn("product-service", [
+            sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.service_port),
+            "--workers", str(self.workers), "--log-level", "warning",
+        ], cwd=SERVICE_DIR, env=env)
+
+        ready_url = f"{self.base_url}{API_PREFIX}/health/ready"
+        wait_until(lambda: httpx.get(ready_url, timeout=1.0).status_code == 200, self.ready_timeout_seconds, "product-service")
+        logger.info(f"product-service ready at {self.base_url}")
+
+    def stop(self) -> None:
+        for process in reversed(self._processes):
+            if process.poll() is None:
+                process.terminate()
+        for process in reversed(self._processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes.clear()
+        if self.workdir is not None:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
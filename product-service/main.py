@@ -1,15 +1,23 @@
 import logging
 import os
-import time
-from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-import uvicorn
-import uvicorn.logging
 from config.eureka import get_app_info, lifespan
 from constants.paths import STATIC_DIR
-from routers import api_router
+from config.logging_setup import configure_logging
+from config.settings import get_settings
+from core.exceptions import AuthenticationError, AuthorizationError, RateLimitExceeded
+from core.profiling import get_profile_store
+from core.responses import FastJSONResponse
+from decorators import create_redis_cache_provider
+from middleware import (
+    AdmissionControlMiddleware, AIMDLimit, CatalogVersions, CompressionMiddleware, ConditionalGetMiddleware,
+    MetricsMiddleware, PrecompressedStore, ProfilingMiddleware, RequestLoggingMiddleware, available_codecs,
+)
+from routers import CATALOG_RESOURCES, include_routers
+from utils.rate_limiter import retry_after_header
 
 from fastapi import Header, HTTPException
 
@@ -23,7 +31,47 @@ def verify_api_key(x_api_key: str = Header(...)):
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application"""
-    app = FastAPI(lifespan=lifespan)
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+    
+    settings = get_settings()
+    
+    # Innermost, right in front of the routers: 304s and compression never wait for a slot
+    if settings.admission_enabled:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            limit=AIMDLimit(
+                initial=settings.admission_initial_limit,
+                minimum=settings.admission_min_limit,
+                maximum=settings.admission_max_limit,
+                latency_target_seconds=settings.admission_latency_target_ms / 1000,
+            ),
+            priorities=settings.admission_priorities,
+            max_queue=settings.admission_max_queue,
+            queue_timeout_seconds=settings.admission_queue_timeout_ms / 1000,
+            retry_after_seconds=settings.admission_retry_after_seconds,
+        )
+    
+    # Inside ConditionalGetMiddleware, which puts the ETag the precompressed store is keyed by in scope state
+    app.state.precompressed_store = PrecompressedStore(settings.compression_store_max_bytes)
+    app.add_middleware(
+        CompressionMiddleware,
+        codecs=available_codecs(
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            zstd_level=settings.compression_zstd_level,
+        ),
+        minimum_size=settings.compression_minimum_size,
+        store=app.state.precompressed_store,
+    )
+    
+    # Added before CORS so that 304 responses still pass through the CORS middleware
+    app.add_middleware(
+        ConditionalGetMiddleware,
+        resources=CATALOG_RESOURCES,
+        versions=CatalogVersions(create_redis_cache_provider(), settings.catalog_version_refresh_seconds),
+        max_age=settings.catalog_cache_max_age,
+        stale_while_revalidate=settings.catalog_stale_while_revalidate,
+    )
     
     app.add_middleware(
         CORSMiddleware,
@@ -32,53 +80,40 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    
+    app.add_middleware(MetricsMiddleware)
+    
+    app.add_middleware(ProfilingMiddleware, store=get_profile_store(), sample_every=settings.profiling_sample_every)
+    
+    # Outermost, so the logged duration covers every other middleware
+    app.add_middleware(
+        RequestLoggingMiddleware,
+        sample_rate=settings.request_log_sample_rate,
+        slow_request_seconds=settings.request_log_slow_seconds,
+    )
+    @app.exception_handler(AuthenticationError)
+    async def authentication_error_handler(request: Request, exc: AuthenticationError):
+        return JSONResponse(status_code=401, content={"detail": exc.message})
+
+    @app.exception_handler(AuthorizationError)
+    async def authorization_error_handler(request: Request, exc: AuthorizationError):
+        return JSONResponse(status_code=403, content={"detail": exc.message})
+
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limit_error_handler(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(status_code=429, content={"detail": exc.message}, headers={
+            "Retry-After": retry_after_header(exc.retry_after_seconds),
+            "X-RateLimit-Limit": str(exc.details["limit"]),
+            "X-RateLimit-Remaining": "0",
+        })
+
     app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-    app.include_router(api_router)
+    include_routers(app)
     
     return app
 
+configure_logging(get_settings().log_file)
 app = create_app()
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                        force=True , # Override any existing configuration
-                            
-                     filename='app.log', 
-                     filemode='a', 
-                     format='%(asctime)s - %(levelname)s - %(message)s'
-                     )
-logger = logging.getLogger(__name__)
-# Create a middleware class for logging
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Log request info
-        request_id = f"{time.time()}"
-        request_path = request.url.path
-        client_host = request.client.host if request.client else "unknown"
-        
-        logger.info(f"Request started - ID: {request_id} | Path: {request_path} | Client: {client_host}")
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Process the request and get the response
-        try:
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log response info
-            logger.info(
-                f"Request completed - ID: {request_id} | Status: {response.status_code} | "
-                f"Duration: {process_time:.4f}s"
-            )
-            
-            return response
-        except Exception as e:
-            # Log any exceptions that occur
-            logger.error(f"Request failed - ID: {request_id} | Error: {str(e)}")
-            raise
-app.add_middleware(LoggingMiddleware)
 
 
 @app.on_event("startup")
@@ -109,5 +144,6 @@ async def startup_event() -> None:
         raise
 
 if __name__ == "__main__":
-    
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,13 @@
+from .admission import AdmissionControlMiddleware, AIMDLimit
+from .compression import CompressionMiddleware, PrecompressedStore, available_codecs
+from .conditional_get import CatalogResource, CatalogVersions, ConditionalGetMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .request_logging import RequestLoggingMiddleware
+
+__all__ = [
+    'AdmissionControlMiddleware', 'AIMDLimit',
+    'CatalogResource', 'CatalogVersions', 'ConditionalGetMiddleware',
+    'CompressionMiddleware', 'PrecompressedStore', 'available_codecs',
+    'MetricsMiddleware', 'ProfilingMiddleware', 'RequestLoggingMiddleware',
+]
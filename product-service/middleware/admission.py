@@ -0,0 +1,234 @@
+import asyncio
+import heapq
+import itertools
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import MetricsRegistry, metrics
+
+EXEMPT, HIGH, NORMAL, LOW = -1, 0, 1, 2
+PRIORITIES = {"exempt": EXEMPT, "high": HIGH, "normal": NORMAL, "low": LOW}
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+# Share of the concurrency limit each priority may fill, so bulk work never takes the last slots
+CAPACITY_SHARE = {HIGH: 1.0, NORMAL: 0.9, LOW: 0.5}
+# How long each priority may wait for a slot, relative to the queue timeout
+QUEUE_TIME_FACTOR = {HIGH: 2.0, NORMAL: 1.0, LOW: 0.5}
+
+
+class AIMDLimit:
+    """
+    Concurrency limit adapted to latency by additive increase, multiplicative decrease.
+
+    Every request that starts its response within ``latency_target_seconds`` while the limit
+    was at least half used adds ``1 / limit``, so the limit grows by about one per round of
+    requests. A slower response or a server error multiplies the limit by ``backoff_ratio``,
+    at most once per ``latency_target_seconds`` so that one burst of slow requests counts as
+    one congestion signal rather than many.
+    """
+
+    def __init__(
+        self,
+        initial: int = 50,
+        minimum: int = 4,
+        maximum: int = 500,
+        latency_target_seconds: float = 0.5,
+        backoff_ratio: float = 0.9,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.latency_target_seconds = latency_target_seconds
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_sample(self, latency_seconds: float, in_flight: int, dropped: bool, now: float) -> None:
+        """
+        Adjust the limit after one request.
+
+        Args:
+            latency_seconds: Time from admission to the start of the response
+            in_flight: Requests being handled when this one finished, itself included
+            dropped: The request failed with a server error
+            now: Monotonic time of the sample
+        """
+        if dropped or latency_seconds > self.latency_target_seconds:
+            if now - self._last_decrease >= self.latency_target_seconds:
+                self._last_decrease = now
+                self._limit = max(self.minimum, self._limit * self.backoff_ratio)
+        elif in_flight * 2 >= self._limit:
+            self._limit = min(self.maximum, self._limit + 1 / self._limit)
+
+
+class AdmissionControlMiddleware:
+    """
+    Admits requests up to an adaptive concurrency limit and sheds the rest with 503.
+
+    Requests are classed by the first rule in ``priorities`` whose text occurs in the path
+    (``high``, ``normal``, ``low`` or ``exempt``; unmatched paths are ``normal``). A request
+    runs at once if its class may still use a slot (see CAPACITY_SHARE), otherwise it waits
+    in a queue that hands freed slots to the highest priority first. Requests that wait
+    longer than their class allows, or find the queue full, are answered with 503 and
+    ``Retry-After``. Exempt paths, such as health checks, are never queued or counted.
+
+    Latency samples are taken to the start of the response, which is also how long streamed
+    exports keep a client waiting. Low-priority requests are bulk work that is slow by
+    design, so they hold slots but do not move the limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limit: Optional[AIMDLimit] = None,
+        priorities: Optional[Dict[str, str]] = None,
+        max_queue: int = 200,
+        queue_timeout_seconds: float = 1.0,
+        retry_after_seconds: int = 2,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.app = app
+        self.limit = limit or AIMDLimit()
+        self.rules: List[Tuple[str, int]] = [(text, PRIORITIES[name]) for text, name in (priorities or {}).items()]
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        # Heap of waiters; entries that timed out or were cancelled stay until they reach the
+        # top (or the heap is compacted), so ``queued`` counts the live ones
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.queued = 0
+        self._sequence = itertools.count()
+        self.limit_gauge = registry.gauge("admission_concurrency_limit", "Current adaptive concurrency limit")
+        self.in_flight_gauge = registry.gauge("admission_in_flight", "Requests holding an admission slot")
+        self.queue_gauge = registry.gauge("admission_queue_depth", "Requests waiting for an admission slot")
+        self.shed = registry.counter("admission_shed_total", "Requests answered 503 by admission control", labels=("priority",))
+        self.limit_gauge.set(self.limit.limit)
+
+    def priority(self, path: str) -> int:
+        for text, priority in self.rules:
+            if text in path:
+                return priority
+        return NORMAL
+
+    def _has_capacity(self, priority: int) -> bool:
+        return self.in_flight < max(1, int(self.limit.limit * CAPACITY_SHARE[priority]))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.priority(scope["path"])
+        if priority == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        if not await self._acquire(priority):
+            self.shed.labels(PRIORITY_NAMES[priority]).inc()
+            await self._send_overloaded(send)
+            return
+
+        start = time.perf_counter()
+        latency: Optional[float] = None
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal latency, status
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if priority != LOW:
+                self.limit.on_sample(
+                    latency if latency is not None else time.perf_counter() - start,
+                    self.in_flight,
+                    status >= 500,
+                    time.monotonic(),
+                )
+                self.limit_gauge.set(self.limit.limit)
+            self._release()
+
+    async def _acquire(self, priority: int) -> bool:
+        # Queued requests of the same or a higher priority go first
+        if self._has_capacity(priority) and not (self._waiters and self._waiters[0][0] <= priority):
+            self._take_slot()
+            return True
+        if self.queued >= self.max_queue:
+            return False
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.queued += 1
+        self.queue_gauge.set(self.queued)
+        try:
+            # The slot is taken by whoever resolves the future
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout_seconds * QUEUE_TIME_FACTOR[priority])
+            return True
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Granted just as the wait ran out: the slot is ours
+                return True
+            self._abandon(future)
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            self._abandon(future)
+            raise
+        finally:
+            self._drop_finished_waiters()
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        if not future.done():
+            future.cancel()
+            self.queued -= 1
+
+    def _take_slot(self) -> None:
+        self.in_flight += 1
+        self.in_flight_gauge.set(self.in_flight)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._drop_finished_waiters()
+        # Hand freed slots to waiters, best priority first, while their class has room
+        while self._waiters and self._has_capacity(self._waiters[0][0]):
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.queued -= 1
+                self._take_slot()
+                future.set_result(None)
+        self.in_flight_gauge.set(self.in_flight)
+        self.queue_gauge.set(self.queued)
+
+    def _drop_finished_waiters(self) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if len(self._waiters) > 2 * self.max_queue:
+            # Mostly abandoned entries stuck under a live one; rebuild from the live waiters
+            self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+            heapq.heapify(self._waiters)
+        self.queue_gauge.set(self.queued)
+
+    async def _send_overloaded(self, send: Send) -> None:
+        body = json.dumps({"detail": "Service is overloaded, please retry shortly"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after_seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current limit, slots in use and queue length"""
+        return {"limit": self.limit.limit, "in_flight": self.in_flight, "queued": self.queued}
@@ -0,0 +1,315 @@
+import gzip
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class StreamCompressor:
+    """Incremental compressor for responses sent in several body messages"""
+
+    def __init__(self, process: Callable[[bytes], bytes], flush: Callable[[], bytes], finish: Callable[[], bytes]):
+        self._process = process
+        self._flush = flush
+        self._finish = finish
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush after every chunk so the client can decode each one as it arrives
+        return self._process(data) + self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class Codec:
+    """
+    One content-coding.
+
+    Attributes:
+        name: Token used in Accept-Encoding / Content-Encoding
+        compress: One-shot compression of a complete body
+        stream: Factory for a StreamCompressor
+    """
+
+    def __init__(self, name: str, compress: Callable[[bytes], bytes], stream: Callable[[], StreamCompressor]):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+def gzip_codec(level: int = 6) -> Codec:
+    def stream() -> StreamCompressor:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return StreamCompressor(compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush)
+
+    return Codec("gzip", lambda body: gzip.compress(body, compresslevel=level, mtime=0), stream)
+
+
+def brotli_codec(quality: int = 5) -> Optional[Codec]:
+    if brotli is None:
+        return None
+
+    def stream() -> StreamCompressor:
+        compressor = brotli.Compressor(quality=quality)
+        return StreamCompressor(compressor.process, compressor.flush, compressor.finish)
+
+    return Codec("br", lambda body: brotli.compress(body, quality=quality), stream)
+
+
+def zstd_codec(level: int = 3) -> Optional[Codec]:
+    if zstandard is None:
+        return None
+    context = zstandard.ZstdCompressor(level=level)
+
+    def stream() -> StreamCompressor:
+        compressor = context.compressobj()
+        return StreamCompressor(
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+    return Codec("zstd", context.compress, stream)
+
+
+def available_codecs(gzip_level: int = 6, brotli_quality: int = 5, zstd_level: int = 3) -> List[Codec]:
+    """
+    Codecs whose libraries are installed, most preferred first.
+
+    Brotli comes first because catalog bodies are compressed once and then served from the
+    PrecompressedStore, so ratio matters more than speed; gzip is always available.
+    """
+    codecs = [brotli_codec(brotli_quality), zstd_codec(zstd_level), gzip_codec(gzip_level)]
+    return [codec for codec in codecs if codec is not None]
+
+
+def negotiate(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Pick a content-coding for a request.
+
+    The client's q-values decide first, then the order of ``available``.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding header
+        available: Codings the server supports, most preferred first
+
+    Returns:
+        The chosen coding, or None to send the body as is
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[token] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best: Optional[Tuple[float, int, str]] = None
+    for rank, name in enumerate(available):
+        weight = weights.get(name, wildcard)
+        if weight > 0 and (best is None or weight > best[0]):
+            best = (weight, rank, name)
+    return best[2] if best else None
+
+
+@dataclass
+class CompressedResponse:
+    """A compressed body together with the response headers it was sent with"""
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class PrecompressedStore:
+    """
+    In-process LRU of compressed catalog responses, keyed by ETag and coding.
+
+    ETags of catalog routes change whenever the catalog version does, so entries never
+    need explicit invalidation; stale ones simply stop being requested and age out.
+    The store is bounded by the total size of the compressed bodies.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self._entries = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: len(entry.body) or 1)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str, encoding: str) -> Optional[CompressedResponse]:
+        entry = self._entries.get((etag, encoding))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, etag: str, encoding: str, entry: CompressedResponse) -> None:
+        if len(entry.body) <= self._entries.maxsize:
+            self._entries[(etag, encoding)] = entry
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": int(self._entries.currsize),
+            "max_bytes": int(self._entries.maxsize),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli, zstd or gzip, whichever the client accepts.
+
+    Bodies smaller than ``minimum_size``, non-text content and responses that already carry
+    a Content-Encoding are passed through. Streaming responses are compressed chunk by chunk.
+    Must sit inside ConditionalGetMiddleware: when a catalog GET has an ETag, the compressed
+    body is kept in a PrecompressedStore and later requests for the same ETag and coding are
+    answered from it without running the route or compressing again. The ETag of a compressed
+    response is sent as a weak validator, as the bytes differ from the identity encoding.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        codecs: List[Codec],
+        minimum_size: int = 1024,
+        store: Optional[PrecompressedStore] = None,
+    ):
+        self.app = app
+        self.codecs = {codec.name: codec for codec in codecs}
+        self.preference = [codec.name for codec in codecs]
+        self.minimum_size = minimum_size
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding, self.preference) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = scope.get("state", {}).get("etag")
+        if etag is not None and self.store is not None:
+            entry = self.store.get(etag, encoding)
+            if entry is not None:
+                await send({"type": "http.response.start", "status": entry.status, "headers": list(entry.headers)})
+                await send({"type": "http.response.body", "body": entry.body})
+                return
+
+        responder = _CompressingResponder(self, self.codecs[encoding], etag, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Per-request send wrapper that buffers the start message until the body is known"""
+
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec, etag: Optional[str], send: Send):
+        self.middleware = middleware
+        self.codec = codec
+        self.etag = etag
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.stream: Optional[StreamCompressor] = None
+
+    def _compressible(self, message: Message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        headers = MutableHeaders(raw=message["headers"])
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["content-encoding"] = self.codec.name
+        headers.add_vary_header("Accept-Encoding")
+        if self.etag is not None and "etag" not in headers:
+            headers["etag"] = f"W/{self.etag}"
+        return headers
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.start["headers"] = list(message.get("headers", []))
+            self.passthrough = not self._compressible(self.start)
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and not more_body:
+            await self._send_whole(body)
+            return
+
+        if self.stream is None:
+            self.stream = self.codec.stream()
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            await self._send(self.start)
+
+        data = self.stream.chunk(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.middleware.minimum_size:
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        compressed = self.codec.compress(body)
+        headers = self._encoded_headers()
+        headers["content-length"] = str(len(compressed))
+        if self.etag is not None and self.middleware.store is not None and self.start["status"] == 200:
+            self.middleware.store.put(
+                self.etag, self.codec.name,
+                CompressedResponse(self.start["status"], list(self.start["headers"]), compressed),
+            )
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": compressed})
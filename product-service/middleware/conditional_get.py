@@ -0,0 +1,262 @@
+import hashlib
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from decorators.circuit_breaker import CircuitBreaker
+from decorators.redis_provider import RedisCacheProvider
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+VERSION_KEY_PREFIX = "catalog-version"
+VERSION_TTL_SECONDS = 30 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class CatalogResource:
+    """
+    A group of catalog routes that share one version.
+
+    Attributes:
+        prefixes: Request path prefixes served by the group
+        depends_on: Other groups whose writes also change this group's responses
+        cache_keys: ``cache_response`` key patterns to drop when the group is written to
+    """
+    prefixes: Tuple[str, ...]
+    depends_on: Tuple[str, ...] = ()
+    cache_keys: Tuple[str, ...] = ()
+
+
+class CatalogVersions:
+    """
+    Per-group version tokens stored in Redis, so every instance hands out the same ETags.
+
+    A version is a random token plus the time it was minted. A write replaces it with a new
+    token, so a token that expires or is lost never collides with one a client still holds.
+    Tokens are memoised in-process for ``refresh_seconds`` to keep Redis off the hot path.
+    """
+
+    def __init__(self, cache_provider: RedisCacheProvider, refresh_seconds: float = 1.0):
+        self.cache_provider = cache_provider
+        self.refresh_seconds = refresh_seconds
+        self._local: Dict[str, Tuple[float, Dict[str, float]]] = {}
+
+    @staticmethod
+    def _new_version() -> Dict[str, float]:
+        return {"token": secrets.token_hex(8), "modified": int(time.time())}
+
+    @staticmethod
+    def _key(group: str) -> str:
+        return f"{VERSION_KEY_PREFIX}:{group}"
+
+    def _is_reliable(self) -> bool:
+        # An open breaker means Redis may hold newer versions than we can see
+        return self.cache_provider.circuit_breaker.state == CircuitBreaker.CLOSED
+
+    async def current(self, groups: Iterable[str]) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Return the version of each group, or None when versions cannot be trusted right now.
+        """
+        now = time.monotonic()
+        versions: Dict[str, Dict[str, float]] = {}
+        stale: List[str] = []
+        for group in groups:
+            cached = self._local.get(group)
+            if cached and now - cached[0] < self.refresh_seconds:
+                versions[group] = cached[1]
+            else:
+                stale.append(group)
+
+        if stale:
+            if not self._is_reliable():
+                return None
+            found = await self.cache_provider.get_many([self._key(group) for group in stale])
+            if not self._is_reliable():
+                return None
+            missing = {}
+            for group in stale:
+                version = found.get(self._key(group))
+                if not isinstance(version, dict):
+                    version = self._new_version()
+                    missing[self._key(group)] = version
+                versions[group] = version
+                self._local[group] = (now, version)
+            if missing:
+                await self.cache_provider.set_many(missing, VERSION_TTL_SECONDS)
+        return versions
+
+    async def bump(self, group: str) -> None:
+        """
+        Mint a new version for ``group`` after a successful write.
+
+        Last-Modified only has one-second resolution, so the new version is dated at least a
+        second after the one it replaces; otherwise a client revalidating with only
+        If-Modified-Since could get a 304 for a body from earlier in the same second.
+        """
+        key = self._key(group)
+        stored = (await self.cache_provider.get_many([key])).get(key)
+        cached = self._local.get(group)
+        previous = [version["modified"] for version in (stored, cached and cached[1]) if isinstance(version, dict)]
+        version = self._new_version()
+        version["modified"] = max([version["modified"]] + [int(modified) + 1 for modified in previous])
+        self._local[group] = (time.monotonic(), version)
+        await self.cache_provider.set(self._key(group), version, VERSION_TTL_SECONDS)
+
+
+class ConditionalGetMiddleware:
+    """
+    ETag / Last-Modified validation for catalog routes.
+
+    The ETag of a GET is derived from the versions of the groups it depends on and the
+    normalised request URL, so ``If-None-Match`` and ``If-Modified-Since`` are answered
+    with a 304 before the route runs, without touching Mongo or the response cache.
+    Successful writes to a group mint a new version and drop its cached responses.
+
+    The version is minted before the write's response starts, so a client reading its own
+    write never gets a 304 for the old body. Cached bodies are dropped once the response has
+    been sent, since that scans the keyspace once per pattern, and the version is minted
+    again afterwards: a reader in between may have paired the first new ETag with a cached
+    body from before the write, and that pairing must not stay valid.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        resources: Dict[str, CatalogResource],
+        versions: CatalogVersions,
+        max_age: int = 30,
+        stale_while_revalidate: int = 60,
+    ):
+        self.app = app
+        self.resources = resources
+        self.versions = versions
+        self.cache_control = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+        # Longest prefix first so nested prefixes win
+        self._prefixes = sorted(
+            ((prefix, group) for group, resource in resources.items() for prefix in resource.prefixes),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def _resolve_group(self, path: str) -> Optional[str]:
+        for prefix, group in self._prefixes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return group
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group = self._resolve_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in SAFE_METHODS:
+            await self._handle_read(group, scope, receive, send)
+        else:
+            await self._handle_write(group, scope, receive, send)
+
+    async def _handle_read(self, group: str, scope: Scope, receive: Receive, send: Send) -> None:
+        groups = (group,) + self.resources[group].depends_on
+        versions = await self.versions.current(groups)
+        if versions is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = self._etag(scope, [versions[name]["token"] for name in groups])
+        last_modified = max(int(versions[name]["modified"]) for name in groups)
+        validator_headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", formatdate(last_modified, usegmt=True).encode("latin-1")),
+            (b"cache-control", self.cache_control.encode("latin-1")),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        scope.setdefault("state", {})["etag"] = etag
+
+        request_headers = _headers(scope)
+        if _is_not_modified(request_headers, etag, last_modified):
+            await send({"type": "http.response.start", "status": 304, "headers": validator_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                present = {name.lower() for name, _ in message.get("headers", [])}
+                message["headers"] = list(message.get("headers", [])) + [
+                    header for header in validator_headers if header[0] not in present
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+    async def _handle_write(self, group: str, scope: Scope, receive: Receive, send: Send) -> None:
+        succeeded = False
+
+        async def send_and_bump(message: Message) -> None:
+            nonlocal succeeded
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                succeeded = True
+                await self._bump(group)
+            await send(message)
+
+        await self.app(scope, receive, send_and_bump)
+        if succeeded:
+            await self._drop_cached_responses(group)
+            await self._bump(group)
+
+    async def _bump(self, group: str) -> None:
+        try:
+            await self.versions.bump(group)
+        except Exception as e:
+            logger.error(f"Failed to bump the version of catalog group {group}: {e}")
+
+    async def _drop_cached_responses(self, group: str) -> None:
+        # Groups that depend on this one get new ETags too, so their cached bodies must go as well
+        affected = [group] + [name for name, resource in self.resources.items() if group in resource.depends_on]
+        try:
+            for name in affected:
+                for pattern in self.resources[name].cache_keys:
+                    await self.versions.cache_provider.delete_pattern(pattern)
+        except Exception as e:
+            logger.error(f"Failed to drop cached responses of catalog group {group}: {e}")
+
+    @staticmethod
+    def _etag(scope: Scope, tokens: List[str]) -> str:
+        query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)))
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(scope["path"].encode("utf-8"))
+        digest.update(b"?" + query.encode("utf-8"))
+        for token in tokens:
+            digest.update(b"|" + token.encode("latin-1"))
+        return f'"{digest.hexdigest()}"'
+
+
+def _headers(scope: Scope) -> Dict[str, str]:
+    return {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+
+def _is_not_modified(request_headers: Dict[str, str], etag: str, last_modified: int) -> bool:
+    """RFC 7232 evaluation: If-None-Match takes precedence, and uses weak comparison"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return last_modified <= since
+    return False
@@ -0,0 +1,80 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import LATENCY_BUCKETS, MetricsRegistry, metrics
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Records request latency per route template, method and status, and requests in flight.
+
+    The route label is the path template (``/products/{product_id}``), never the raw path, so
+    the number of series stays bounded. Starlette records the matched endpoint in the scope;
+    it is mapped back to its route once and remembered.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency",
+            labels=("method", "route", "status"), buckets=LATENCY_BUCKETS,
+        )
+        self.in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being handled", labels=("method",))
+        self._routes_by_endpoint: Optional[Dict[Any, List[BaseRoute]]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.in_flight.labels(scope["method"])
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            self.duration.labels(scope["method"], self.route_template(scope), str(status)).observe(
+                time.perf_counter() - start
+            )
+
+    def route_template(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._routes_by_endpoint is None:
+            self._routes_by_endpoint = self._index_routes(scope)
+        routes = self._routes_by_endpoint.get(endpoint)
+        if not routes:
+            return UNMATCHED_ROUTE
+        if len(routes) == 1:
+            return routes[0].path  # type: ignore[attr-defined]
+        # One endpoint behind several routes: find the one this request matched
+        for route in routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return route.path  # type: ignore[attr-defined]
+        return UNMATCHED_ROUTE
+
+    @staticmethod
+    def _index_routes(scope: Scope) -> Dict[Any, List[BaseRoute]]:
+        index: Dict[Any, List[BaseRoute]] = {}
+        app = scope.get("app")
+        for route in getattr(app, "routes", []):
+            # Routes expose their handler as ``endpoint``, mounts as ``app``
+            endpoint = getattr(route, "endpoint", None) or getattr(route, "app", None)
+            if endpoint is not None and hasattr(route, "path"):
+                index.setdefault(endpoint, []).append(route)
+        return index
@@ -0,0 +1,114 @@
+import asyncio
+import cProfile
+import itertools
+import logging
+import threading
+import time
+import uuid
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.exceptions import AuthenticationError, AuthorizationError
+from core.profiling import PROFILE_ID_PATTERN, ProfileStore
+from utils.auth import verify_admin_api_key
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Runs selected requests under cProfile and saves the profile under the request id.
+
+    A request is profiled when it carries ``X-Profile`` together with an admin ``X-API-Key``,
+    or, with ``sample_every`` > 0, when it is the N-th request since the last sample. A requested
+    profile is saved under the ``X-Request-ID`` when present; sampled requests are anonymous and
+    always get a generated id, so they cannot overwrite a stored profile. The id is returned in
+    ``X-Profile-Id``; profiles are listed and downloaded under ``/debug/profiles``.
+
+    The profiler sees everything the event loop thread runs while the request is in flight,
+    including other requests, so profile under low concurrency when attribution matters. Only
+    one request is profiled at a time. Requests that are not profiled cost one scan of the
+    headers.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, sample_every: int = 0, header: str = "x-profile"):
+        self.app = app
+        self.store = store
+        self.sample_every = sample_every
+        self.header = header.lower().encode("latin-1")
+        self._counter = itertools.count(1)
+        self._active = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._reason(scope)
+        if reason is None or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self._profile_id(scope) if reason == "requested" else uuid.uuid4().hex
+        status = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.disable()
+            self._active.release()
+            metadata = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "reason": reason,
+                "timestamp": time.time(),
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile_id, profiler, metadata)
+            except Exception as e:
+                logger.error(f"Failed to save profile {profile_id}: {e}")
+
+    def _reason(self, scope: Scope) -> Optional[str]:
+        requested = False
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == self.header:
+                requested = True
+            elif name == b"x-api-key":
+                api_key = value.decode("latin-1")
+        if requested and self._authorised(api_key):
+            return "requested"
+        if self.sample_every > 0 and next(self._counter) % self.sample_every == 0:
+            return "sampled"
+        return None
+
+    @staticmethod
+    def _authorised(api_key: Optional[str]) -> bool:
+        try:
+            return bool(verify_admin_api_key(api_key))  # type: ignore[arg-type]
+        except (AuthenticationError, AuthorizationError):
+            logger.warning("Ignoring profile request without a valid admin API key")
+            return False
+
+    @staticmethod
+    def _profile_id(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                if PROFILE_ID_PATTERN.match(request_id):
+                    return request_id
+        return uuid.uuid4().hex
@@ -0,0 +1,96 @@
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("access")
+
+
+class RequestLoggingMiddleware:
+    """
+    Logs one structured record per HTTP request, after the response has been sent.
+
+    A pure ASGI middleware: it only wraps ``send`` to see the status code, so requests are not
+    moved to a separate task and bodies are not re-streamed as they are with BaseHTTPMiddleware.
+    Errors (4xx, 5xx, exceptions) and requests slower than ``slow_request_seconds`` are always
+    logged; every other request is logged with probability ``sample_rate``. Sampling is uniform,
+    so frequencies in the log (used by the cache warmer) keep their ranking. A request that
+    ends before a response starts, e.g. cancelled when the client disconnects, is logged with
+    no status and ``cancelled``, not as a 500.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 0.1,
+        slow_request_seconds: float = 1.0,
+        random_source: Callable[[], float] = random.random,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_request_seconds = slow_request_seconds
+        self.random_source = random_source
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status: Optional[int] = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            slow = duration >= self.slow_request_seconds
+            if status is None and error is not None:
+                # Answered by the server error handler outside this middleware
+                status = 500
+            if error is not None or status is None or status >= 400 or slow:
+                self._log(scope, status, duration, slow, error)
+            elif self.sample_rate > 0 and self.random_source() < self.sample_rate:
+                self._log(scope, status, duration, slow, None)
+
+    def _log(self, scope: Scope, status: Optional[int], duration: float, slow: bool, error: Optional[BaseException]) -> None:
+        client = scope.get("client")
+        fields = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "client": client[0] if client else "unknown",
+        }
+        if slow:
+            fields["slow"] = True
+        if error is not None:
+            level = logging.ERROR
+            fields["error"] = str(error)
+        elif status is None:
+            level = logging.WARNING
+            fields["cancelled"] = True
+        elif status >= 500:
+            level = logging.ERROR
+        elif status >= 400 or slow:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+            fields["sample_rate"] = self.sample_rate
+        logger.log(
+            level,
+            f"{fields['method']} {fields['path']} {status or 'cancelled'} {fields['duration_ms']}ms",
+            extra={"fields": fields},
+        )
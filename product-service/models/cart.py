@@ -1,21 +1,85 @@
-from typing import List, Optional
-from pydantic import Field
-from .common import CommonModel
-from .products import Product, ProductVariant
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from .common import CommonModel, PyObjectId
 
-class CartItem(CommonModel):
-    product: Product
+
+def discounted_price(price: float, discount: Optional[float]) -> float:
+    """Price after a percentage discount (``discount=15`` takes 15% off)"""
+    if not discount:
+        return price
+    return round(price * (1 - discount / 100), 2)
+
+
+class CartItem(BaseModel):
+    """
+    A product in a cart, stored as a compact snapshot taken when it was added.
+
+    Carts written before snapshots embedded the whole product; those items are read
+    back by copying the snapshot fields out of ``product``.
+    """
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    product_id: str
     variant_id: str
+    name: str
+    image: Optional[str] = None
+    price: float  # list price when added
+    discount: Optional[float] = None  # percentage
+    unit_price: float  # price after discount
     quantity: int = Field(gt=0)
-    unit_price: float
-    total_price: float
+    total_price: float = 0
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_embedded_product(cls, data: Any) -> Any:
+        if not isinstance(data, dict) or "product" not in data or "product_id" in data:
+            return data
+        product = data["product"]
+        if isinstance(product, BaseModel):
+            product = product.model_dump(by_alias=True)
+        data = {key: value for key, value in data.items() if key != "product"}
+        data.update(
+            product_id=str(product.get("_id") or product.get("id")),
+            name=product["name"],
+            price=product["price"],
+            discount=product.get("discount"),
+        )
+        # Old items kept the list price as unit_price and applied the discount as a fraction
+        data["unit_price"] = discounted_price(data.get("unit_price", product["price"]), product.get("discount"))
+        data["total_price"] = round(data["unit_price"] * data.get("quantity", 0), 2)
+        return data
+
+    @classmethod
+    def from_product(cls, product: Dict[str, Any], variant: Dict[str, Any], quantity: int) -> "CartItem":
+        """
+        Snapshot a product and variant document for a new cart line.
+
+        Args:
+            product: Product document with at least ``_id``, ``name``, ``price`` and ``discount``
+            variant: Variant document; the first of its ``images`` becomes the item image
+            quantity: Units to add
+
+        Returns:
+            Item with its total calculated
+        """
+        images = variant.get("images") or []
+        item = cls(
+            product_id=str(product["_id"]),
+            variant_id=str(variant["_id"]),
+            name=product["name"],
+            image=images[0] if images else None,
+            price=product["price"],
+            discount=product.get("discount"),
+            unit_price=discounted_price(product["price"], product.get("discount")),
+            quantity=quantity,
+        )
+        item.calculate_total()
+        return item
 
     def calculate_total(self):
-        if self.product.discount:
-            discounted_price = self.unit_price * (1 - self.product.discount)
-            self.total_price = discounted_price * self.quantity
-        else:
-            self.total_price = self.unit_price * self.quantity
+        self.total_price = round(self.unit_price * self.quantity, 2)
+
 
 class Cart(CommonModel):
     user_id: str
@@ -23,8 +87,7 @@ class Cart(CommonModel):
     total_amount: float = 0
 
     def calculate_total(self):
-        self.total_amount = sum(item.total_price for item in self.items)
+        self.total_amount = round(sum(item.total_price for item in self.items), 2)
 
     class Settings:
         name = "carts"
-    
\ No newline at end of file
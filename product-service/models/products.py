@@ -1,9 +1,9 @@
 from typing import Any, Dict, List, Optional
-from pydantic import  BaseModel, Field
+from pydantic import  BaseModel, ConfigDict, Field
 from pymongo import ASCENDING, IndexModel
 
 
-from .common import CommonModel
+from .common import CommonModel, PyObjectId
 
 
 class Dimensions(CommonModel):
@@ -141,8 +141,115 @@ class CategoryProducts(BaseModel):
     category_name: str
     products: List[Product]
 
+class ProductSummaryImage(BaseModel):
+    color_id: Optional[str] = None
+    image: Optional[str] = None
+
+
+class ProductSummary(BaseModel):
+    """Card-sized view of a product for list endpoints; every field is optional to allow sparse fieldsets"""
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    name: Optional[str] = None
+    short_name: Optional[str] = None
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    discount: Optional[float] = None
+    is_new: Optional[bool] = None
+    images: Optional[List[ProductSummaryImage]] = None  # first image of each colour
+    rating: Optional[float] = None  # average review rating
+    review_count: Optional[int] = None
+    category_short_name: Optional[str] = None
+    level1_category_short_name: Optional[str] = None
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "ProductSummary":
+        """Build a summary from a full product document, mirroring ProductPipeline.summary_projection"""
+        images: List[Dict[str, Any]] = []
+        seen_colors = set()
+        for variant in document.get("product_variants") or []:
+            color_id = variant.get("color_id")
+            if color_id in seen_colors:
+                continue
+            seen_colors.add(color_id)
+            variant_images = variant.get("images") or []
+            images.append({"color_id": color_id, "image": variant_images[0] if variant_images else None})
+        ratings = [review["rating"] for review in document.get("product_reviews") or [] if "rating" in review]
+        category = document.get("category") or {}
+        return cls(
+            _id=document.get("_id"),
+            name=document.get("name"),
+            short_name=document.get("short_name"),
+            price=document.get("price"),
+            currency=document.get("currency"),
+            discount=document.get("discount"),
+            is_new=document.get("is_new"),
+            images=images,
+            rating=sum(ratings) / len(ratings) if ratings else None,
+            review_count=len(ratings),
+            category_short_name=category.get("short_name"),
+            level1_category_short_name=(category.get("level_one_category") or {}).get("short_name"),
+        )
+
+
 # Pipeline abstraction
 class ProductPipeline:
+
+    # Expressions computing each ProductSummary field from a product document
+    SUMMARY_FIELDS: Dict[str, Any] = {
+        "name": "$name",
+        "short_name": "$short_name",
+        "price": "$price",
+        "currency": "$currency",
+        "discount": "$discount",
+        "is_new": "$is_new",
+        "images": {
+            "$reduce": {
+                "input": {"$ifNull": ["$product_variants", []]},
+                "initialValue": [],
+                "in": {
+                    "$cond": [
+                        {"$in": ["$$this.color_id", "$$value.color_id"]},
+                        "$$value",
+                        {"$concatArrays": ["$$value", [{
+                            "color_id": "$$this.color_id",
+                            "image": {"$arrayElemAt": ["$$this.images", 0]}
+                        }]]}
+                    ]
+                }
+            }
+        },
+        "rating": {"$avg": "$product_reviews.rating"},
+        "review_count": {"$size": {"$ifNull": ["$product_reviews", []]}},
+        "category_short_name": "$category.short_name",
+        "level1_category_short_name": "$category.level_one_category.short_name",
+    }
+
+    @staticmethod
+    def parse_summary_fields(fields: Optional[str]) -> Optional[List[str]]:
+        """
+        Parse a comma-separated sparse fieldset.
+
+        Returns None when no fieldset was requested. ``id`` is always returned and need not be listed.
+
+        Raises:
+            ValueError: If a field is not a ProductSummary field
+        """
+        if fields is None:
+            return None
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = sorted({field for field in requested if field not in ProductPipeline.SUMMARY_FIELDS} - {"id", "_id"})
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(field for field in requested if field in ProductPipeline.SUMMARY_FIELDS))
+
+    @staticmethod
+    def summary_projection(fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """$project stage producing ProductSummary documents, optionally restricted to ``fields``"""
+        selected = ProductPipeline.SUMMARY_FIELDS.keys() if fields is None else fields
+        stage = {field: ProductPipeline.SUMMARY_FIELDS[field] for field in selected}
+        return {"$project": stage or {"_id": 1}}
     
     @staticmethod
     def get_products_by_level_two_category_name(name:str,limit:int=10):
@@ -174,31 +281,31 @@ class ProductPipeline:
    
     
     @staticmethod
-    def get_products_by_level_one_category_name(name:str,limit:int=10):
-        return [
-    
+    def get_products_by_level_one_category_name(name:str,limit:int=10,projection:Optional[Dict[str, Any]]=None):
+        """Up to ``limit`` products of a level 1 category, grouped under the category name"""
+        pipeline: List[Dict[str, Any]] = [
                 {
                     "$match": {
                     "category.level_one_category.name":name}},
+                {
+                    "$limit": limit
+                },
+        ]
+        if projection:
+            pipeline.append(projection)
+        pipeline.append(
                 {
                     "$group": {
-                        "_id": "$category.level_one_category.name",
+                        "_id": {"$literal": name},
                     "category_name": {
-                        "$first": "$category.level_one_category.name"
+                        "$first": {"$literal": name}
                         },
                     "products": {
                         "$push": "$$ROOT"
                     }
                     }
-                },
-                {
-                    "$skip": 0
-                },
-                {
-                    "$limit": limit
-                }
-
-]
+                })
+        return pipeline
         
     
     @staticmethod
@@ -6,9 +6,10 @@ from typing import Generic, TypeVar, List, Optional, Type, Dict, Any
 from pydantic import BaseModel
 from bson import ObjectId
 from database import db
-from core.interfaces import IRepository
+from core.interfaces import IRepository, ICacheService
 from core.exceptions import DatabaseError, NotFoundError, DuplicateError
 from core.dto import PaginationParams, SortParams
+from core.hydration import HydrationMode, Hydrator
 
 T = TypeVar('T', bound=BaseModel)
 CreateSchema = TypeVar('CreateSchema', bound=BaseModel)
@@ -27,6 +28,12 @@ class BaseRepository(IRepository[T]):
     - Dependency Inversion: Depends on abstractions
     """
     
+    # Prefix for per-entity cache keys ("<prefix>:<id>"); defaults to the collection name
+    cache_key_prefix: Optional[str] = None
+    
+    # How documents read back from MongoDB become models; writes are always validated
+    hydration: HydrationMode = HydrationMode.VALIDATE
+    
     def __init__(self, model_class: Type[T], collection_name: str):
         """
         Initialize the repository.
@@ -38,6 +45,7 @@ class BaseRepository(IRepository[T]):
         self.db = db
         self.model_class = model_class
         self.collection_name = collection_name
+        self.hydrator = Hydrator(model_class, self.hydration)
         self.logger = logging.getLogger(f"{self.__class__.__name__}")
     
     async def create(self, data: CreateSchema) -> str:
@@ -93,13 +101,73 @@ class BaseRepository(IRepository[T]):
             doc = self.db[self.collection_name].find_one({"_id": ObjectId(entity_id)})
             
             if doc:
-                return self.model_class(**doc)
+                return self.hydrator.one(doc)
             return None
             
         except Exception as e:
             self.logger.error(f"Failed to get {self.collection_name} by ID {entity_id}: {e}")
             raise DatabaseError("get_by_id", str(e))
     
+    async def get_many_by_ids(
+        self,
+        entity_ids: List[str],
+        cache_service: Optional[ICacheService] = None,
+        ttl_seconds: int = 300
+    ) -> List[T]:
+        """
+        Get several entities by ID with at most one cache read, one query and one cache write.
+        
+        Cached entities are read with a single multi-key lookup, only the misses are
+        fetched with one ``$in`` query, and those are written back to the cache in bulk.
+        
+        Args:
+            entity_ids: The entity IDs, in the order the results should be returned
+            cache_service: Optional cache to read from and backfill
+            ttl_seconds: Expiry for backfilled cache entries
+            
+        Returns:
+            The entities that were found, in the order of ``entity_ids``
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        ids = list(dict.fromkeys(entity_id for entity_id in entity_ids if ObjectId.is_valid(entity_id)))
+        if not ids:
+            return []
+        
+        prefix = self.cache_key_prefix or self.collection_name
+        found: Dict[str, T] = {}
+        
+        if cache_service is not None:
+            cached = await cache_service.get_many([f"{prefix}:{entity_id}" for entity_id in ids])
+            for entity_id in ids:
+                data = cached.get(f"{prefix}:{entity_id}")
+                if data:
+                    found[entity_id] = self.hydrator.one(data)
+        
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if missing:
+            try:
+                cursor = self.db[self.collection_name].find(
+                    {"_id": {"$in": [ObjectId(entity_id) for entity_id in missing]}}
+                )
+                documents = list(cursor)
+                fetched = {
+                    str(doc["_id"]): entity for doc, entity in zip(documents, self.hydrator.many(documents))
+                }
+            except Exception as e:
+                self.logger.error(f"Failed to get {self.collection_name} by IDs: {e}")
+                raise DatabaseError("get_many_by_ids", str(e))
+            
+            found.update(fetched)
+            if cache_service is not None and fetched:
+                await cache_service.set_many(
+                    {f"{prefix}:{entity_id}": entity.model_dump() for entity_id, entity in fetched.items()},
+                    ttl_seconds=ttl_seconds
+                )
+        
+        return [found[entity_id] for entity_id in ids if entity_id in found]
+    
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
         """
         Get all entities with pagination.
@@ -116,7 +184,7 @@ class BaseRepository(IRepository[T]):
         """
         try:
             cursor = self.db[self.collection_name].find().skip(skip).limit(limit)
-            return [self.model_class(**doc) for doc in cursor]
+            return self.hydrator.many(cursor)
             
         except Exception as e:
             self.logger.error(f"Failed to get all {self.collection_name}: {e}")
@@ -231,7 +299,7 @@ class BaseRepository(IRepository[T]):
             
             cursor = cursor.skip(skip).limit(limit)
             
-            return [self.model_class(**doc) for doc in cursor]
+            return self.hydrator.many(cursor)
             
         except Exception as e:
             self.logger.error(f"Failed to find {self.collection_name} by criteria: {e}")
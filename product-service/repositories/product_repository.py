@@ -7,9 +7,10 @@ from bson import ObjectId
 from pymongo import ASCENDING, DESCENDING
 
 from repositories.base_repository import BaseRepository
-from models.products import Product, ProductCreateDTO, ProductUpdateDTO
+from models.products import Product, ProductPipeline, ProductSummary
 from core.exceptions import DuplicateError, NotFoundError, DatabaseError
-from core.dto import ProductFilterParams, PaginationParams, SortParams
+from core.hydration import HydrationMode
+from core.dto import ProductCreateDTO, ProductUpdateDTO, ProductFilterParams, PaginationParams, SortParams
 
 
 class ProductRepository(BaseRepository[Product]):
@@ -19,6 +20,12 @@ class ProductRepository(BaseRepository[Product]):
     Implements product-specific operations and follows SOLID principles.
     """
     
+    # Shared with ProductService.get_entity_by_id so single and bulk lookups use the same entries
+    cache_key_prefix = "product"
+    
+    # Listing pages hydrate whole cursors; see tests/benchmarks/test_hydration_benchmark.py
+    hydration = HydrationMode.ADAPTER
+    
     def __init__(self):
         super().__init__(Product, "products")
     
@@ -313,6 +320,44 @@ class ProductRepository(BaseRepository[Product]):
             self.logger.error(f"Failed to get popular products: {e}")
             raise DatabaseError("get_popular_products", str(e))
     
+    async def get_summaries(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
+        criteria: Optional[Dict[str, Any]] = None,
+        sort: Optional[Dict[str, int]] = None
+    ) -> List[ProductSummary]:
+        """
+        Get product cards, projected in MongoDB to the ProductSummary fields.
+        
+        Args:
+            skip: Number of products to skip
+            limit: Maximum number of products to return
+            fields: ProductSummary fields to keep; None keeps all of them
+            criteria: Match criteria; defaults to non-archived products
+            sort: Sort specification; defaults to ``_id`` ascending
+            
+        Returns:
+            List of product summaries
+            
+        Raises:
+            DatabaseError: If the aggregation fails
+        """
+        try:
+            pipeline = [
+                {"$match": criteria if criteria is not None else {"is_archived": False}},
+                {"$sort": sort or {"_id": ASCENDING}},
+                {"$skip": skip},
+                {"$limit": limit},
+                ProductPipeline.summary_projection(fields)
+            ]
+            return [ProductSummary(**doc) for doc in self.db[self.collection_name].aggregate(pipeline)]
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get product summaries: {e}")
+            raise DatabaseError("get_summaries", str(e))
+    
     async def search_products(
         self,
         search_term: str,
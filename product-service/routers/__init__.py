@@ -1,3 +1,5 @@
+from typing import Tuple
+
 from .products_route import router as product_router
 from .users import router as user_router
 from .currencies import router as currency_router
@@ -5,19 +7,57 @@ from .categories_router import router as category_router
 from .material import router as materials_router
 from.colors import router as color_router
 from .product_variants import router as product_variant_router
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI
+from middleware import CatalogResource
 from .cart import router as cart_router
+from .cache import router as cache_router
+from .health import router as health_router
+from .metrics import router as metrics_router
+from .debug import router as debug_router
+
+API_PREFIX = "/product-service/api/v1"
 
-api_router = APIRouter(prefix="/product-service/api/v1")
-api_router.include_router(cart_router)
-api_router.include_router(product_router)
-api_router.include_router(user_router)
-api_router.include_router(currency_router)
-api_router.include_router(category_router)
-api_router.include_router(product_variant_router)
-api_router.include_router(color_router)
-api_router.include_router(materials_router)
+ROUTERS: Tuple[APIRouter, ...] = (
+    cart_router,
+    product_router,
+    user_router,
+    currency_router,
+    category_router,
+    product_variant_router,
+    color_router,
+    materials_router,
+    cache_router,
+    health_router,
+    metrics_router,
+    debug_router,
+)
 
 
+def include_routers(app: FastAPI) -> None:
+    """
+    Mount every router on the app under API_PREFIX.
 
+    FastAPI rebuilds each route, response model included, every time a router is included,
+    so the routers go straight onto the app rather than through an intermediate prefixed
+    router; that saves one rebuild of every route on each worker boot.
+    """
+    for router in ROUTERS:
+        app.include_router(router, prefix=API_PREFIX)
 
+# Catalog route groups for conditional GETs; writes to a group drop the listed response cache keys
+CATALOG_RESOURCES = {
+    "products": CatalogResource(
+        prefixes=(f"{API_PREFIX}/products", f"{API_PREFIX}/product/variant"),
+        depends_on=("categories",),
+        cache_keys=("products:*", "product:*", "filtered-product:*", "level-one-products:*", "level-two-products:*",
+                    "category-products:*"),
+    ),
+    "categories": CatalogResource(
+        prefixes=(f"{API_PREFIX}/categories",),
+        cache_keys=("categories", "level1_categories", "level1-categories-by-category:*",
+                    "level2_categories", "level2-categories-by-level1:*"),
+    ),
+    "colors": CatalogResource(prefixes=(f"{API_PREFIX}/colors",), cache_keys=("colors", "color:*")),
+    "materials": CatalogResource(prefixes=(f"{API_PREFIX}/materials",), cache_keys=("materials", "material:*")),
+    "currencies": CatalogResource(prefixes=(f"{API_PREFIX}/currencies",), cache_keys=("currencies",)),
+}
@@ -0,0 +1,58 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from decorators import create_redis_cache_provider
+from decorators.circuit_breaker import CircuitBreaker
+from core.metrics import PROMETHEUS_CONTENT_TYPE
+from decorators.metrics import cache_metrics
+from utils.auth import verify_api_key
+
+router = APIRouter(
+    prefix="/cache",
+    tags=["Cache"]
+)
+
+@router.get("/health", response_model=Dict[str, Any])
+async def cache_health():
+    """Redis reachability, circuit breaker state and connection pool usage"""
+    provider = create_redis_cache_provider()
+    reachable = await provider.ping()
+    stats = provider.stats()
+    return {
+        "status": "up" if reachable else "degraded",
+        **stats
+    }
+
+
+@router.get("/stats")
+async def cache_stats(
+    request: Request,
+    format: str = Query("json", pattern="^(json|prometheus)$", description="json or prometheus"),
+    top: int = Query(0, ge=0, le=100, description="Report the N largest and hottest keys sampled from Redis"),
+    sample_size: int = Query(1000, ge=1, le=10000, description="Number of keys to sample for the top-N report"),
+    api_key: str = Depends(verify_api_key)
+):
+    """Per key template hit, miss, error, size and timing counters"""
+    provider = create_redis_cache_provider()
+    provider_stats = provider.stats()
+
+    if format == "prometheus":
+        breaker = provider_stats["circuit_breaker"]
+        gauges = {
+            "cache_circuit_open": int(breaker["state"] != CircuitBreaker.CLOSED),
+            "cache_pool_connections_in_use": provider_stats["connection_pool"]["in_use"],
+        }
+        counters = {
+            "cache_circuit_failures_total": breaker["total_failures"],
+            "cache_circuit_short_circuited_total": breaker["short_circuited"],
+        }
+        return PlainTextResponse(cache_metrics.render_prometheus(gauges, counters), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    report = {**cache_metrics.snapshot(), **provider_stats}
+    precompressed_store = getattr(request.app.state, "precompressed_store", None)
+    if precompressed_store is not None:
+        report["precompressed"] = precompressed_store.stats()
+    if top:
+        report["keys"] = await provider.sample_keys(limit=top, scan_count=sample_size)
+    return report
@@ -1,25 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from models.cart import Cart, CartItem
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from typing import List, Optional
+from dependencies.cart import get_cart_service
+from models.cart import Cart
 from models.common import ResponseModel
-from models.products import ProductVariant
-from services.repository.cart_repository import CartRepository
-from services.repository.product_repository import ProductRepository
-from services.repository.product_variant_repository import ProductVariantRepository
+from services.cart_service import CartService
+from utils.rate_limiter import limit_requests
 
 router = APIRouter(tags=["Cart"])
 
-# Initialize repositories
-cart_repository = CartRepository()
-product_repository = ProductRepository()
-product_variant_repository = ProductVariantRepository()
-
 @router.post("/cart/create/{user_id}", response_model=ResponseModel)
-async def create_cart(user_id: str):
+async def create_cart(user_id: str, cart_service: CartService = Depends(get_cart_service)):
     """Create a new cart for a user"""
     try:
-        cart = Cart(user_id=user_id)
-        is_created = await cart_repository.insert_one(cart.model_dump())
+        # A user has one active cart; hand back the existing one rather than fail on the unique index
+        existing = await cart_service.get_user_cart(user_id)
+        if existing:
+            return ResponseModel.create(
+                status_code=200,
+                message="Cart already exists.",
+                data={"cart_id": str(existing.id)}
+            )
+
+        is_created = await cart_service.create_cart(user_id)
         if not is_created:
             return ResponseModel(
                 class_name="Cart",
@@ -38,10 +40,10 @@ async def create_cart(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/cart/{cart_id}", response_model=Cart)
-async def get_cart(cart_id: str):
+async def get_cart(cart_id: str, cart_service: CartService = Depends(get_cart_service)):
     """Get a cart by ID"""
     try:
-        cart = await cart_repository.fetch_one({"_id": cart_id})
+        cart = await cart_service.get_cart(cart_id)
         if not cart:
             raise HTTPException(status_code=404, detail="Cart not found")
         return cart
@@ -50,72 +52,52 @@ async def get_cart(cart_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/cart/add-product/{cart_id}/", response_model=ResponseModel)
+@router.post("/cart/{cart_id}/checkout", response_model=Cart)
+async def checkout_cart(cart_id: str, cart_service: CartService = Depends(get_cart_service)):
+    """Cart to place an order from; the order service calls this rather than reading the cart"""
+    try:
+        cart = await cart_service.checkout(cart_id)
+        if not cart:
+            raise HTTPException(status_code=404, detail="Cart not found")
+        return cart
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post(
+    "/cart/add-product/{cart_id}/",
+    response_model=ResponseModel,
+    dependencies=[Depends(limit_requests("cart-add", "60/minute", key="user"))],
+)
 async def add_product_to_cart(
     cart_id: str,
-    user_id: str = Query(None, description="User ID"),
-    product_id: str = Query(None, description="Product ID"),
-    quantity: int = Query(None, description="Quantity"),
-    variant_id: str = Query(None, description="Variant ID")
+    user_id: Optional[str] = Query(None, description="User ID"),
+    product_id: str = Query(..., description="Product ID"),
+    quantity: int = Query(1, gt=0, description="Quantity"),
+    variant_id: str = Query(..., description="Variant ID"),
+    cart_service: CartService = Depends(get_cart_service)
 ):
-    """Add a product to a cart"""
+    """Add a product to a cart, or add to its quantity if it is already there"""
     try:
-        # Verify product variant exists
-        product_variant = await product_variant_repository.fetch_one({"_id": variant_id})
-        if not isinstance(product_variant, ProductVariant):
-            return ResponseModel.create(
-                status_code=-1,
-                message="Error. Product variant is not found."
-            )
-
-        # Verify product exists
-        product = await product_repository.fetch_one({"_id": product_id})
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-
-        # Check if item already exists in cart
-        existing_item = await cart_repository.get_cart_item(cart_id, product_id, variant_id)
-        if existing_item:
-            # Update quantity of existing item
-            updated = await cart_repository.update_item_quantity(
-                cart_id,
-                existing_item._id,
-                existing_item.quantity + quantity
-            )
-            if not updated:
-                return ResponseModel.create(
-                    status_code=500,
-                    message="Product quantity update failed. Please try again",
-                    data={"cart_id": cart_id}
-                )
-            return ResponseModel.create(
-                status_code=200,
-                message="Product quantity updated successfully",
-                data={"cart_id": cart_id}
-            )
-        else:
-            # Add new item to cart
-            updated = await cart_repository.add_to_cart(
-                user_id=user_id,
-                product_id=product_id,
-                variant_id=variant_id,
-                quantity=quantity
-            )
-            if not updated:
-                return ResponseModel(
-                    data={},
-                    class_name="Cart",
-                    status_code=500,
-                    number_of_data_items=0,
-                    message="Failed to update product in cart"
-                )
+        if user_id is None:
+            cart = await cart_service.get_cart(cart_id)
+            if not cart:
+                raise HTTPException(status_code=404, detail="Cart not found")
+            user_id = cart.user_id
 
+        cart = await cart_service.add_to_cart(user_id, product_id, variant_id, quantity)
+        if cart is None:
             return ResponseModel.create(
-                status_code=200,
-                message="Product added to cart successfully",
-                data={"cart_id": cart_id}
+                status_code=-1,
+                message="Error. Product or product variant is not found."
             )
 
+        return ResponseModel.create(
+            status_code=200,
+            message="Product added to cart successfully",
+            data={"cart_id": str(cart.id), "total_amount": cart.total_amount}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -124,11 +106,13 @@ async def add_product_to_cart(
 @router.delete("/cart/{cart_id}/items/{item_id}")
 async def remove_from_cart(
     cart_id: str,
-    item_ids: List[str]
+    item_id: str,
+    item_ids: Optional[List[str]] = Body(None, description="Item IDs to remove; the path item is removed as well"),
+    cart_service: CartService = Depends(get_cart_service)
 ):
     """Remove items from a cart"""
     try:
-        updated = await cart_repository.remove_from_cart(cart_id, item_ids)
+        updated = await cart_service.remove_from_cart(cart_id, list(dict.fromkeys([item_id, *(item_ids or [])])))
         if updated:
             return ResponseModel(
                 class_name="Cart",
@@ -153,18 +137,19 @@ async def remove_from_cart(
 async def update_item_quantity(
     cart_id: str,
     item_id: str,
-    quantity: int
+    quantity: int = Query(..., gt=0),
+    cart_service: CartService = Depends(get_cart_service)
 ):
     """Update the quantity of an item in a cart"""
     try:
-        updated = await cart_repository.update_item_quantity(cart_id, item_id, quantity)
+        updated = await cart_service.update_item_quantity(cart_id, item_id, quantity)
         if updated:
             return ResponseModel(
                 class_name="Cart",
                 status_code=200,
                 number_of_data_items=1,
                 message="Cart item quantity updated successfully",
-                data={}
+                data={"total_amount": updated.total_amount}
             )
         return ResponseModel(
             data={},
@@ -179,10 +164,10 @@ async def update_item_quantity(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/cart/{cart_id}/clear")
-async def clear_cart(cart_id: str):
+async def clear_cart(cart_id: str, cart_service: CartService = Depends(get_cart_service)):
     """Clear all items from a cart"""
     try:
-        updated = await cart_repository.clear_cart(cart_id)
+        updated = await cart_service.clear_cart(cart_id)
         if updated:
             return ResponseModel(
                 class_name="Cart",
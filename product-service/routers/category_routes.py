@@ -8,13 +8,13 @@ from constants.paths import LEVEL_ONE_IMAGES_DIR
 from models.products import Category
 from services.repository.category_repository import CategoryRepository
 from services.image_processor import WebPImageProcessor
-from decorators.redis_provider import RedisCacheProvider
+from decorators import create_redis_cache_provider
 router = APIRouter()
 
 # Initialize repositories and processors
 category_repository = CategoryRepository()
 image_processor = WebPImageProcessor()
-redis_app=RedisCacheProvider()
+redis_app=create_redis_cache_provider()
 key="categories"
 @router.get("/", )
 async def get_categories():
@@ -41,7 +41,7 @@ async def create_color(name: str  = Form(...),
         raise HTTPException(status_code=500, detail="Failed to save color")
 
 @router.get("/{code}", response_model=Color)
-@cache_response(key="color", response_model=Color)
+@cache_response(key="color:{code}", response_model=Color)
 
 async def get_color(code: str):
     """Get a color by code"""
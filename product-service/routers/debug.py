@@ -0,0 +1,60 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from core.profiling import get_profile_store
+from database import slow_query_monitor
+from utils.auth import verify_admin_api_key, verify_api_key
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"]
+)
+
+
+@router.get("/slow-queries", response_model=Dict[str, Any])
+async def slow_queries(
+    top: int = Query(10, ge=1, le=100, description="Number of query shapes to return"),
+    sort_by: str = Query("total", pattern="^(total|max|mean|count|slow)$", description="total, max, mean, count or slow"),
+    slow_only: bool = Query(False, description="Only shapes that exceeded the slow-query threshold"),
+    api_key: str = Depends(verify_api_key)
+):
+    """Most expensive MongoDB query shapes with their explain plans"""
+    return {
+        "threshold_ms": slow_query_monitor.threshold_ms,
+        "shapes": slow_query_monitor.top(top, sort_by, slow_only),
+    }
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries(api_key: str = Depends(verify_api_key)):
+    """Forget the collected query shapes"""
+    slow_query_monitor.reset()
+    return {"status": "reset"}
+
+
+@router.get("/profiles", response_model=List[Dict[str, Any]])
+async def list_profiles(api_key: str = Depends(verify_admin_api_key)):
+    """Stored request profiles, newest first"""
+    return get_profile_store().list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("pstats", pattern="^(pstats|text)$", description="pstats file or text report"),
+    sort_by: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$", description="Sort order of the text report"),
+    limit: int = Query(40, ge=1, le=500, description="Functions in the text report"),
+    api_key: str = Depends(verify_admin_api_key)
+):
+    """A request profile as a .prof file for snakeviz or pstats, or as a text report"""
+    store = get_profile_store()
+    if format == "text":
+        report = store.report(profile_id, sort_by, limit)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return PlainTextResponse(report)
+    path = store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
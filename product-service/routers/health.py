@@ -0,0 +1,39 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"]
+)
+
+
+@router.get("/live", response_model=Dict[str, Any])
+async def liveness():
+    """The process is up and serving requests"""
+    return {"status": "up"}
+
+
+@router.get("/ready", response_model=Dict[str, Any])
+async def readiness(request: Request):
+    """Ready once MongoDB is reachable and startup cache warming has finished or timed out"""
+    body: Dict[str, Any] = {}
+    ready = True
+
+    database = getattr(request.app.state, "database", None)
+    if database is not None:
+        body["database"] = database.summary()
+        ready = ready and database.connected
+
+    cache_warmer = getattr(request.app.state, "cache_warmer", None)
+    if cache_warmer is not None:
+        body["cache_warming"] = cache_warmer.summary()
+        ready = ready and cache_warmer.ready
+
+    if ready:
+        body["status"] = "ready"
+    elif database is not None and not database.connected:
+        body["status"] = "connecting"
+    else:
+        body["status"] = "warming"
+    return JSONResponse(status_code=200 if ready else 503, content=body)
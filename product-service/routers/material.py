@@ -41,7 +41,7 @@ async def create_material(
         raise HTTPException(status_code=500, detail="Failed to save material")
 
 @router.get("/{name}", response_model=Material)
-@cache_response(key="material", response_model=Material)
+@cache_response(key="material:{name}", response_model=Material)
 async def get_material(name: str):
     """Get a material by name"""
     try:
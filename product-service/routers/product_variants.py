@@ -11,21 +11,17 @@ import asyncio
 import logging
 
 from fastapi.responses import FileResponse
-import httpx
-import pandas as pd
 
 from models.common import ResponseModel
 from models.products import Color, ProductVariant
 from database import db
 from constants.paths import PRODUCT_IMAGES_DIR
 from services.image_processor import WebPImageProcessor
+from utils.rate_limiter import limit_requests
 from services.repository.product_variant_repository import ProductVariantRepository
 from services.repository.product_repository import ProductRepository
 from services.repository.color_repository import ColorRepository
 
-collection=db["products"]
-variants = db["variants"]
-colors = db["colors"]
 
 image_processor = WebPImageProcessor()
 
@@ -205,6 +201,7 @@ def validate_variant_csv_headers(func):
                     content_str = content.decode('latin-1')  # Fallback encoding
             
             # Read CSV with additional parameters for better compatibility
+            import pandas as pd  # deferred: pandas costs ~0.3s at startup
             df = pd.read_csv(
                 io.StringIO(content_str),
                 dtype=str,  # Read all columns as strings initially
@@ -275,6 +272,8 @@ async def process_image_sources(image_sources: List[str], product_id: str, color
             # Check if it's a URL
             if source.startswith(('http://', 'https://')):
                 # Download from URL
+                import httpx
+
                 async with httpx.AsyncClient() as client:
                     response = await client.get(source, timeout=30.0)
                     response.raise_for_status()
@@ -348,7 +347,7 @@ async def process_image_sources(image_sources: List[str], product_id: str, color
     
     return image_paths
 
-@router.post("/variants/bulk-import", response_model=None)
+@router.post("/variants/bulk-import", response_model=None, dependencies=[Depends(limit_requests("bulk-import", "5/minute"))])
 @validate_variant_csv_file
 @validate_variant_csv_headers
 @log_bulk_variant_operation
@@ -1,21 +1,26 @@
 from fastapi import APIRouter, Depends, Form, HTTPException, Header, Query, Body, UploadFile, File
-from typing import List, Optional
+from typing import List, Optional, Union
 from bson import ObjectId
 import logging
 import io
 import logging
 from typing import List, Optional
-from functools import wraps
+from functools import lru_cache, wraps
 from datetime import datetime
-import pandas as pd
 from fastapi import HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import os
 from decorators.decorator import cache_response
-from models.products import CategoryProducts, Dimensions, Product, ProductFeature, ProductPipeline
+from core.hydration import Hydrator
+from core.responses import trusted_response
+from models.products import CategoryProducts, Dimensions, Product, ProductFeature, ProductPipeline, ProductSummary
 from models.common import ResponseModel
 from utils.query_builder import build_product_query
+from utils.rate_limiter import limit_requests
+from services.catalog_export import CatalogExport
 from database import db
+from repositories.product_repository import ProductRepository
+from services.product_service import ProductService
 
 
 API_KEY = "your-super-secret-api-key"
@@ -26,12 +31,22 @@ def verify_api_key(x_api_key: str = Header(...)):
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Same read strategy as the repository layer
+product_hydrator = Hydrator(Product, ProductRepository.hydration)
+
 
-@router.get("/filter", response_model=List[Product])
+@router.get(
+    "/filter",
+    response_model=Union[List[Product], List[ProductSummary]],
+    dependencies=[Depends(limit_requests("products-filter", "600/minute"))],
+)
+@trusted_response()
 @cache_response(
-    key="products:{start_price}:{end_price}:{short_name}:{colors}:{materials}:{width}:{length}:{depth}:{height}:{weight}:{category_short_name}:{level1_category_name}:{page}:{page_size}:{sort_by}:{sort_order}:{name}",
+    key="products:{start_price}:{end_price}:{short_name}:{colors}:{materials}:{width}:{length}:{depth}:{height}:{weight}:{category_short_name}:{level1_category_name}:{page}:{page_size}:{sort_by}:{sort_order}:{name}:{view}:{fields}",
     response_model=Product,
-    ttl_seconds=300
+    ttl_seconds=300,
+    case_insensitive=("short_name", "level1_category_name", "name"),
+    raw_hits=True
 )
 
 async def filter_products_route(
@@ -51,11 +66,14 @@ async def filter_products_route(
     page_size: int = Query(10, description="Number of items per page"),
     sort_by: str = Query("_id", description="Field to sort by"),
     sort_order: int = Query(1, description="Sort order (1 for ascending, -1 for descending)"),
-    name: Optional[str] = Query(None, description="Product name")
+    name: Optional[str] = Query(None, description="Product name"),
+    view: str = Query("full", pattern="^(full|summary)$", description="full documents or ProductSummary cards"),
+    fields: Optional[str] = Query(None, description="Comma-separated ProductSummary fields; implies view=summary")
 ):
     """Filter products based on various criteria"""
     try:
         skip = (page - 1) * page_size
+        summary_fields = ProductPipeline.parse_summary_fields(fields)
 
         query_criteria = build_product_query(
             start_price=start_price,
@@ -78,7 +96,18 @@ async def filter_products_route(
         # Add default criteria
         query_criteria["is_archived"] = False
         
-        logging.info(f"Query criteria: {query_criteria}")
+        logging.debug(f"Query criteria: {query_criteria}")
+
+        if view == "summary" or summary_fields is not None:
+            # Card fields only: Mongo projects them and the documents are returned as they come
+            pipeline = [
+                {"$match": query_criteria},
+                {"$sort": {sort_by: sort_order}},
+                {"$skip": skip},
+                {"$limit": page_size},
+                ProductPipeline.summary_projection(summary_fields)
+            ]
+            return list(db['products'].aggregate(pipeline))
 
         # Get products with a pipeline to properly handle nested objects
         pipeline = [
@@ -96,9 +125,9 @@ async def filter_products_route(
             {"$limit": page_size}
         ]
         
-        logging.info(f"Pipeline: {pipeline}")
+        logging.debug(f"Pipeline: {pipeline}")
         cursor = db['products'].aggregate(pipeline)
-        products = [Product(**item)  for item in cursor]
+        products = product_hydrator.many(cursor)
         logging.info(f"Found {len(products)} products")
             
         return products
@@ -108,11 +137,67 @@ async def filter_products_route(
         logging.error(f"Error filtering products: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/export", response_class=StreamingResponse, dependencies=[Depends(limit_requests("products-export", "10/minute"))])
+async def export_products(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format"),
+    after: Optional[str] = Query(None, description="Resume after this product _id"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of products to export"),
+    batch_size: int = Query(500, ge=1, le=5000, description="Products fetched per round trip"),
+    start_price: Optional[float] = Query(None, description="Minimum price"),
+    end_price: Optional[float] = Query(None, description="Maximum price"),
+    short_name: Optional[str] = Query(None, description="Short name"),
+    colors: str = Query('[]', description="Colors (JSON array) of hex codes"),
+    materials: str = Query('[]', description="Materials (JSON array)"),
+    width: Optional[float] = Query(None, description="Product width"),
+    length: Optional[float] = Query(None, description="Product length"),
+    depth: Optional[float] = Query(None, description="Product depth"),
+    height: Optional[float] = Query(None, description="Product height"),
+    category_short_name: Optional[str] = Query(None, description="Category short name"),
+    level1_category_name: Optional[str] = Query(None, description="Level 1 category name"),
+    name: Optional[str] = Query(None, description="Product name")
+):
+    """Stream the catalog as NDJSON or CSV in _id order; resume with after=<last _id>"""
+    try:
+        query_criteria = build_product_query(
+            start_price=start_price,
+            end_price=end_price,
+            name=name,
+            short_name=short_name,
+            colors=colors,
+            materials=materials,
+            dimensions={
+                "length": length,
+                "width": width,
+                "height": height,
+                "depth": depth
+            },
+            category_short_name=category_short_name,
+            level1_category_name=level1_category_name
+        )
+        query_criteria["is_archived"] = False
+        export = CatalogExport(
+            db["products"],
+            query_criteria,
+            export_format=format,
+            after=after,
+            limit=limit,
+            batch_size=batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        iter(export),
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'}
+    )
+
 @router.get("/filter-one", response_model=Product)
 @cache_response(
     key="filtered-product:{id}:{short_name}:{name}",
     response_model=Product,
-    ttl_seconds=300
+    ttl_seconds=300,
+    case_insensitive=("short_name", "name")
 )
 async def filter_product(
     id: str = Query(None, description="Product ID"),
@@ -143,6 +228,28 @@ async def filter_product(
         logging.error(f"Error retrieving product: {e}")
         raise HTTPException(status_code=500, detail="Internal server error: "+str(e))
 
+MAX_PRODUCTS_BY_IDS = 100
+
+
+@lru_cache()
+def get_product_service() -> ProductService:
+    return ProductService()
+
+
+@router.get("/by-ids", response_model=List[Product])
+async def get_products_by_ids(
+    ids: List[str] = Query(..., description="Product IDs; repeat the parameter or separate them with commas")
+):
+    """Get several products in one call, reading the cache in bulk and only the misses from Mongo"""
+    product_ids = [product_id for value in ids for product_id in value.split(",") if product_id]
+    if len(product_ids) > MAX_PRODUCTS_BY_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PRODUCTS_BY_IDS} product IDs per request")
+    try:
+        return await get_product_service().get_entities_by_ids(product_ids)
+    except Exception as e:
+        logging.error(f"Error retrieving products by IDs: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.post("/", response_model=ResponseModel)
 async def create_product(
     product_features: List[ProductFeature] | None = None,
@@ -206,16 +313,23 @@ async def create_product(
         logging.error(f"Error creating product: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/by-level-two-category/filter", response_model=List[Product])
-@cache_response(key="level-two-products:{short_name}:{limit}:{skip}:{sort_by}:{sort_order}",response_model=Product,ttl_seconds=300)
+@router.get("/by-level-two-category/filter", response_model=Union[List[Product], List[ProductSummary]])
+@trusted_response()
+@cache_response(key="level-two-products:{short_name}:{limit}:{skip}:{sort_by}:{sort_order}:{view}:{fields}",response_model=Product,ttl_seconds=300,raw_hits=True)
 async def get_products_by_level_two_category(
     short_name: str = Query(..., description="Level 2 category name"),
     limit: int = Query(10, description="Number of products to return"),
     skip: int = Query(0, description="Number of products to skip"),
     sort_by: str = Query("_id", description="Field to sort by"),
-    sort_order: int = Query(1, description="Sort order (1 for ascending, -1 for descending)")
+    sort_order: int = Query(1, description="Sort order (1 for ascending, -1 for descending)"),
+    view: str = Query("full", pattern="^(full|summary)$", description="full documents or ProductSummary cards"),
+    fields: Optional[str] = Query(None, description="Comma-separated ProductSummary fields; implies view=summary")
 ):
     """Get products by Level 2 category name"""
+    try:
+        summary_fields = ProductPipeline.parse_summary_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         # Use aggregation pipeline for better performance and flexibility
         pipeline = [
@@ -227,23 +341,39 @@ async def get_products_by_level_two_category(
             {"$skip": skip},
             {"$limit": limit}
         ]
+        if view == "summary" or summary_fields is not None:
+            pipeline.append(ProductPipeline.summary_projection(summary_fields))
+            return list(db["products"].aggregate(pipeline))
         
         products =  db["products"].aggregate(pipeline)
-        data = [Product(**product) for product in products]
+        data = product_hydrator.many(products)
         
         return data
     except Exception as e:
         logging.error(f"Error retrieving products by level two category: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
-@router.get("/by-level-one-category", response_model=List[Product])
-@cache_response(key="level-one-products:{name}",response_model=Product,ttl_seconds=300)
+@router.get("/by-level-one-category", response_model=List[CategoryProducts])
+@trusted_response()
+@cache_response(key="level-one-products:{name}:{limit}:{view}:{fields}",response_model=CategoryProducts,ttl_seconds=300,raw_hits=True)
 
 async def get_products_by_level_one_category(
     name: str = Query(..., description="Level 1 category name"),
-    limit: int = Query(10, description="Number of products to return")
+    limit: int = Query(10, description="Number of products to return"),
+    view: str = Query("full", pattern="^(full|summary)$", description="full documents or ProductSummary cards"),
+    fields: Optional[str] = Query(None, description="Comma-separated ProductSummary fields; implies view=summary")
 ):
     """Get products by Level 1 category name"""
     try:
+        summary_fields = ProductPipeline.parse_summary_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        if view == "summary" or summary_fields is not None:
+            pipeline = ProductPipeline.get_products_by_level_one_category_name(
+                name, limit, projection=ProductPipeline.summary_projection(summary_fields)
+            )
+            return list(db["products"].aggregate(pipeline))
+
         pipeline = ProductPipeline.get_products_by_level_one_category_name(name, limit)
         products =  db["products"].aggregate(pipeline)
         products= [CategoryProducts(**product) for product in products]
@@ -356,6 +486,7 @@ def validate_csv_headers(func):
                     content_str = content.decode('latin-1')  # Fallback encoding
             
             # Read CSV with additional parameters for better compatibility
+            import pandas as pd  # deferred: pandas costs ~0.3s at startup
             df = pd.read_csv(
                 io.StringIO(content_str),
                 dtype=str,  # Read all columns as strings initially
@@ -418,7 +549,7 @@ def log_bulk_operation(func):
             raise
     return wrapper
 
-@router.post("/bulk-import", response_model=None)  # Add this parameter
+@router.post("/bulk-import", response_model=None, dependencies=[Depends(limit_requests("bulk-import", "5/minute"))])
 @validate_csv_file
 @validate_csv_headers
 @log_bulk_operation
@@ -6,7 +6,6 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Body, UploadFile,
 from fastapi.responses import FileResponse
 import logging
 import os
-import pandas as pd
 from datetime import datetime
 
 from core.interfaces import IService
@@ -27,7 +26,7 @@ from core.dto import (
     BulkImportResultDTO
 )
 from services.product_service import ProductService
-from models.products import Product
+from models.products import Product, ProductPipeline
 from utils.auth import verify_api_key
 from utils.validators import validate_csv_file, validate_csv_headers
 from utils.decorators import log_operation
@@ -48,6 +47,8 @@ async def get_all_products(
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     sort_by: str = Query("_id", description="Field to sort by"),
     sort_order: int = Query(1, ge=-1, le=1, description="Sort order (1=asc, -1=desc)"),
+    view: str = Query("full", pattern="^(full|summary)$", description="full documents or ProductSummary cards"),
+    fields: Optional[str] = Query(None, description="Comma-separated ProductSummary fields; implies view=summary"),
     service: IService[Product] = Depends(get_product_service)
 ):
     """
@@ -58,24 +59,40 @@ async def get_all_products(
         page_size: Items per page
         sort_by: Field to sort by
         sort_order: Sort order
+        view: ``full`` for complete products, ``summary`` for product cards
+        fields: ProductSummary fields to return
         service: Product service dependency
         
     Returns:
         Paginated list of products
     """
+    try:
+        summary_fields = ProductPipeline.parse_summary_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     try:
         pagination = PaginationParams(page=page, page_size=page_size)
         sort = SortParams(sort_by=sort_by, sort_order=sort_order)
         
-        products = await service.get_all_entities(
-            skip=pagination.skip,
-            limit=pagination.limit
-        )
+        if view == "summary" or summary_fields is not None:
+            summaries = await service.get_entity_summaries(
+                skip=pagination.skip,
+                limit=pagination.limit,
+                fields=summary_fields
+            )
+            items = [summary.model_dump(by_alias=True, exclude_unset=True) for summary in summaries]
+        else:
+            products = await service.get_all_entities(
+                skip=pagination.skip,
+                limit=pagination.limit
+            )
+            items = [product.dict() for product in products]
         
-        total = len(products)  # In a real implementation, get total from repository
+        total = len(items)  # In a real implementation, get total from repository
         
         return PaginatedResponseDTO(
-            items=[product.dict() for product in products],
+            items=items,
             total=total,
             page=pagination.page,
             page_size=pagination.page_size,
@@ -468,6 +485,7 @@ async def bulk_import_products(
         start_time = datetime.now()
         
         # Read CSV file
+        import pandas as pd  # deferred: pandas costs ~0.3s at startup
         df = pd.read_csv(file.file)
         total_processed = len(df)
         successful = 0
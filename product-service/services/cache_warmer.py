@@ -0,0 +1,229 @@
+"""
+Startup cache warmer for hot catalog keys.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+import orjson
+from starlette.types import ASGIApp
+
+WARMER_CLIENT = "cache-warmer"
+
+
+class CacheWarmer:
+    """
+    Fills the response cache before the service reports ready.
+
+    Every target is a GET issued in-process through the full ASGI app, so the keys that get
+    cached are exactly the keys real traffic produces. Targets come from three places: a static
+    list of paths, the first pages of every level-1 and level-2 category, and the most frequent
+    filter queries in the tail of the request log.
+    """
+
+    PENDING = "pending"
+    WARMING = "warming"
+    DONE = "done"
+    TIMED_OUT = "timed_out"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        base_path: str,
+        static_paths: Iterable[str] = (),
+        include_categories: bool = True,
+        log_file: Optional[str] = None,
+        log_prefixes: Iterable[str] = (),
+        top_log_queries: int = 20,
+        log_tail_bytes: int = 5 * 1024 * 1024,
+        concurrency: int = 4,
+        timeout_seconds: float = 30.0,
+    ):
+        self.app = app
+        self.base_path = base_path.rstrip("/")
+        self.static_paths = list(static_paths)
+        self.include_categories = include_categories
+        self.log_file = log_file
+        self.log_prefixes = tuple(log_prefixes)
+        self.top_log_queries = top_log_queries
+        self.log_tail_bytes = log_tail_bytes
+        self.concurrency = max(1, concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.logger = logging.getLogger(__name__)
+
+        self.status = self.PENDING
+        self.warmed = 0
+        self.failed = 0
+        self.targets = 0
+        self.duration_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """Ready once warming has finished, timed out or given up; only pending and warming block"""
+        return self.status not in (self.PENDING, self.WARMING)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "targets": self.targets,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "duration_seconds": self.duration_seconds,
+        }
+
+    async def run(self) -> None:
+        """Warm every target, giving up after ``timeout_seconds``"""
+        self.status = self.WARMING
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._warm(), timeout=self.timeout_seconds)
+            self.status = self.DONE
+        except asyncio.TimeoutError:
+            self.status = self.TIMED_OUT
+            self.logger.warning(f"Cache warming timed out after {self.timeout_seconds}s")
+        except asyncio.CancelledError:
+            self.status = self.FAILED
+            raise
+        except Exception as e:
+            self.status = self.FAILED
+            self.logger.error(f"Cache warming failed: {e}")
+        finally:
+            self.duration_seconds = round(time.perf_counter() - started, 3)
+            self.logger.info(f"Cache warming finished: {self.summary()}")
+
+    async def _warm(self) -> None:
+        paths = list(dict.fromkeys(
+            self.static_paths
+            + (await self.category_paths() if self.include_categories else [])
+            + self.popular_log_paths()
+        ))
+        self.targets = len(paths)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        transport = httpx.ASGITransport(app=self.app, client=(WARMER_CLIENT, 0))
+
+        async with httpx.AsyncClient(transport=transport, base_url=f"http://{WARMER_CLIENT}") as client:
+            async def warm_one(path: str) -> None:
+                async with semaphore:
+                    try:
+                        response = await client.get(f"{self.base_path}{path}")
+                        if response.status_code < 400:
+                            self.warmed += 1
+                            return
+                        self.logger.warning(f"Cache warming got {response.status_code} for {path}")
+                    except Exception as e:
+                        self.logger.warning(f"Cache warming failed for {path}: {e}")
+                    self.failed += 1
+
+            await asyncio.gather(*(warm_one(path) for path in paths))
+
+    async def category_paths(self) -> List[str]:
+        """First-page paths for every level-1 and level-2 category, as the storefront requests them"""
+        from database import db
+
+        def load_categories():
+            projection = {"name": 1, "short_name": 1}
+            level1 = list(db["level1_categories"].find({"is_archived": {"$ne": True}}, projection))
+            level2 = list(db["level2_categories"].find({"is_archived": {"$ne": True}}, projection))
+            return level1, level2
+
+        try:
+            level1, level2 = await asyncio.to_thread(load_categories)
+        except Exception as e:
+            self.logger.warning(f"Could not load categories for cache warming: {e}")
+            return []
+
+        paths = []
+        for category in level1:
+            paths.append(f"/categories/level-2/{category['_id']}")
+            if category.get("name"):
+                paths.append(f"/products/by-level-one-category?{httpx.QueryParams(name=category['name'])}")
+            if category.get("short_name"):
+                paths.append(f"/categories/level-2/short-name/{category['short_name']}")
+        for category in level2:
+            if category.get("short_name"):
+                paths.append(
+                    f"/products/by-level-two-category/filter?{httpx.QueryParams(short_name=category['short_name'])}"
+                )
+        return paths
+
+    def popular_log_paths(self) -> List[str]:
+        """The most frequent GET queries under ``log_prefixes`` in the tail of the request log"""
+        if not self.log_file or not self.log_prefixes or self.top_log_queries <= 0:
+            return []
+        try:
+            lines = read_tail(self.log_file, self.log_tail_bytes)
+        except OSError as e:
+            self.logger.info(f"No request log to warm from: {e}")
+            return []
+        return top_request_paths(lines, self.base_path, self.log_prefixes, self.top_log_queries)
+
+
+def read_tail(path: str, max_bytes: int) -> List[str]:
+    """Read the last ``max_bytes`` of a text file, dropping the first partial line"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - max_bytes))
+        data = f.read()
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[1:] if size > max_bytes else lines
+
+
+def parse_request_line(line: str) -> Optional[Dict[str, str]]:
+    """
+    Read method, path, query and client from a request log line.
+
+    Args:
+        line: A JSON line written by RequestLoggingMiddleware
+
+    Returns:
+        The request fields, or None if the line does not describe a request
+    """
+    if not line.startswith("{"):
+        return None
+    try:
+        entry = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(entry, dict) or "method" not in entry or "path" not in entry:
+        return None
+    return {
+        "method": entry["method"],
+        "path": entry["path"],
+        "query": entry.get("query", ""),
+        "client": entry.get("client", ""),
+    }
+
+
+def top_request_paths(lines: Iterable[str], base_path: str, prefixes: Iterable[str], limit: int) -> List[str]:
+    """
+    Count GET requests in request log lines and return the ``limit`` most frequent.
+
+    Args:
+        lines: Lines from the request log
+        base_path: API prefix stripped from logged paths
+        prefixes: Paths (relative to ``base_path``) whose requests are counted
+        limit: Number of paths to return
+
+    Returns:
+        Paths relative to ``base_path``, query string included, most frequent first
+    """
+    prefixes = tuple(prefixes)
+    counts: Counter = Counter()
+    for line in lines:
+        request = parse_request_line(line)
+        if not request or request["method"] != "GET" or request["client"] == WARMER_CLIENT:
+            continue
+        path = request["path"]
+        if not path.startswith(base_path):
+            continue
+        path = path[len(base_path):]
+        if not path.startswith(prefixes):
+            continue
+        counts[f"{path}?{request['query']}" if request["query"] else path] += 1
+    return [path for path, _ in counts.most_common(limit)]
@@ -0,0 +1,181 @@
+"""
+Streaming export of the product catalog.
+"""
+import csv
+import io
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from bson import ObjectId
+
+from core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# (CSV header, dotted path into the product document)
+CSV_COLUMNS = (
+    ("id", "_id"),
+    ("name", "name"),
+    ("short_name", "short_name"),
+    ("description", "description"),
+    ("price", "price"),
+    ("currency", "currency"),
+    ("discount", "discount"),
+    ("is_new", "is_new"),
+    ("material", "material"),
+    ("category", "category.short_name"),
+    ("level1_category", "category.level_one_category.short_name"),
+    ("color_codes", "color_codes"),
+    ("width", "dimensions.width"),
+    ("height", "dimensions.height"),
+    ("length", "dimensions.length"),
+    ("depth", "dimensions.depth"),
+    ("weight", "dimensions.weight"),
+    ("views", "views"),
+)
+
+# Spreadsheets evaluate a cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class CatalogExport:
+    """
+    Streams products matching a query as NDJSON or CSV, one batch at a time.
+
+    Documents are read in ``_id`` order with a range condition on ``_id`` instead of ``skip``, so
+    every batch is an index seek and an interrupted export resumes from the last ``_id`` it
+    received. The cursor's ``batch_size`` matches the size of the chunks written to the response,
+    so at most one batch of documents is held in memory.
+    """
+
+    FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+    def __init__(
+        self,
+        collection: Any,
+        criteria: Dict[str, Any],
+        export_format: str = "ndjson",
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 500,
+    ):
+        """
+        Initialize the export.
+
+        Args:
+            collection: MongoDB collection to read from
+            criteria: Query criteria, as built by ``build_product_query``
+            export_format: ``ndjson`` or ``csv``
+            after: Checkpoint; only products with a greater ``_id`` are exported
+            limit: Maximum number of products to export
+            batch_size: Documents fetched per round trip and written per chunk
+
+        Raises:
+            ValueError: If the format or checkpoint is invalid
+        """
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        if after is not None and not ObjectId.is_valid(after):
+            raise ValueError(f"Invalid checkpoint: {after}")
+
+        self.collection = collection
+        self.criteria = dict(criteria)
+        if after is not None:
+            self.criteria["_id"] = {"$gt": ObjectId(after)}
+        self.export_format = export_format
+        self.limit = limit
+        self.batch_size = batch_size
+
+    @property
+    def media_type(self) -> str:
+        return self.FORMATS[self.export_format]
+
+    @property
+    def filename(self) -> str:
+        return f"catalog.{self.export_format}"
+
+    def documents(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over matching documents in ``_id`` order"""
+        cursor = self.collection.find(self.criteria).sort("_id", 1).batch_size(self.batch_size)
+        if self.limit:
+            cursor = cursor.limit(self.limit)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def batches(self) -> Iterator[List[Dict[str, Any]]]:
+        batch: List[Dict[str, Any]] = []
+        for document in self.documents():
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Yield the encoded export, one chunk per batch.
+
+        This is a plain generator: StreamingResponse runs it in the threadpool, so the blocking
+        cursor reads never stall the event loop.
+        """
+        exported = 0
+        try:
+            if self.export_format == "csv":
+                yield encode_csv_header()
+                for batch in self.batches():
+                    yield encode_csv_rows(batch)
+                    exported += len(batch)
+            else:
+                for batch in self.batches():
+                    yield encode_ndjson(batch)
+                    exported += len(batch)
+        except Exception as e:
+            # Headers are already sent; the client resumes from the last _id it received
+            logger.error(f"Catalog export stopped after {exported} products: {e}")
+            raise
+        logger.info(f"Catalog export finished: {exported} products as {self.export_format}")
+
+
+def encode_ndjson(documents: List[Dict[str, Any]]) -> bytes:
+    """Encode documents as newline-delimited JSON"""
+    return b"".join(dumps(document) + b"\n" for document in documents)
+
+
+def _lookup(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, list):
+        value = "|".join(str(item) for item in value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Product text is entered by staff; quote it so it opens as text, not as a formula
+        return "'" + value
+    return value
+
+
+def encode_csv_header() -> bytes:
+    return encode_csv_rows([], header=True)
+
+
+def encode_csv_rows(documents: List[Dict[str, Any]], header: bool = False) -> bytes:
+    """Encode documents as CSV rows flattened to CSV_COLUMNS"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([column for column, _ in CSV_COLUMNS])
+    for document in documents:
+        writer.writerow([_csv_value(_lookup(document, path)) for _, path in CSV_COLUMNS])
+    return buffer.getvalue().encode("utf-8")
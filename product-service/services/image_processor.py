@@ -4,18 +4,21 @@ from io import BytesIO
 import os
 from pathlib import Path
 import re
-from typing import Any, List, Optional
-from PIL import Image
+from typing import TYPE_CHECKING, Any, List, Optional
 from dotenv import load_dotenv
 from fastapi import HTTPException, UploadFile
 
 from constants.paths import COLOR_IMAGES_DIR
+from core.metrics import image_encode_queue_depth
+
+if TYPE_CHECKING:
+    from PIL import Image
 load_dotenv()
 class ImageProcessor(ABC):
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
     
     @abstractmethod
-    def convert_image(self, img: Image.Image) -> bytes:
+    def convert_image(self, img: "Image.Image") -> bytes:
         """Convert the image to desired format."""
         pass
     
@@ -27,7 +30,9 @@ class ImageProcessor(ABC):
     def _allowed_file(self, filename: str) -> bool:
         return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.ALLOWED_EXTENSIONS
     
-    def _read_image(self, contents: bytes) -> Image.Image:
+    def _read_image(self, contents: bytes) -> "Image.Image":
+        from PIL import Image  # deferred: only image uploads need Pillow
+
         return Image.open(BytesIO(contents))
     
     async def process_image(self, image: UploadFile, i: int, inserted_item: Any, directory: str,color_code: Optional[str]) -> str:
@@ -39,8 +44,12 @@ class ImageProcessor(ABC):
         # img = self._read_image(contents)
         # converted_contents = self.convert_image(img)
         # convert image to webp
-        img = Image.open(image.file)
-        converted_contents = self.convert_image(img)
+        # Encoding is CPU-bound; run it off the event loop and count it while it waits or runs
+        image_encode_queue_depth.inc()
+        try:
+            converted_contents = await asyncio.to_thread(self._encode, image.file)
+        finally:
+            image_encode_queue_depth.dec()
         color_folder = os.path.join(directory, color_code.replace("#", "") if color_code else "")
 
         os.makedirs(color_folder, exist_ok=True)
@@ -53,6 +62,11 @@ class ImageProcessor(ABC):
 
         self.save_image(converted_contents, file_path)
         return file_path
+    def _encode(self, file: Any) -> bytes:
+        from PIL import Image  # deferred: only image uploads need Pillow
+
+        return self.convert_image(Image.open(file))
+
     async def process_images(self,images: List[UploadFile], product_id: str,folder,color_code: Optional[str]=None) -> List[str]:
         """Process multiple images in parallel using the WebP image processor"""
         return await asyncio.gather(
@@ -62,7 +76,7 @@ class ImageProcessor(ABC):
 
 
 class WebPImageProcessor(ImageProcessor):
-    def convert_image(self, img: Image.Image) -> bytes:
+    def convert_image(self, img: "Image.Image") -> bytes:
         output_buffer = BytesIO()
         img.save(output_buffer, format="WEBP")
         return output_buffer.getvalue()
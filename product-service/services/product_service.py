@@ -22,7 +22,7 @@ from core.dto import (
     PaginatedResponseDTO
 )
 from repositories.product_repository import ProductRepository
-from models.products import Product
+from models.products import Product, ProductSummary
 from decorators import create_redis_cache_provider
 
 
@@ -120,6 +120,26 @@ class ProductService(IService[Product]):
             self.logger.error(f"Failed to get product {entity_id}: {e}")
             return None
     
+    async def get_entities_by_ids(self, entity_ids: List[str]) -> List[Product]:
+        """
+        Get several products by ID using bulk cache reads.
+        
+        Args:
+            entity_ids: Product IDs
+            
+        Returns:
+            Products that were found, in the order of ``entity_ids``
+        """
+        try:
+            return await self.repository.get_many_by_ids(
+                entity_ids,
+                cache_service=self.cache_service,
+                ttl_seconds=300
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to get products {entity_ids}: {e}")
+            raise DatabaseError("get_many_by_ids", str(e))
+    
     async def get_all_entities(self, skip: int = 0, limit: int = 100) -> List[Product]:
         """
         Get all products with pagination.
@@ -137,6 +157,25 @@ class ProductService(IService[Product]):
             self.logger.error(f"Failed to get all products: {e}")
             raise DatabaseError("get_all", str(e))
     
+    async def get_entity_summaries(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[ProductSummary]:
+        """
+        Get product cards for list views.
+        
+        Args:
+            skip: Number of products to skip
+            limit: Maximum number of products to return
+            fields: ProductSummary fields to return; None returns all of them
+            
+        Returns:
+            List of product summaries
+        """
+        return await self.repository.get_summaries(skip=skip, limit=limit, fields=fields)
+    
     async def update_entity(self, entity_id: str, data: ProductUpdateDTO) -> Optional[Product]:
         """
         Update a product.
@@ -4,13 +4,18 @@ from fastapi import HTTPException
 from pydantic import BaseModel
 from bson import ObjectId
 from database import db
+from core.hydration import HydrationMode, Hydrator
 T = TypeVar('T', bound=BaseModel)
 
 class BaseRepository(Generic[T]):
+    # How documents read back from MongoDB become models; writes are always validated
+    hydration: HydrationMode = HydrationMode.VALIDATE
+
     def __init__(self, model_class: Type[T], collection_name: str):
         self.db = db
         self.model_class = model_class
         self.collection_name = collection_name
+        self.hydrator = Hydrator(model_class, self.hydration)
     async def insert_one(self, data: T, id: Optional[str] = None) ->str:
         try:
             collection = self.db[self.collection_name]
@@ -28,7 +33,7 @@ class BaseRepository(Generic[T]):
     async def fetch_all(self) -> List[T]:
         try:
             docs =  self.db[self.collection_name].find()
-            return [self.model_class(**doc) for doc in docs]
+            return self.hydrator.many(docs)
         except Exception as e:
             raise HTTPException(status_code=500, 
                               detail=f"Repository error: Failed to fetch {self.collection_name}. {e}")
@@ -36,7 +41,7 @@ class BaseRepository(Generic[T]):
         try:
             doc =  self.db[self.collection_name].find_one({"_id": ObjectId(id)})
             if doc:
-                return self.model_class(**doc)
+                return self.hydrator.one(doc)
             return None
         except Exception as e:
             raise HTTPException(status_code=500, 
@@ -46,7 +51,7 @@ class BaseRepository(Generic[T]):
         try:
             doc =  self.db[self.collection_name].find_one(filter_query)
             if doc:
-                return self.model_class(**doc)
+                return self.hydrator.one(doc)
             return None
         except Exception as e:
             raise HTTPException(status_code=500, 
@@ -69,7 +74,7 @@ class BaseRepository(Generic[T]):
             if sort_by:
                 cursor = cursor.sort(sort_by, sort_order)
             
-            results= [self.model_class(**item) for item in  cursor]
+            results= self.hydrator.many(cursor)
             # validate the type of the results
             if not all(isinstance(item, self.model_class) for item in results):
                 
@@ -1,26 +1,95 @@
-from typing import Optional, List
+from typing import Any, Dict, List, Optional
 import logging
 from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from models.cart import Cart, CartItem
 from services.repository.base_repository import BaseRepository
-from services.repository.product_repository import ProductRepository
-from services.repository.product_variant_repository import ProductVariantRepository
+
+# Recomputes every line total and the cart total from the items as they are now, so the
+# totals stay right whichever order concurrent item updates land in
+CART_TOTALS_PIPELINE: List[Dict[str, Any]] = [
+    {"$set": {"items": {"$map": {
+        "input": "$items",
+        "as": "item",
+        "in": {"$mergeObjects": [
+            "$$item",
+            {"total_price": {"$round": [{"$multiply": ["$$item.unit_price", "$$item.quantity"]}, 2]}},
+        ]},
+    }}}},
+    {"$set": {"total_amount": {"$round": [{"$sum": "$items.total_price"}, 2]}, "updated_at": "$$NOW"}},
+]
+
+PRODUCT_SNAPSHOT_FIELDS = {"name": 1, "price": 1, "discount": 1}
+# Items written before snapshots embed the whole product
+LEGACY_ITEMS = {"items.product": {"$exists": True}}
+VARIANT_SNAPSHOT_FIELDS = {"images": {"$slice": 1}}
+
+
+def _object_id(value: Optional[str]) -> Optional[ObjectId]:
+    # ObjectId(None) would make up a new ID
+    if not value:
+        return None
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
 
 class CartRepository(BaseRepository[Cart]):
+    """
+    Carts updated in place with targeted operators, never read, rebuilt and written back.
+
+    Each change touches only the affected item (``$push``, positional ``$inc``/``$set``,
+    ``$pull`` by item id) and is followed by CART_TOTALS_PIPELINE, which also returns the
+    cart as it is after the change. A user has at most one active cart, enforced by the
+    partial unique index on ``(user_id, is_archived)`` that also serves the lookups by user.
+    """
+
     def __init__(self):
         super().__init__(model_class=Cart, collection_name="cart")
-        self.product_repository = ProductRepository()
-        self.product_variant_repository = ProductVariantRepository()
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    def migrate_legacy_items(self, batch_size: int = 500) -> int:
+        """
+        Rewrite stored items that embed the product into the snapshot shape.
+
+        Such items have no ``product_id``/``variant_id`` pair or ``_id`` to match on and keep
+        the undiscounted unit price, so the targeted updates and the totals pipeline would
+        miss or misprice them. Each cart is written only if its items are unchanged since
+        they were read, so a cart changed meanwhile is left for the next run. Runs in a
+        worker thread once Mongo is reachable.
+
+        Returns:
+            Number of carts rewritten
+        """
+        migrated = 0
+        for doc in self.collection.find(LEGACY_ITEMS, {"items": 1}).batch_size(batch_size):
+            items = []
+            for stored in doc["items"]:
+                item = CartItem(**stored)
+                item_id = ObjectId(item.id) if item.id and ObjectId.is_valid(item.id) else ObjectId()
+                items.append({"_id": item_id, **item.model_dump(exclude={"id"})})
+            total_amount = round(sum(item["total_price"] for item in items), 2)
+            result = self.collection.update_one(
+                {"_id": doc["_id"], "items": doc["items"]},
+                {"$set": {"items": items, "total_amount": total_amount}, "$currentDate": {"updated_at": True}},
+            )
+            migrated += result.modified_count
+        if migrated:
+            self.logger.info(f"Rewrote the items of {migrated} carts into snapshots")
+        return migrated
+
     async def find_by_user_id(self, user_id: str) -> Optional[Cart]:
-        """Find cart by user ID"""
+        """Find the active cart of a user"""
         try:
-            doc = await self.db[self.collection_name].find_one({
-                "user_id": user_id,
-                "is_archived": False
-            })
+            doc = self.collection.find_one({"user_id": user_id, "is_archived": False})
             return Cart(**doc) if doc else None
         except Exception as e:
             self.logger.error(f"Failed to find cart by user ID: {e}")
@@ -29,24 +98,46 @@ class CartRepository(BaseRepository[Cart]):
                 detail="Failed to find cart"
             )
 
-    async def update_cart_items(self, cart_id: str, cart: Cart) -> bool:
-        """Update cart items and total amount"""
-        try:
-            update_data = {
-                "items": [item.model_dump() for item in cart.items],
-                "total_amount": cart.total_amount
-            }
-            result = await self.db[self.collection_name].update_one(
-                {"_id": ObjectId(cart_id)},
-                {"$set": update_data}
-            )
-            return result.modified_count > 0
-        except Exception as e:
-            self.logger.error(f"Failed to update cart items: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to update cart"
-            )
+    async def get_cart(self, cart_id: str) -> Optional[Cart]:
+        """Find a cart by ID; None if the ID is malformed or unknown"""
+        object_id = _object_id(cart_id)
+        if object_id is None:
+            return None
+        doc = self.collection.find_one({"_id": object_id})
+        return Cart(**doc) if doc else None
+
+    async def create_cart(self, user_id: str) -> str:
+        """Create an empty active cart for a user; returns its ID"""
+        return str(await self.insert_one(Cart(user_id=user_id).model_dump(exclude={"id"})))
+
+    async def persist(self, cart_id: str) -> Optional[Cart]:
+        """Carts are written as they change, so this only reads the cart back"""
+        return await self.get_cart(cart_id)
+
+    async def snapshot_item(self, product_id: str, variant_id: str, quantity: int) -> Optional[CartItem]:
+        """
+        Build the cart line for a product variant from the few fields a cart keeps.
+
+        Args:
+            product_id: Product ID
+            variant_id: Variant ID
+            quantity: Units to add
+
+        Returns:
+            The new item, or None if the product or variant does not exist
+        """
+        product_object_id, variant_object_id = _object_id(product_id), _object_id(variant_id)
+        if product_object_id is None or variant_object_id is None:
+            return None
+        product = self.db["products"].find_one({"_id": product_object_id}, PRODUCT_SNAPSHOT_FIELDS)
+        variant = self.db["variants"].find_one({"_id": variant_object_id}, VARIANT_SNAPSHOT_FIELDS)
+        if not product or not variant:
+            return None
+        return CartItem.from_product(product, variant, quantity)
+
+    async def _recalculate(self, cart_filter: Dict[str, Any]) -> Optional[Cart]:
+        doc = self.collection.find_one_and_update(cart_filter, CART_TOTALS_PIPELINE, return_document=ReturnDocument.AFTER)
+        return Cart(**doc) if doc else None
 
     async def add_to_cart(
         self,
@@ -54,35 +145,46 @@ class CartRepository(BaseRepository[Cart]):
         product_id: str,
         variant_id: str,
         quantity: int
-    ) -> bool:
-        """Add item to cart"""
-        try:
-            cart = await self.find_by_user_id(user_id)
-            product = await self.product_repository.find_one({"_id": ObjectId(product_id)})
-            product_variant = await self.product_variant_repository.find_one({"_id": ObjectId(variant_id)})
+    ) -> Optional[Cart]:
+        """
+        Add units of a product variant to the user's active cart, creating the cart if needed.
 
-            if not product or not product_variant:
-                return None
+        If the variant is already in the cart its quantity is incremented in place; otherwise
+        a snapshot of the product is pushed. Two tabs adding the same new item at once cannot
+        create two lines or two carts: the push only matches a cart without that item, and
+        the unique index turns a second cart into a DuplicateKeyError, after which the
+        increment is retried.
 
-            if not cart:
-                cart = Cart(user_id=user_id, items=[], total_amount=0)
-                cart = await self.insert_one(cart.model_dump())
+        Returns:
+            The updated cart, or None if the product or variant does not exist
+        """
+        try:
+            item = await self.snapshot_item(product_id, variant_id, quantity)
+            if item is None:
+                return None
 
-            cart_item = CartItem(
-                product=product,
-                variant_id=str(product_variant.id),
-                quantity=quantity,
-                unit_price=product.price,
-                total_price=product.price * quantity
-            )
-            cart_item.calculate_total()
-            
-            if isinstance(cart, Cart):
-                cart.items.append(cart_item)
-                cart.calculate_total()
-                return await self.update_cart_items(str(cart.id), cart)
-                
-            return False
+            active_cart = {"user_id": user_id, "is_archived": False}
+            same_line = {"$elemMatch": {"product_id": item.product_id, "variant_id": item.variant_id}}
+            for _ in range(2):
+                result = self.collection.update_one(
+                    {**active_cart, "items": same_line},
+                    {"$inc": {"items.$.quantity": quantity}},
+                )
+                if result.matched_count:
+                    break
+                line = item.model_dump(by_alias=True, exclude={"id"})
+                try:
+                    # An upsert creates the cart from the equality fields of the filter
+                    self.collection.update_one(
+                        {**active_cart, "items": {"$not": same_line}},
+                        {"$push": {"items": {"_id": ObjectId(), **line}}},
+                        upsert=True,
+                    )
+                    break
+                except DuplicateKeyError:
+                    # Another request created the cart or the line first; increment that instead
+                    continue
+            return await self._recalculate(active_cart)
         except Exception as e:
             self.logger.error(f"Failed to add item to cart: {e}")
             raise HTTPException(
@@ -93,15 +195,18 @@ class CartRepository(BaseRepository[Cart]):
     async def remove_from_cart(self, cart_id: str, item_ids: List[str]) -> bool:
         """Remove items from cart"""
         try:
-            cart = await self.get_by_id(cart_id)
-            if not cart:
+            object_id = _object_id(cart_id)
+            item_object_ids = [oid for oid in map(_object_id, item_ids) if oid is not None]
+            if object_id is None or not item_object_ids:
                 return False
-            
-            cart_obj = Cart(**cart)
-            cart_obj.items = [item for item in cart_obj.items if item.id not in item_ids]
-            cart_obj.calculate_total()
-            
-            return await self.update(cart_id, cart_obj.model_dump())
+            result = self.collection.update_one(
+                {"_id": object_id},
+                {"$pull": {"items": {"_id": {"$in": item_object_ids}}}},
+            )
+            if not result.modified_count:
+                return False
+            await self._recalculate({"_id": object_id})
+            return True
         except Exception as e:
             self.logger.error(f"Failed to remove items from cart: {e}")
             raise HTTPException(
@@ -112,15 +217,14 @@ class CartRepository(BaseRepository[Cart]):
     async def clear_cart(self, cart_id: str) -> bool:
         """Clear all items from cart"""
         try:
-            cart = await self.get_by_id(cart_id)
-            if not cart:
+            object_id = _object_id(cart_id)
+            if object_id is None:
                 return False
-            
-            cart_obj = Cart(**cart)
-            cart_obj.items = []
-            cart_obj.total_amount = 0
-            
-            return await self.update(cart_id, cart_obj.model_dump())
+            result = self.collection.update_one(
+                {"_id": object_id},
+                {"$set": {"items": [], "total_amount": 0}, "$currentDate": {"updated_at": True}},
+            )
+            return result.matched_count > 0
         except Exception as e:
             self.logger.error(f"Failed to clear cart: {e}")
             raise HTTPException(
@@ -128,23 +232,20 @@ class CartRepository(BaseRepository[Cart]):
                 detail="Failed to clear cart"
             )
 
-    async def update_item_quantity(self, cart_id: str, item_id: str, quantity: int) -> bool:
-        """Update quantity of an item in cart"""
+    async def update_item_quantity(self, cart_id: str, item_id: str, quantity: int) -> Optional[Cart]:
+        """Set the quantity of an item in cart; returns the updated cart"""
         try:
-            cart = await self.get_by_id(cart_id)
-            if not cart:
-                raise HTTPException(status_code=404, detail="Cart not found")
-
-            cart_obj = Cart(**cart)
-            item = next((item for item in cart_obj.items if str(item.id) == item_id), None)
-            if not item:
+            object_id, item_object_id = _object_id(cart_id), _object_id(item_id)
+            if object_id is None or item_object_id is None:
                 raise HTTPException(status_code=404, detail="Item not found in cart")
 
-            item.quantity = quantity
-            item.calculate_total()
-            cart_obj.calculate_total()
-
-            return await self.update_cart_items(cart_id, cart_obj)
+            result = self.collection.update_one(
+                {"_id": object_id, "items._id": item_object_id},
+                {"$set": {"items.$.quantity": quantity}},
+            )
+            if not result.matched_count:
+                raise HTTPException(status_code=404, detail="Item not found in cart")
+            return await self._recalculate({"_id": object_id})
         except HTTPException:
             raise
         except Exception as e:
@@ -155,17 +256,16 @@ class CartRepository(BaseRepository[Cart]):
             )
 
     async def get_cart_item(self, cart_id: str, product_id: str, variant_id: Optional[str] = None) -> Optional[CartItem]:
-        """Get specific item from cart"""
+        """Get specific item from cart, reading only that item"""
         try:
-            cart = await self.get_by_id(cart_id)
-            if not cart:
+            object_id = _object_id(cart_id)
+            if object_id is None:
                 return None
-            
-            cart_obj = Cart(**cart)
-            for item in cart_obj.items:
-                if item.product.id == product_id and (item.variant_id == variant_id or variant_id is None):
-                    return item
-            return None
+            line = {"product_id": product_id}
+            if variant_id is not None:
+                line["variant_id"] = variant_id
+            doc = self.collection.find_one({"_id": object_id, "items": {"$elemMatch": line}}, {"items.$": 1})
+            return CartItem(**doc["items"][0]) if doc else None
         except Exception as e:
             self.logger.error(f"Failed to get cart item: {e}")
             raise HTTPException(
@@ -2,8 +2,11 @@ import logging
 from typing import  List, Union
 from .base_repository import BaseRepository
 from models.products import Product
+from core.hydration import HydrationMode
 
 class ProductRepository(BaseRepository[Product]):
+    hydration = HydrationMode.ADAPTER
+
     def __init__(self):
         super().__init__( Product,collection_name="products")
 
@@ -19,7 +22,7 @@ class ProductRepository(BaseRepository[Product]):
                 "is_archived": False
             })
             documents = await cursor.to_list(length=None)
-            return [Product(**doc) for doc in documents]
+            return self.hydrator.many(documents)
 
     async def find_by_material(self, material_id: str) -> List[Product]:
             cursor = self.db[self.collection_name].find({
@@ -27,7 +30,7 @@ class ProductRepository(BaseRepository[Product]):
                 "is_archived": False
             })
             documents = await cursor.to_list(length=None)
-            return [Product(**doc) for doc in documents]
+            return self.hydrator.many(documents)
 
     async def update_views(self, product_id: str) -> bool:
             result = await self.db[self.collection_name].update_one(
@@ -0,0 +1,566 @@
+"""
+Active carts kept in Redis hashes and written to Mongo behind the request.
+
+A cart is one hash, ``{prefix}:{cart_id}``, with a field per value of each line::
+
+    user_id                     owner
+    line:{product}:{variant}    item ID of that product variant, so adding it again increments
+    item:{item_id}              JSON snapshot of the item (name, image, prices)
+    qty:{item_id}               quantity, changed with HINCRBY
+
+Every change is one Lua script that updates the hash, slides its TTL, marks the cart dirty
+and returns the cart, so a cart click is a single Redis round trip. CartWriteBehind writes
+dirty carts to the Mongo ``cart`` collection in batches, and writes then drops carts that
+have been idle for ``idle_seconds``. Carts missing from Redis are read from Mongo and
+loaded on first use, so switching the store on or off loses nothing that was written.
+
+The Redis holding carts must not evict keys under memory pressure (``maxmemory-policy
+noeviction``); a cart evicted before it is written is lost. The TTL, twice the idle
+time, only drops carts if the write-behind task stops running.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.metrics import metrics
+from models.cart import Cart, CartItem
+from services.repository.cart_repository import CartRepository
+
+logger = logging.getLogger(__name__)
+
+# KEYS: cart hash, dirty set, activity index. ARGV: TTL in ms, cart ID, now, prefix of the
+# owner's cart ID key, then the script's own. Both the cart and its owner's key get the new TTL,
+# so a cart kept in use by ID is still found by user. Returns -1 when the cart is not in Redis,
+# so the caller loads it from Mongo and retries.
+_TOUCH = """
+local function touch()
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+    redis.call('PEXPIRE', ARGV[4] .. redis.call('HGET', KEYS[1], 'user_id'), ARGV[1])
+    redis.call('SADD', KEYS[2], ARGV[2])
+    redis.call('ZADD', KEYS[3], ARGV[3], ARGV[2])
+    return redis.call('HGETALL', KEYS[1])
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+"""
+
+# ARGV: line, new item ID, item JSON, quantity.
+ADD_ITEM_SCRIPT = _TOUCH + """
+local id = redis.call('HGET', KEYS[1], 'line:' .. ARGV[5])
+if not id then
+    id = ARGV[6]
+    redis.call('HSET', KEYS[1], 'line:' .. ARGV[5], id, 'item:' .. id, ARGV[7])
+end
+redis.call('HINCRBY', KEYS[1], 'qty:' .. id, ARGV[8])
+return touch()
+"""
+
+# ARGV: item ID, quantity. Returns 0 when the item is not in the cart.
+SET_QUANTITY_SCRIPT = _TOUCH + """
+if redis.call('HEXISTS', KEYS[1], 'item:' .. ARGV[5]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'qty:' .. ARGV[5], ARGV[6])
+return touch()
+"""
+
+# ARGV: item IDs. Returns 0 when none of them is in the cart.
+REMOVE_ITEMS_SCRIPT = _TOUCH + """
+local removed = 0
+for i = 5, #ARGV do
+    local item = redis.call('HGET', KEYS[1], 'item:' .. ARGV[i])
+    if item then
+        local line = cjson.decode(item)
+        redis.call('HDEL', KEYS[1], 'item:' .. ARGV[i], 'qty:' .. ARGV[i],
+            'line:' .. line['product_id'] .. ':' .. line['variant_id'])
+        removed = removed + 1
+    end
+end
+if removed == 0 then
+    return 0
+end
+return touch()
+"""
+
+CLEAR_SCRIPT = _TOUCH + """
+for _, field in ipairs(redis.call('HKEYS', KEYS[1])) do
+    local kind = string.match(field, '^(%a+):')
+    if kind == 'line' or kind == 'item' or kind == 'qty' then
+        redis.call('HDEL', KEYS[1], field)
+    end
+end
+return touch()
+"""
+
+# KEYS: cart hash, owner's cart ID key, activity index. ARGV: TTL in ms, cart ID, now, then
+# field, value pairs. Leaves a cart already in Redis alone, since it may be newer than Mongo.
+LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('PEXPIRE', KEYS[1], ARGV[1])
+redis.call('SET', KEYS[2], ARGV[2], 'PX', ARGV[1], 'NX')
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[2])
+return 1
+"""
+
+# KEYS: cart hash, owner's cart ID key, dirty set, activity index. ARGV: cart ID, idle cutoff.
+# Keeps carts that were used or changed after they were written.
+EVICT_SCRIPT = """
+local touched = redis.call('ZSCORE', KEYS[4], ARGV[1])
+if (touched and tonumber(touched) > tonumber(ARGV[2])) or redis.call('SISMEMBER', KEYS[3], ARGV[1]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+if redis.call('GET', KEYS[2]) == ARGV[1] then
+    redis.call('DEL', KEYS[2])
+end
+redis.call('ZREM', KEYS[4], ARGV[1])
+return 1
+"""
+
+SCRIPTS = {
+    "add": ADD_ITEM_SCRIPT,
+    "set_quantity": SET_QUANTITY_SCRIPT,
+    "remove": REMOVE_ITEMS_SCRIPT,
+    "clear": CLEAR_SCRIPT,
+    "load": LOAD_SCRIPT,
+    "evict": EVICT_SCRIPT,
+}
+
+carts_written = metrics.counter("cart_write_behind_writes_total", "Carts written from Redis to Mongo")
+cart_write_failures = metrics.counter("cart_write_behind_failures_total", "Batches of carts that failed to write to Mongo")
+carts_evicted = metrics.counter("cart_evictions_total", "Idle carts written to Mongo and dropped from Redis")
+
+ITEM_SNAPSHOT_EXCLUDE = {"id", "quantity", "total_price"}
+
+
+def cart_fields(cart: Cart) -> Dict[str, str]:
+    """Hash fields of a cart; items without an ID are given one"""
+    fields = {"user_id": cart.user_id}
+    for item in cart.items:
+        item_id = str(item.id or ObjectId())
+        fields[f"line:{item.product_id}:{item.variant_id}"] = item_id
+        fields[f"item:{item_id}"] = json.dumps(item.model_dump(mode="json", exclude=ITEM_SNAPSHOT_EXCLUDE))
+        fields[f"qty:{item_id}"] = str(item.quantity)
+    return fields
+
+
+def cart_from_fields(cart_id: str, fields: Dict[str, str]) -> Cart:
+    """
+    Rebuild a cart from its hash fields.
+
+    Args:
+        cart_id: Cart ID
+        fields: Fields as returned by HGETALL
+
+    Returns:
+        Cart with its items in the order they were added and its totals calculated
+    """
+    items = []
+    # Item IDs are ObjectIds, which sort by creation time
+    for field in sorted(field for field in fields if field.startswith("item:")):
+        item_id = field[len("item:"):]
+        item = CartItem(_id=item_id, quantity=int(fields[f"qty:{item_id}"]), **json.loads(fields[field]))
+        item.calculate_total()
+        items.append(item)
+    cart = Cart(_id=cart_id, user_id=fields["user_id"], items=items)
+    cart.calculate_total()
+    return cart
+
+
+def _pairs_to_dict(values: List[str]) -> Dict[str, str]:
+    return dict(zip(values[::2], values[1::2]))
+
+
+class RedisCartRepository:
+    """
+    Cart store with the methods of CartRepository, keeping active carts in Redis.
+
+    The circuit breaker and connection pool are the cart store's own, never the cache's:
+    carts have no fallback, so slow cache commands must not fail every cart request.
+
+    Args:
+        redis_url: Redis holding the carts
+        key_prefix: Prefix of the cart keys; kept apart from the cache prefix so that
+            clearing the cache never drops carts
+        idle_seconds: Carts untouched this long are written to Mongo and dropped from Redis
+        batch_size: Carts written to Mongo per bulk write
+        carts: Mongo cart repository that carts are read from and written to
+        client: Redis client; by default one on the cart store's connection pool
+        socket_timeout_ms: Command and connect timeout of that pool
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        key_prefix: str = "afrifurn-cart",
+        idle_seconds: int = 3 * 24 * 3600,
+        batch_size: int = 500,
+        carts: Optional[CartRepository] = None,
+        client: Any = None,
+        socket_timeout_ms: int = 500,
+    ):
+        from decorators.redis_provider import get_circuit_breaker
+
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.idle_seconds = idle_seconds
+        self.ttl_ms = idle_seconds * 2 * 1000
+        self.batch_size = batch_size
+        self.carts = carts or CartRepository()
+        self.socket_timeout_ms = socket_timeout_ms
+        self.circuit_breaker = get_circuit_breaker(redis_url, store="cart")
+        self._client = client
+        self._scripts: Dict[str, Any] = {}
+        self.dirty_key = f"{key_prefix}:dirty"
+        self.active_key = f"{key_prefix}:active"
+
+    def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            from decorators.redis_provider import get_connection_pool
+
+            self._client = redis.Redis(connection_pool=get_connection_pool(
+                self.redis_url,
+                store="cart",
+                socket_timeout_ms=self.socket_timeout_ms,
+                connect_timeout_ms=self.socket_timeout_ms,
+            ))
+        return self._client
+
+    def _cart_key(self, cart_id: str) -> str:
+        return f"{self.key_prefix}:{cart_id}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:user:{user_id}"
+
+    async def _execute(self, operation: str, command: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run Redis commands behind the shared circuit breaker.
+
+        Carts have no other copy to fall back to while Redis is down, so failures surface
+        as 503 rather than serving a possibly older cart from Mongo.
+
+        Raises:
+            HTTPException: 503 if Redis is unreachable or the circuit breaker is open
+        """
+        if not self.circuit_breaker.allow_request():
+            raise HTTPException(status_code=503, detail="Cart store is unavailable")
+        from decorators.redis_provider import redis_command_duration, redis_command_failures
+
+        start = time.perf_counter()
+        try:
+            result = await command(self._get_client())
+        except Exception as e:
+            redis_command_failures.labels(f"cart_{operation}").inc()
+            self.circuit_breaker.record_failure()
+            logger.error(f"Cart store {operation} failed: {e}")
+            raise HTTPException(status_code=503, detail="Cart store is unavailable")
+        except BaseException:
+            self.circuit_breaker.release_probe()
+            raise
+        redis_command_duration.labels(f"cart_{operation}").observe(time.perf_counter() - start)
+        self.circuit_breaker.record_success()
+        return result
+
+    async def _script(self, name: str, keys: List[str], args: List[Any]) -> Any:
+        if name not in self._scripts:
+            # Sent with EVALSHA, falling back to EVAL the first time a server has not seen it
+            self._scripts[name] = self._get_client().register_script(SCRIPTS[name])
+        script = self._scripts[name]
+        return await self._execute(name, lambda client: script(keys=keys, args=args))
+
+    async def _mutate(self, name: str, cart_id: str, args: List[Any]) -> Any:
+        """Run a change script, loading the cart from Mongo first if Redis does not have it"""
+        keys = [self._cart_key(cart_id), self.dirty_key, self.active_key]
+        for _ in range(2):
+            result = await self._script(name, keys, [self.ttl_ms, cart_id, time.time(), self._user_key(""), *args])
+            if result != -1:
+                return result
+            if not await self._load(cart_id):
+                return None
+        return None
+
+    async def _load(self, cart_id: str, cart: Optional[Cart] = None) -> bool:
+        """Copy a cart from Mongo into Redis; False if neither has it"""
+        cart = cart or await self.carts.get_cart(cart_id)
+        if cart is None:
+            return False
+        fields = [value for pair in cart_fields(cart).items() for value in pair]
+        await self._script(
+            "load",
+            [self._cart_key(cart_id), self._user_key(cart.user_id), self.active_key],
+            [self.ttl_ms, cart_id, time.time(), *fields],
+        )
+        return True
+
+    async def _cart_id_for_user(self, user_id: str, create: bool = True) -> Optional[str]:
+        """ID of the user's active cart, loading it from Mongo or creating it as needed"""
+        user_key = self._user_key(user_id)
+        # Looking the cart up by user keeps the key alive as long as the cart
+        cart_id = await self._execute("get", lambda client: client.getex(user_key, px=self.ttl_ms))
+        if cart_id:
+            return cart_id
+        cart = await self.carts.find_by_user_id(user_id)
+        if cart is None and not create:
+            return None
+        cart = cart or Cart(_id=str(ObjectId()), user_id=user_id)
+        claimed = await self._execute("set", lambda client: client.set(user_key, cart.id, px=self.ttl_ms, nx=True))
+        if not claimed:
+            # Another request found or created the cart first
+            return await self._execute("get", lambda client: client.get(user_key)) or cart.id
+        await self._load(cart.id, cart)
+        return cart.id
+
+    async def find_by_user_id(self, user_id: str) -> Optional[Cart]:
+        """Find the active cart of a user"""
+        cart_id = await self._cart_id_for_user(user_id, create=False)
+        return await self.get_cart(cart_id) if cart_id else None
+
+    async def get_cart(self, cart_id: str) -> Optional[Cart]:
+        """Find a cart by ID, from Redis or else from Mongo"""
+        cart_key = self._cart_key(cart_id)
+
+        async def read(client) -> List[Any]:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hgetall(cart_key)
+                pipe.pexpire(cart_key, self.ttl_ms)
+                pipe.zadd(self.active_key, {cart_id: time.time()}, xx=True)
+                return await pipe.execute()
+
+        fields = (await self._execute("get", read))[0]
+        if fields:
+            return cart_from_fields(cart_id, fields)
+        cart = await self.carts.get_cart(cart_id)
+        if cart is not None:
+            await self._load(cart_id, cart)
+        return cart
+
+    async def create_cart(self, user_id: str) -> str:
+        """Create an empty active cart for a user; returns its ID"""
+        return await self._cart_id_for_user(user_id)
+
+    async def add_to_cart(self, user_id: str, product_id: str, variant_id: str, quantity: int) -> Optional[Cart]:
+        """
+        Add units of a product variant to the user's active cart, creating the cart if needed.
+
+        Returns:
+            The updated cart, or None if the product or variant does not exist
+        """
+        item = await self.carts.snapshot_item(product_id, variant_id, quantity)
+        if item is None:
+            return None
+        cart_id = await self._cart_id_for_user(user_id)
+        snapshot = json.dumps(item.model_dump(mode="json", exclude=ITEM_SNAPSHOT_EXCLUDE))
+        fields = await self._mutate(
+            "add", cart_id,
+            [f"{item.product_id}:{item.variant_id}", str(ObjectId()), snapshot, quantity],
+        )
+        return cart_from_fields(cart_id, _pairs_to_dict(fields)) if fields else None
+
+    async def update_item_quantity(self, cart_id: str, item_id: str, quantity: int) -> Optional[Cart]:
+        """Set the quantity of an item in cart; returns the updated cart"""
+        fields = await self._mutate("set_quantity", cart_id, [item_id, quantity])
+        if not fields:
+            raise HTTPException(status_code=404, detail="Item not found in cart")
+        return cart_from_fields(cart_id, _pairs_to_dict(fields))
+
+    async def remove_from_cart(self, cart_id: str, item_ids: List[str]) -> bool:
+        """Remove items from cart"""
+        if not item_ids:
+            return False
+        return bool(await self._mutate("remove", cart_id, list(item_ids)))
+
+    async def clear_cart(self, cart_id: str) -> bool:
+        """Clear all items from cart"""
+        return bool(await self._mutate("clear", cart_id, []))
+
+    async def get_cart_item(self, cart_id: str, product_id: str, variant_id: Optional[str] = None) -> Optional[CartItem]:
+        """Get specific item from cart"""
+        cart = await self.get_cart(cart_id)
+        if cart is None:
+            return None
+        return next(
+            (item for item in cart.items
+             if item.product_id == product_id and (variant_id is None or item.variant_id == variant_id)),
+            None,
+        )
+
+    async def _write(self, cart_ids: List[str]) -> Dict[str, Cart]:
+        """
+        Write carts from Redis to Mongo in one bulk write.
+
+        Callers take the carts out of the dirty set first, so a change made while the write
+        is in flight marks the cart dirty again and is written by the next flush.
+
+        Returns:
+            The carts written, by ID; carts no longer in Redis are skipped
+
+        Raises:
+            Exception: If the write fails; the carts are marked dirty again first
+        """
+        async def read(client) -> List[Dict[str, str]]:
+            async with client.pipeline(transaction=False) as pipe:
+                for cart_id in cart_ids:
+                    pipe.hgetall(self._cart_key(cart_id))
+                return await pipe.execute()
+
+        try:
+            carts = [cart_from_fields(cart_id, fields) for cart_id, fields in zip(cart_ids, await self._execute("read", read)) if fields]
+        except Exception:
+            await self._mark_dirty(cart_ids)
+            raise
+        if not carts:
+            return {}
+        now = datetime.now()
+        operations = [
+            UpdateOne(
+                {"_id": ObjectId(cart.id)},
+                {
+                    "$set": {
+                        "user_id": cart.user_id,
+                        "is_archived": False,
+                        "items": [{"_id": ObjectId(item.id), **item.model_dump(exclude={"id"})} for item in cart.items],
+                        "total_amount": cart.total_amount,
+                        "updated_at": now,
+                    },
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            )
+            for cart in carts
+        ]
+        try:
+            await asyncio.to_thread(self.carts.collection.bulk_write, operations, ordered=False)
+        except BulkWriteError as e:
+            cart_write_failures.inc()
+            # A duplicate key means the user has another active cart in Mongo; retrying cannot help
+            errors = e.details.get("writeErrors", [])
+            retry = [carts[error["index"]].id for error in errors if error.get("code") != 11000]
+            for error in errors:
+                if error.get("code") == 11000:
+                    logger.error(f"Cart {carts[error['index']].id} not written, the user has another active cart")
+            await self._mark_dirty(retry)
+            failed = {carts[error["index"]].id for error in errors}
+            written = {cart.id: cart for cart in carts if cart.id not in failed}
+            carts_written.inc(len(written))
+            return written
+        except Exception:
+            cart_write_failures.inc()
+            await self._mark_dirty([cart.id for cart in carts])
+            raise
+        carts_written.inc(len(carts))
+        return {cart.id: cart for cart in carts}
+
+    async def _mark_dirty(self, cart_ids: List[str]) -> None:
+        if cart_ids:
+            await self._execute("sadd", lambda client: client.sadd(self.dirty_key, *cart_ids))
+
+    async def flush_dirty(self) -> int:
+        """
+        Write up to ``batch_size`` changed carts to Mongo.
+
+        Returns:
+            Number of carts taken from the dirty set; ``batch_size`` means more may be waiting
+        """
+        cart_ids = await self._execute("spop", lambda client: client.spop(self.dirty_key, self.batch_size))
+        if not cart_ids:
+            return 0
+        await self._write(cart_ids)
+        return len(cart_ids)
+
+    async def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Write carts idle for ``idle_seconds`` to Mongo and drop them from Redis.
+
+        Returns:
+            Number of carts dropped
+        """
+        cutoff = (now if now is not None else time.time()) - self.idle_seconds
+        cart_ids = await self._execute(
+            "idle", lambda client: client.zrangebyscore(self.active_key, "-inf", cutoff, start=0, num=self.batch_size),
+        )
+        if not cart_ids:
+            return 0
+        await self._execute("srem", lambda client: client.srem(self.dirty_key, *cart_ids))
+        written = await self._write(cart_ids)
+        evicted = 0
+        for cart_id in cart_ids:
+            cart = written.get(cart_id)
+            if cart is None:
+                # Expired from Redis already, or its write failed and it is dirty again
+                await self._execute("zrem", lambda client: client.zrem(self.active_key, cart_id))
+                continue
+            evicted += await self._script(
+                "evict",
+                [self._cart_key(cart_id), self._user_key(cart.user_id), self.dirty_key, self.active_key],
+                [cart_id, cutoff],
+            )
+        carts_evicted.inc(evicted)
+        return evicted
+
+    async def persist(self, cart_id: str) -> Optional[Cart]:
+        """Write a cart to Mongo now, e.g. before checkout reads it; returns the cart as written"""
+        await self._execute("srem", lambda client: client.srem(self.dirty_key, cart_id))
+        written = await self._write([cart_id])
+        return written.get(cart_id) or await self.carts.get_cart(cart_id)
+
+
+class CartWriteBehind:
+    """
+    Background task that writes changed Redis carts to Mongo and drops idle ones.
+
+    Stopping it writes whatever is still dirty, so a clean shutdown leaves Mongo current.
+    """
+
+    def __init__(self, repository: RedisCartRepository, interval_seconds: float = 2.0):
+        self.repository = repository
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Write every dirty cart and drop idle ones; returns the number of carts flushed"""
+        flushed = 0
+        while True:
+            taken = await self.repository.flush_dirty()
+            flushed += taken
+            if taken < self.repository.batch_size:
+                break
+        await self.repository.evict_idle()
+        return flushed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Cart write-behind failed, retrying in {self.interval_seconds}s: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Cart write-behind could not write dirty carts on shutdown: {e}")
@@ -0,0 +1,43 @@
+"""
+CPU cost against bytes saved when compressing a 100-product listing page.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import pytest
+
+from core.responses import dumps
+from middleware.compression import brotli_codec, gzip_codec, zstd_codec
+
+pytest.importorskip("pytest_benchmark")
+
+CODECS = {
+    "gzip-1": lambda: gzip_codec(1),
+    "gzip-6": lambda: gzip_codec(6),
+    "br-1": lambda: brotli_codec(1),
+    "br-5": lambda: brotli_codec(5),
+    "zstd-1": lambda: zstd_codec(1),
+    "zstd-3": lambda: zstd_codec(3),
+}
+
+
+@pytest.mark.slow
+class TestListingPageCompression:
+    """One-shot compression of the rendered page with each codec and level."""
+
+    @pytest.fixture
+    def body(self, product_page):
+        return dumps(product_page)
+
+    @pytest.mark.parametrize("name", list(CODECS))
+    @pytest.mark.benchmark(group="compress-page-100")
+    def test_compress(self, benchmark, body, name):
+        codec = CODECS[name]()
+        if codec is None:
+            pytest.skip(f"{name} library is not installed")
+
+        compressed = benchmark(codec.compress, body)
+
+        benchmark.extra_info["bytes"] = len(compressed)
+        benchmark.extra_info["ratio"] = round(len(compressed) / len(body), 4)
+        print(f"\n{name}: {len(body)} -> {len(compressed)} bytes ({len(compressed) / len(body):.1%})")
+        assert len(compressed) < len(body)
@@ -0,0 +1,208 @@
+"""
+Microbenchmarks of the CPU-bound hot paths of a product request.
+
+- build_product_query with no filters and with every filter
+- Product validation of a stored document and serialisation of the model
+- cache_response overhead on a hit (decoded and raw) and on a miss, against an in-memory cache
+- ResponseModel.create around a listing page
+- WebPImageProcessor.convert_image on a product photo sized image
+- Cart total calculation
+- A rate limit check against 100k in-process buckets
+
+Save a baseline and compare a later run against it:
+
+    pytest tests/benchmarks -m slow --benchmark-autosave
+    pytest tests/benchmarks -m slow --benchmark-json=current.json
+    python -m loadtest.compare .benchmarks current.json --threshold 10
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import asyncio
+from io import BytesIO
+from typing import Dict, Optional
+
+import pytest
+from PIL import Image
+
+from core.responses import dumps
+from decorators import decorator
+from decorators.decorator import cache_response
+from models.cart import Cart, CartItem
+from models.common import ResponseModel
+from models.products import Product
+from services.image_processor import WebPImageProcessor
+from utils.query_builder import build_product_query
+from utils.rate_limiter import LocalTokenBuckets, RateLimit
+
+pytest.importorskip("pytest_benchmark")
+
+NO_DIMENSIONS = {"width": None, "length": None, "depth": None, "height": None, "weight": None}
+
+
+class InMemoryRawCache:
+    """Raw get/set as RedisCacheProvider offers them, without the network"""
+
+    def __init__(self, keep: bool = True):
+        self.keep = keep
+        self.store: Dict[str, str] = {}
+
+    async def get_raw(self, key: str) -> Optional[str]:
+        return self.store.get(key)
+
+    async def set_raw(self, key: str, payload: str, ttl_seconds: Optional[int] = None) -> None:
+        if self.keep:
+            self.store[key] = payload
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.mark.slow
+class TestQueryBuilding:
+    """Filter criteria for /products/filter."""
+
+    @pytest.mark.benchmark(group="build-product-query")
+    def test_no_filters(self, benchmark):
+        query = benchmark(build_product_query, None, None, None, None, "[]", "[]", NO_DIMENSIONS, None, None)
+        assert query == {}
+
+    @pytest.mark.benchmark(group="build-product-query")
+    def test_every_filter(self, benchmark):
+        dimensions = {"width": 160.0, "length": 210.0, "depth": None, "height": 110.0, "weight": None}
+        query = benchmark(
+            build_product_query, 100.0, 900.0, "oslo", "oslo-bed", '["#5C4033", "#F5F5DC"]', '["oak"]',
+            dimensions, "beds", "Bedroom",
+        )
+        assert "price" in query
+
+
+@pytest.mark.slow
+class TestProductModel:
+    """Validating a stored product and serialising the model."""
+
+    @pytest.mark.benchmark(group="product-model")
+    def test_validate_document(self, benchmark, product_page_documents):
+        document = product_page_documents[0]
+        assert benchmark(Product.model_validate, document).name == document["name"]
+
+    @pytest.mark.benchmark(group="product-model")
+    def test_model_dump_json_mode(self, benchmark, product_page):
+        assert benchmark(product_page[0].model_dump, mode="json", by_alias=True)["name"]
+
+    @pytest.mark.benchmark(group="product-model")
+    def test_orjson_dumps(self, benchmark, product_page):
+        assert benchmark(dumps, product_page[0]).startswith(b"{")
+
+
+@pytest.mark.slow
+class TestCacheResponseOverhead:
+    """Cost of cache_response around a handler returning a 20-product page."""
+
+    @pytest.fixture
+    def page(self, product_page):
+        return product_page[:20]
+
+    def decorated(self, page, raw_hits: bool = False):
+        @cache_response(key="bench-products:{page}", response_model=Product, raw_hits=raw_hits)
+        async def list_products(page: int = 1):
+            return products
+
+        products = page
+        return list_products
+
+    @pytest.mark.benchmark(group="cache-response")
+    def test_undecorated_handler(self, benchmark, loop, page):
+        async def list_products(page: int = 1):
+            return products
+
+        products = page
+        assert len(benchmark(lambda: loop.run_until_complete(list_products(page=1)))) == 20
+
+    @pytest.mark.benchmark(group="cache-response")
+    def test_miss(self, benchmark, loop, page, monkeypatch):
+        monkeypatch.setattr(decorator, "redis_app", InMemoryRawCache(keep=False))
+        handler = self.decorated(page)
+        assert len(benchmark(lambda: loop.run_until_complete(handler(page=1)))) == 20
+
+    @pytest.mark.benchmark(group="cache-response")
+    def test_hit_decoded_and_validated(self, benchmark, loop, page, monkeypatch):
+        monkeypatch.setattr(decorator, "redis_app", InMemoryRawCache())
+        handler = self.decorated(page)
+        loop.run_until_complete(handler(page=1))
+        assert len(benchmark(lambda: loop.run_until_complete(handler(page=1)))) == 20
+
+    @pytest.mark.benchmark(group="cache-response")
+    def test_hit_raw(self, benchmark, loop, page, monkeypatch):
+        monkeypatch.setattr(decorator, "redis_app", InMemoryRawCache())
+        handler = self.decorated(page, raw_hits=True)
+        loop.run_until_complete(handler(page=1))
+        assert benchmark(lambda: loop.run_until_complete(handler(page=1))).body.startswith(b"[")
+
+
+@pytest.mark.slow
+class TestResponseEnvelope:
+    """ResponseModel.create around a 100-product page."""
+
+    @pytest.mark.benchmark(group="response-model")
+    def test_create(self, benchmark, product_page):
+        assert benchmark(ResponseModel.create, class_name="Product", data=product_page).number_of_data_items == 100
+
+
+@pytest.mark.slow
+class TestImageConversion:
+    """WebP encoding of an uploaded photo."""
+
+    @pytest.fixture(scope="class")
+    def photo(self):
+        # A gradient compresses like a photo far better than a flat colour does
+        image = Image.linear_gradient("L").resize((1200, 900)).convert("RGB")
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        return Image.open(BytesIO(buffer.getvalue()))
+
+    @pytest.mark.benchmark(group="image-conversion")
+    def test_convert_image_to_webp(self, benchmark, photo):
+        webp = benchmark.pedantic(WebPImageProcessor().convert_image, args=(photo,), rounds=10, warmup_rounds=1)
+        assert webp[:4] == b"RIFF"
+
+
+@pytest.mark.slow
+class TestCartTotals:
+    """Recalculating a 20-item cart."""
+
+    @pytest.fixture
+    def cart(self, product_page_documents):
+        items = [
+            CartItem.from_product(document, {"_id": f"variant-{n}", "images": []}, quantity=n % 3 + 1)
+            for n, document in enumerate(product_page_documents[:20])
+        ]
+        return Cart(user_id="user-1", items=items)
+
+    @pytest.mark.benchmark(group="cart-total")
+    def test_calculate_total(self, benchmark, cart):
+        def recalculate():
+            for item in cart.items:
+                item.calculate_total()
+            cart.calculate_total()
+            return cart.total_amount
+
+        assert benchmark(recalculate) > 0
+
+
+@pytest.mark.slow
+class TestRateLimitCheck:
+    """Token bucket check with a full set of in-process buckets."""
+
+    @pytest.mark.benchmark(group="rate-limit")
+    def test_local_bucket_hit(self, benchmark):
+        buckets = LocalTokenBuckets(max_keys=100_000)
+        limit = RateLimit(600, 60)
+        for n in range(100_000):
+            buckets.hit(f"ip:{n}", limit)
+        clients = iter(range(10**9))
+
+        assert benchmark(lambda: buckets.hit(f"ip:{next(clients) % 200_000}", limit)).limit == 600
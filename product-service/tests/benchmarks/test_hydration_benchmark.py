@@ -0,0 +1,29 @@
+"""
+Cost of turning a 100-document cursor into Product models with each HydrationMode.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group
+"""
+import pytest
+
+from core.hydration import HydrationMode, Hydrator
+from core.responses import dumps
+from models.products import Product
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.slow
+class TestProductHydration:
+    """Hydration alone, and hydration followed by rendering the page."""
+
+    @pytest.mark.parametrize("mode", list(HydrationMode))
+    @pytest.mark.benchmark(group="hydrate-100")
+    def test_hydrate(self, benchmark, mode, product_page_documents):
+        hydrator = Hydrator(Product, mode)
+        assert len(benchmark(hydrator.many, product_page_documents)) == 100
+
+    @pytest.mark.parametrize("mode", list(HydrationMode))
+    @pytest.mark.benchmark(group="hydrate-and-render-100")
+    def test_hydrate_and_render(self, benchmark, mode, product_page_documents):
+        hydrator = Hydrator(Product, mode)
+        assert benchmark(lambda: dumps(hydrator.many(product_page_documents))).startswith(b"[")
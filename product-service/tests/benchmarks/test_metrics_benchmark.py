@@ -0,0 +1,77 @@
+"""
+Cost of recording metrics on the request path.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from core.metrics import MetricsRegistry
+from middleware import MetricsMiddleware
+
+pytest.importorskip("pytest_benchmark")
+
+REQUESTS_PER_ROUND = 200
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products/{product_id}")
+    async def product(product_id: str):
+        return {"id": product_id}
+
+    return app
+
+
+async def drive(app, count: int) -> None:
+    async def send(message):
+        pass
+
+    for n in range(count):
+        path = f"/products/{n}"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+            "headers": [(b"host", b"bench")], "client": ("10.0.0.1", 1234), "server": ("bench", 80),
+            "root_path": "",
+        }
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        await app(scope, receive, send)
+
+
+@pytest.mark.slow
+class TestMetricsOverhead:
+    """Requests per second with and without MetricsMiddleware, and the raw cost of one observation."""
+
+    @pytest.fixture
+    def loop(self):
+        loop = asyncio.new_event_loop()
+        yield loop
+        loop.close()
+
+    def run(self, benchmark, loop, app):
+        benchmark.pedantic(lambda: loop.run_until_complete(drive(app, REQUESTS_PER_ROUND)), rounds=20, warmup_rounds=2)
+        benchmark.extra_info["requests_per_second"] = round(REQUESTS_PER_ROUND / benchmark.stats.stats.mean)
+
+    @pytest.mark.benchmark(group="metrics-requests")
+    def test_without_metrics(self, benchmark, loop):
+        self.run(benchmark, loop, make_app())
+
+    @pytest.mark.benchmark(group="metrics-requests")
+    def test_with_metrics(self, benchmark, loop):
+        app = make_app()
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+        self.run(benchmark, loop, app)
+
+    @pytest.mark.benchmark(group="metrics-observe")
+    def test_labelled_histogram_observe(self, benchmark):
+        histogram = MetricsRegistry().histogram("latency_seconds", "Latency", labels=("method", "route", "status"))
+
+        benchmark(lambda: histogram.labels("GET", "/products/{product_id}", "200").observe(0.012))
@@ -0,0 +1,90 @@
+"""
+The ProductPipeline aggregations and the /products/filter pipeline against a seeded MongoDB.
+
+Needs a server: set BENCHMARK_MONGO_URI (e.g. mongodb://localhost:27017). A generated catalog
+of BENCHMARK_CATALOG_SIZE products (default 10k, see loadtest.catalog) is loaded into the
+``afrifurn_benchmark`` database first, so pagination, grouping and sorting run at a realistic
+size. Skipped without a server.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import os
+
+import pytest
+
+from loadtest.catalog import build_generator, load_catalog, parse_size
+from models.products import ProductPipeline
+
+pytest.importorskip("pytest_benchmark")
+
+MONGO_URI = os.getenv("BENCHMARK_MONGO_URI")
+DATABASE_NAME = "afrifurn_benchmark"
+
+pytestmark = pytest.mark.skipif(not MONGO_URI, reason="BENCHMARK_MONGO_URI is not set")
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    generator = build_generator(parse_size(os.getenv("BENCHMARK_CATALOG_SIZE", "10k")))
+    print(f"\nloaded {load_catalog(MONGO_URI, DATABASE_NAME, generator)}")  # type: ignore[arg-type]
+    return generator
+
+
+@pytest.fixture(scope="module")
+def products(catalog):
+    from pymongo import MongoClient
+
+    client = MongoClient(MONGO_URI)
+    yield client[DATABASE_NAME]["products"]
+    client.close()
+
+
+@pytest.fixture(scope="module")
+def busiest_category(products):
+    [top] = products.aggregate([{"$sortByCount": "$category.name"}, {"$limit": 1}])
+    return top["_id"]
+
+
+def run(benchmark, products, pipeline):
+    return benchmark.pedantic(lambda: list(products.aggregate(pipeline)), rounds=15, warmup_rounds=2)
+
+
+@pytest.mark.slow
+class TestProductPipelines:
+    """Aggregations behind the category and listing endpoints."""
+
+    @pytest.mark.benchmark(group="pipelines")
+    def test_by_level_two_category_name(self, benchmark, products, busiest_category):
+        groups = run(benchmark, products, ProductPipeline.get_products_by_level_two_category_name(busiest_category))
+        assert groups[0]["category_name"] == busiest_category
+
+    @pytest.mark.benchmark(group="pipelines")
+    def test_by_level_one_category_name(self, benchmark, products, catalog):
+        name = catalog.level2_categories[0]["level_one_category"]["name"]
+        groups = run(benchmark, products, ProductPipeline.get_products_by_level_one_category_name(name))
+        assert len(groups[0]["products"]) == 10
+
+    @pytest.mark.benchmark(group="pipelines")
+    def test_by_category(self, benchmark, products, busiest_category):
+        assert run(benchmark, products, ProductPipeline.get_products_by_category(busiest_category)) is not None
+
+    @pytest.mark.benchmark(group="pipelines")
+    def test_filter_page_deep_skip_sorted_by_price(self, benchmark, products):
+        pipeline = [
+            {"$match": {"is_archived": False}},
+            {"$sort": {"price": 1}},
+            {"$skip": 50 * 10},
+            {"$limit": 10},
+        ]
+        assert len(run(benchmark, products, pipeline)) == 10
+
+    @pytest.mark.benchmark(group="pipelines")
+    def test_filter_page_summary_view(self, benchmark, products):
+        pipeline = [
+            {"$match": {"is_archived": False, "price": {"$gte": 100, "$lte": 400}}},
+            {"$sort": {"views": -1}},
+            {"$skip": 0},
+            {"$limit": 10},
+            ProductPipeline.summary_projection(),
+        ]
+        assert len(run(benchmark, products, pipeline)) == 10
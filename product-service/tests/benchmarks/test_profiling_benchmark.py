@@ -0,0 +1,81 @@
+"""
+Cost of the profiling hook: not installed, installed but idle, and sampling 1 in 100 requests.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from core.profiling import ProfileStore
+from middleware import ProfilingMiddleware
+
+pytest.importorskip("pytest_benchmark")
+
+REQUESTS_PER_ROUND = 200
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products/filter")
+    async def products():
+        return [{"name": "Oslo bed", "price": 450.0}]
+
+    return app
+
+
+async def drive(app, count: int) -> None:
+    headers = [(b"host", b"bench"), (b"accept", b"application/json"), (b"accept-encoding", b"gzip, br")]
+
+    async def send(message):
+        pass
+
+    for _ in range(count):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/products/filter", "raw_path": b"/products/filter",
+            "query_string": b"", "headers": headers, "client": ("10.0.0.1", 1234),
+            "server": ("bench", 80), "root_path": "",
+        }
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        await app(scope, receive, send)
+
+
+@pytest.mark.slow
+class TestProfilingOverhead:
+    """Requests per second with the profiling hook idle and sampling."""
+
+    @pytest.fixture
+    def loop(self):
+        loop = asyncio.new_event_loop()
+        yield loop
+        loop.close()
+
+    def run(self, benchmark, loop, app):
+        benchmark.pedantic(lambda: loop.run_until_complete(drive(app, REQUESTS_PER_ROUND)), rounds=20, warmup_rounds=2)
+        benchmark.extra_info["requests_per_second"] = round(REQUESTS_PER_ROUND / benchmark.stats.stats.mean)
+
+    @pytest.mark.benchmark(group="profiling")
+    def test_not_installed(self, benchmark, loop):
+        self.run(benchmark, loop, make_app())
+
+    @pytest.mark.benchmark(group="profiling")
+    def test_installed_idle(self, benchmark, loop, tmp_path):
+        app = make_app()
+        app.add_middleware(ProfilingMiddleware, store=ProfileStore(str(tmp_path)), sample_every=0)
+        self.run(benchmark, loop, app)
+
+    @pytest.mark.benchmark(group="profiling")
+    def test_sampling_one_in_100(self, benchmark, loop, tmp_path):
+        store = ProfileStore(str(tmp_path), max_profiles=10)
+        app = make_app()
+        app.add_middleware(ProfilingMiddleware, store=store, sample_every=100)
+        self.run(benchmark, loop, app)
+
+        assert store.list()
@@ -0,0 +1,148 @@
+"""
+Requests per second through a small app with request logging off, as it was, and as it is now.
+
+- off: no logging middleware
+- before: BaseHTTPMiddleware writing two text lines per request to a FileHandler on the event loop
+- after: RequestLoggingMiddleware (pure ASGI) logging through a QueueHandler; with the default
+  sample rate and, for the worst case, with every request logged
+
+Requests are driven straight into the ASGI app, so the numbers are the middleware's own cost.
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import asyncio
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+import pytest
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from config.logging_setup import JsonFormatter
+from middleware import RequestLoggingMiddleware
+
+pytest.importorskip("pytest_benchmark")
+
+REQUESTS_PER_ROUND = 200
+
+
+class BeforeLoggingMiddleware(BaseHTTPMiddleware):
+    """The middleware main.py used to install."""
+
+    def __init__(self, app, logger):
+        super().__init__(app)
+        self.logger = logger
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = f"{time.time()}"
+        client_host = request.client.host if request.client else "unknown"
+        self.logger.info(f"Request started - ID: {request_id} | Path: {request.url.path} | Client: {client_host}")
+        start_time = time.time()
+        response = await call_next(request)
+        self.logger.info(
+            f"Request completed - ID: {request_id} | Status: {response.status_code} | "
+            f"Duration: {time.time() - start_time:.4f}s"
+        )
+        return response
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products/filter")
+    async def products():
+        return [{"name": "Oslo bed", "price": 450.0}]
+
+    return app
+
+
+async def drive(app, count: int) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/products/filter", "raw_path": b"/products/filter",
+        "query_string": b"page=1", "headers": [(b"host", b"bench")], "client": ("10.0.0.1", 1234),
+        "server": ("bench", 80), "root_path": "",
+    }
+
+    async def send(message):
+        pass
+
+    for _ in range(count):
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        await app(dict(scope), receive, send)
+
+
+@pytest.mark.slow
+class TestRequestLoggingThroughput:
+    """Requests per second with each logging setup."""
+
+    @pytest.fixture
+    def loop(self):
+        loop = asyncio.new_event_loop()
+        yield loop
+        loop.close()
+
+    @pytest.fixture
+    def file_logger(self, tmp_path):
+        """A logger writing synchronously to a file, as the old setup did"""
+        logger = logging.getLogger("bench.before")
+        handler = logging.FileHandler(tmp_path / "before.log")
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        yield logger
+        logger.removeHandler(handler)
+        handler.close()
+
+    @pytest.fixture
+    def queued_access_logger(self, tmp_path):
+        """The access logger feeding a queue drained by a listener thread, as configure_logging sets up"""
+        access = logging.getLogger("access")
+        file_handler = logging.FileHandler(tmp_path / "after.log")
+        file_handler.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler)
+        queue_handler = QueueHandler(log_queue)
+        access.addHandler(queue_handler)
+        access.setLevel(logging.INFO)
+        access.propagate = False
+        listener.start()
+        yield tmp_path / "after.log"
+        listener.stop()
+        access.removeHandler(queue_handler)
+        access.propagate = True
+        file_handler.close()
+
+    def run(self, benchmark, loop, app):
+        benchmark.pedantic(lambda: loop.run_until_complete(drive(app, REQUESTS_PER_ROUND)), rounds=20, warmup_rounds=2)
+        benchmark.extra_info["requests_per_second"] = round(REQUESTS_PER_ROUND / benchmark.stats.stats.mean)
+
+    @pytest.mark.benchmark(group="request-logging")
+    def test_off(self, benchmark, loop):
+        self.run(benchmark, loop, make_app())
+
+    @pytest.mark.benchmark(group="request-logging")
+    def test_before_base_http_middleware_sync_file(self, benchmark, loop, file_logger):
+        app = make_app()
+        app.add_middleware(BeforeLoggingMiddleware, logger=file_logger)
+        self.run(benchmark, loop, app)
+
+    @pytest.mark.benchmark(group="request-logging")
+    def test_after_asgi_queue_sampled(self, benchmark, loop, queued_access_logger):
+        app = make_app()
+        app.add_middleware(RequestLoggingMiddleware, sample_rate=0.1)
+        self.run(benchmark, loop, app)
+
+    @pytest.mark.benchmark(group="request-logging")
+    def test_after_asgi_queue_every_request(self, benchmark, loop, queued_access_logger):
+        app = make_app()
+        app.add_middleware(RequestLoggingMiddleware, sample_rate=1.0)
+        self.run(benchmark, loop, app)
+
+        assert queued_access_logger.exists()
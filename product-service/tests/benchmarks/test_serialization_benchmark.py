@@ -0,0 +1,44 @@
+"""
+Serialisation cost of a 100-product listing page.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group
+"""
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+
+from core.responses import FastJSONResponse
+from models.products import Product
+
+pytest.importorskip("pytest_benchmark")
+
+PAGE_FIELD = create_response_field(name="response", type_=List[Product])
+
+
+def fastapi_serialize(products):
+    """What FastAPI does for response_model=List[Product]: validate, then dump in JSON mode."""
+    value, errors = PAGE_FIELD.validate(products, {}, loc=("response",))
+    assert not errors
+    return PAGE_FIELD.serialize(value, by_alias=True)
+
+
+@pytest.mark.slow
+class TestProductPageSerialization:
+    """Before/after timings for rendering a 100-product page."""
+
+    @pytest.mark.benchmark(group="product-page-100")
+    def test_before_stdlib_json_with_validation(self, benchmark, product_page):
+        body = benchmark(lambda: JSONResponse(fastapi_serialize(product_page)).body)
+        assert body.startswith(b"[")
+
+    @pytest.mark.benchmark(group="product-page-100")
+    def test_after_orjson_with_validation(self, benchmark, product_page):
+        body = benchmark(lambda: FastJSONResponse(fastapi_serialize(product_page)).body)
+        assert body.startswith(b"[")
+
+    @pytest.mark.benchmark(group="product-page-100")
+    def test_after_trusted_pydantic_core(self, benchmark, product_page):
+        body = benchmark(lambda: FastJSONResponse(product_page).body)
+        assert body.startswith(b"[")
@@ -0,0 +1,81 @@
+"""
+Worker start-up: time to import the application, measured in a fresh interpreter.
+
+Importing ``main`` must not touch MongoDB, so these run the same with the database down.
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group -s
+"""
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Boot budget for ``import main`` with Mongo unreachable, timed inside the child so that
+# interpreter start-up and teardown are left out; about 0.8s measured locally
+IMPORT_BUDGET_SECONDS = 1.0
+
+# Heavy modules that only some endpoints or the ``__main__`` entry point need
+DEFERRED_MODULES = {"pandas", "PIL", "httpx", "dns", "uvicorn"}
+
+IMPORT_MAIN = "import main, database; assert database._client is None, 'MongoClient created at import'"
+TIMED_IMPORT_MAIN = f"import time; start = time.perf_counter(); {IMPORT_MAIN}; print(time.perf_counter() - start)"
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """``(module, self us, cumulative us)`` for every line of ``-X importtime`` output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not own.strip().isdigit():
+            continue
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+@pytest.mark.slow
+class TestStartup:
+    """Import cost of the application module."""
+
+    @pytest.mark.benchmark(group="startup")
+    def test_import_main(self, benchmark):
+        import_seconds = []
+
+        def import_main() -> None:
+            result = run_python("-c", TIMED_IMPORT_MAIN)
+            assert result.returncode == 0, result.stderr
+            import_seconds.append(float(result.stdout.split()[-1]))
+
+        benchmark.pedantic(import_main, rounds=3, iterations=1)
+
+        # Noise only ever adds time, so the fastest round is the closest to the real cost
+        assert min(import_seconds) < IMPORT_BUDGET_SECONDS
+
+    def test_import_breakdown(self):
+        result = run_python("-X", "importtime", "-c", IMPORT_MAIN)
+        assert result.returncode == 0, result.stderr
+
+        modules = parse_importtime(result.stderr)
+        total = next(cumulative for name, _, cumulative in modules if name == "main")
+        print(f"\nimport main: {total / 1e6:.3f}s")
+        for name, own, _ in sorted(modules, key=lambda module: -module[1])[:10]:
+            print(f"  {own / 1e3:8.1f}ms  {name}")
+
+        # -X importtime adds its own overhead, so the budget is checked by test_import_main
+        assert not DEFERRED_MODULES & {name for name, _, _ in modules}
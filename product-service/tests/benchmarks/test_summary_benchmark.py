@@ -0,0 +1,33 @@
+"""
+Payload size and serialisation cost of full versus summary listing pages.
+
+Run with: pytest tests/benchmarks -m slow --benchmark-group-by=group
+"""
+import pytest
+
+from core.responses import dumps
+from models.products import ProductSummary
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.slow
+class TestListingPageViews:
+    """Full Product pages against ProductSummary pages of the same 100 documents."""
+
+    @pytest.fixture
+    def summary_page(self, product_page_documents):
+        return [ProductSummary.from_document(document) for document in product_page_documents]
+
+    def test_summary_payload_is_smaller(self, product_page, summary_page):
+        full, summary = len(dumps(product_page)), len(dumps(summary_page))
+        print(f"\nfull page: {full} bytes, summary page: {summary} bytes ({summary / full:.0%})")
+        assert summary < full / 2
+
+    @pytest.mark.benchmark(group="listing-view-100")
+    def test_full_view(self, benchmark, product_page):
+        assert benchmark(dumps, product_page).startswith(b"[")
+
+    @pytest.mark.benchmark(group="listing-view-100")
+    def test_summary_view(self, benchmark, summary_page):
+        assert benchmark(dumps, summary_page).startswith(b"[")
@@ -4,9 +4,12 @@ Test configuration and fixtures for the AfriFurn product service.
 import pytest
 import asyncio
 import logging
+from datetime import datetime
 from typing import AsyncGenerator, Dict, Any
 from unittest.mock import AsyncMock, MagicMock
 
+from bson import ObjectId
+
 from core.interfaces import ICacheService
 from core.dto import ProductCreateDTO, ProductUpdateDTO
 from models.products import Product, Dimensions
@@ -34,6 +37,8 @@ def mock_cache_service() -> ICacheService:
     cache_service.set.return_value = None
     cache_service.delete.return_value = None
     cache_service.exists.return_value = False
+    cache_service.get_many.return_value = {}
+    cache_service.set_many.return_value = None
     return cache_service
 
 
@@ -163,6 +168,59 @@ def sample_products_data() -> list:
     ]
 
 
+def make_product_document(index: int) -> Dict[str, Any]:
+    """A product document shaped like the ones stored in Mongo, with the category chain embedded."""
+    product_id = ObjectId()
+    return {
+        "_id": product_id,
+        "name": f"Oslo Bed {index}",
+        "short_name": f"oslo-bed-{index}",
+        "description": "Solid wood bed frame with a slatted base and padded headboard",
+        "category": {
+            "_id": ObjectId(),
+            "name": "Bedroom Sets",
+            "short_name": "bedroom-sets",
+            "images": ["static/images/bedroom-sets.webp"],
+            "level_one_category": {
+                "_id": ObjectId(),
+                "name": "Bedroom",
+                "short_name": "bedroom",
+                "images": ["static/images/bedroom.webp"],
+                "category": {"_id": ObjectId(), "name": "Furniture", "short_name": "furniture"},
+            },
+        },
+        "dimensions": {"width": 160.0, "height": 110.0, "length": 210.0, "depth": 12.0, "weight": 65.0},
+        "price": 499.0 + index,
+        "currency": "USD",
+        "material": "oak",
+        "color_codes": ["#5C4033", "#F5F5DC"],
+        "product_variants": [
+            {"_id": ObjectId(), "color_id": code, "quantity_in_stock": 4, "product_id": str(product_id),
+             "images": [f"static/images/oslo-bed-{index}-{n}.webp" for n in range(3)]}
+            for code in ("#5C4033", "#F5F5DC")
+        ],
+        "product_features": [
+            {"name": "Storage drawers", "description": "Two drawers under the base"},
+            {"name": "Slatted base", "description": "Sprung slats for mattress ventilation"},
+        ],
+        "views": index * 7,
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": datetime(2024, 1, 1),
+    }
+
+
+@pytest.fixture
+def product_page_documents() -> list:
+    """A 100-product listing page as Mongo returns it."""
+    return [make_product_document(i) for i in range(100)]
+
+
+@pytest.fixture
+def product_page(product_page_documents) -> list:
+    """A 100-product listing page as validated Product models."""
+    return [Product(**document) for document in product_page_documents]
+
+
 @pytest.fixture
 def product_service_with_mocks(mock_cache_service, mock_repository) -> ProductService:
     """Product service with mocked dependencies."""
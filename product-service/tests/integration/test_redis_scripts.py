@@ -0,0 +1,207 @@
+"""
+The Lua scripts that keep shared state in Redis, run against a real server.
+
+The unit tests answer the scripts with Python stand-ins, so the Lua itself only runs here.
+Needs a server: set TEST_REDIS_URL (e.g. redis://localhost:6379/15). Every test works under
+its own key prefix and deletes its keys afterwards. Skipped without a server.
+"""
+import os
+import time
+import uuid
+from typing import Any, Dict, List
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from fastapi import HTTPException
+
+from decorators.circuit_breaker import CircuitBreaker
+from decorators.redis_provider import close_connection_pools
+from services.repository.cart_repository import CartRepository
+from services.repository.redis_cart_repository import RedisCartRepository
+from utils.rate_limiter import RateLimit, RateLimiter
+
+REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+PRODUCT = {"_id": ObjectId(), "name": "Oslo Bed", "price": 200.0, "discount": 15}
+VARIANTS = [{"_id": ObjectId(), "images": ["oslo-oak.webp"]}, {"_id": ObjectId(), "images": ["oslo-ash.webp"]}]
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not REDIS_URL, reason="TEST_REDIS_URL is not set"),
+]
+
+
+@pytest_asyncio.fixture
+async def key_prefix():
+    import redis.asyncio as redis
+
+    prefix = f"afrifurn-test-{uuid.uuid4().hex[:8]}"
+    yield prefix
+    client = redis.Redis.from_url(REDIS_URL)
+    try:
+        keys = [key async for key in client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await client.delete(*keys)
+    finally:
+        await client.aclose()
+        # Pools are bound to the event loop of the test that created them
+        await close_connection_pools()
+
+
+class TestTokenBucketScript:
+    """Test cases for TOKEN_BUCKET_SCRIPT behind RateLimiter."""
+
+    @pytest.fixture
+    def limiter(self, key_prefix):
+        limiter = RateLimiter(REDIS_URL, key_prefix=key_prefix)
+        limiter.circuit_breaker = CircuitBreaker(failure_threshold=1)
+        return limiter
+
+    @pytest.mark.asyncio
+    async def test_burst_then_reject_with_retry_after(self, limiter):
+        limit = RateLimit(1, 60, burst=2)
+
+        decisions = [await limiter.hit("export", "ip:1", limit) for _ in range(3)]
+
+        assert [decision.allowed for decision in decisions] == [True, True, False]
+        assert decisions[1].remaining == 0
+        assert 0 < decisions[2].retry_after_seconds <= 60
+        assert limiter.circuit_breaker.total_failures == 0
+        assert len(limiter.local) == 0
+
+    @pytest.mark.asyncio
+    async def test_clients_and_costs_are_counted_separately(self, limiter):
+        limit = RateLimit(10, 1, burst=10)
+
+        assert (await limiter.hit("export", "ip:1", limit, cost=10)).allowed
+        assert not (await limiter.hit("export", "ip:1", limit, cost=5)).allowed
+        assert (await limiter.hit("export", "ip:2", limit, cost=5)).remaining == 5
+
+
+class MongoCollection:
+    """The Mongo calls the cart store makes, on documents kept by ``_id``."""
+
+    def __init__(self, documents: List[Dict[str, Any]] = ()):
+        self.documents = {doc["_id"]: doc for doc in documents}
+
+    def find_one(self, criteria: Dict[str, Any], projection: Dict[str, Any] = None):
+        return next((doc for doc in self.documents.values()
+                     if all(doc.get(field) == value for field, value in criteria.items())), None)
+
+    def bulk_write(self, operations: List[Any], ordered: bool = True):
+        for operation in operations:
+            self.documents[operation._filter["_id"]] = {"_id": operation._filter["_id"], **operation._doc["$set"]}
+
+
+class TestCartScripts:
+    """Test cases for the cart scripts behind RedisCartRepository."""
+
+    @pytest.fixture
+    def carts(self):
+        return MongoCollection()
+
+    @pytest.fixture
+    def repository(self, key_prefix, carts):
+        mongo = CartRepository()
+        mongo.db = {"cart": carts, "products": MongoCollection([PRODUCT]), "variants": MongoCollection(VARIANTS)}
+        repository = RedisCartRepository(REDIS_URL, key_prefix=key_prefix, idle_seconds=60, carts=mongo)
+        repository.circuit_breaker = CircuitBreaker(failure_threshold=1)
+        return repository
+
+    async def add(self, repository, variant: int = 0, quantity: int = 1, user_id: str = "user-1"):
+        return await repository.add_to_cart(user_id, str(PRODUCT["_id"]), str(VARIANTS[variant]["_id"]), quantity)
+
+    @pytest.mark.asyncio
+    async def test_adding_a_variant_again_increments_its_line(self, repository):
+        await self.add(repository, quantity=1)
+        cart = await self.add(repository, quantity=2)
+
+        [item] = cart.items
+        assert item.quantity == 3
+        assert cart.total_amount == 510.0
+        client = repository._get_client()
+        assert await client.smembers(repository.dirty_key) == {cart.id}
+        assert await client.zscore(repository.active_key, cart.id) is not None
+        assert await client.get(repository._user_key("user-1")) == cart.id
+        assert 0 < await client.pttl(repository._user_key("user-1")) <= repository.ttl_ms
+
+    @pytest.mark.asyncio
+    async def test_quantity_is_set_only_for_items_in_the_cart(self, repository):
+        cart = await self.add(repository)
+
+        updated = await repository.update_item_quantity(cart.id, cart.items[0].id, 4)
+        assert updated.items[0].quantity == 4
+        assert updated.total_amount == 680.0
+
+        with pytest.raises(HTTPException) as error:
+            await repository.update_item_quantity(cart.id, str(ObjectId()), 4)
+        assert error.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_removed_items_take_their_line_with_them(self, repository):
+        await self.add(repository, variant=0)
+        cart = await self.add(repository, variant=1)
+        removed = cart.items[0]
+
+        assert await repository.remove_from_cart(cart.id, [removed.id, str(ObjectId())])
+        assert not await repository.remove_from_cart(cart.id, [removed.id])
+        assert [item.variant_id for item in (await repository.get_cart(cart.id)).items] == [str(VARIANTS[1]["_id"])]
+
+        # The variant is a new line again, not an increment of the removed one
+        readded = await self.add(repository, variant=0)
+        assert {item.quantity for item in readded.items} == {1}
+        assert removed.id not in {item.id for item in readded.items}
+
+    @pytest.mark.asyncio
+    async def test_clear_keeps_the_owner_and_slides_the_owner_key(self, repository):
+        cart = await self.add(repository)
+        client = repository._get_client()
+        user_key = repository._user_key("user-1")
+        await client.pexpire(user_key, 1000)
+
+        assert await repository.clear_cart(cart.id)
+
+        assert await client.pttl(user_key) > 1000
+        cleared = await repository.find_by_user_id("user-1")
+        assert cleared.id == cart.id
+        assert cleared.items == []
+
+    @pytest.mark.asyncio
+    async def test_cart_only_in_mongo_is_loaded_once(self, repository, carts):
+        cart = await self.add(repository, quantity=2)
+        await repository.persist(cart.id)
+        client = repository._get_client()
+        await client.delete(repository._cart_key(cart.id), repository._user_key("user-1"))
+
+        loaded = await repository.update_item_quantity(cart.id, cart.items[0].id, 5)
+        assert loaded.items[0].quantity == 5
+        assert await client.get(repository._user_key("user-1")) == cart.id
+
+        # A second load would overwrite changes not yet written to Mongo
+        stale = await repository.carts.get_cart(cart.id)
+        await repository._load(cart.id, stale)
+        assert (await repository.get_cart(cart.id)).items[0].quantity == 5
+
+    @pytest.mark.asyncio
+    async def test_idle_carts_are_evicted_unless_touched_since(self, repository, carts):
+        idle = await self.add(repository, user_id="user-1")
+        touched = await self.add(repository, user_id="user-2")
+        client = repository._get_client()
+        await client.zadd(repository.active_key, {idle.id: 100, touched.id: 100})
+
+        # Touched by a change after the eviction pass read the activity index
+        original = repository._write
+
+        async def write_then_touch(cart_ids):
+            written = await original(cart_ids)
+            await repository.clear_cart(touched.id)
+            return written
+
+        repository._write = write_then_touch
+        assert await repository.evict_idle(now=time.time()) == 1
+
+        assert not await client.exists(repository._cart_key(idle.id), repository._user_key("user-1"))
+        assert await client.zscore(repository.active_key, idle.id) is None
+        assert ObjectId(idle.id) in carts.documents
+        assert await client.exists(repository._cart_key(touched.id), repository._user_key("user-2")) == 2
@@ -0,0 +1,252 @@
+"""
+Unit tests for adaptive admission control and load shedding.
+"""
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from core.metrics import MetricsRegistry
+from middleware import AdmissionControlMiddleware, AIMDLimit
+
+PRIORITIES = {"/health": "exempt", "/bulk-import": "low", "/products/filter-one": "high"}
+
+
+class BlockingApp:
+    """Answers each request once the test releases its path"""
+
+    def __init__(self):
+        self.gates: Dict[str, asyncio.Event] = {}
+        self.started: List[str] = []
+
+    def release(self, path: str) -> None:
+        self.gates.setdefault(path, asyncio.Event()).set()
+
+    async def __call__(self, scope, receive, send):
+        self.started.append(scope["path"])
+        await self.gates.setdefault(scope["path"], asyncio.Event()).wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+def make_middleware(app, limit: int = 2, **kwargs) -> AdmissionControlMiddleware:
+    return AdmissionControlMiddleware(
+        app, limit=AIMDLimit(initial=limit, minimum=limit, maximum=limit), priorities=PRIORITIES,
+        registry=MetricsRegistry(), **kwargs,
+    )
+
+
+async def request(middleware, path: str) -> Dict:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware({"type": "http", "method": "GET", "path": path, "headers": []}, None, send)
+    start = messages[0]
+    return {"status": start["status"], "headers": dict(start["headers"])}
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAIMDLimit:
+    """Test cases for the additive increase, multiplicative decrease limit."""
+
+    def test_grows_by_about_one_per_round_while_busy(self):
+        limit = AIMDLimit(initial=10, maximum=100, latency_target_seconds=0.5)
+
+        for n in range(10):
+            limit.on_sample(0.01, in_flight=10, dropped=False, now=n)
+
+        assert limit.limit == 10
+        limit.on_sample(0.01, in_flight=10, dropped=False, now=11)
+        assert limit.limit == 11
+
+    def test_does_not_grow_while_mostly_idle(self):
+        limit = AIMDLimit(initial=10, latency_target_seconds=0.5)
+
+        for n in range(50):
+            limit.on_sample(0.01, in_flight=1, dropped=False, now=n)
+
+        assert limit.limit == 10
+
+    def test_backs_off_once_per_latency_target(self):
+        limit = AIMDLimit(initial=100, minimum=4, latency_target_seconds=0.5, backoff_ratio=0.9)
+
+        limit.on_sample(0.8, in_flight=100, dropped=False, now=10.0)
+        limit.on_sample(0.9, in_flight=100, dropped=False, now=10.1)
+        assert limit.limit == 90
+
+        limit.on_sample(0.01, in_flight=100, dropped=True, now=10.6)
+        assert limit.limit == 81
+
+    def test_stays_within_bounds(self):
+        limit = AIMDLimit(initial=5, minimum=4, maximum=6, latency_target_seconds=0.5)
+
+        for n in range(20):
+            limit.on_sample(5.0, in_flight=5, dropped=False, now=n)
+        assert limit.limit == 4
+        for n in range(200):
+            limit.on_sample(0.01, in_flight=6, dropped=False, now=100 + n)
+        assert limit.limit == 6
+
+
+class TestAdmissionControlMiddleware:
+    """Test cases for queueing, priorities and shedding."""
+
+    @pytest.mark.asyncio
+    async def test_queued_request_runs_when_a_slot_frees(self):
+        app = BlockingApp()
+        # Normal requests may fill 90% of the limit, the rest is kept for high priority
+        middleware = make_middleware(app, limit=3)
+
+        first = asyncio.create_task(request(middleware, "/a"))
+        second = asyncio.create_task(request(middleware, "/b"))
+        queued = asyncio.create_task(request(middleware, "/c"))
+        await settle()
+        assert app.started == ["/a", "/b"]
+        assert middleware.snapshot() == {"limit": 3, "in_flight": 2, "queued": 1}
+
+        app.release("/a")
+        app.release("/c")
+        assert (await queued)["status"] == 200
+        assert (await first)["status"] == 200
+        app.release("/b")
+        await second
+        assert middleware.snapshot() == {"limit": 3, "in_flight": 0, "queued": 0}
+
+    @pytest.mark.asyncio
+    async def test_sheds_with_retry_after_when_the_wait_runs_out(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=1, queue_timeout_seconds=0.02, retry_after_seconds=3)
+
+        busy = asyncio.create_task(request(middleware, "/a"))
+        await settle()
+        shed = await request(middleware, "/b")
+
+        assert shed["status"] == 503
+        assert shed["headers"][b"retry-after"] == b"3"
+        assert middleware.snapshot()["queued"] == 0
+        app.release("/a")
+        await busy
+
+    @pytest.mark.asyncio
+    async def test_sheds_at_once_when_the_queue_is_full(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=1, max_queue=1)
+
+        busy = asyncio.create_task(request(middleware, "/a"))
+        waiting = asyncio.create_task(request(middleware, "/b"))
+        await settle()
+
+        assert (await request(middleware, "/c"))["status"] == 503
+        app.release("/a")
+        app.release("/b")
+        await asyncio.gather(busy, waiting)
+
+    @pytest.mark.asyncio
+    async def test_abandoned_waiters_do_not_fill_the_queue(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=1, max_queue=3, queue_timeout_seconds=0.02)
+
+        busy = asyncio.create_task(request(middleware, "/a"))
+        await settle()
+        high = asyncio.create_task(request(middleware, "/products/filter-one"))
+        await settle()
+        # Time out beneath the waiting high-priority request
+        shed = await asyncio.gather(request(middleware, "/bulk-import"), request(middleware, "/bulk-import"))
+        assert [response["status"] for response in shed] == [503, 503]
+        assert middleware.snapshot()["queued"] == 1
+
+        normal = asyncio.create_task(request(middleware, "/products/filter"))
+        await settle()
+        assert not normal.done()
+        assert middleware.snapshot()["queued"] == 2
+
+        app.release("/a")
+        app.release("/products/filter-one")
+        app.release("/products/filter")
+        assert [response["status"] for response in await asyncio.gather(busy, high, normal)] == [200, 200, 200]
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_is_admitted_first(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=1)
+
+        busy = asyncio.create_task(request(middleware, "/a"))
+        await settle()
+        normal = asyncio.create_task(request(middleware, "/products/filter"))
+        await settle()
+        high = asyncio.create_task(request(middleware, "/products/filter-one"))
+        await settle()
+
+        app.release("/a")
+        await settle()
+        assert app.started == ["/a", "/products/filter-one"]
+        app.release("/products/filter-one")
+        app.release("/products/filter")
+        await asyncio.gather(busy, normal, high)
+
+    @pytest.mark.asyncio
+    async def test_high_priority_uses_the_reserved_slot(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=3, queue_timeout_seconds=0.01)
+
+        busy = [asyncio.create_task(request(middleware, path)) for path in ("/a", "/b")]
+        await settle()
+        app.release("/products/filter-one")
+
+        assert (await request(middleware, "/products/filter-one"))["status"] == 200
+        assert (await request(middleware, "/products/filter"))["status"] == 503
+        app.release("/a")
+        app.release("/b")
+        await asyncio.gather(*busy)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=1)
+
+        busy = asyncio.create_task(request(middleware, "/a"))
+        await settle()
+        waiting = asyncio.create_task(request(middleware, "/b"))
+        await settle()
+        waiting.cancel()
+        await settle()
+
+        app.release("/a")
+        await busy
+        assert middleware.snapshot() == {"limit": 1, "in_flight": 0, "queued": 0}
+
+    @pytest.mark.asyncio
+    async def test_low_priority_keeps_to_its_share(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=4, queue_timeout_seconds=0.02)
+
+        imports = [asyncio.create_task(request(middleware, f"/bulk-import/{n}")) for n in range(3)]
+        await settle()
+        assert len(app.started) == 2
+        app.release("/products/filter")
+        assert (await request(middleware, "/products/filter"))["status"] == 200
+
+        assert (await imports[2])["status"] == 503
+        for n in range(2):
+            app.release(f"/bulk-import/{n}")
+        await asyncio.gather(*imports[:2])
+
+    @pytest.mark.asyncio
+    async def test_exempt_paths_bypass_the_limit(self):
+        app = BlockingApp()
+        middleware = make_middleware(app, limit=1, queue_timeout_seconds=0.01)
+
+        busy = asyncio.create_task(request(middleware, "/a"))
+        await settle()
+        app.release("/health/ready")
+
+        assert (await request(middleware, "/health/ready"))["status"] == 200
+        assert middleware.snapshot()["in_flight"] == 1
+        app.release("/a")
+        await busy
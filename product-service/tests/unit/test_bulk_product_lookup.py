@@ -0,0 +1,123 @@
+"""
+Unit tests for bulk product lookups through the cache.
+"""
+from typing import Any, Dict, List
+
+import pytest
+from bson import ObjectId
+
+from repositories.product_repository import ProductRepository
+from services.product_service import ProductService
+
+
+class RecordingCache:
+    """In-memory cache that counts round trips."""
+
+    def __init__(self):
+        self.store: Dict[str, Any] = {}
+        self.round_trips = 0
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        self.round_trips += 1
+        return {key: self.store[key] for key in keys if key in self.store}
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: int = 300) -> None:
+        self.round_trips += 1
+        self.store.update(items)
+
+
+class RecordingCollection:
+    """Collection stand-in that serves documents for ``$in`` queries and counts them."""
+
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = {doc["_id"]: doc for doc in documents}
+        self.queries = 0
+
+    def find(self, criteria: Dict[str, Any]):
+        self.queries += 1
+        return [self.documents[_id] for _id in criteria["_id"]["$in"] if _id in self.documents]
+
+
+def make_product_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": ObjectId(),
+        "name": f"Product {index}",
+        "short_name": f"product-{index}",
+        "description": "A product used in bulk lookup tests",
+        "category": {
+            "name": "Bedroom Sets",
+            "level_one_category": {"name": "Bedroom", "category": {"name": "Furniture"}},
+        },
+        "dimensions": {"width": 10, "height": 10, "length": 10},
+        "price": 100.0 + index,
+        "currency": "USD",
+        "material": "oak",
+    }
+
+
+class TestGetManyByIds:
+    """Test cases for BaseRepository.get_many_by_ids."""
+
+    @pytest.fixture
+    def documents(self):
+        return [make_product_document(i) for i in range(10)]
+
+    @pytest.fixture
+    def repository(self, documents):
+        repository = ProductRepository()
+        repository.db = {"products": RecordingCollection(documents)}
+        return repository
+
+    @pytest.mark.asyncio
+    async def test_cold_lookup_costs_one_query_and_two_cache_round_trips(self, repository, documents):
+        cache = RecordingCache()
+        ids = [str(doc["_id"]) for doc in documents]
+
+        products = await repository.get_many_by_ids(ids, cache_service=cache)
+
+        assert [p.id for p in products] == ids
+        assert repository.db["products"].queries == 1
+        assert cache.round_trips == 2
+        assert set(cache.store) == {f"product:{_id}" for _id in ids}
+
+    @pytest.mark.asyncio
+    async def test_warm_lookup_skips_the_database(self, repository, documents):
+        cache = RecordingCache()
+        ids = [str(doc["_id"]) for doc in documents]
+        await repository.get_many_by_ids(ids, cache_service=cache)
+        cache.round_trips = 0
+
+        products = await repository.get_many_by_ids(list(reversed(ids)), cache_service=cache)
+
+        assert [p.id for p in products] == list(reversed(ids))
+        assert repository.db["products"].queries == 1
+        assert cache.round_trips == 1
+
+    @pytest.mark.asyncio
+    async def test_only_misses_are_fetched(self, repository, documents):
+        cache = RecordingCache()
+        ids = [str(doc["_id"]) for doc in documents]
+        await repository.get_many_by_ids(ids[:5], cache_service=cache)
+
+        products = await repository.get_many_by_ids(ids + [str(ObjectId()), "not-an-id"], cache_service=cache)
+
+        assert [p.id for p in products] == ids
+        assert repository.db["products"].queries == 2
+
+
+class TestProductServiceBulkLookup:
+    """Test cases for ProductService.get_entities_by_ids."""
+
+    @pytest.mark.asyncio
+    async def test_uses_the_bulk_lookup_through_the_service_cache(self):
+        documents = [make_product_document(i) for i in range(3)]
+        cache = RecordingCache()
+        service = ProductService(cache_service=cache)
+        service.repository.db = {"products": RecordingCollection(documents)}
+        ids = [str(doc["_id"]) for doc in documents]
+
+        products = await service.get_entities_by_ids(ids)
+
+        assert [p.id for p in products] == ids
+        assert service.repository.db["products"].queries == 1
+        assert cache.round_trips == 2
@@ -0,0 +1,86 @@
+"""
+Unit tests for compiled, canonical cache keys.
+"""
+from typing import Optional
+
+import pytest
+from fastapi import Query
+
+from decorators.cache_key import CacheKeyTemplate, canonicalize
+
+
+async def filter_products(
+    start_price: Optional[float] = Query(None),
+    colors: str = Query('[]'),
+    name: Optional[str] = Query(None),
+    page: int = Query(1),
+    sort_by: str = Query("_id"),
+    sort_order: int = Query(1),
+):
+    return []
+
+
+def call_kwargs(**overrides):
+    """Keyword arguments as FastAPI passes them: every parameter resolved."""
+    kwargs = {"start_price": None, "colors": "[]", "name": None, "page": 1, "sort_by": "_id", "sort_order": 1}
+    kwargs.update(overrides)
+    return kwargs
+
+
+class TestCacheKeyTemplate:
+    """Test cases for CacheKeyTemplate."""
+
+    @pytest.fixture
+    def template(self):
+        return CacheKeyTemplate(
+            "products:{start_price}:{colors}:{name}:{page}:{sort_by}:{sort_order}",
+            filter_products,
+            case_insensitive=("name",),
+        )
+
+    def test_defaults_are_elided(self, template):
+        assert template.build(kwargs=call_kwargs()) == "products::::::"
+        assert template.build(kwargs=call_kwargs(sort_order=1)) == template.build(kwargs={})
+
+    def test_json_arrays_are_sorted_and_deduplicated(self, template):
+        first = template.build(kwargs=call_kwargs(colors='["#fff","#000"]'))
+        second = template.build(kwargs=call_kwargs(colors='[" #000", "#fff", "#000"]'))
+        assert first == second
+        assert '["#000","#fff"]' in first
+
+    def test_case_is_folded_only_for_case_insensitive_parameters(self, template):
+        assert template.build(kwargs=call_kwargs(name="Sofa")) == template.build(kwargs=call_kwargs(name="sofa"))
+        assert template.build(kwargs=call_kwargs(sort_by="Price")) != template.build(kwargs=call_kwargs(sort_by="price"))
+
+    def test_positional_arguments_are_bound(self, template):
+        assert template.build((10.0,), {}) == template.build(kwargs=call_kwargs(start_price=10))
+
+    def test_long_keys_are_hashed_with_prefix(self):
+        template = CacheKeyTemplate("products:{name}", filter_products, max_length=40)
+        key = template.build(kwargs=call_kwargs(name="x" * 100))
+        assert key.startswith("products:h:")
+        assert len(key) <= 64
+        assert key == template.build(kwargs=call_kwargs(name="x" * 100))
+
+    def test_unknown_placeholder_fails_at_compile_time(self):
+        with pytest.raises(ValueError):
+            CacheKeyTemplate("products:{missing}", filter_products)
+
+    def test_static_key(self):
+        assert CacheKeyTemplate("colors", filter_products).build(kwargs=call_kwargs(page=3)) == "colors"
+
+
+class TestCanonicalize:
+    """Test cases for value canonicalisation."""
+
+    @pytest.mark.parametrize("value,expected", [
+        (100.0, "100"),
+        (99.5, "99.5"),
+        (True, "1"),
+        (["b", "a", "a"], '["a","b"]'),
+        ("[]", ""),
+        ("  walnut ", "walnut"),
+        ("[not json", "[not json"),
+    ])
+    def test_canonical_forms(self, value, expected):
+        assert canonicalize(value) == expected
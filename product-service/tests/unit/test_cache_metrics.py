@@ -0,0 +1,99 @@
+"""
+Unit tests for per-template cache metrics.
+"""
+from typing import Dict, Optional
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from decorators import decorator
+from decorators.decorator import cache_response
+from decorators.metrics import CacheMetrics, cache_metrics
+
+
+class Swatch(BaseModel):
+    name: str
+
+
+class InMemoryRawCache:
+    def __init__(self):
+        self.store: Dict[str, str] = {}
+
+    async def get_raw(self, key: str) -> Optional[str]:
+        return self.store.get(key)
+
+    async def set_raw(self, key: str, payload: str, ttl_seconds: Optional[int] = None) -> None:
+        self.store[key] = payload
+
+
+class TestCacheResponseMetrics:
+    """Test cases for the counters recorded by cache_response."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        cache = InMemoryRawCache()
+        monkeypatch.setattr(decorator, "redis_app", cache)
+        cache_metrics.reset()
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_counts_per_template_not_per_key(self, cache):
+        @cache_response(key="test-swatches:{name}", response_model=Swatch)
+        async def get_swatch(name: str):
+            return Swatch(name=name)
+
+        await get_swatch(name="oak")
+        await get_swatch(name="oak")
+        await get_swatch(name="teak")
+
+        stats = cache_metrics.snapshot()["templates"]["test-swatches:{name}"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["sets"] == 2
+        assert stats["hit_ratio"] == pytest.approx(1 / 3, abs=1e-4)
+        assert stats["bytes_written"] == sum(len(payload) for payload in cache.store.values())
+        assert stats["bytes_read"] == len(cache.store["test-swatches:oak"])
+
+    @pytest.mark.asyncio
+    async def test_errors_fall_back_to_the_handler(self):
+        @cache_response(key="test-broken", response_model=Swatch)
+        async def get_broken():
+            return object()
+
+        result = await get_broken()
+
+        assert result is not None
+        assert cache_metrics.snapshot()["templates"]["test-broken"]["errors"] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_propagate_without_a_second_run(self):
+        calls = []
+
+        @cache_response(key="test-missing:{name}", response_model=Swatch)
+        async def get_missing(name: str):
+            calls.append(name)
+            raise HTTPException(status_code=404, detail="Swatch not found")
+
+        with pytest.raises(HTTPException):
+            await get_missing(name="oak")
+
+        assert calls == ["oak"]
+        assert cache_metrics.snapshot()["templates"]["test-missing:{name}"]["errors"] == 0
+
+
+class TestPrometheusRendering:
+    """Test cases for the Prometheus text output."""
+
+    def test_renders_counters_with_template_label(self):
+        metrics = CacheMetrics()
+        metrics.template('products:{name}').hits = 3
+
+        text = metrics.render_prometheus({"cache_circuit_open": 0}, {"cache_circuit_failures_total": 2})
+
+        assert "# TYPE cache_hits_total counter" in text
+        assert 'cache_hits_total{template="products:{name}"} 3' in text
+        assert "# TYPE cache_circuit_open gauge\ncache_circuit_open 0" in text
+        assert "# TYPE cache_circuit_failures_total counter\ncache_circuit_failures_total 2" in text
+        assert text.endswith("\n")
@@ -0,0 +1,146 @@
+"""
+Unit tests for utils.decorators.cache_result.
+"""
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import pytest
+from bson import ObjectId
+
+import decorators
+from utils.decorators import cache_result, make_cache_key
+
+
+class InMemoryCache:
+    def __init__(self):
+        self.store: Dict[str, Any] = {}
+        self.reads = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        self.reads += 1
+        return self.store.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        self.store[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.store.pop(key, None)
+
+
+class PriceService:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+
+    @cache_result(ttl_seconds=60, namespace="prices")
+    async def quote(self, product_id: ObjectId, quantity: int = 1):
+        self.calls += 1
+        return {"product_id": str(product_id), "total": 10 * quantity}
+
+
+class TestCacheResult:
+    """Test cases for cache_result."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        cache = InMemoryCache()
+        monkeypatch.setattr(decorators, "create_redis_cache_provider", lambda: cache)
+        return cache
+
+    def test_keys_are_stable_across_processes(self):
+        arguments = {"product_id": "65f0c0ffee", "filters": {"b": 2, "a": [1, 2]}}
+        command = (
+            "from utils.decorators import make_cache_key;"
+            f"print(make_cache_key('ns', 1, {arguments!r}))"
+        )
+        keys = {
+            subprocess.run([sys.executable, "-c", command], capture_output=True, text=True, check=True).stdout.strip()
+            for _ in range(2)
+        }
+        assert keys == {make_cache_key("ns", 1, arguments)}
+
+    @pytest.mark.asyncio
+    async def test_self_is_excluded_and_defaults_are_applied(self, cache):
+        product_id = ObjectId()
+        first, second = PriceService("a"), PriceService("b")
+
+        await first.quote(product_id)
+        result = await second.quote(product_id, quantity=1)
+
+        assert result == {"product_id": str(product_id), "total": 10}
+        assert (first.calls, second.calls) == (1, 0)
+        assert PriceService.quote.cache_key(first, product_id) == PriceService.quote.cache_key(second, product_id, 1)
+        assert all(key.startswith("memo:prices:v1:") for key in cache.store)
+
+    @pytest.mark.asyncio
+    async def test_version_bump_changes_the_key(self):
+        async def lookup(code: str):
+            return code
+
+        assert cache_result(version=1)(lookup).cache_key("usd") != cache_result(version=2)(lookup).cache_key("usd")
+
+    @pytest.mark.asyncio
+    async def test_local_cache_skips_redis(self, cache):
+        calls = []
+
+        @cache_result(local_maxsize=8)
+        async def load(day: datetime):
+            calls.append(day)
+            return day.isoformat()
+
+        day = datetime(2025, 1, 1)
+        await load(day)
+        await load(day)
+
+        assert len(calls) == 1
+        assert cache.reads == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_both_tiers(self, cache):
+        calls = []
+
+        @cache_result(local_maxsize=8)
+        async def load(code: str):
+            calls.append(code)
+            return code
+
+        await load("usd")
+        await load.invalidate("usd")
+        await load("usd")
+
+        assert len(calls) == 2
+
+    def test_sync_helpers_use_local_memo_only(self, cache):
+        calls = []
+
+        @cache_result(shared=False, local_maxsize=4)
+        def slugify(name: str) -> str:
+            calls.append(name)
+            return name.lower().replace(" ", "-")
+
+        assert slugify("Oslo Bed") == slugify("Oslo Bed") == "oslo-bed"
+        assert len(calls) == 1
+        assert cache.store == {}
+
+    @pytest.mark.asyncio
+    async def test_unhashable_arguments_bypass_the_cache(self, cache):
+        calls = []
+
+        @cache_result()
+        async def describe(thing: object):
+            calls.append(thing)
+            return "ok"
+
+        await describe(object())
+        await describe(object())
+
+        assert len(calls) == 2
+        assert cache.store == {}
+
+    def test_shared_cache_requires_async(self):
+        with pytest.raises(TypeError):
+            @cache_result()
+            def blocking(code: str):
+                return code
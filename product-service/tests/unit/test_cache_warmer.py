@@ -0,0 +1,118 @@
+"""
+Unit tests for the startup cache warmer.
+"""
+import asyncio
+import logging
+
+import pytest
+from fastapi import FastAPI
+
+from config.logging_setup import JsonFormatter
+
+from services.cache_warmer import CacheWarmer, top_request_paths
+
+BASE_PATH = "/product-service/api/v1"
+
+
+def log_line(method: str, path: str, query: str = "", client: str = "172.18.0.5") -> str:
+    fields = {"method": method, "path": f"{BASE_PATH}{path}", "query": query, "status": 200, "client": client}
+    record = logging.LogRecord("access", logging.INFO, __file__, 0, "request", None, None)
+    record.fields = fields
+    return JsonFormatter().format(record)
+
+
+class TestTopRequestPaths:
+    """Test cases for ranking filter queries from the request log."""
+
+    def test_ranks_get_requests_under_prefixes(self):
+        lines = [
+            log_line("GET", "/products/filter", "colors=%5B%22%23fff%22%5D"),
+            log_line("GET", "/products/filter", "colors=%5B%22%23fff%22%5D"),
+            log_line("GET", "/products/filter", "page=2"),
+            log_line("GET", "/products/filter-one", "short_name=oslo-bed"),
+            log_line("GET", "/products/filter-one", "short_name=oslo-bed"),
+            log_line("GET", "/products/filter-one", "short_name=oslo-bed"),
+            log_line("POST", "/products/filter", "page=3"),
+            log_line("GET", "/colors/"),
+            log_line("GET", "/products/filter", "page=9", client="cache-warmer"),
+        ]
+
+        paths = top_request_paths(lines, BASE_PATH, ["/products/filter"], limit=2)
+
+        assert paths == [
+            "/products/filter-one?short_name=oslo-bed",
+            "/products/filter?colors=%5B%22%23fff%22%5D",
+        ]
+
+    def test_skips_lines_that_are_not_requests(self):
+        lines = [
+            log_line("GET", "/products/filter", "page=2"),
+            '{"time": "2025-01-01T10:00:00.000+00:00", "level": "INFO", "message": "Connected to MongoDB"}',
+            "{not json",
+            "2025-01-01 10:00:00,000 - INFO - Request started - ID: 1.0 | Path: /products/filter | Client: 10.0.0.7",
+        ]
+
+        paths = top_request_paths(lines, BASE_PATH, ["/products/filter"], limit=5)
+
+        assert paths == ["/products/filter?page=2"]
+
+
+class TestCacheWarmer:
+    """Test cases for CacheWarmer."""
+
+    @pytest.fixture
+    def requested(self):
+        return []
+
+    @pytest.fixture
+    def app(self, requested):
+        app = FastAPI()
+
+        @app.get(BASE_PATH + "/colors/")
+        async def list_colors():
+            requested.append("/colors/")
+            return []
+
+        @app.get(BASE_PATH + "/products/filter")
+        async def filter_products(page: int = 1):
+            requested.append(f"/products/filter?page={page}")
+            return []
+
+        @app.get(BASE_PATH + "/slow")
+        async def slow():
+            await asyncio.sleep(5)
+            return []
+
+        return app
+
+    @pytest.mark.asyncio
+    async def test_warms_static_and_logged_paths(self, app, requested, tmp_path):
+        log_file = tmp_path / "app.log"
+        log_file.write_text("\n".join([log_line("GET", "/products/filter", "page=2")] * 3) + "\n")
+        warmer = CacheWarmer(
+            app,
+            base_path=BASE_PATH,
+            static_paths=["/colors/", "/missing"],
+            include_categories=False,
+            log_file=str(log_file),
+            log_prefixes=["/products/filter"],
+        )
+        assert not warmer.ready
+
+        await warmer.run()
+
+        assert warmer.ready
+        assert warmer.status == CacheWarmer.DONE
+        assert sorted(requested) == ["/colors/", "/products/filter?page=2"]
+        assert warmer.summary()["warmed"] == 2
+        assert warmer.summary()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_still_becomes_ready(self, app):
+        warmer = CacheWarmer(app, base_path=BASE_PATH, static_paths=["/slow"], include_categories=False,
+                             timeout_seconds=0.1)
+
+        await warmer.run()
+
+        assert warmer.status == CacheWarmer.TIMED_OUT
+        assert warmer.ready
@@ -0,0 +1,226 @@
+"""
+Unit tests for cart item snapshots and the atomic cart updates.
+"""
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+
+from dependencies.cart import get_cart_service
+from models.cart import Cart, CartItem
+from routers.cart import router as cart_router
+from services.cart_service import CartService
+from services.repository.cart_repository import CART_TOTALS_PIPELINE, CartRepository
+
+PRODUCT = {"_id": ObjectId(), "name": "Oslo Bed", "price": 200.0, "discount": 15}
+VARIANT = {"_id": ObjectId(), "images": ["oslo-oak.webp"]}
+
+
+class RecordingCollection:
+    """Collection stand-in that records every call and answers from canned results."""
+
+    def __init__(self, documents: Optional[List[Dict[str, Any]]] = None, matched: Optional[List[int]] = None):
+        self.documents = {doc["_id"]: doc for doc in documents or []}
+        self.matched = list(matched or [])
+        self.calls: List[tuple] = []
+        self.duplicate_upserts = 0
+
+    def find_one(self, criteria: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+        self.calls.append(("find_one", criteria, projection))
+        return self.documents.get(criteria.get("_id"))
+
+    def update_one(self, criteria: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        self.calls.append(("update_one", criteria, update, upsert))
+        if upsert and self.duplicate_upserts:
+            self.duplicate_upserts -= 1
+            raise DuplicateKeyError("E11000 duplicate key error")
+        matched = self.matched.pop(0) if self.matched else 1
+        return SimpleNamespace(matched_count=matched, modified_count=matched)
+
+    def find(self, criteria: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+        self.calls.append(("find", criteria, projection))
+        return SimpleNamespace(batch_size=lambda size: list(self.documents.values()))
+
+    def find_one_and_update(self, criteria: Dict[str, Any], update: List[Dict[str, Any]], return_document=None):
+        self.calls.append(("find_one_and_update", criteria, update))
+        return {"_id": ObjectId(), "user_id": "user-1", "items": [], "total_amount": 0}
+
+
+@pytest.fixture
+def carts():
+    return RecordingCollection()
+
+
+@pytest.fixture
+def repository(carts):
+    repository = CartRepository()
+    repository.db = {
+        "cart": carts,
+        "products": RecordingCollection([PRODUCT]),
+        "variants": RecordingCollection([VARIANT]),
+    }
+    return repository
+
+
+class TestCartItem:
+    """Test cases for cart item snapshots."""
+
+    def test_snapshot_applies_the_discount_as_a_percentage(self):
+        item = CartItem.from_product(PRODUCT, VARIANT, quantity=3)
+
+        assert item.product_id == str(PRODUCT["_id"])
+        assert item.image == "oslo-oak.webp"
+        assert item.unit_price == 170.0
+        assert item.total_price == 510.0
+
+    def test_reads_items_that_embed_the_product(self):
+        item = CartItem(
+            product={**PRODUCT, "description": "A bed", "category": {"name": "Beds"}},
+            variant_id=str(VARIANT["_id"]),
+            quantity=2,
+            unit_price=200.0,
+        )
+
+        assert item.name == "Oslo Bed"
+        assert item.unit_price == 170.0
+        assert item.total_price == 340.0
+        assert "product" not in item.model_dump()
+
+    def test_cart_total_is_rounded(self):
+        items = [CartItem.from_product({**PRODUCT, "price": 0.1, "discount": None}, VARIANT, 1) for _ in range(3)]
+        cart = Cart(user_id="user-1", items=items)
+
+        cart.calculate_total()
+
+        assert cart.total_amount == 0.3
+
+
+class TestCartRepository:
+    """Test cases for the targeted cart updates."""
+
+    @pytest.mark.asyncio
+    async def test_adding_an_item_already_in_the_cart_increments_it(self, repository, carts):
+        cart = await repository.add_to_cart("user-1", str(PRODUCT["_id"]), str(VARIANT["_id"]), 2)
+
+        assert isinstance(cart, Cart)
+        (_, criteria, update, upsert), (_, recalculated, pipeline) = carts.calls
+        assert criteria["items"] == {"$elemMatch": {"product_id": str(PRODUCT["_id"]), "variant_id": str(VARIANT["_id"])}}
+        assert update == {"$inc": {"items.$.quantity": 2}}
+        assert not upsert
+        assert recalculated == {"user_id": "user-1", "is_archived": False}
+        assert pipeline is CART_TOTALS_PIPELINE
+
+    @pytest.mark.asyncio
+    async def test_adding_a_new_item_pushes_a_snapshot(self, repository, carts):
+        carts.matched = [0]
+
+        await repository.add_to_cart("user-1", str(PRODUCT["_id"]), str(VARIANT["_id"]), 1)
+
+        _, criteria, update, upsert = carts.calls[1]
+        assert upsert
+        assert "$not" in criteria["items"]
+        pushed = update["$push"]["items"]
+        assert isinstance(pushed["_id"], ObjectId)
+        assert pushed["unit_price"] == 170.0
+        assert set(pushed) == {"_id", "product_id", "variant_id", "name", "image", "price", "discount",
+                               "unit_price", "quantity", "total_price"}
+
+    @pytest.mark.asyncio
+    async def test_retries_as_an_increment_when_another_request_pushed_first(self, repository, carts):
+        carts.matched = [0, 1]
+        carts.duplicate_upserts = 1
+
+        await repository.add_to_cart("user-1", str(PRODUCT["_id"]), str(VARIANT["_id"]), 1)
+
+        operations = [call[0] for call in carts.calls]
+        assert operations == ["update_one", "update_one", "update_one", "find_one_and_update"]
+        assert carts.calls[2][2] == {"$inc": {"items.$.quantity": 1}}
+
+    @pytest.mark.asyncio
+    async def test_unknown_variant_changes_nothing(self, repository, carts):
+        assert await repository.add_to_cart("user-1", str(PRODUCT["_id"]), str(ObjectId()), 1) is None
+        assert await repository.add_to_cart("user-1", str(PRODUCT["_id"]), None, 1) is None
+        assert carts.calls == []
+
+    @pytest.mark.asyncio
+    async def test_removes_items_by_id(self, repository, carts):
+        cart_id, item_ids = ObjectId(), [ObjectId(), ObjectId()]
+
+        assert await repository.remove_from_cart(str(cart_id), [str(i) for i in item_ids] + ["not-an-id"])
+
+        _, criteria, update, _ = carts.calls[0]
+        assert criteria == {"_id": cart_id}
+        assert update == {"$pull": {"items": {"_id": {"$in": item_ids}}}}
+        assert carts.calls[1][0] == "find_one_and_update"
+
+    @pytest.mark.asyncio
+    async def test_setting_the_quantity_of_a_missing_item_is_not_found(self, repository, carts):
+        carts.matched = [0]
+
+        with pytest.raises(Exception) as error:
+            await repository.update_item_quantity(str(ObjectId()), str(ObjectId()), 4)
+
+        assert error.value.status_code == 404
+        assert [call[0] for call in carts.calls] == ["update_one"]
+
+    def test_migration_rewrites_legacy_items_into_snapshots(self, repository, carts):
+        legacy_id = ObjectId()
+        legacy_items = [{
+            "id": str(legacy_id),
+            "product": {**PRODUCT, "description": "A bed"},
+            "variant_id": str(VARIANT["_id"]),
+            "quantity": 2,
+            "unit_price": 200.0,
+            "total_price": 400.0,
+        }]
+        cart_id = ObjectId()
+        carts.documents = {cart_id: {"_id": cart_id, "items": legacy_items}}
+
+        assert repository.migrate_legacy_items() == 1
+
+        _, criteria, update, _ = carts.calls[1]
+        assert criteria == {"_id": cart_id, "items": legacy_items}
+        [item] = update["$set"]["items"]
+        assert item["_id"] == legacy_id
+        assert "product" not in item
+        assert (item["product_id"], item["unit_price"], item["total_price"]) == (str(PRODUCT["_id"]), 170.0, 340.0)
+        assert update["$set"]["total_amount"] == 340.0
+
+
+class TestCheckoutRoute:
+    """Test cases for handing a cart to the order service."""
+
+    @pytest.fixture
+    def cart(self):
+        cart = Cart(_id=str(ObjectId()), user_id="user-1", items=[CartItem.from_product(PRODUCT, VARIANT, 2)])
+        cart.calculate_total()
+        return cart
+
+    @pytest.fixture
+    def persisted(self):
+        return []
+
+    @pytest.fixture
+    def client(self, cart, persisted):
+        async def persist(cart_id: str) -> Optional[Cart]:
+            persisted.append(cart_id)
+            return cart if cart_id == cart.id else None
+
+        app = FastAPI()
+        app.include_router(cart_router)
+        app.dependency_overrides[get_cart_service] = lambda: CartService(SimpleNamespace(persist=persist))
+        return TestClient(app)
+
+    def test_checkout_returns_the_cart_as_written(self, client, cart, persisted):
+        response = client.post(f"/cart/{cart.id}/checkout")
+
+        assert response.status_code == 200
+        assert response.json()["total_amount"] == 340.0
+        assert persisted == [cart.id]
+
+    def test_unknown_cart_is_not_found(self, client):
+        assert client.post(f"/cart/{ObjectId()}/checkout").status_code == 404
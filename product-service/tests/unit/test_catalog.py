@@ -0,0 +1,86 @@
+"""
+Unit tests for the synthetic catalog generator.
+"""
+from bson import json_util
+
+from loadtest.catalog import (
+    DEFAULT_TEMPLATES, build_generator, chunk_ranges, load_templates, parse_size, write_catalog,
+)
+from loadtest.mix import default_mix
+from loadtest.seed import load_seed
+from models.products import Level2Category, Product
+
+
+class TestCatalogGenerator:
+    """Test cases for generated products, categories and colours."""
+
+    def test_products_match_the_product_model(self):
+        generator = build_generator(500)
+
+        for product in generator.products():
+            Product.model_validate(product)
+        for category in generator.level2_categories:
+            Level2Category.model_validate(category)
+
+    def test_products_are_reproducible_from_their_index(self):
+        first = build_generator(1000, random_seed=4)
+        second = build_generator(1000, random_seed=4)
+
+        assert first.product(123) == second.product(123)
+        assert first.product(123)["name"] != first.product(124)["name"]
+
+    def test_unique_fields_stay_unique(self):
+        generator = build_generator(3000)
+        products = list(generator.products())
+
+        assert len({product["name"] for product in products}) == len(products)
+        assert len({product["short_name"] for product in products}) == len(products)
+        assert len({color["color_code"].lower() for color in generator.colors}) == len(generator.colors)
+        assert len({category["short_name"] for category in generator.level2_categories}) == len(generator.level2_categories)
+
+    def test_catalog_scales_categories_and_skews_reviews(self):
+        generator = build_generator(100_000)
+        products = list(generator.products(0, 2000))
+        reviews = [len(product["product_reviews"]) for product in products]
+
+        assert len(generator.level2_categories) == 158
+        assert {product["category"]["id"] for product in products} <= {str(c["_id"]) for c in generator.level2_categories}
+        assert reviews.count(0) > len(reviews) / 2
+        assert max(reviews) > 20
+        assert products[0]["_id"] < products[1]["_id"]
+
+    def test_sample_feeds_the_default_mix(self):
+        generator = build_generator(10_000)
+        mix = default_mix(generator.as_seed(sample_products=50))
+
+        product_pages = [spec for spec in mix.specs if "/products/filter-one" in spec.path]
+        assert len(product_pages) == 50
+
+    def test_templates_include_the_csv(self):
+        seed = load_seed()
+        with_csv = load_templates(DEFAULT_TEMPLATES, seed)
+        seed_only = load_templates(None, seed)
+
+        assert len(seed_only) == len(seed["products"])
+        assert len(with_csv) > len(seed_only)
+        assert all(template["price"] > 0 and template["dimensions"]["width"] for template in with_csv)
+
+
+class TestCatalogHelpers:
+    """Test cases for sizes, chunking and file output."""
+
+    def test_parse_size(self):
+        assert parse_size("10k") == 10_000
+        assert parse_size("1M") == 1_000_000
+        assert parse_size("2500") == 2500
+
+    def test_chunk_ranges_cover_the_catalog(self):
+        assert chunk_ranges(12, 5) == [(0, 5), (5, 10), (10, 12)]
+
+    def test_write_catalog_as_extended_json(self, tmp_path):
+        generator = build_generator(20)
+        path = tmp_path / "catalog.jsonl"
+
+        assert write_catalog(path, generator) == 20
+        first = json_util.loads(path.read_text().splitlines()[0])
+        assert first == generator.product(0)
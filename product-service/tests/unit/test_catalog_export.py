@@ -0,0 +1,122 @@
+"""
+Unit tests for the streaming catalog export.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List
+
+import pytest
+from bson import ObjectId
+
+from services.catalog_export import CSV_COLUMNS, CatalogExport, encode_csv_rows
+
+
+class FakeCursor:
+    """Cursor stand-in that yields documents lazily and records how it was configured."""
+
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+        self.sort_spec = None
+        self.fetch_size = None
+        self.max_documents = None
+        self.closed = False
+
+    def sort(self, key, direction):
+        self.sort_spec = (key, direction)
+        return self
+
+    def batch_size(self, size):
+        self.fetch_size = size
+        return self
+
+    def limit(self, count):
+        self.max_documents = count
+        return self
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        documents = self.documents[:self.max_documents] if self.max_documents else self.documents
+        yield from documents
+
+
+class FakeCollection:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = sorted(documents, key=lambda document: document["_id"])
+        self.criteria = None
+        self.cursor = None
+
+    def find(self, criteria):
+        self.criteria = criteria
+        after = criteria.get("_id", {}).get("$gt")
+        self.cursor = FakeCursor([d for d in self.documents if after is None or d["_id"] > after])
+        return self.cursor
+
+
+class TestCatalogExport:
+    """Test cases for CatalogExport."""
+
+    @pytest.fixture
+    def collection(self, product_page_documents):
+        return FakeCollection(product_page_documents[:25])
+
+    def test_ndjson_streams_one_chunk_per_batch(self, collection):
+        export = CatalogExport(collection, {"is_archived": False}, batch_size=10)
+
+        chunks = list(export)
+
+        assert len(chunks) == 3
+        lines = b"".join(chunks).splitlines()
+        assert len(lines) == 25
+        assert json.loads(lines[0])["_id"] == str(collection.documents[0]["_id"])
+        assert collection.cursor.sort_spec == ("_id", 1)
+        assert collection.cursor.fetch_size == 10
+        assert collection.cursor.closed
+
+    def test_resumes_after_checkpoint(self, collection):
+        checkpoint = str(collection.documents[9]["_id"])
+
+        lines = b"".join(CatalogExport(collection, {"is_archived": False}, after=checkpoint)).splitlines()
+
+        assert collection.criteria == {"is_archived": False, "_id": {"$gt": ObjectId(checkpoint)}}
+        assert len(lines) == 15
+        assert json.loads(lines[0])["_id"] == str(collection.documents[10]["_id"])
+
+    def test_limit_is_applied_to_the_cursor(self, collection):
+        lines = b"".join(CatalogExport(collection, {}, limit=5)).splitlines()
+
+        assert len(lines) == 5
+
+    def test_csv_flattens_nested_fields(self, collection):
+        export = CatalogExport(collection, {}, export_format="csv", batch_size=10)
+
+        rows = list(csv.reader(io.StringIO(b"".join(export).decode("utf-8"))))
+
+        assert rows[0] == [column for column, _ in CSV_COLUMNS]
+        assert len(rows) == 26
+        first = dict(zip(rows[0], rows[1]))
+        document = collection.documents[0]
+        assert first["id"] == str(document["_id"])
+        assert first["level1_category"] == document["category"]["level_one_category"]["short_name"]
+        assert first["color_codes"] == "|".join(document["color_codes"])
+        assert export.media_type == "text/csv"
+
+    def test_csv_quotes_cells_that_spreadsheets_would_run_as_formulas(self):
+        document = {"_id": ObjectId(), "name": "=HYPERLINK(\"http://evil.test\")", "description": "@SUM(A1)",
+                    "short_name": "-sofa", "discount": -5, "color_codes": ["+1", "red"]}
+
+        [row] = csv.reader(io.StringIO(encode_csv_rows([document]).decode("utf-8")))
+        cells = dict(zip([column for column, _ in CSV_COLUMNS], row))
+
+        assert cells["name"] == "'=HYPERLINK(\"http://evil.test\")"
+        assert cells["description"] == "'@SUM(A1)"
+        assert cells["short_name"] == "'-sofa"
+        assert cells["color_codes"] == "'+1|red"
+        assert cells["discount"] == "-5"
+
+    @pytest.mark.parametrize("options", [{"after": "not-an-id"}, {"export_format": "xml"}])
+    def test_rejects_invalid_options(self, collection, options):
+        with pytest.raises(ValueError):
+            CatalogExport(collection, {}, **options)
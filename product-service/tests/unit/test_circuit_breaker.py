@@ -0,0 +1,198 @@
+"""
+Unit tests for the Redis circuit breaker and the cache provider's use of it.
+"""
+import asyncio
+
+import pytest
+from redis.exceptions import ResponseError
+
+from decorators.circuit_breaker import CircuitBreaker
+from decorators.redis_provider import RedisCacheProvider
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class UnreachableRedis:
+    """Client stand-in whose every command times out."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        raise TimeoutError("Timeout reading from socket")
+
+    async def ping(self):
+        self.calls += 1
+        raise TimeoutError("Timeout reading from socket")
+
+
+class HangingRedis:
+    """Client stand-in whose commands never answer."""
+
+    async def get(self, key):
+        await asyncio.Event().wait()
+
+
+class SamplingRedis:
+    """Admin client stand-in for a Redis with an LFU maxmemory-policy."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.closed = False
+
+    async def scan_iter(self, match, count):
+        for key in self.keys:
+            yield key
+
+    def pipeline(self, transaction=True):
+        return SamplingPipeline()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class SamplingPipeline:
+    def __init__(self):
+        self.results = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def memory_usage(self, key):
+        self.results.append(len(key) * 10)
+
+    def object(self, subcommand, key):
+        if subcommand == "idletime":
+            self.results.append(ResponseError("An LFU maxmemory policy is selected, idle time not tracked."))
+        else:
+            self.results.append(int(key[-1]))
+
+    def ttl(self, key):
+        self.results.append(60)
+
+    async def execute(self, raise_on_error=True):
+        return self.results
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock):
+        return CircuitBreaker(failure_threshold=3, cooldown_seconds=10, clock=clock)
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.snapshot()["short_circuited"] == 1
+
+    def test_success_resets_failure_count(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_a_single_probe(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.snapshot()["times_opened"] == 2
+        assert breaker.snapshot()["retry_in_seconds"] == 10
+
+
+    def test_released_probe_lets_the_next_call_probe(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow_request()
+
+        breaker.release_probe()
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+
+
+class TestRedisCacheProviderCircuit:
+    """Test cases for RedisCacheProvider behaviour when Redis is unreachable."""
+
+    @pytest.fixture
+    def provider(self):
+        provider = RedisCacheProvider(redis_url="redis://unreachable.test:6379")
+        provider.circuit_breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+        provider._redis = UnreachableRedis()
+        return provider
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_redis(self, provider):
+        assert await provider.get("a") is None
+        assert await provider.get("b") is None
+        assert provider._redis.calls == 2
+
+        assert await provider.get("c") is None
+        assert await provider.ping() is False
+        assert provider._redis.calls == 2
+        assert provider.stats()["circuit_breaker"]["state"] == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_is_released(self, provider):
+        clock = FakeClock()
+        provider.circuit_breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=10, clock=clock)
+        provider.circuit_breaker.record_failure()
+        clock.now = 10
+        provider._redis = HangingRedis()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(provider.get("a"), timeout=0.01)
+
+        assert provider.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+        assert provider.circuit_breaker.allow_request()
+
+    @pytest.mark.asyncio
+    async def test_key_sampling_ranks_by_frequency_under_lfu_outside_the_breaker(self, provider):
+        admin = SamplingRedis([f"{provider.key_prefix}:colors:1", f"{provider.key_prefix}:colors:7"])
+        provider._admin_client = lambda: admin
+
+        report = await provider.sample_keys(limit=5)
+
+        assert [entry["key"] for entry in report["hottest"]] == ["colors:7", "colors:1"]
+        assert report["hottest"][0]["idle_seconds"] is None
+        assert admin.closed
+        assert provider._redis.calls == 0
+        assert provider.circuit_breaker.snapshot()["total_failures"] == 0
@@ -0,0 +1,80 @@
+"""
+Unit tests for comparing benchmark and load-test runs.
+"""
+import json
+import os
+
+import pytest
+
+from loadtest.compare import compare, extract_metrics, main, resolve
+
+
+def benchmark_result(**medians):
+    return {"benchmarks": [{"fullname": name, "stats": {"median": median, "mean": median}} for name, median in medians.items()]}
+
+
+def load_report(rps, p95):
+    latency = {"p50": p95 / 2, "p95": p95, "p99": p95 * 2}
+    return {
+        "requests": 100,
+        "error_rate": 0.0,
+        "throughput_rps": rps,
+        "latency_ms": latency,
+        "routes": {"GET /products": {"latency_ms": latency}},
+    }
+
+
+class TestCompare:
+    """Test cases for regression detection."""
+
+    def test_slower_benchmark_beyond_threshold_is_a_regression(self):
+        baseline = extract_metrics(benchmark_result(query=1.0, dump=2.0, gone=1.0))
+        current = extract_metrics(benchmark_result(query=1.2, dump=1.5, new=1.0))
+
+        result = compare(baseline, current, 0.10)
+
+        assert result["regressions"] == ["query"]
+        assert [row["metric"] for row in result["rows"]] == ["query", "dump"]
+        assert result["rows"][1]["improvement"]
+        assert result["only_in_baseline"] == ["gone"]
+        assert result["only_in_current"] == ["new"]
+
+    def test_change_within_threshold_passes(self):
+        result = compare(extract_metrics(benchmark_result(query=1.0)), extract_metrics(benchmark_result(query=1.05)), 0.10)
+
+        assert result["regressions"] == []
+
+    def test_lower_throughput_is_a_regression(self):
+        baseline = extract_metrics(load_report(rps=200, p95=50))
+        current = extract_metrics(load_report(rps=150, p95=50))
+
+        result = compare(baseline, current, 0.10)
+
+        assert result["regressions"] == ["throughput_rps"]
+        assert "GET /products p99_ms" in baseline
+
+    def test_unknown_document_is_rejected(self):
+        with pytest.raises(ValueError):
+            extract_metrics({"status": "ok"})
+
+
+class TestCompareCommand:
+    """Test cases for the command line entry point."""
+
+    def test_directory_resolves_to_newest_result(self, tmp_path):
+        older, newer = tmp_path / "a" / "0001.json", tmp_path / "b" / "0002.json"
+        for path, mtime in ((older, 1_000), (newer, 2_000)):
+            path.parent.mkdir()
+            path.write_text("{}")
+            os.utime(path, (mtime, mtime))
+
+        assert resolve(tmp_path) == newer
+
+    def test_exit_status_reports_regressions(self, tmp_path, capsys):
+        baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+        baseline.write_text(json.dumps(benchmark_result(query=1.0)))
+        current.write_text(json.dumps(benchmark_result(query=1.5)))
+
+        assert main([str(baseline), str(current), "--threshold", "10"]) == 1
+        assert "REGRESSION" in capsys.readouterr().out
+        assert main([str(baseline), str(current), "--threshold", "60"]) == 0
@@ -0,0 +1,122 @@
+"""
+Unit tests for response compression and the precompressed store.
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from decorators.circuit_breaker import CircuitBreaker
+from middleware import CatalogResource, CatalogVersions, ConditionalGetMiddleware
+from middleware.compression import CompressionMiddleware, PrecompressedStore, gzip_codec, negotiate
+
+LARGE = [{"name": "Walnut", "description": "Solid walnut with an oiled finish " * 4} for _ in range(50)]
+
+
+class InMemoryCacheProvider:
+    """Just enough of RedisCacheProvider for the version store."""
+
+    def __init__(self):
+        self.store = {}
+        self.circuit_breaker = CircuitBreaker()
+
+    async def get_many(self, keys):
+        return {key: self.store[key] for key in keys if key in self.store}
+
+    async def set_many(self, items, ttl_seconds=None):
+        self.store.update(items)
+
+
+class TestNegotiate:
+    """Test cases for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "br"),
+        ("identity", None),
+        ("deflate", None),
+    ])
+    def test_picks_client_weight_then_server_preference(self, header, expected):
+        assert negotiate(header, ["br", "zstd", "gzip"]) == expected
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware."""
+
+    @pytest.fixture
+    def calls(self):
+        return {"colors": 0}
+
+    @pytest.fixture
+    def store(self):
+        return PrecompressedStore(max_bytes=1024 * 1024)
+
+    @pytest.fixture
+    def client(self, calls, store):
+        app = FastAPI()
+
+        @app.get("/colors/")
+        async def list_colors():
+            calls["colors"] += 1
+            return LARGE
+
+        @app.get("/small")
+        async def small():
+            return {"ok": True}
+
+        @app.get("/export")
+        async def export():
+            return StreamingResponse(iter([b'{"a": 1}\n' * 200, b'{"b": 2}\n' * 200]), media_type="application/x-ndjson")
+
+        app.add_middleware(CompressionMiddleware, codecs=[gzip_codec()], minimum_size=500, store=store)
+        app.add_middleware(
+            ConditionalGetMiddleware,
+            resources={"colors": CatalogResource(prefixes=("/colors",))},
+            versions=CatalogVersions(InMemoryCacheProvider()),
+        )
+        return TestClient(app)
+
+    def test_compresses_large_json(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+        response = client.get("/colors/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"].startswith('W/"')
+        assert response.json() == LARGE
+
+    def test_identity_when_not_accepted(self, client):
+        response = client.get("/colors/", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert not response.headers["etag"].startswith("W/")
+
+    def test_repeat_requests_are_served_from_the_store(self, client, calls, store):
+        first = client.get("/colors/", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/colors/", headers={"Accept-Encoding": "gzip"})
+
+        assert calls["colors"] == 1
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.json() == LARGE
+        assert store.stats()["hits"] == 1
+
+    def test_weak_etag_still_revalidates(self, client):
+        etag = client.get("/colors/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+        response = client.get("/colors/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_streams_are_compressed_per_chunk(self, client):
+        with client.stream("GET", "/export", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw).count(b"\n") == 400
@@ -0,0 +1,157 @@
+"""
+Unit tests for ETag / Last-Modified handling on catalog routes.
+"""
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from decorators.circuit_breaker import CircuitBreaker
+from middleware import CatalogResource, CatalogVersions, ConditionalGetMiddleware
+
+
+class InMemoryCacheProvider:
+    """Just enough of RedisCacheProvider for the version store."""
+
+    def __init__(self):
+        self.store: Dict[str, Any] = {}
+        self.deleted_patterns: List[str] = []
+        self.circuit_breaker = CircuitBreaker()
+
+    async def get_many(self, keys):
+        return {key: self.store[key] for key in keys if key in self.store}
+
+    async def set_many(self, items, ttl_seconds=None):
+        self.store.update(items)
+
+    async def set(self, key, value, ttl_seconds=None):
+        self.store[key] = value
+
+    async def delete_pattern(self, pattern):
+        self.deleted_patterns.append(pattern)
+        return 0
+
+
+class TestConditionalGetMiddleware:
+    """Test cases for ConditionalGetMiddleware."""
+
+    @pytest.fixture
+    def provider(self):
+        return InMemoryCacheProvider()
+
+    @pytest.fixture
+    def calls(self):
+        return {"colors": 0}
+
+    @pytest.fixture
+    def client(self, provider, calls):
+        app = FastAPI()
+
+        @app.get("/colors/")
+        async def list_colors():
+            calls["colors"] += 1
+            return [{"name": "Walnut"}]
+
+        @app.post("/colors/")
+        async def create_color():
+            return {"status": "created"}
+
+        @app.get("/cart/{cart_id}")
+        async def get_cart(cart_id: str):
+            return {"id": cart_id}
+
+        app.add_middleware(
+            ConditionalGetMiddleware,
+            resources={"colors": CatalogResource(prefixes=("/colors",), cache_keys=("colors", "color:*"))},
+            versions=CatalogVersions(provider, refresh_seconds=0),
+            max_age=30,
+            stale_while_revalidate=60,
+        )
+        return TestClient(app)
+
+    def test_catalog_responses_carry_validators(self, client):
+        response = client.get("/colors/")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert "last-modified" in response.headers
+        assert response.headers["cache-control"] == "public, max-age=30, stale-while-revalidate=60"
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_matching_etag_returns_304_without_running_the_route(self, client, calls):
+        etag = client.get("/colors/").headers["etag"]
+
+        response = client.get("/colors/", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert calls["colors"] == 1
+
+    def test_if_modified_since_returns_304(self, client, calls):
+        last_modified = client.get("/colors/").headers["last-modified"]
+
+        response = client.get("/colors/", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304
+        assert calls["colors"] == 1
+
+    def test_write_in_the_same_second_moves_last_modified_forward(self, client, calls):
+        last_modified = client.get("/colors/").headers["last-modified"]
+
+        assert client.post("/colors/").status_code == 200
+        assert client.post("/colors/").status_code == 200
+
+        response = client.get("/colors/", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 200
+        assert calls["colors"] == 2
+
+    def test_query_order_does_not_change_the_etag(self, client):
+        first = client.get("/colors/?a=1&b=2").headers["etag"]
+        second = client.get("/colors/?b=2&a=1").headers["etag"]
+        assert first == second
+        assert first != client.get("/colors/?a=2&b=2").headers["etag"]
+
+    def test_successful_write_changes_the_etag_and_drops_cached_responses(self, client, provider):
+        etag = client.get("/colors/").headers["etag"]
+
+        assert client.post("/colors/").status_code == 200
+
+        response = client.get("/colors/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert provider.deleted_patterns == ["colors", "color:*"]
+
+    def test_etag_seen_while_cached_responses_are_dropped_does_not_stay_valid(self, client, provider):
+        seen = []
+
+        async def delete_pattern(pattern):
+            # A reader between the write and the deletes may pair the new ETag with an old body
+            if not seen:
+                seen.append(client.get("/colors/").headers["etag"])
+            provider.deleted_patterns.append(pattern)
+            return 0
+
+        provider.delete_pattern = delete_pattern
+
+        assert client.post("/colors/").status_code == 200
+
+        assert provider.deleted_patterns == ["colors", "color:*"]
+        assert client.get("/colors/", headers={"If-None-Match": seen[0]}).status_code == 200
+
+    def test_open_circuit_disables_validation(self, client, provider, calls):
+        etag = client.get("/colors/").headers["etag"]
+        for _ in range(provider.circuit_breaker.failure_threshold):
+            provider.circuit_breaker.record_failure()
+
+        response = client.get("/colors/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert calls["colors"] == 2
+
+    def test_other_routes_are_untouched(self, client):
+        response = client.get("/cart/abc")
+        assert response.status_code == 200
+        assert "etag" not in response.headers
@@ -0,0 +1,153 @@
+"""
+Unit tests for the Eureka registry cache and client-side load balancing.
+"""
+import httpx
+import pytest
+
+from config.eureka.discovery import (
+    DiscoveryClient,
+    LeastOutstandingBalancer,
+    NoInstanceAvailable,
+    RoundRobinBalancer,
+    ServiceInstance,
+    parse_registry,
+    registry_urls,
+)
+
+EUREKA = "http://eureka:8761/eureka"
+
+
+def eureka_instance(host: str, port: int = 8000, status: str = "UP") -> dict:
+    return {
+        "instanceId": f"{host}:product-service:{port}",
+        "hostName": host,
+        "ipAddr": f"10.0.0.{host[-1]}",
+        "status": status,
+        "port": {"$": port, "@enabled": "true"},
+        "securePort": {"$": 443, "@enabled": "false"},
+    }
+
+
+def registry_payload(*instances: dict) -> dict:
+    return {"applications": {"application": [{"name": "PRODUCT-SERVICE", "instance": list(instances)}]}}
+
+
+def instances(count: int) -> list:
+    return [ServiceInstance("PRODUCT-SERVICE", f"i{n}", f"host{n}", 8000) for n in range(count)]
+
+
+class TestParseRegistry:
+    """Test cases for reading Eureka's JSON registry."""
+
+    def test_keeps_only_up_instances(self):
+        registry = parse_registry(registry_payload(
+            eureka_instance("host1"), eureka_instance("host2", status="DOWN"),
+        ))
+
+        assert [instance.host for instance in registry["PRODUCT-SERVICE"]] == ["host1"]
+        assert registry["PRODUCT-SERVICE"][0].base_url == "http://host1:8000"
+
+    def test_single_instance_object_and_prefer_ip(self):
+        payload = {"applications": {"application": {"name": "product-service", "instance": eureka_instance("host3")}}}
+
+        registry = parse_registry(payload, prefer_ip=True)
+
+        assert registry["PRODUCT-SERVICE"][0].host == "10.0.0.3"
+
+    def test_applications_without_up_instances_are_dropped(self):
+        assert parse_registry(registry_payload(eureka_instance("host1", status="STARTING"))) == {}
+
+    def test_registry_urls_add_context(self):
+        assert registry_urls("http://a:8761, http://b:8761/eureka/") == [
+            "http://a:8761/eureka/apps",
+            "http://b:8761/eureka/apps",
+        ]
+
+
+class TestBalancers:
+    """Test cases for the load balancing strategies."""
+
+    def test_round_robin_cycles(self):
+        balancer = RoundRobinBalancer()
+        pool = instances(3)
+
+        chosen = [balancer.choose(pool).instance_id for _ in range(6)]
+
+        assert chosen == ["i0", "i1", "i2", "i0", "i1", "i2"]
+
+    def test_least_outstanding_avoids_busy_instance(self):
+        balancer = LeastOutstandingBalancer()
+        pool = instances(2)
+
+        first = balancer.choose(pool)
+        second = balancer.choose(pool)
+        assert first != second
+
+        balancer.release(first)
+        assert balancer.choose(pool) == first
+        assert balancer.outstanding(first) == 1
+        assert balancer.outstanding(second) == 1
+
+
+class TestDiscoveryClient:
+    """Test cases for the registry cache."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_and_lease(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert str(request.url) == f"{EUREKA}/apps"
+            return httpx.Response(200, json=registry_payload(eureka_instance("host1"), eureka_instance("host2")))
+
+        client = DiscoveryClient(EUREKA, transport=httpx.MockTransport(handler))
+        assert await client.refresh()
+
+        with client.lease("product-service") as first:
+            pass
+        with client.lease("product-service") as second:
+            pass
+        assert {first.host, second.host} == {"host1", "host2"}
+        await client.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_cached_registry(self):
+        responses = [
+            httpx.Response(200, json=registry_payload(eureka_instance("host1"))),
+            httpx.Response(503),
+        ]
+        client = DiscoveryClient(EUREKA, transport=httpx.MockTransport(lambda request: responses.pop(0)))
+
+        assert await client.refresh()
+        assert not await client.refresh()
+
+        assert [instance.host for instance in client.instances("PRODUCT-SERVICE")] == ["host1"]
+        assert client.last_error is not None
+        await client.stop()
+
+    def test_lease_without_instances(self):
+        client = DiscoveryClient(EUREKA)
+
+        with pytest.raises(NoInstanceAvailable):
+            with client.lease("product-service"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_request_retries_on_another_instance(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "host1":
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={"host": request.url.host})
+
+        client = DiscoveryClient(EUREKA, transport=httpx.MockTransport(handler))
+        client.registry = {"PRODUCT-SERVICE": [
+            ServiceInstance("PRODUCT-SERVICE", "i1", "host1", 8000),
+            ServiceInstance("PRODUCT-SERVICE", "i2", "host2", 8000),
+        ]}
+
+        response = await client.request("product-service", "GET", "/product-service/api/v1/health/live")
+
+        assert response.json() == {"host": "host2"}
+        await client.stop()
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            DiscoveryClient(EUREKA, strategy="random")
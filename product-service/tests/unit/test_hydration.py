@@ -0,0 +1,80 @@
+"""
+Unit tests for document hydration strategies.
+"""
+from typing import List, Optional
+
+import pytest
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+
+from core.hydration import HydrationMode, Hydrator, construct_model, construct_plan
+from core.responses import dumps
+from models.common import CommonModel
+from models.products import Product
+from repositories.product_repository import ProductRepository
+
+
+class Swatch(CommonModel):
+    name: str
+    tags: List[str] = []
+
+
+class Sample(BaseModel):
+    swatch: Optional[Swatch] = None
+    swatches: List[Swatch] = []
+
+
+class TestConstructModel:
+    """Test cases for construct_model."""
+
+    def test_matches_validated_models(self, product_page_documents):
+        validated = [Product(**document) for document in product_page_documents]
+        constructed = [construct_model(Product, document) for document in product_page_documents]
+
+        assert dumps(constructed) == dumps(validated)
+        assert constructed[0].model_fields_set == validated[0].model_fields_set
+
+    def test_builds_nested_models_and_converts_object_ids(self):
+        swatch_id = ObjectId()
+
+        sample = construct_model(Sample, {"swatch": {"_id": swatch_id, "name": "oak"}, "swatches": [{"name": "teak"}]})
+
+        assert isinstance(sample.swatch, Swatch)
+        assert sample.swatch.id == str(swatch_id)
+        assert isinstance(sample.swatches[0], Swatch)
+
+    def test_mutable_defaults_are_not_shared(self):
+        first = construct_model(Swatch, {"name": "oak"})
+        first.tags.append("dark")
+
+        assert construct_model(Swatch, {"name": "teak"}).tags == []
+        assert first.model_fields_set == {"name"}
+
+    def test_accepts_field_names_from_cached_dumps(self):
+        swatch = construct_model(Swatch, Swatch(_id=ObjectId(), name="oak").model_dump())
+
+        assert swatch.id is not None
+
+    def test_plan_is_computed_once(self):
+        assert construct_plan(Swatch) is construct_plan(Swatch)
+
+
+class TestHydrator:
+    """Test cases for Hydrator modes."""
+
+    @pytest.mark.parametrize("mode", list(HydrationMode))
+    def test_every_mode_produces_the_same_models(self, mode, product_page_documents):
+        models = Hydrator(Product, mode).many(iter(product_page_documents))
+
+        assert dumps(models) == dumps([Product(**document) for document in product_page_documents])
+
+    @pytest.mark.parametrize("mode", [HydrationMode.VALIDATE, HydrationMode.ADAPTER])
+    def test_validating_modes_reject_bad_documents(self, mode):
+        with pytest.raises(ValidationError):
+            Hydrator(Swatch, mode).many([{"name": None}])
+
+    def test_construct_trusts_documents(self):
+        assert Hydrator(Swatch, "construct").one({"name": None}).name is None
+
+    def test_repository_selects_mode(self):
+        assert ProductRepository().hydrator.mode is HydrationMode.ADAPTER
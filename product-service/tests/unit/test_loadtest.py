@@ -0,0 +1,107 @@
+"""
+Unit tests for the load-testing harness: mixes, percentiles and the runner.
+"""
+import json
+import random
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from loadtest import LoadRunner, RequestMix, RequestSpec, default_mix, load_mix, load_seed, percentile
+
+
+class TestPercentile:
+    """Test cases for nearest-rank percentiles."""
+
+    def test_nearest_rank(self):
+        values = [float(n) for n in range(1, 101)]
+
+        assert percentile(values, 0.50) == 50.0
+        assert percentile(values, 0.95) == 95.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) is None
+
+
+class TestRequestMix:
+    """Test cases for building and sampling request mixes."""
+
+    def test_choices_follow_weights(self):
+        mix = RequestMix([RequestSpec("GET", "/a", 3), RequestSpec("GET", "/b", 1), RequestSpec("GET", "/c", 0)])
+        rng = random.Random(7)
+
+        picks = [mix.choose(rng).path for _ in range(4000)]
+
+        assert len(mix) == 2
+        assert 0.70 < picks.count("/a") / len(picks) < 0.80
+
+    def test_default_mix_covers_the_seeded_catalog(self):
+        seed = load_seed()
+        mix = default_mix(seed)
+        routes = mix.routes()
+
+        assert routes["GET /product-service/api/v1/products/filter"] > 0.25
+        short_names = {product["short_name"] for product in seed["products"]}
+        assert any(spec.path.endswith(f"short_name={name}") for spec in mix.specs for name in short_names)
+
+    def test_load_mix_merges_entries_and_log_records(self, tmp_path):
+        lines = [
+            {"method": "GET", "path": "/products/filter?page=2", "weight": 2, "name": "filter"},
+            {"level": "INFO", "logger": "access", "method": "GET", "path": "/colors/", "query": "", "status": 200},
+            {"level": "INFO", "logger": "access", "method": "GET", "path": "/colors/", "query": "", "status": 200},
+            {"level": "INFO", "logger": "access", "method": "POST", "path": "/cart/", "query": "", "status": 201},
+        ]
+        mix_file = tmp_path / "mix.jsonl"
+        mix_file.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+
+        mix = load_mix(mix_file)
+
+        assert {(spec.path, spec.weight) for spec in mix.specs} == {("/products/filter?page=2", 2.0), ("/colors/", 2.0)}
+        assert set(mix.routes()) == {"filter", "GET /colors/"}
+
+
+class TestLoadRunner:
+    """Test cases for generating load and reporting it."""
+
+    @pytest.fixture
+    def transport(self):
+        app = FastAPI()
+
+        @app.get("/ok")
+        async def ok():
+            return {"ok": True}
+
+        @app.get("/broken")
+        async def broken():
+            raise HTTPException(status_code=503, detail="down")
+
+        return httpx.ASGITransport(app=app)
+
+    @pytest.fixture
+    def mix(self):
+        return RequestMix([RequestSpec("GET", "/ok", 3), RequestSpec("GET", "/broken", 1)])
+
+    @pytest.mark.asyncio
+    async def test_closed_loop_report(self, transport, mix):
+        runner = LoadRunner("http://test", mix, concurrency=4, duration_seconds=0.3, seed=1, transport=transport)
+
+        report = await runner.run()
+
+        assert report["config"]["mode"] == "closed"
+        assert report["requests"] > 0
+        assert report["throughput_rps"] > 0
+        broken = report["routes"]["GET /broken"]
+        assert broken["errors"] == broken["requests"] == broken["status"]["503"]
+        assert report["routes"]["GET /ok"]["errors"] == 0
+        assert report["errors"] == broken["errors"]
+        assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+    @pytest.mark.asyncio
+    async def test_open_loop_arrivals(self, transport, mix):
+        runner = LoadRunner("http://test", mix, concurrency=8, rate=200, duration_seconds=0.5, seed=3, transport=transport)
+
+        report = await runner.run()
+
+        assert report["config"]["mode"] == "open"
+        # Poisson arrivals at 200/s for half a second
+        assert 50 < report["requests"] + report["dropped"] < 160
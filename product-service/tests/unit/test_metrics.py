@@ -0,0 +1,114 @@
+"""
+Unit tests for the Prometheus metrics registry and the metrics middleware.
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.metrics import MetricsRegistry
+from database import CommandMetrics
+from middleware import MetricsMiddleware
+
+
+class TestMetricsRegistry:
+    """Test cases for rendering counters, gauges and histograms."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", labels=("route",), buckets=(0.1, 1.0))
+
+        child = latency.labels("/products")
+        child.observe(0.05)
+        child.observe(0.1)
+        child.observe(3.0)
+        text = registry.render()
+
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/products",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{route="/products",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{route="/products",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/products"} 3' in text
+
+    def test_unlabelled_metrics_start_at_zero(self):
+        registry = MetricsRegistry()
+        registry.gauge("queue_depth", "Depth")
+        requests = registry.counter("requests_total", "Requests")
+        requests.inc(2)
+
+        text = registry.render()
+
+        assert "queue_depth 0" in text
+        assert "requests_total 2" in text
+
+    def test_labels_are_escaped_and_checked(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("errors_total", "Errors", labels=("message",))
+        counter.labels('say "hi"').inc()
+
+        assert 'errors_total{message="say \\"hi\\""} 1' in registry.render()
+        with pytest.raises(ValueError):
+            counter.labels("a", "b")
+
+    def test_registering_twice_returns_the_same_metric(self):
+        registry = MetricsRegistry()
+
+        assert registry.counter("hits_total", "Hits") is registry.counter("hits_total", "Hits")
+
+    def test_collectors_are_appended(self):
+        registry = MetricsRegistry()
+        registry.add_collector(lambda: "external_metric 1\n")
+
+        assert registry.render().endswith("external_metric 1\n")
+
+
+class TestMetricsMiddleware:
+    """Test cases for per-route request metrics."""
+
+    @pytest.fixture
+    def registry(self):
+        return MetricsRegistry()
+
+    @pytest.fixture
+    def client(self, registry):
+        app = FastAPI()
+
+        @app.get("/products/{product_id}")
+        async def product(product_id: str):
+            return {"id": product_id}
+
+        app.add_middleware(MetricsMiddleware, registry=registry)
+        return TestClient(app)
+
+    def test_labels_by_route_template(self, client, registry):
+        client.get("/products/1")
+        client.get("/products/2")
+        client.get("/unknown")
+
+        text = registry.render()
+        assert 'http_request_duration_seconds_count{method="GET",route="/products/{product_id}",status="200"} 2' in text
+        assert 'http_request_duration_seconds_count{method="GET",route="<unmatched>",status="404"} 1' in text
+        assert 'http_requests_in_flight{method="GET"} 0' in text
+
+
+class TestCommandMetrics:
+    """Test cases for timing MongoDB commands."""
+
+    def event(self, name, command=None, request_id=1, duration_micros=0):
+        return SimpleNamespace(
+            command_name=name, command=command or {}, database_name="afrifurn",
+            connection_id=("mongo", 27017), request_id=request_id, duration_micros=duration_micros,
+        )
+
+    def test_times_commands_per_collection(self):
+        listener = CommandMetrics()
+        before = listener.duration.labels("products", "find").count
+
+        listener.started(self.event("find", {"find": "products", "filter": {}}, request_id=7))
+        listener.succeeded(self.event("find", request_id=7, duration_micros=1500))
+        listener.started(self.event("getMore", {"getMore": 123, "collection": "products"}, request_id=8))
+        listener.failed(self.event("getMore", request_id=8, duration_micros=200))
+
+        assert listener.duration.labels("products", "find").count == before + 1
+        assert listener.failures.labels("products", "getMore").value >= 1
@@ -0,0 +1,64 @@
+"""
+Unit tests for the ProductSummary list view.
+"""
+import pytest
+from bson import ObjectId
+
+from models.products import ProductPipeline, ProductSummary
+
+
+class TestSummaryProjection:
+    """Test cases for the ProductSummary aggregation helpers."""
+
+    def test_projection_covers_every_summary_field(self):
+        stage = ProductPipeline.summary_projection()["$project"]
+
+        assert set(stage) == set(ProductSummary.model_fields) - {"id"}
+
+    def test_sparse_fieldset_restricts_projection(self):
+        fields = ProductPipeline.parse_summary_fields("name, price,id,name")
+
+        assert fields == ["name", "price"]
+        assert set(ProductPipeline.summary_projection(fields)["$project"]) == {"name", "price"}
+
+    def test_id_only_fieldset_projects_id(self):
+        assert ProductPipeline.summary_projection(ProductPipeline.parse_summary_fields("id")) == {"$project": {"_id": 1}}
+
+    def test_no_fieldset_means_all_fields(self):
+        assert ProductPipeline.parse_summary_fields(None) is None
+
+    def test_unknown_fields_are_rejected(self):
+        with pytest.raises(ValueError, match="description, product_variants"):
+            ProductPipeline.parse_summary_fields("name,product_variants,description")
+
+    def test_level_one_projection_runs_before_grouping(self):
+        projection = ProductPipeline.summary_projection(["name"])
+        pipeline = ProductPipeline.get_products_by_level_one_category_name("Bedroom", 5, projection=projection)
+
+        stages = [next(iter(stage)) for stage in pipeline]
+        assert stages == ["$match", "$limit", "$project", "$group"]
+        assert pipeline[-1]["$group"]["_id"] == {"$literal": "Bedroom"}
+
+
+class TestProductSummaryFromDocument:
+    """Test cases for ProductSummary.from_document."""
+
+    def test_mirrors_the_projection(self, product_page_documents):
+        document = product_page_documents[0]
+        document["product_variants"].append(dict(document["product_variants"][0], images=["dup.jpg"]))
+        document["product_reviews"] = [{"rating": 4}, {"rating": 5}]
+
+        summary = ProductSummary.from_document(document)
+
+        colors = [image.color_id for image in summary.images]
+        assert len(colors) == len(set(colors))
+        assert summary.images[0].image == document["product_variants"][0]["images"][0]
+        assert summary.rating == 4.5
+        assert summary.review_count == 2
+        assert summary.level1_category_short_name == document["category"]["level_one_category"]["short_name"]
+        assert summary.id == str(document["_id"])
+
+    def test_sparse_documents_dump_only_what_was_projected(self):
+        summary = ProductSummary(_id=ObjectId(), name="Oslo Bed")
+
+        assert set(summary.model_dump(by_alias=True, exclude_unset=True)) == {"_id", "name"}
@@ -0,0 +1,133 @@
+"""
+Unit tests for the profiling middleware and the profile store.
+"""
+import cProfile
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import routers.debug as debug_routes
+from core.exceptions import AuthenticationError, AuthorizationError
+from core.profiling import ProfileStore
+from middleware import ProfilingMiddleware
+
+API_KEY = "your-super-secret-api-key"
+
+
+def busy_work():
+    return sum(n * n for n in range(1000))
+
+
+class TestProfilingMiddleware:
+    """Test cases for choosing and saving profiled requests."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return ProfileStore(str(tmp_path / "profiles"), max_profiles=10)
+
+    def make_client(self, store, sample_every=0):
+        app = FastAPI()
+
+        @app.get("/products/filter")
+        async def products():
+            return {"total": busy_work()}
+
+        app.add_middleware(ProfilingMiddleware, store=store, sample_every=sample_every)
+        return TestClient(app)
+
+    def test_profiles_requests_with_admin_key(self, store, monkeypatch):
+        monkeypatch.delenv("API_KEY", raising=False)
+        monkeypatch.delenv("ADMIN_API_KEY", raising=False)
+        client = self.make_client(store)
+
+        response = client.get("/products/filter", headers={"X-Profile": "1", "X-API-Key": API_KEY, "X-Request-ID": "req-42"})
+
+        assert response.status_code == 200
+        assert response.headers["x-profile-id"] == "req-42"
+        [entry] = store.list()
+        assert entry["path"] == "/products/filter"
+        assert entry["reason"] == "requested"
+        assert "busy_work" in store.report("req-42")
+
+    def test_ignores_profile_header_without_valid_key(self, store, monkeypatch):
+        monkeypatch.delenv("API_KEY", raising=False)
+        client = self.make_client(store)
+
+        response = client.get("/products/filter", headers={"X-Profile": "1", "X-API-Key": "wrong"})
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert store.list() == []
+
+    def test_admin_key_enables_profiling_when_it_differs_from_the_api_key(self, store, monkeypatch):
+        monkeypatch.delenv("API_KEY", raising=False)
+        monkeypatch.setenv("ADMIN_API_KEY", "admin-key")
+        client = self.make_client(store)
+
+        regular = client.get("/products/filter", headers={"X-Profile": "1", "X-API-Key": API_KEY})
+        admin = client.get("/products/filter", headers={"X-Profile": "1", "X-API-Key": "admin-key"})
+
+        assert "x-profile-id" not in regular.headers
+        assert "x-profile-id" in admin.headers
+
+    def test_sampled_requests_ignore_the_client_request_id(self, store):
+        client = self.make_client(store, sample_every=1)
+
+        response = client.get("/products/filter", headers={"X-Request-ID": "req-42"})
+
+        assert response.headers["x-profile-id"] != "req-42"
+        assert store.path("req-42") is None
+
+    def test_samples_every_nth_request(self, store):
+        client = self.make_client(store, sample_every=3)
+
+        responses = [client.get("/products/filter") for _ in range(6)]
+
+        assert ["x-profile-id" in response.headers for response in responses] == [False, False, True, False, False, True]
+        assert {entry["reason"] for entry in store.list()} == {"sampled"}
+
+
+class TestProfileRoutes:
+    """Test cases for access to stored profiles."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("API_KEY", raising=False)
+        monkeypatch.setenv("ADMIN_API_KEY", "admin-key")
+        monkeypatch.setattr(debug_routes, "get_profile_store", lambda: ProfileStore(str(tmp_path), max_profiles=2))
+        app = FastAPI()
+        app.include_router(debug_routes.router)
+
+        @app.exception_handler(AuthenticationError)
+        @app.exception_handler(AuthorizationError)
+        async def auth_error(request: Request, exc: Exception):
+            return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+        return TestClient(app)
+
+    def test_profiles_need_the_admin_key(self, client):
+        assert client.get("/debug/profiles", headers={"X-API-Key": API_KEY}).status_code == 403
+        assert client.get("/debug/profiles/req-42", headers={"X-API-Key": API_KEY}).status_code == 403
+        assert client.get("/debug/profiles", headers={"X-API-Key": "admin-key"}).json() == []
+
+
+class TestProfileStore:
+    """Test cases for the rotating profile directory."""
+
+    def test_keeps_only_the_newest_profiles(self, tmp_path):
+        store = ProfileStore(str(tmp_path), max_profiles=2)
+        for n in range(4):
+            profiler = cProfile.Profile()
+            profiler.runcall(busy_work)
+            store.save(f"p{n}", profiler, {"timestamp": n})
+
+        assert [entry["id"] for entry in store.list()] == ["p3", "p2"]
+        assert store.path("p0") is None
+
+    def test_rejects_ids_that_are_not_file_names(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+
+        assert store.path("../secrets") is None
+        assert store.report("../secrets") is None
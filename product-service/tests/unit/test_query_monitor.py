@@ -0,0 +1,141 @@
+"""
+Unit tests for query shape normalisation and the slow-query monitor.
+"""
+from types import SimpleNamespace
+
+from database.query_monitor import OVERFLOW_SHAPE, SlowQueryMonitor, query_shape, summarize_explain
+
+
+class InlineExecutor:
+    """Runs submitted explains immediately"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def filter_pipeline(min_price, category):
+    return [
+        {"$match": {"price": {"$gte": min_price}, "category.short_name": category, "is_archived": False}},
+        {"$sort": {"price": 1}},
+        {"$skip": 0},
+        {"$limit": 10},
+    ]
+
+
+class TestQueryShape:
+    """Test cases for stripping values from commands."""
+
+    def test_values_are_stripped_and_sort_kept(self):
+        first = query_shape("aggregate", {"aggregate": "products", "pipeline": filter_pipeline(100, "beds")})
+        second = query_shape("aggregate", {"aggregate": "products", "pipeline": filter_pipeline(450, "sofas")})
+
+        assert first == second
+        assert "beds" not in first
+        assert '"$sort":{"price":1}' in first
+
+    def test_different_filters_are_different_shapes(self):
+        by_price = query_shape("find", {"find": "products", "filter": {"price": {"$lt": 10}}})
+        by_name = query_shape("find", {"find": "products", "filter": {"name": "Oslo bed"}})
+        by_names = query_shape("find", {"find": "products", "filter": {"$or": [{"name": "a"}, {"short_name": "b"}]}})
+
+        assert by_price != by_name
+        assert '"$or":[{"name":"?"},{"short_name":"?"}]' in by_names
+
+    def test_commands_without_a_query_have_no_shape(self):
+        assert query_shape("insert", {"insert": "products", "documents": [{}]}) is None
+
+
+class TestSummarizeExplain:
+    """Test cases for reading explain replies."""
+
+    def test_find_explain(self):
+        reply = {
+            "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "price_1"}}},
+            "executionStats": {"nReturned": 10, "totalDocsExamined": 10, "totalKeysExamined": 12, "executionTimeMillis": 3},
+        }
+
+        summary = summarize_explain(reply)
+
+        assert summary["plan"] == "FETCH > IXSCAN(price_1)"
+        assert summary["docsExamined"] == 10
+        assert summary["keysExamined"] == 12
+        assert summary["collectionScan"] is False
+
+    def test_aggregate_explain_uses_cursor_stage(self):
+        reply = {"stages": [
+            {"$cursor": {
+                "queryPlanner": {"winningPlan": {"queryPlan": {"stage": "COLLSCAN"}}},
+                "executionStats": {"nReturned": 3, "totalDocsExamined": 5000, "totalKeysExamined": 0},
+            }},
+            {"$sort": {"sortKey": {"price": 1}}},
+        ]}
+
+        summary = summarize_explain(reply)
+
+        assert summary["plan"] == "COLLSCAN"
+        assert summary["docsExamined"] == 5000
+        assert summary["collectionScan"] is True
+
+
+class TestSlowQueryMonitor:
+    """Test cases for per-shape timing and explain capture."""
+
+    def run(self, monitor, command_name, command, duration_ms, request_id=1):
+        started = SimpleNamespace(
+            command_name=command_name, command=command, database_name="afrifurn",
+            connection_id=("mongo", 27017), request_id=request_id,
+        )
+        monitor.started(started)
+        monitor.succeeded(SimpleNamespace(
+            command_name=command_name, connection_id=("mongo", 27017), request_id=request_id,
+            duration_micros=int(duration_ms * 1000),
+        ))
+
+    def test_slow_shapes_are_explained_once(self):
+        explained = []
+
+        def runner(database_name, command):
+            explained.append((database_name, command))
+            return {"executionStats": {"totalDocsExamined": 5000, "totalKeysExamined": 0}, "queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+
+        monitor = SlowQueryMonitor(threshold_ms=50, explain_runner=runner, executor=InlineExecutor())
+        for n, duration in enumerate((5, 80, 120)):
+            command = {"aggregate": "products", "pipeline": filter_pipeline(n, "beds"), "cursor": {}, "lsid": {"id": n}}
+            self.run(monitor, "aggregate", command, duration, request_id=n)
+
+        [shape] = monitor.top(10)
+        assert shape["count"] == 3
+        assert shape["slow_count"] == 2
+        assert shape["max_ms"] == 120
+        assert shape["explain"]["plan"] == "COLLSCAN"
+        assert len(explained) == 1
+        database_name, command = explained[0]
+        assert database_name == "afrifurn"
+        assert command["verbosity"] == "executionStats"
+        assert "lsid" not in command["explain"]
+
+    def test_writes_are_not_explained(self):
+        monitor = SlowQueryMonitor(threshold_ms=1, explain_runner=lambda *args: {}, executor=InlineExecutor())
+
+        self.run(monitor, "update", {"update": "products", "updates": [{"q": {"_id": 1}, "u": {"$inc": {"views": 1}}}]}, 10)
+
+        assert monitor.top(1)[0]["explain"]["reason"] == "not explainable"
+
+    def test_top_sorts_and_filters(self):
+        monitor = SlowQueryMonitor(threshold_ms=100)
+        self.run(monitor, "find", {"find": "products", "filter": {"name": "a"}}, 150, request_id=1)
+        for n in range(5):
+            self.run(monitor, "find", {"find": "colors", "filter": {}}, 40, request_id=10 + n)
+
+        assert monitor.top(1, "count")[0]["collection"] == "colors"
+        assert monitor.top(1, "max")[0]["collection"] == "products"
+        assert [shape["collection"] for shape in monitor.top(10, slow_only=True)] == ["products"]
+
+    def test_shapes_beyond_the_limit_are_aggregated(self):
+        monitor = SlowQueryMonitor(max_shapes=2)
+        for n in range(4):
+            self.run(monitor, "find", {"find": "products", "filter": {f"field{n}": n}}, 1, request_id=n)
+
+        shapes = {shape["shape"]: shape["count"] for shape in monitor.top(10)}
+        assert len(shapes) == 3
+        assert shapes[OVERFLOW_SHAPE] == 2
@@ -0,0 +1,184 @@
+"""
+Unit tests for token-bucket rate limiting.
+"""
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from core.exceptions import RateLimitExceeded
+from utils import rate_limiter
+from utils.decorators import rate_limit
+from utils.rate_limiter import (
+    LocalTokenBuckets, RateLimit, RateLimiter, limit_requests, parse_limit, retry_after_header,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestParseLimit:
+    """Test cases for limit strings."""
+
+    def test_units_and_multipliers(self):
+        assert parse_limit("100/minute") == RateLimit(100, 60)
+        assert parse_limit("5/second") == RateLimit(5, 1)
+        assert parse_limit("1000 / 6 hours") == RateLimit(1000, 6 * 3600)
+
+    @pytest.mark.parametrize("text", ["100", "0/minute", "ten/minute", "5/fortnight"])
+    def test_rejects_invalid_limits(self, text):
+        with pytest.raises(ValueError):
+            parse_limit(text)
+
+
+class TestLocalTokenBuckets:
+    """Test cases for in-process buckets."""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        buckets = LocalTokenBuckets(clock=clock)
+        limit = RateLimit(2, 1)
+
+        assert [buckets.hit("client", limit).allowed for _ in range(3)] == [True, True, False]
+        rejected = buckets.hit("client", limit)
+        assert rejected.retry_after_seconds == pytest.approx(0.5)
+
+        clock.now += 0.5
+        assert buckets.hit("client", limit).allowed
+        assert not buckets.hit("client", limit).allowed
+
+    def test_clients_have_separate_buckets(self):
+        buckets = LocalTokenBuckets(clock=FakeClock())
+        limit = RateLimit(1, 60)
+
+        assert buckets.hit("a", limit).allowed
+        assert buckets.hit("b", limit).allowed
+        assert not buckets.hit("a", limit).allowed
+
+    def test_least_recently_used_buckets_are_evicted(self):
+        buckets = LocalTokenBuckets(max_keys=2, clock=FakeClock())
+        limit = RateLimit(1, 60)
+
+        for key in ("a", "b", "a", "c"):
+            buckets.hit(key, limit)
+
+        assert len(buckets) == 2
+        # "b" was evicted and starts with a full bucket again
+        assert buckets.hit("b", limit).allowed
+        assert not buckets.hit("c", limit).allowed
+
+    def test_burst_above_sustained_rate(self):
+        buckets = LocalTokenBuckets(clock=FakeClock())
+        limit = RateLimit(1, 1, burst=3)
+
+        assert [buckets.hit("client", limit).allowed for _ in range(4)] == [True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_process_buckets_without_redis(self):
+        from loadtest.stack import free_port
+
+        limiter = RateLimiter(redis_url=f"redis://127.0.0.1:{free_port()}", local=LocalTokenBuckets(clock=FakeClock()))
+        limit = RateLimit(1, 60)
+
+        assert (await limiter.hit("export", "ip:1", limit)).allowed
+        assert not (await limiter.hit("export", "ip:1", limit)).allowed
+        assert limiter.circuit_breaker.total_failures == 2
+
+    def test_retry_after_rounds_up_to_whole_seconds(self):
+        assert retry_after_header(0.2) == "1"
+        assert retry_after_header(1.01) == "2"
+
+
+class TestLimitRequests:
+    """Test cases for the route dependency and the 429 response."""
+
+    @pytest.fixture
+    def limiter(self, monkeypatch):
+        limiter = RateLimiter(redis_url=None, local=LocalTokenBuckets(clock=FakeClock()))
+        monkeypatch.setattr(rate_limiter, "get_rate_limiter", lambda: limiter)
+        return limiter
+
+    @pytest.fixture
+    def client(self, limiter):
+        from main import app as main_app
+
+        app = FastAPI()
+        app.add_exception_handler(RateLimitExceeded, main_app.exception_handlers[RateLimitExceeded])
+
+        @app.get("/export", dependencies=[Depends(limit_requests("export", "2/minute"))])
+        async def export():
+            return {"ok": True}
+
+        @app.post("/cart/{user_id}", dependencies=[Depends(limit_requests("cart", "1/minute", key="user"))])
+        async def add_to_cart(user_id: str):
+            return {"user": user_id}
+
+        return TestClient(app)
+
+    @pytest.fixture(autouse=True)
+    def api_keys(self, monkeypatch):
+        monkeypatch.setenv("API_KEY", "k1")
+        monkeypatch.setenv("ADMIN_API_KEY", "k2")
+
+    def test_rejects_with_retry_after(self, client):
+        first = client.get("/export", headers={"X-API-Key": "k1"})
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+        client.get("/export", headers={"X-API-Key": "k1"})
+
+        rejected = client.get("/export", headers={"X-API-Key": "k1"})
+
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "30"
+        assert rejected.headers["X-RateLimit-Remaining"] == "0"
+        assert client.get("/export", headers={"X-API-Key": "k2"}).status_code == 200
+
+    def test_unknown_api_keys_share_the_address_bucket(self, client):
+        assert client.get("/export", headers={"X-API-Key": "made-up-1"}).status_code == 200
+        assert client.get("/export", headers={"X-API-Key": "made-up-2"}).status_code == 200
+        assert client.get("/export", headers={"X-API-Key": "made-up-3"}).status_code == 429
+        assert client.get("/export", headers={"X-API-Key": "k1"}).status_code == 200
+
+    def test_counts_per_user(self, client):
+        assert client.post("/cart/u1").status_code == 200
+        assert client.post("/cart/u1").status_code == 429
+        assert client.post("/cart/u2").status_code == 200
+
+    def test_overrides_replace_the_default(self, client, monkeypatch):
+        settings = rate_limiter.get_settings()
+        monkeypatch.setitem(settings.rate_limit_overrides, "export", "1/minute")
+
+        assert client.get("/export").status_code == 200
+        assert client.get("/export").status_code == 429
+
+    def test_can_be_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(rate_limiter.get_settings(), "rate_limit_enabled", False)
+
+        assert all(client.get("/export").status_code == 200 for _ in range(5))
+
+    def test_unknown_key_is_rejected_at_import(self):
+        with pytest.raises(ValueError):
+            limit_requests("export", "2/minute", key="cookie")
+
+
+class TestRateLimitDecorator:
+    """Test cases for the function-wide rate_limit decorator."""
+
+    @pytest.mark.asyncio
+    async def test_raises_429_with_retry_after(self, monkeypatch):
+        limiter = RateLimiter(redis_url=None, local=LocalTokenBuckets(clock=FakeClock()))
+        monkeypatch.setattr(rate_limiter, "get_rate_limiter", lambda: limiter)
+
+        @rate_limit(max_calls=1, time_window=10)
+        async def handler():
+            return "done"
+
+        assert await handler() == "done"
+        with pytest.raises(HTTPException) as error:
+            await handler()
+        assert error.value.status_code == 429
+        assert error.value.headers["Retry-After"] == "10"
@@ -0,0 +1,341 @@
+"""
+Unit tests for the Redis cart store and its write-behind to Mongo.
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+import dependencies.cart as cart_dependencies
+from decorators.circuit_breaker import CircuitBreaker
+from models.cart import Cart, CartItem
+from services.repository.cart_repository import CartRepository
+from services.repository.redis_cart_repository import (
+    SCRIPTS,
+    CartWriteBehind,
+    RedisCartRepository,
+    cart_fields,
+    cart_from_fields,
+)
+
+PRODUCT = {"_id": ObjectId(), "name": "Oslo Bed", "price": 200.0, "discount": 15}
+VARIANT = {"_id": ObjectId(), "images": ["oslo-oak.webp"]}
+
+
+class FakePipeline:
+    """Queues commands and runs them against the fake client on execute."""
+
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.commands: List[Callable[[], Any]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name: str):
+        command = getattr(self.client, name)
+        return lambda *args, **kwargs: self.commands.append(lambda: command(*args, **kwargs))
+
+    async def execute(self) -> List[Any]:
+        return [await command() for command in self.commands]
+
+
+class FakeRedis:
+    """The few plain Redis commands the store uses; scripts are answered by ``handlers``."""
+
+    def __init__(self):
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.sets: Dict[str, set] = {}
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.strings: Dict[str, str] = {}
+        self.handlers: Dict[str, Callable[[List[str], List[Any]], Any]] = {}
+        self.script_calls: List[tuple] = []
+
+    def register_script(self, source: str):
+        async def run(keys: List[str], args: List[Any]):
+            name = next(name for name, handler in self.handlers.items() if handler.source == source)
+            self.script_calls.append((name, keys, args))
+            return self.handlers[name](keys, args)
+
+        return run
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self.hashes.get(key, {}))
+
+    async def pexpire(self, key: str, ttl_ms: int) -> bool:
+        return key in self.hashes
+
+    async def zadd(self, key: str, mapping: Dict[str, float], xx: bool = False) -> int:
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+        return 0
+
+    async def zrangebyscore(self, key: str, low: str, high: float, start: int = 0, num: int = -1) -> List[str]:
+        members = sorted((score, member) for member, score in self.zsets.get(key, {}).items() if score <= high)
+        return [member for _, member in members][start:start + num]
+
+    async def zrem(self, key: str, *members: str) -> int:
+        return sum(self.zsets.get(key, {}).pop(member, None) is not None for member in members)
+
+    async def sadd(self, key: str, *members: str) -> int:
+        self.sets.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def srem(self, key: str, *members: str) -> int:
+        self.sets.setdefault(key, set()).difference_update(members)
+        return len(members)
+
+    async def spop(self, key: str, count: int) -> List[str]:
+        members = sorted(self.sets.get(key, set()))[:count]
+        self.sets.setdefault(key, set()).difference_update(members)
+        return members
+
+    async def get(self, key: str):
+        return self.strings.get(key)
+
+    async def getex(self, key: str, px: int = None):
+        return self.strings.get(key)
+
+    async def set(self, key: str, value: str, px: int = None, nx: bool = False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+
+class RecordingCollection:
+    """Mongo collection stand-in that records bulk writes."""
+
+    def __init__(self, documents: List[Dict[str, Any]] = (), error: Exception = None):
+        self.documents = {doc["_id"]: doc for doc in documents}
+        self.error = error
+        self.bulk_writes: List[List[Any]] = []
+
+    def find_one(self, criteria: Dict[str, Any], projection: Dict[str, Any] = None):
+        return self.documents.get(criteria.get("_id"))
+
+    def bulk_write(self, operations: List[Any], ordered: bool = True):
+        self.bulk_writes.append(operations)
+        if self.error is not None:
+            raise self.error
+
+
+def handler(name: str, function: Callable[[List[str], List[Any]], Any]):
+    function.source = SCRIPTS[name]
+    return function
+
+
+def make_cart(user_id: str = "user-1", quantity: int = 2) -> Cart:
+    item = CartItem.from_product(PRODUCT, VARIANT, quantity)
+    item.id = str(ObjectId())
+    return Cart(_id=str(ObjectId()), user_id=user_id, items=[item])
+
+
+@pytest.fixture
+def client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def carts_collection():
+    return RecordingCollection()
+
+
+@pytest.fixture
+def repository(client, carts_collection):
+    carts = CartRepository()
+    carts.db = {
+        "cart": carts_collection,
+        "products": RecordingCollection([PRODUCT]),
+        "variants": RecordingCollection([VARIANT]),
+    }
+    return RedisCartRepository("redis://carts-test:6379", idle_seconds=60, batch_size=2, carts=carts, client=client)
+
+
+class TestCartFields:
+    """Test cases for storing a cart as hash fields."""
+
+    def test_round_trip_keeps_items_and_recalculates_totals(self):
+        cart = make_cart(quantity=3)
+        second = CartItem.from_product({**PRODUCT, "discount": None}, {"_id": ObjectId(), "images": []}, 1)
+        second.id = str(ObjectId())
+        cart.items.append(second)
+
+        fields = cart_fields(cart)
+        fields[f"qty:{second.id}"] = "4"  # as after HINCRBY
+        restored = cart_from_fields(cart.id, fields)
+
+        assert fields[f"line:{second.product_id}:{second.variant_id}"] == second.id
+        assert [item.id for item in restored.items] == [cart.items[0].id, second.id]
+        assert restored.items[1].quantity == 4
+        assert restored.total_amount == 170.0 * 3 + 200.0 * 4
+
+
+class TestRedisCartRepository:
+    """Test cases for cart changes in Redis."""
+
+    @pytest.mark.asyncio
+    async def test_adding_an_item_is_one_script_call_returning_the_cart(self, repository, client):
+        cart = make_cart()
+        client.strings[f"afrifurn-cart:user:{cart.user_id}"] = cart.id
+        client.handlers["add"] = handler("add", lambda keys, args: [
+            value for pair in cart_fields(cart).items() for value in pair
+        ])
+
+        result = await repository.add_to_cart(cart.user_id, str(PRODUCT["_id"]), str(VARIANT["_id"]), 2)
+
+        [(name, keys, args)] = client.script_calls
+        assert keys == [f"afrifurn-cart:{cart.id}", "afrifurn-cart:dirty", "afrifurn-cart:active"]
+        assert args[3] == "afrifurn-cart:user:"
+        assert args[4] == f"{PRODUCT['_id']}:{VARIANT['_id']}"
+        assert args[7] == 2
+        assert result.total_amount == 340.0
+
+    @pytest.mark.asyncio
+    async def test_cart_missing_from_redis_is_loaded_from_mongo_then_changed(self, repository, client, carts_collection):
+        cart = make_cart()
+        carts_collection.documents[ObjectId(cart.id)] = cart.model_dump(by_alias=True)
+        answers = iter([-1, [value for pair in cart_fields(cart).items() for value in pair]])
+        client.handlers["set_quantity"] = handler("set_quantity", lambda keys, args: next(answers))
+        client.handlers["load"] = handler("load", lambda keys, args: 1)
+
+        result = await repository.update_item_quantity(cart.id, cart.items[0].id, 2)
+
+        assert [call[0] for call in client.script_calls] == ["set_quantity", "load", "set_quantity"]
+        assert client.script_calls[1][2][3:5] == ["user_id", cart.user_id]
+        assert result.items[0].quantity == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_item_is_not_found(self, repository, client):
+        client.handlers["set_quantity"] = handler("set_quantity", lambda keys, args: 0)
+
+        with pytest.raises(HTTPException) as error:
+            await repository.update_item_quantity(str(ObjectId()), str(ObjectId()), 2)
+
+        assert error.value.status_code == 404
+
+    def test_cart_store_has_its_own_breaker_and_pool(self, repository):
+        from decorators.redis_provider import get_circuit_breaker, get_connection_pool
+
+        cache_breaker = get_circuit_breaker(repository.redis_url)
+        assert repository.circuit_breaker is not cache_breaker
+        for _ in range(cache_breaker.failure_threshold):
+            cache_breaker.record_failure()
+        try:
+            assert repository.circuit_breaker.allow_request()
+        finally:
+            cache_breaker.record_success()
+
+        pool = get_connection_pool(repository.redis_url, store="cart", socket_timeout_ms=500)
+        assert pool is not get_connection_pool(repository.redis_url)
+        assert pool.connection_kwargs["socket_timeout"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, repository):
+        repository.circuit_breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60)
+        repository.circuit_breaker.record_failure()
+
+        with pytest.raises(HTTPException) as error:
+            await repository.get_cart(str(ObjectId()))
+
+        assert error.value.status_code == 503
+
+
+class TestWriteBehind:
+    """Test cases for writing Redis carts to Mongo."""
+
+    def store(self, client: FakeRedis, cart: Cart, dirty: bool = True, touched: Optional[float] = None) -> None:
+        client.hashes[f"afrifurn-cart:{cart.id}"] = cart_fields(cart)
+        client.zsets.setdefault("afrifurn-cart:active", {})[cart.id] = time.time() if touched is None else touched
+        if dirty:
+            client.sets.setdefault("afrifurn-cart:dirty", set()).add(cart.id)
+
+    @pytest.mark.asyncio
+    async def test_dirty_carts_are_upserted_in_batches(self, repository, client, carts_collection):
+        saved = [make_cart(f"user-{n}") for n in range(3)]
+        for cart in saved:
+            self.store(client, cart)
+
+        flushed = await CartWriteBehind(repository).run_once()
+
+        assert flushed == 3
+        assert [len(batch) for batch in carts_collection.bulk_writes] == [2, 1]
+        operation = carts_collection.bulk_writes[0][0]
+        assert operation._upsert
+        assert operation._doc["$set"]["items"][0]["quantity"] == 2
+        assert isinstance(operation._doc["$set"]["items"][0]["_id"], ObjectId)
+        assert client.sets["afrifurn-cart:dirty"] == set()
+
+    @pytest.mark.asyncio
+    async def test_failed_write_marks_the_carts_dirty_again(self, repository, client, carts_collection):
+        cart = make_cart()
+        self.store(client, cart)
+        carts_collection.error = RuntimeError("primary stepped down")
+
+        with pytest.raises(RuntimeError):
+            await repository.flush_dirty()
+
+        assert client.sets["afrifurn-cart:dirty"] == {cart.id}
+
+    @pytest.mark.asyncio
+    async def test_duplicate_active_cart_is_not_retried(self, repository, client, carts_collection):
+        cart = make_cart()
+        self.store(client, cart)
+        carts_collection.error = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "dup"}]})
+
+        await repository.flush_dirty()
+
+        assert client.sets["afrifurn-cart:dirty"] == set()
+
+    @pytest.mark.asyncio
+    async def test_idle_carts_are_written_then_evicted(self, repository, client, carts_collection):
+        idle, active = make_cart("user-1"), make_cart("user-2")
+        self.store(client, idle, dirty=True, touched=100)
+        self.store(client, active, dirty=False, touched=1000)
+        client.handlers["evict"] = handler("evict", lambda keys, args: 1)
+
+        assert await repository.evict_idle(now=1000) == 1
+
+        [operations] = carts_collection.bulk_writes
+        assert [operation._filter["_id"] for operation in operations] == [ObjectId(idle.id)]
+        [(_, keys, args)] = client.script_calls
+        assert keys[1] == "afrifurn-cart:user:user-1"
+        assert args == [idle.id, 940]
+
+    @pytest.mark.asyncio
+    async def test_checkout_writes_the_cart_at_once(self, repository, client, carts_collection):
+        cart = make_cart()
+        self.store(client, cart)
+
+        persisted = await repository.persist(cart.id)
+
+        assert persisted.total_amount == 340.0
+        assert len(carts_collection.bulk_writes) == 1
+        assert cart.id not in client.sets["afrifurn-cart:dirty"]
+
+
+class TestCartStoreSetting:
+    """Test cases for choosing the cart store from settings."""
+
+    def test_redis_store_is_chosen_by_setting(self, monkeypatch):
+        monkeypatch.setattr(cart_dependencies.get_settings(), "cart_store", "redis")
+        cart_dependencies.get_cart_repository.cache_clear()
+        try:
+            assert isinstance(cart_dependencies.get_cart_repository(), RedisCartRepository)
+        finally:
+            cart_dependencies.get_cart_repository.cache_clear()
+
+    def test_mongo_is_the_default(self):
+        cart_dependencies.get_cart_repository.cache_clear()
+        assert isinstance(cart_dependencies.get_cart_repository(), CartRepository)
@@ -0,0 +1,143 @@
+"""
+Unit tests for request logging and the JSON log format.
+"""
+import asyncio
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from config import logging_setup
+from config.logging_setup import JsonFormatter, configure_logging
+from middleware import RequestLoggingMiddleware
+
+
+class TestRequestLoggingMiddleware:
+    """Test cases for RequestLoggingMiddleware."""
+
+    @pytest.fixture
+    def records(self):
+        captured = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                captured.append(record)
+
+        access = logging.getLogger("access")
+        handler = Capture()
+        access.addHandler(handler)
+        access.setLevel(logging.INFO)
+        yield captured
+        access.removeHandler(handler)
+
+    def make_client(self, sample: float, **options) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/ok")
+        async def ok():
+            return {"ok": True}
+
+        @app.get("/missing")
+        async def missing():
+            raise HTTPException(status_code=404)
+
+        @app.get("/boom")
+        async def boom():
+            raise RuntimeError("boom")
+
+        app.add_middleware(RequestLoggingMiddleware, random_source=lambda: sample, **options)
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_successful_requests_are_sampled(self, records):
+        skipped = self.make_client(sample=0.5, sample_rate=0.1)
+        skipped.get("/ok")
+        assert records == []
+
+        logged = self.make_client(sample=0.05, sample_rate=0.1)
+        logged.get("/ok", params={"page": 2})
+        assert len(records) == 1
+        assert records[0].levelno == logging.INFO
+        assert records[0].fields["path"] == "/ok"
+        assert records[0].fields["query"] == "page=2"
+        assert records[0].fields["status"] == 200
+        assert records[0].fields["sample_rate"] == 0.1
+
+    def test_errors_are_always_logged(self, records):
+        client = self.make_client(sample=0.99, sample_rate=0.0)
+
+        client.get("/missing")
+        client.get("/boom")
+
+        assert [(record.levelno, record.fields["status"]) for record in records] == [
+            (logging.WARNING, 404),
+            (logging.ERROR, 500),
+        ]
+        assert records[1].fields["error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_requests_are_not_logged_as_errors(self, records):
+        async def disconnected(scope, receive, send):
+            raise asyncio.CancelledError()
+
+        middleware = RequestLoggingMiddleware(disconnected, sample_rate=0.0)
+        scope = {"type": "http", "method": "GET", "path": "/ok", "query_string": b"", "client": ("10.0.0.7", 1)}
+
+        with pytest.raises(asyncio.CancelledError):
+            await middleware(scope, None, None)
+
+        [record] = records
+        assert record.levelno == logging.WARNING
+        assert record.fields["status"] is None
+        assert record.fields["cancelled"] is True
+
+    def test_slow_requests_are_always_logged(self, records):
+        client = self.make_client(sample=0.99, sample_rate=0.0, slow_request_seconds=0.0)
+
+        client.get("/ok")
+
+        assert len(records) == 1
+        assert records[0].levelno == logging.WARNING
+        assert records[0].fields["slow"] is True
+
+
+class TestJsonFormatter:
+    """Test cases for the JSON-lines formatter."""
+
+    def test_merges_fields_into_one_line(self):
+        record = logging.LogRecord("access", logging.INFO, __file__, 0, "GET %s", ("/ok",), None)
+        record.fields = {"status": 200, "duration_ms": 1.5}
+
+        line = JsonFormatter().format(record)
+
+        assert "\n" not in line
+        entry = json.loads(line)
+        assert entry["message"] == "GET /ok"
+        assert entry["logger"] == "access"
+        assert entry["status"] == 200
+        assert entry["duration_ms"] == 1.5
+
+
+class TestConfigureLogging:
+    """Test cases for replacing and stopping the log listener."""
+
+    def test_reconfiguring_stops_the_previous_listener_once(self, tmp_path):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        try:
+            first = configure_logging(str(tmp_path / "first.log"))
+            configure_logging(str(tmp_path / "second.log"))
+            logging.getLogger("test").info("hello")
+
+            logging_setup._stop_listener()
+            logging_setup._stop_listener()  # as at interpreter exit
+        finally:
+            for handler in root.handlers[:]:
+                root.removeHandler(handler)
+            for handler in handlers:
+                root.addHandler(handler)
+            root.setLevel(level)
+
+        assert first.handlers[0].stream is None
+        assert "hello" in (tmp_path / "second.log").read_text()
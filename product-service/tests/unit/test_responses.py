@@ -0,0 +1,63 @@
+"""
+Unit tests for the orjson response class and trusted responses.
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+
+from core.responses import FastJSONResponse, dumps, trusted_response
+from models.products import Product
+
+
+class TestFastJSONResponse:
+    """Test cases for FastJSONResponse rendering."""
+
+    def test_handles_objectid_datetime_and_decimal(self):
+        object_id = ObjectId()
+        body = FastJSONResponse({"_id": object_id, "at": datetime(2025, 1, 2, 3, 4, 5), "price": Decimal("9.5")}).body
+
+        assert json.loads(body) == {"_id": str(object_id), "at": "2025-01-02T03:04:05", "price": 9.5}
+
+    def test_matches_fastapi_output_for_a_product_page(self, product_page):
+        field = create_response_field(name="response", type_=List[Product])
+        value, errors = field.validate(product_page, {}, loc=("response",))
+        assert not errors
+        validated = field.serialize(value, by_alias=True)
+
+        stdlib = json.loads(JSONResponse(validated).body)
+        assert json.loads(FastJSONResponse(validated).body) == stdlib
+        assert json.loads(dumps(product_page)) == stdlib
+
+
+class TestTrustedResponse:
+    """Test cases for the trusted_response decorator."""
+
+    @pytest.fixture
+    def client(self, product_page):
+        app = FastAPI(default_response_class=FastJSONResponse)
+
+        @app.get("/validated", response_model=List[Product])
+        async def validated():
+            return product_page[:3]
+
+        @app.get("/trusted", response_model=List[Product])
+        @trusted_response()
+        async def trusted(limit: int = 3):
+            return product_page[:limit]
+
+        return TestClient(app)
+
+    def test_trusted_output_matches_validated_output(self, client):
+        assert client.get("/trusted").json() == client.get("/validated").json()
+
+    def test_signature_is_preserved_for_query_parameters(self, client):
+        assert len(client.get("/trusted?limit=2").json()) == 2
+        assert "limit" in json.dumps(client.app.openapi())
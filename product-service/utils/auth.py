@@ -56,6 +56,34 @@ def verify_admin_access(api_key: str) -> bool:
     return True
 
 
+def verify_admin_api_key(x_api_key: str = Header(..., description="Admin API Key")) -> str:
+    """
+    Verify an API key for admin-only endpoints.
+    
+    The admin key is accepted on its own; the regular API key only while no admin key is
+    configured. Chaining ``verify_api_key`` and ``verify_admin_access`` instead would need a key
+    equal to both, which no key is once ADMIN_API_KEY differs from API_KEY.
+    
+    Args:
+        x_api_key: API key from header
+        
+    Returns:
+        Verified API key
+        
+    Raises:
+        AuthenticationError: If the key is missing or matches no configured key
+        AuthorizationError: If the key is the regular API key and an admin key is configured
+    """
+    admin_api_key = os.getenv("ADMIN_API_KEY")
+    
+    if admin_api_key and x_api_key == admin_api_key:
+        return x_api_key
+    
+    verify_api_key(x_api_key)
+    verify_admin_access(x_api_key)
+    return x_api_key
+
+
 def verify_write_access(api_key: str) -> bool:
     """
     Verify write access level.
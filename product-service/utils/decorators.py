@@ -2,11 +2,24 @@
 Decorators for logging and operation tracking.
 """
 import asyncio
+import hashlib
+import inspect
+import json
 import logging
+import threading
 import time
 import functools
-from typing import Any, Callable
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from bson import ObjectId
+from cachetools import TTLCache
+from pydantic import BaseModel
+
+_MISSING = object()
 
 
 def log_operation(operation_name: str):
@@ -124,46 +137,190 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
     return decorator
 
 
-def cache_result(ttl_seconds: int = 300):
+class UncacheableArguments(TypeError):
+    """Raised when call arguments have no stable, content-based representation."""
+
+
+def _key_material_default(value: Any) -> Any:
+    """JSON encoder hook for the value types that appear in service and repository calls"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, (ObjectId, Decimal, UUID, Enum)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    # Anything else would fall back to a repr that may embed a memory address
+    raise UncacheableArguments(f"Cannot derive a stable cache key from {type(value).__name__}")
+
+
+def make_cache_key(namespace: str, version: int, arguments: Dict[str, Any]) -> str:
+    """
+    Build a cache key that is identical in every process for equal arguments.
+    
+    Args:
+        namespace: Key namespace, usually the function's qualified name
+        version: Bumped to invalidate every key of the namespace at once
+        arguments: Bound call arguments, ``self``/``cls`` already removed
+        
+    Returns:
+        Key of the form ``memo:{namespace}:v{version}:{digest}``
+        
+    Raises:
+        UncacheableArguments: If an argument has no stable representation
+    """
+    material = json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=_key_material_default)
+    digest = hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+    return f"memo:{namespace}:v{version}:{digest}"
+
+
+def cache_result(
+    ttl_seconds: int = 300,
+    namespace: Optional[str] = None,
+    version: int = 1,
+    shared: bool = True,
+    local_maxsize: int = 0,
+    local_ttl_seconds: Optional[float] = None,
+):
     """
-    Decorator to cache function results.
+    Decorator to memoise function results under stable, content-hashed keys.
+    
+    Keys hash the bound arguments (defaults applied, ``self``/``cls`` excluded), so every
+    worker and every restart computes the same key for the same call. Results are stored
+    in the shared Redis provider and, optionally, in a small in-process TTL cache in front
+    of it. With ``shared=False`` only the in-process cache is used, which suits pure helpers
+    and also works for synchronous functions. Results read back from Redis are JSON-decoded,
+    so shared caching is meant for functions that return plain JSON-compatible data.
     
     Args:
         ttl_seconds: Time to live for cached results
+        namespace: Key namespace; defaults to ``module.qualname`` of the function
+        version: Bump to orphan every previously cached result of the function
+        shared: Store results in Redis so they are shared between processes
+        local_maxsize: Size of the in-process cache; 0 disables it
+        local_ttl_seconds: Time to live in the in-process cache; defaults to ``ttl_seconds``
         
     Returns:
-        Decorated function
+        Decorated function, with ``cache_key(*args, **kwargs)`` and async
+        ``invalidate(*args, **kwargs)`` helpers attached
     """
+    if not shared and local_maxsize <= 0:
+        raise ValueError("cache_result needs shared=True or a positive local_maxsize")
+
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Import here to avoid circular imports
-            
-            cache_service = create_redis_cache_provider()
-            
-            # Generate cache key from function name and arguments
-            cache_key = f"{func.__name__}:{hash(str(args) + str(kwargs))}"
-            
+        is_async = asyncio.iscoroutinefunction(func)
+        if shared and not is_async:
+            raise TypeError(f"{func.__qualname__} must be async to use the shared cache; pass shared=False")
+
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters)
+        skip_first = bool(parameters) and parameters[0] in ("self", "cls")
+        key_namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+        local_cache = TTLCache(maxsize=local_maxsize, ttl=local_ttl_seconds or ttl_seconds) if local_maxsize > 0 else None
+        local_lock = threading.Lock()
+        logger = logging.getLogger(func.__module__)
+
+        def cache_key(*args, **kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if skip_first:
+                arguments.pop(parameters[0], None)
+            return make_cache_key(key_namespace, version, arguments)
+
+        def key_or_none(args, kwargs) -> Optional[str]:
             try:
-                # Try to get from cache
-                cached_result = await cache_service.get(cache_key)
-                if cached_result is not None:
-                    return cached_result
-                
-                # Execute function
-                result = await func(*args, **kwargs)
-                
-                # Cache the result
-                await cache_service.set(cache_key, result, ttl_seconds)
-                
+                return cache_key(*args, **kwargs)
+            except UncacheableArguments as e:
+                logger.debug(f"Not caching {func.__qualname__}: {e}")
+                return None
+
+        def local_get(key: str) -> Any:
+            if local_cache is None:
+                return _MISSING
+            with local_lock:
+                return local_cache.get(key, _MISSING)
+
+        def local_set(key: str, value: Any) -> None:
+            if local_cache is not None:
+                with local_lock:
+                    local_cache[key] = value
+
+        if not is_async:
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                key = key_or_none(args, kwargs)
+                if key is None:
+                    return func(*args, **kwargs)
+                cached = local_get(key)
+                if cached is not _MISSING:
+                    return cached
+                result = func(*args, **kwargs)
+                local_set(key, result)
                 return result
-                
-            except Exception as e:
-                logger = logging.getLogger(func.__module__)
-                logger.error(f"Cache operation failed for {func.__name__}: {e}")
-                # Fall back to executing function without caching
+
+            async def invalidate_local(*args, **kwargs) -> None:
+                key = key_or_none(args, kwargs)
+                if key is not None:
+                    with local_lock:
+                        local_cache.pop(key, None)
+
+            sync_wrapper.cache_key = cache_key
+            sync_wrapper.invalidate = invalidate_local
+            return sync_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = key_or_none(args, kwargs)
+            if key is None:
                 return await func(*args, **kwargs)
-                
+
+            cached = local_get(key)
+            if cached is not _MISSING:
+                return cached
+
+            cache_service = None
+            if shared:
+                # Import here to avoid circular imports
+                from decorators import create_redis_cache_provider
+
+                cache_service = create_redis_cache_provider()
+                try:
+                    cached = await cache_service.get(key)
+                except Exception as e:
+                    logger.error(f"Cache read failed for {func.__qualname__}: {e}")
+                    cached = None
+                if cached is not None:
+                    local_set(key, cached)
+                    return cached
+
+            result = await func(*args, **kwargs)
+
+            local_set(key, result)
+            if cache_service is not None and result is not None:
+                try:
+                    await cache_service.set(key, result, ttl_seconds)
+                except Exception as e:
+                    logger.error(f"Cache write failed for {func.__qualname__}: {e}")
+            return result
+
+        async def invalidate(*args, **kwargs) -> None:
+            key = key_or_none(args, kwargs)
+            if key is None:
+                return
+            if local_cache is not None:
+                with local_lock:
+                    local_cache.pop(key, None)
+            if shared:
+                from decorators import create_redis_cache_provider
+
+                await create_redis_cache_provider().delete(key)
+
+        wrapper.cache_key = cache_key
+        wrapper.invalidate = invalidate
         return wrapper
     return decorator
 
@@ -196,39 +353,40 @@ def validate_input(validator_func: Callable):
     return decorator
 
 
-def rate_limit(max_calls: int = 100, time_window: int = 60):
+def rate_limit(max_calls: int = 100, time_window: int = 60, scope: Optional[str] = None):
     """
     Decorator to implement rate limiting.
     
+    All calls of the function share one token bucket in the process-wide rate limiter, so the
+    limit holds across workers while Redis is reachable. Routes that should limit each client
+    separately use ``utils.rate_limiter.limit_requests`` instead.
+    
     Args:
         max_calls: Maximum number of calls allowed
         time_window: Time window in seconds
+        scope: Bucket name; defaults to ``module.qualname`` of the function
         
     Returns:
         Decorated function
     """
+    from utils import rate_limiter
+
+    limit = rate_limiter.RateLimit(max_calls, time_window)
+
     def decorator(func: Callable) -> Callable:
-        call_history = []
+        bucket = scope or f"{func.__module__}.{func.__qualname__}"
         
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            current_time = time.time()
-            
-            # Remove old calls outside the time window
-            call_history[:] = [call_time for call_time in call_history 
-                             if current_time - call_time < time_window]
-            
-            # Check if rate limit exceeded
-            if len(call_history) >= max_calls:
+            decision = await rate_limiter.get_rate_limiter().hit(bucket, "all", limit)
+            if not decision.allowed:
                 from fastapi import HTTPException, status
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded. Maximum {max_calls} calls per {time_window} seconds."
+                    detail=f"Rate limit exceeded. Maximum {max_calls} calls per {time_window} seconds.",
+                    headers={"Retry-After": rate_limiter.retry_after_header(decision.retry_after_seconds)},
                 )
             
-            # Add current call
-            call_history.append(current_time)
-            
             return await func(*args, **kwargs)
             
         return wrapper
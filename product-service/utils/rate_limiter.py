@@ -0,0 +1,325 @@
+"""
+Token-bucket rate limiting per client, shared between workers through Redis.
+
+Each (scope, client) pair owns a bucket of ``burst`` tokens that refills at ``requests``
+per ``period``. A request takes one token or is rejected with the time until one is
+available, which becomes the ``Retry-After`` header. Buckets live in Redis and are updated
+by one Lua script, so a check is a single O(1) round trip and every worker sees the same
+counts. While Redis is unreachable (the shared circuit breaker is open) the same buckets
+are kept in process, so each instance still enforces the limit on its own.
+
+Routes opt in with a dependency::
+
+    @router.get("/export", dependencies=[Depends(limit_requests("products-export", "10/minute"))])
+
+and operators can change a scope's limit with ``RATE_LIMIT_OVERRIDES``, e.g.
+``{"products-export": "30/minute"}``.
+"""
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from config.settings import get_settings
+from core.exceptions import AuthenticationError, AuthorizationError, RateLimitExceeded
+from core.metrics import metrics
+from utils.auth import verify_admin_api_key
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+# KEYS[1] bucket; ARGV rate (tokens per second), capacity, cost.
+# Time comes from the Redis server so workers with skewed clocks share one view of the bucket.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+rate_limit_decisions = metrics.counter(
+    "rate_limit_decisions_total", "Rate-limited requests by outcome", labels=("scope", "outcome"),
+)
+rate_limit_fallbacks = metrics.counter(
+    "rate_limit_local_fallbacks_total", "Rate limit checks answered in process because Redis was unavailable",
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``requests`` per ``period_seconds``, with up to ``burst`` requests at once (default ``requests``)"""
+
+    requests: int
+    period_seconds: float
+    burst: Optional[int] = None
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.requests / self.period_seconds
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or self.requests
+
+    def __str__(self) -> str:
+        return f"{self.requests}/{self.period_seconds:g}s"
+
+
+@lru_cache(maxsize=256)
+def parse_limit(text: str) -> RateLimit:
+    """
+    Parse a limit such as ``100/minute``, ``5/second`` or ``1000/6hours``.
+
+    Args:
+        text: Count, a slash and a period, optionally with a multiplier
+
+    Returns:
+        The parsed limit
+
+    Raises:
+        ValueError: If the text is not a limit
+    """
+    match = LIMIT_PATTERN.match(text)
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid rate limit {text!r}; expected e.g. '100/minute'")
+    count, multiplier, unit = match.groups()
+    return RateLimit(int(count), int(multiplier or 1) * PERIODS[unit])
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_seconds: float
+
+
+def take_token(tokens: float, updated_at: float, now: float, limit: RateLimit, cost: int) -> Tuple[bool, float, float]:
+    """
+    Refill a bucket up to ``now`` and take ``cost`` tokens from it if it holds enough.
+
+    The same arithmetic as TOKEN_BUCKET_SCRIPT, for buckets kept in process.
+
+    Returns:
+        Whether the tokens were taken, the tokens left and the seconds until ``cost`` are available
+    """
+    tokens = min(limit.capacity, tokens + max(0.0, now - updated_at) * limit.rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / limit.rate
+
+
+class LocalTokenBuckets:
+    """
+    Token buckets in process memory, bounded to ``max_keys`` least recently used buckets.
+
+    A bucket that is evicted starts full again the next time its client is seen, so the
+    bound only loosens limits for clients idle long enough to be evicted.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+            allowed, tokens, retry_after = take_token(tokens, updated_at, now, limit, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return RateLimitDecision(allowed, limit.capacity, int(tokens), retry_after)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Token buckets in Redis, with in-process buckets while Redis is unavailable.
+
+    Args:
+        redis_url: Redis holding the buckets; None keeps every bucket in process
+        key_prefix: Prefix of the bucket keys
+        local: Buckets used without Redis or while its circuit breaker is open
+    """
+
+    def __init__(self, redis_url: Optional[str], key_prefix: str = "afrifurn", local: Optional[LocalTokenBuckets] = None):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.local = local or LocalTokenBuckets()
+        self._script = None
+        self.circuit_breaker = None
+        if redis_url:
+            from decorators.redis_provider import get_circuit_breaker
+
+            self.circuit_breaker = get_circuit_breaker(redis_url)
+
+    def _get_script(self):
+        if self._script is None:
+            import redis.asyncio as redis
+            from decorators.redis_provider import get_connection_pool
+
+            client = redis.Redis(connection_pool=get_connection_pool(self.redis_url))
+            # Sent with EVALSHA, falling back to EVAL the first time a server has not seen it
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    async def hit(self, scope: str, client: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        """
+        Take ``cost`` tokens from the bucket of ``client`` in ``scope``.
+
+        Args:
+            scope: Name of the limited route or group of routes
+            client: Client identity, see ``client_identity``
+            limit: Limit of the scope
+            cost: Tokens the request takes
+
+        Returns:
+            Whether the request may proceed, and when to retry if not
+        """
+        key = f"{self.key_prefix}:ratelimit:{scope}:{client}"
+        if self.circuit_breaker is not None and self.circuit_breaker.allow_request():
+            from decorators.redis_provider import redis_command_duration, redis_command_failures
+
+            start = time.perf_counter()
+            try:
+                allowed, tokens, retry_after = await self._get_script()(keys=[key], args=[limit.rate, limit.capacity, cost])
+            except Exception as e:
+                redis_command_failures.labels("ratelimit").inc()
+                self.circuit_breaker.record_failure()
+                logger.error(f"Rate limit check failed for {scope}, limiting in process: {e}")
+            except BaseException:
+                self.circuit_breaker.release_probe()
+                raise
+            else:
+                redis_command_duration.labels("ratelimit").observe(time.perf_counter() - start)
+                self.circuit_breaker.record_success()
+                return RateLimitDecision(bool(allowed), limit.capacity, int(float(tokens)), float(retry_after))
+        if self.circuit_breaker is not None:
+            rate_limit_fallbacks.inc()
+        return self.local.hit(key, limit, cost)
+
+
+@lru_cache()
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter, created from settings on first use"""
+    settings = get_settings()
+    return RateLimiter(
+        redis_url=settings.redis_url if settings.rate_limit_backend == "redis" else None,
+        key_prefix=settings.redis_key_prefix,
+        local=LocalTokenBuckets(settings.rate_limit_local_max_keys),
+    )
+
+
+def _is_configured_key(api_key: str) -> bool:
+    try:
+        verify_admin_api_key(api_key)
+    except AuthenticationError:
+        return False
+    except AuthorizationError:
+        # The regular API key while an admin key is configured
+        pass
+    return True
+
+
+def client_identity(request: Request, key: str = "api_key") -> str:
+    """
+    Identify the client a request is counted against.
+
+    Args:
+        request: Incoming request
+        key: ``api_key`` (X-API-Key if it is a configured key, else the address), ``user``
+            (the ``user_id`` path or query parameter, else the address) or ``ip``
+
+    Returns:
+        Identity such as ``key:3f1c...``, ``user:42`` or ``ip:10.0.0.7``
+    """
+    if key == "api_key":
+        api_key = request.headers.get("x-api-key")
+        # An unchecked key would give a client a fresh bucket per made-up value
+        if api_key and _is_configured_key(api_key):
+            # Keys are never written to Redis as they are
+            return "key:" + hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+    elif key == "user":
+        user_id = request.path_params.get("user_id") or request.query_params.get("user_id")
+        if user_id:
+            return f"user:{user_id}"
+    if get_settings().rate_limit_trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return "ip:" + forwarded.split(",", 1)[0].strip()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def limit_requests(scope: str, default: str, key: str = "api_key", cost: int = 1) -> Callable:
+    """
+    FastAPI dependency limiting a route to ``default`` per client.
+
+    Args:
+        scope: Bucket namespace; routes sharing a scope share their budget
+        default: Limit such as ``60/minute``, unless ``rate_limit_overrides`` names the scope
+        key: How clients are told apart, see ``client_identity``
+        cost: Tokens one request takes
+
+    Returns:
+        Dependency raising RateLimitExceeded once the client's bucket is empty
+    """
+    if key not in ("api_key", "user", "ip"):
+        raise ValueError(f"Unknown rate limit key {key!r}")
+    parse_limit(default)
+
+    async def dependency(request: Request, response: Response) -> None:
+        settings = get_settings()
+        if not settings.rate_limit_enabled:
+            return
+        limit = parse_limit(settings.rate_limit_overrides.get(scope, default))
+        decision = await get_rate_limiter().hit(scope, client_identity(request, key), limit, cost)
+        if not decision.allowed:
+            rate_limit_decisions.labels(scope, "limited").inc()
+            raise RateLimitExceeded(scope, decision.limit, decision.retry_after_seconds)
+        rate_limit_decisions.labels(scope, "allowed").inc()
+        # Only reaches the client when the route returns data rather than its own Response
+        response.headers["X-RateLimit-Limit"] = str(decision.limit)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+
+    return dependency
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After takes whole seconds; round up so a client retrying on time finds a token"""
+    return str(max(1, math.ceil(seconds)))